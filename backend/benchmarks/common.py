@@ -0,0 +1,187 @@
+"""
+Shared helpers for the benchmark scripts: resource sampling, JSON output and
+baseline comparison.
+"""
+
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+BENCH_DIR = Path(__file__).parent
+BACKEND_DIR = BENCH_DIR.parent
+REPO_ROOT = BACKEND_DIR.parent
+RESULTS_DIR = BENCH_DIR / "results"
+BASELINES_DIR = BENCH_DIR / "baselines"
+
+
+def peak_rss_mb() -> float:
+    """High-water resident set size of this process"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def current_rss_mb() -> float:
+    """Resident set size now (Linux only, 0.0 elsewhere)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def reset_peak_rss() -> bool:
+    """Reset the RSS high-water mark to the current RSS (Linux), so peak_rss_mb() covers only what follows"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def window_peak_rss_mb() -> float:
+    """RSS high-water mark since reset_peak_rss(); falls back to the process lifetime peak"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+class Measure:
+    """Wall time, CPU time and peak RSS for a block (the RSS window restarts on entry, so do not nest)"""
+
+    def __enter__(self) -> "Measure":
+        reset_peak_rss()
+        self._wall0, self._cpu0 = time.perf_counter(), cpu_seconds()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.wall_s = time.perf_counter() - self._wall0
+        self.cpu_s = cpu_seconds() - self._cpu0
+        self.peak_rss_mb = window_peak_rss_mb()
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "wall_s": round(self.wall_s, 6),
+            "cpu_s": round(self.cpu_s, 6),
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+        }
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def summarize(values: Iterable[float]) -> Dict[str, float]:
+    values = list(values)
+    if not values:
+        return {"n": 0}
+    return {
+        "n": len(values),
+        "total": round(sum(values), 6),
+        "mean": round(statistics.fmean(values), 6),
+        "p50": round(percentile(values, 50), 6),
+        "p95": round(percentile(values, 95), 6),
+        "max": round(max(values), 6),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, timeout=10,
+        ).stdout.strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "provider_mode": os.getenv("PROVIDER_MODE", "live"),
+    }
+
+
+def write_json(data: Dict[str, Any], path: Optional[Path], name: str) -> Path:
+    if path is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        path = RESULTS_DIR / f"{name}-{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def load_json(path: Path) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def compare_metrics(
+    current: Dict[str, float],
+    baseline: Dict[str, float],
+    threshold: float = 0.2,
+    min_delta: float = 0.0,
+) -> List[Dict[str, Any]]:
+    """
+    Compare flat {metric: value} maps where lower is better.
+    A metric regresses when it grew by more than `threshold` (relative) and
+    more than `min_delta` (absolute, filters timer noise on tiny stages).
+    """
+    rows = []
+    for key in sorted(set(current) | set(baseline)):
+        cur, base = current.get(key), baseline.get(key)
+        if cur is None or base is None:
+            rows.append({"metric": key, "baseline": base, "current": cur, "change": None,
+                         "status": "new" if base is None else "missing"})
+            continue
+        delta = cur - base
+        change = delta / base if base else (0.0 if delta == 0 else float("inf"))
+        if change > threshold and delta > min_delta:
+            status = "regression"
+        elif change < -threshold and -delta > min_delta:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({"metric": key, "baseline": base, "current": cur,
+                     "change": round(change, 4), "status": status})
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]]) -> None:
+    width = max([len(r["metric"]) for r in rows] + [6])
+    print(f"{'metric'.ljust(width)}  {'baseline':>12}  {'current':>12}  {'change':>8}  status")
+    for r in rows:
+        base = "-" if r["baseline"] is None else f"{r['baseline']:.4f}"
+        cur = "-" if r["current"] is None else f"{r['current']:.4f}"
+        change = "-" if r["change"] is None else f"{r['change'] * 100:+.1f}%"
+        print(f"{r['metric'].ljust(width)}  {base:>12}  {cur:>12}  {change:>8}  {r['status']}")
@@ -0,0 +1,192 @@
+"""
+Company-name resolution benchmark
+Compares the prebuilt TF-IDF index (gw_api.wikirate.company_index) with the
+previous per-call flow: read the CSV, substring filter, fit a fresh NameMatcher.
+
+Also builds the company registry (gw_api.core.company_registry) into a temp dir
+and reports its build / load time and whitelist-membership latency against the
+previous check, `name.lower() in <whitelist list>`.
+
+Usage (from backend/):
+    python -m benchmarks.company_match
+    python -m benchmarks.company_match --queries 500 --legacy-queries 20
+"""
+
+import argparse
+import csv
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from benchmarks.common import BACKEND_DIR, Measure, environment, summarize, write_json
+from gw_api.config import WIKIRATE_COMPANY_SOURCES
+from gw_api.core.company_registry import CompanyRegistry, build_registry, default_sources, load_whitelist
+from gw_api.wikirate.company_index import CompanyIndex, build_index, load_companies
+
+LEGACY_CSV = BACKEND_DIR / "data_files" / "wikirate_companies_2000.csv"
+
+
+def legacy_match(input_name: str, csv_path: Path = LEGACY_CSV) -> Optional[str]:
+    """The pre-index WikirateClient.find_best_matching_company flow (prints removed)"""
+    import re
+    import pandas as pd
+    from name_matching.name_matcher import NameMatcher
+
+    def normalize_name(name: str) -> str:
+        name = re.sub(r"[^a-z0-9\s]", "", name.lower())
+        return re.sub(r"\s+", " ", name).strip()
+
+    with open(csv_path, "r", encoding="utf-8") as f:
+        companies = [
+            {"id": r["id"], "name": r["name"], "isin_count": int(r["isin_count"])}
+            for r in csv.DictReader(f)
+        ]
+    keyword = input_name.lower()
+    filtered = [c for c in companies if keyword in c["name"].lower()]
+    if not filtered:
+        return None
+    normalized_map = {
+        normalize_name(c["name"]): {"original_name": c["name"], "isin_count": c["isin_count"]}
+        for c in companies
+    }
+    matcher = NameMatcher(number_of_matches=5, legal_suffixes=True, common_words=False, top_n=50, verbose=False)
+    matcher.set_distance_metrics(["bag", "typo", "refined_soundex"])
+    matcher.load_and_process_master_data(
+        column="Company name", df_matching_data=pd.DataFrame({"Company name": [c["name"] for c in filtered]}),
+        transform=True,
+    )
+    matches = matcher.match_names(to_be_matched=pd.DataFrame({"name": [input_name]}), column_matching="name")
+    if matches.empty:
+        return None
+    results = []
+    for i in range(5):
+        name, score = matches.get(f"match_name_{i}"), matches.get(f"score_{i}")
+        if name is not None and score is not None and pd.notna(name[0]):
+            results.append((normalize_name(name[0]), score[0]))
+    if not results:
+        return None
+    best = max(s for _, s in results)
+    top = [n for n, s in results if s == best]
+    pick = max(top, key=lambda n: normalized_map.get(n, {}).get("isin_count", 0))
+    return normalized_map.get(pick, {}).get("original_name", pick)
+
+
+def sample_queries(n: int, seed: int = 0) -> List[str]:
+    """Real names from the company lists, some with case/suffix noise"""
+    names = [name for _, name, _ in load_companies(WIKIRATE_COMPANY_SOURCES)]
+    rng = random.Random(seed)
+    picked = rng.sample(names, min(n, len(names)))
+    noisy = []
+    for i, name in enumerate(picked):
+        if i % 3 == 1:
+            name = name.upper()
+        elif i % 3 == 2:
+            name = name.split(" ")[0] if " " in name else name
+        noisy.append(name)
+    return noisy
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--legacy-queries", type=int, default=20, help="0 skips the NameMatcher flow")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    companies = load_companies(WIKIRATE_COMPANY_SOURCES)
+    queries = sample_queries(args.queries)
+    report = {"benchmark": "company_match", "environment": environment(), "companies": len(companies)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with Measure() as build:
+            build_index(companies, Path(tmp))
+        with Measure() as load:
+            index = CompanyIndex(Path(tmp))
+        index.search(queries[0])  # fault in the mapped pages once
+        latencies, hits = [], 0
+        index_results = {}
+        for q in queries:
+            start = time.perf_counter()
+            match = index.best_match(q)
+            latencies.append((time.perf_counter() - start) * 1000)
+            index_results[q] = match.name if match else None
+            hits += match is not None
+        report["index"] = {
+            "build": build.as_dict(),
+            "load": load.as_dict(),
+            "query_ms": summarize(latencies),
+            "resolved": hits,
+            "queries": len(queries),
+        }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with Measure() as build:
+            meta = build_registry(Path(tmp))
+        with Measure() as load:
+            registry = CompanyRegistry(Path(tmp))
+        whitelist = [name.lower() for name in load_whitelist(default_sources()["whitelist"])]
+        # half whitelisted names (some re-cased), half names from the Wikirate lists
+        rng = random.Random(1)
+        checks = [n.upper() if i % 2 else n for i, n in enumerate(rng.sample(whitelist, min(len(whitelist), len(queries))))]
+        checks = [c for pair in zip(checks, queries) for c in pair]
+        set_latencies, list_latencies, set_hits, list_hits = [], [], 0, 0
+        for name in checks:
+            start = time.perf_counter()
+            set_hits += registry.is_whitelisted(name)
+            set_latencies.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            list_hits += name.lower() in whitelist
+            list_latencies.append((time.perf_counter() - start) * 1000)
+        report["registry"] = {
+            "build": build.as_dict(),
+            "load": load.as_dict(),
+            "entries": meta["companies"],
+            "aliases": meta["aliases"],
+            "whitelist_size": len(whitelist),
+            "is_whitelisted_ms": summarize(set_latencies),
+            "list_scan_ms": summarize(list_latencies),
+            "whitelisted": set_hits,
+            "whitelisted_list_scan": list_hits,
+            "checks": len(checks),
+        }
+
+    if args.legacy_queries:
+        try:
+            legacy_latencies, agree = [], 0
+            subset = queries[: args.legacy_queries]
+            for q in subset:
+                start = time.perf_counter()
+                name = legacy_match(q)
+                legacy_latencies.append((time.perf_counter() - start) * 1000)
+                agree += name == index_results[q]
+            report["legacy_namematcher"] = {
+                "query_ms": summarize(legacy_latencies),
+                "queries": len(subset),
+                "agreement_with_index": round(agree / len(subset), 3),
+            }
+        except ImportError as e:
+            report["legacy_namematcher"] = {"skipped": f"name_matching not installed ({e})"}
+
+    idx = report["index"]["query_ms"]
+    print(f"index: {len(companies)} companies, build {report['index']['build']['wall_s']:.2f}s, "
+          f"load {report['index']['load']['wall_s'] * 1000:.1f}ms, "
+          f"query p50 {idx['p50']:.3f}ms p95 {idx['p95']:.3f}ms")
+    reg = report["registry"]
+    print(f"registry: {reg['entries']} entries, {reg['aliases']} aliases, build {reg['build']['wall_s']:.2f}s, "
+          f"load {reg['load']['wall_s'] * 1000:.1f}ms; whitelist check p50 {reg['is_whitelisted_ms']['p50']:.4f}ms "
+          f"vs list scan {reg['list_scan_ms']['p50']:.4f}ms ({reg['whitelisted']} vs {reg['whitelisted_list_scan']} "
+          f"of {reg['checks']} names whitelisted)")
+    legacy = report.get("legacy_namematcher", {})
+    if "query_ms" in legacy:
+        print(f"NameMatcher: p50 {legacy['query_ms']['p50']:.1f}ms, "
+              f"agreement {legacy['agreement_with_index']:.0%}")
+    elif legacy:
+        print(f"NameMatcher: {legacy['skipped']}")
+    print(f"Results written to {write_json(report, args.out, 'company_match')}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
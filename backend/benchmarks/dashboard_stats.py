@@ -0,0 +1,156 @@
+"""
+Dashboard statistics benchmark
+Fills a temporary SQLite database with --reports synthetic reports (metrics
+JSON shaped like the analysis output) and measures:
+
+- `GET /v2/dashboard/stats` as it was: load every report, parse every metrics
+  blob, write back corrected scores and commit
+- the materialized counters (gw_api.core.dashboard_stats.get_stats), a
+  single-row read
+- the report insert with and without `record_report` in its transaction
+
+It ends with the consistency check, which must report the counters equal to a
+full scan.
+
+Usage (from backend/):
+    python -m benchmarks.dashboard_stats
+    python -m benchmarks.dashboard_stats --reports 50000 --calls 20
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from benchmarks.common import environment, summarize, write_json
+from gw_api.config import Base
+from gw_api.core.dashboard_stats import backfill, check, get_stats, record_report
+from gw_api.models.report import Report
+
+RISK_TYPES = [
+    "Vague or unsubstantiated claims", "Lack of specific metrics or targets", "Misleading terminology",
+    "Cherry-picked data", "Absence of third-party verification",
+]
+
+
+def _report(rng: random.Random) -> Report:
+    metrics = {name: {"score": round(rng.uniform(0, 10), 1), "explanation": "x" * 300} for name in RISK_TYPES}
+    overall = round(rng.uniform(0, 10), 1)
+    metrics["overall_greenwashing_score"] = {"score": overall, "explanation": "y" * 300}
+    return Report(
+        session_id=str(uuid.UUID(int=rng.getrandbits(128))),
+        company_name=f"Company {rng.randrange(2000)}",
+        overall_score=overall * 10,
+        risk_type="Unknown type",
+        metrics=json.dumps(metrics),
+        analysis_summary="summary",
+    )
+
+
+def legacy_stats(db: Session) -> Dict[str, Any]:
+    """The previous endpoint body"""
+    reports = db.query(Report).all()
+    high_risk_count = 0
+    for report in reports:
+        if report.metrics:
+            try:
+                metrics = json.loads(report.metrics)
+                if "overall_greenwashing_score" in metrics:
+                    overall_score = metrics["overall_greenwashing_score"].get("score", 0)
+                    if report.overall_score != overall_score:
+                        report.overall_score = overall_score
+                    if overall_score >= 7:
+                        high_risk_count += 1
+            except json.JSONDecodeError:
+                pass
+    db.commit()
+    return {"high_risk_companies": high_risk_count, "pending_reports": len(reports)}
+
+
+def _timed(fn, calls: int) -> List[float]:
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=10000)
+    parser.add_argument("--calls", type=int, default=10, help="stats reads per method")
+    parser.add_argument("--inserts", type=int, default=200, help="report inserts per method")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    report: Dict[str, Any] = {"benchmark": "dashboard_stats", "environment": environment(), "reports": args.reports}
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/reports.db")
+        Base.metadata.create_all(bind=engine)
+        Session_ = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        with Session_() as db:
+            db.add_all(_report(rng) for _ in range(args.reports))
+            db.commit()
+            start = time.perf_counter()
+            backfill(db)
+            report["backfill_s"] = round(time.perf_counter() - start, 3)
+
+        def fresh(fn):
+            def call():
+                with Session_() as db:
+                    return fn(db)
+            return call
+
+        legacy_stats(Session_())  # first call rewrites every overall_score; time the steady state
+        report["stats_ms"] = {
+            "legacy_full_scan": summarize(_timed(fresh(legacy_stats), args.calls)),
+            "materialized": summarize(_timed(fresh(get_stats), args.calls)),
+        }
+
+        def insert(count: bool):
+            def run(db: Session):
+                new = _report(rng)
+                db.add(new)
+                if count:
+                    record_report(db, new)
+                db.commit()
+            return fresh(run)
+
+        report["insert_ms"] = {
+            "without_counters": summarize(_timed(insert(False), args.inserts)),
+            "with_counters": summarize(_timed(insert(True), args.inserts)),
+        }
+        with Session_() as db:
+            # the plain inserts above bypassed the counters on purpose
+            report["check_before_backfill"] = check(db)
+            backfill(db)
+            report["check"] = check(db)
+            report["legacy_result"] = legacy_stats(db)
+            stats = get_stats(db)
+            report["materialized_result"] = {
+                "high_risk_companies": stats.high_risk_reports, "pending_reports": stats.total_reports,
+            }
+
+    stats_ms, insert_ms = report["stats_ms"], report["insert_ms"]
+    print(f"{args.reports} reports, backfill {report['backfill_s']:.2f}s")
+    print(f"stats: full scan p50 {stats_ms['legacy_full_scan']['p50']:.1f}ms, "
+          f"materialized p50 {stats_ms['materialized']['p50']:.3f}ms")
+    print(f"insert: p50 {insert_ms['without_counters']['p50']:.2f}ms without counters, "
+          f"{insert_ms['with_counters']['p50']:.2f}ms with")
+    print(f"results equal: {report['legacy_result'] == report['materialized_result']}, "
+          f"consistency check: {report['check']['consistent']}")
+    print(f"Results written to {write_json(report, args.out, 'dashboard_stats')}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
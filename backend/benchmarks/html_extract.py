@@ -0,0 +1,154 @@
+"""
+HTML extraction benchmark
+Runs the article text extractors over a set of saved pages and reports
+documents per second, output size and, for generated fixtures, how much of
+the expected article body is kept and how much of the output is article body:
+
+    fast           gw_api.webscraper.html_extract.extract_main_text
+    unstructured   UnstructuredHTMLLoader, the previous loader (skipped if not installed)
+    visible_text   every visible text node (BeautifulSoup get_text), for scale
+
+By default the pages come from benchmarks.news_pages (BBC-, CNN- and
+generic-shaped articles with navigation, related links and footers). `--pages`
+points at any directory of saved .html files instead, e.g. the article store.
+
+Usage (from backend/):
+    python -m benchmarks.html_extract
+    python -m benchmarks.html_extract --per-site 50 --repeat 3
+    python -m benchmarks.html_extract --pages data/news_store/blobs
+"""
+
+import argparse
+import json
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.common import environment, write_json
+from benchmarks.news_pages import write_pages
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def _norm(text: str) -> str:
+    return WHITESPACE.sub(" ", text).strip()
+
+
+def load_pages(directory: Path) -> List[Dict[str, Any]]:
+    index_path = directory / "index.json"
+    if index_path.exists():
+        pages = json.loads(index_path.read_text(encoding="utf-8"))
+    else:
+        pages = [{"file": str(p.relative_to(directory)), "url": None} for p in sorted(directory.rglob("*.html"))]
+    for page in pages:
+        page["path"] = directory / page["file"]
+        page["html"] = page["path"].read_text(encoding="utf-8", errors="replace")
+    return pages
+
+
+def extractors() -> Dict[str, Optional[Callable[[Dict[str, Any]], str]]]:
+    from bs4 import BeautifulSoup
+
+    from gw_api.webscraper.html_extract import PARSER, extract_main_text
+
+    def visible_text(page):
+        soup = BeautifulSoup(page["html"], PARSER)
+        for tag in soup(["script", "style", "noscript", "template"]):
+            tag.decompose()
+        return _norm(soup.get_text(" "))
+
+    found: Dict[str, Optional[Callable]] = {
+        "fast": lambda page: extract_main_text(page["html"], page.get("url")),
+        "unstructured": None,
+        "visible_text": visible_text,
+    }
+    try:
+        start = time.perf_counter()
+        from langchain_community.document_loaders import UnstructuredHTMLLoader
+
+        def unstructured(page):
+            docs = UnstructuredHTMLLoader(str(page["path"])).load()
+            return "\n\n".join(doc.page_content for doc in docs if doc.page_content)
+
+        unstructured.import_s = round(time.perf_counter() - start, 3)
+        found["unstructured"] = unstructured
+    except ImportError as e:
+        print(f"unstructured: skipped ({e})")
+    return found
+
+
+def run(extract: Callable, pages: List[Dict[str, Any]], repeat: int) -> Dict[str, Any]:
+    outputs: List[str] = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        outputs = [extract(page) for page in pages]
+    elapsed = time.perf_counter() - start
+    result: Dict[str, Any] = {
+        "docs_per_s": round(len(pages) * repeat / elapsed, 1),
+        "ms_per_doc": round(elapsed * 1000 / (len(pages) * repeat), 2),
+        "mean_chars": round(sum(len(o) for o in outputs) / max(1, len(outputs))),
+        "total_chars": sum(len(o) for o in outputs),
+    }
+    if getattr(extract, "import_s", None) is not None:
+        result["import_s"] = extract.import_s
+    expected = [page for page in pages if page.get("body")]
+    if expected:
+        kept = body = total = 0
+        for page, output in zip(pages, outputs):
+            if not page.get("body"):
+                continue
+            flat = _norm(output)
+            found = [p for p in page["body"] if _norm(p) in flat]
+            kept += sum(len(p) for p in found)
+            body += sum(len(p) for p in page["body"])
+            total += len(flat)
+        result["body_recall"] = round(kept / max(1, body), 3)
+        result["body_share_of_output"] = round(kept / max(1, total), 3)
+    return result
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=Path, default=None, help="directory of saved .html pages")
+    parser.add_argument("--per-site", type=int, default=20, help="generated pages per site")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.pages
+        if directory is None:
+            directory = Path(tmp)
+            write_pages(directory, args.per_site)
+        pages = load_pages(directory)
+
+        report: Dict[str, Any] = {
+            "benchmark": "html_extract",
+            "environment": environment(),
+            "pages": len(pages),
+            "source": str(args.pages) if args.pages else f"benchmarks.news_pages ({args.per_site} per site)",
+            "repeat": args.repeat,
+            "extractors": {},
+        }
+        for name, extract in extractors().items():
+            if extract is not None:
+                report["extractors"][name] = run(extract, pages, args.repeat)
+
+    results = report["extractors"]
+    reference = "unstructured" if "unstructured" in results else "visible_text"
+    for name, r in results.items():
+        if name != reference:
+            r[f"size_vs_{reference}"] = round(r["total_chars"] / max(1, results[reference]["total_chars"]), 3)
+            r[f"speedup_vs_{reference}"] = round(r["docs_per_s"] / results[reference]["docs_per_s"], 1)
+        extra = ""
+        if "body_recall" in r:
+            extra = f", body recall {r['body_recall']:.0%}, body share {r['body_share_of_output']:.0%}"
+        print(f"{name:>13}: {r['docs_per_s']:8.1f} docs/s, {r['mean_chars']:6d} chars/doc{extra}")
+    print(f"Results written to {write_json(report, args.out, 'html_extract')}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
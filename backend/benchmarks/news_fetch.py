@@ -0,0 +1,99 @@
+"""
+News fetch benchmark
+Runs the previous serial flow (bbc_search per alias: pages one by one, then
+articles one by one) and the concurrent NewsFetcher against the local fixture
+server (benchmarks.news_fixture), each into an empty download directory.
+
+Usage (from backend/):
+    python -m benchmarks.news_fetch
+    python -m benchmarks.news_fetch --company "Deutsche Bank AG" --latency-ms 100
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.common import environment, write_json
+from benchmarks.news_fixture import FixtureConfig, start
+
+
+def serve_in_background(config: FixtureConfig) -> str:
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="news-fixture", daemon=True).start()
+    _, base_url = asyncio.run_coroutine_threadsafe(start(config), loop).result()
+    return base_url
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--company", default="Royal Dutch Shell plc")
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--skip-serial", action="store_true")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    config = FixtureConfig(latency_ms=args.latency_ms, error_rate=args.error_rate)
+    base_url = serve_in_background(config)
+    os.environ["BBC_BASE_URL"] = base_url  # read when bbc_search is imported
+
+    from gw_api.core.utils import generate_company_aliases
+    from gw_api.webscraper.bbc_search import BBCSource, bbc_search
+    from gw_api.webscraper.news_fetcher import NewsFetcher
+
+    aliases = generate_company_aliases(args.company)
+    report: Dict[str, Any] = {
+        "benchmark": "news_fetch",
+        "environment": environment(),
+        "aliases": aliases,
+        "latency_ms": args.latency_ms,
+    }
+
+    if not args.skip_serial:
+        config.requests.clear()
+        with tempfile.TemporaryDirectory() as tmp:
+            cwd = os.getcwd()
+            os.chdir(tmp)  # url_download writes to ./downloads
+            try:
+                start_t = time.perf_counter()
+                articles = {}
+                for alias in aliases:
+                    try:
+                        articles.update(bbc_search(alias) or {})
+                    except Exception as e:
+                        print(f"serial: alias {alias!r} failed: {e}")
+                elapsed = time.perf_counter() - start_t
+            finally:
+                os.chdir(cwd)
+        report["serial"] = {"seconds": round(elapsed, 3), "articles": len(articles), "requests": dict(config.requests)}
+
+    config.requests.clear()
+    with tempfile.TemporaryDirectory() as tmp:
+        fetcher = NewsFetcher(sources=[BBCSource(base_url, rate_per_s=0)])
+
+        async def run() -> Dict[str, str]:
+            try:
+                return await fetcher.search_aliases(aliases, tmp)
+            finally:
+                await fetcher.close()
+
+        start_t = time.perf_counter()
+        articles = asyncio.run(run())
+        elapsed = time.perf_counter() - start_t
+    report["concurrent"] = {"seconds": round(elapsed, 3), "articles": len(articles), "requests": dict(config.requests)}
+
+    for case in ("serial", "concurrent"):
+        if case in report:
+            r = report[case]
+            print(f"{case:>10}: {r['seconds']:.2f}s, {r['articles']} articles, requests {r['requests']}")
+    print(f"Results written to {write_json(report, args.out, 'news_fetch')}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
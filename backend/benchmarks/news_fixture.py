@@ -0,0 +1,142 @@
+"""
+Local news fixture server
+Serves BBC-shaped search result pages, CNN-shaped search API responses and
+article pages from a fixed pool of generated articles, with configurable
+latency and injected 503s, so the news fetcher can be exercised without the
+network:
+
+    GET /search?q=...&page=N        BBC: 10 "default-promo" results per page
+    GET /content?q=...&page=N       CNN search API: 10 JSON results per page
+    GET /news/articles/{id}         article HTML (CNN links use /cnn/articles/{id})
+
+Each query sees `--per-query` articles drawn deterministically from a pool of
+`--pool` articles, so different aliases of one company overlap like real
+searches do.
+
+Usage (from backend/):
+    python -m benchmarks.news_fixture --port 8766 --latency-ms 80
+    BBC_BASE_URL=http://127.0.0.1:8766 CNN_SEARCH_URL=http://localhost:8766 python -m ...
+
+(BBC and CNN are addressed through different host names so that article
+downloads are attributed to the right source.)
+"""
+
+import argparse
+import asyncio
+import hashlib
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from aiohttp import web
+
+PAGE_SIZE = 10
+
+
+@dataclass
+class FixtureConfig:
+    pool: int = 60
+    per_query: int = 25
+    latency_ms: float = 50.0
+    error_rate: float = 0.0
+    seed: int = 0
+    requests: Dict[str, int] = field(default_factory=dict)
+
+
+def results_for(config: FixtureConfig, query: str) -> List[int]:
+    """Article ids returned for a query; queries sharing a first word share most results"""
+    head = (query.split() or [""])[0].lower()
+    rng = random.Random(int(hashlib.md5(head.encode()).hexdigest()[:8], 16) + config.seed)
+    ids = rng.sample(range(config.pool), min(config.per_query, config.pool))
+    extra = random.Random(query.lower()).sample(range(config.pool), min(3, config.pool))
+    return list(dict.fromkeys(ids + extra))[: config.per_query]
+
+
+def make_app(config: FixtureConfig) -> web.Application:
+    rng = random.Random(config.seed)
+
+    async def delay_or_fail(kind: str):
+        config.requests[kind] = config.requests.get(kind, 0) + 1
+        await asyncio.sleep(config.latency_ms / 1000)
+        if config.error_rate and rng.random() < config.error_rate:
+            raise web.HTTPServiceUnavailable()
+
+    async def search(request: web.Request) -> web.Response:
+        await delay_or_fail("search")
+        ids = results_for(config, request.query.get("q", ""))
+        page = int(request.query.get("page", 1))
+        chunk = ids[(page - 1) * PAGE_SIZE : page * PAGE_SIZE]
+        base = f"{request.scheme}://{request.host}"
+        promos = "".join(
+            f'<div data-testid="default-promo"><a href="{base}/news/articles/a{i}">'
+            f"<p>Fixture article {i}: company sustainability update</p></a>"
+            f"<ul><li><span>{i + 1} hours ago</span></li></ul></div>"
+            for i in chunk
+        )
+        return web.Response(text=f"<html><body>{promos}</body></html>", content_type="text/html")
+
+    async def cnn_search(request: web.Request) -> web.Response:
+        await delay_or_fail("cnn_search")
+        # CNN sees the same pool in a different order, so some articles overlap with BBC
+        ids = list(reversed(results_for(config, request.query.get("q", ""))))
+        page = int(request.query.get("page", 1))
+        chunk = ids[(page - 1) * PAGE_SIZE : page * PAGE_SIZE]
+        base = f"{request.scheme}://{request.host}"
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        result = [
+            {
+                "type": "article",
+                "headline": f"Fixture article {i}: company sustainability update",
+                "url": f"{base}/cnn/articles/a{i}",
+                "firstPublishDate": (now - timedelta(hours=2 * i + 1)).isoformat() + "Z",
+            }
+            for i in chunk
+        ]
+        return web.json_response({"result": result})
+
+    async def article(request: web.Request) -> web.Response:
+        await delay_or_fail("article")
+        i = request.match_info["id"]
+        body = " ".join(f"Paragraph {n} of fixture article {i} about emissions and governance." for n in range(40))
+        return web.Response(
+            text=f"<html><head><title>Fixture article {i}</title></head><body><article><h1>Fixture article {i}</h1>"
+                 f"<p>{body}</p></article></body></html>",
+            content_type="text/html",
+        )
+
+    app = web.Application()
+    app.router.add_get("/search", search)
+    app.router.add_get("/content", cnn_search)
+    app.router.add_get("/news/articles/{id}", article)
+    app.router.add_get("/cnn/articles/{id}", article)
+    return app
+
+
+async def start(config: FixtureConfig, host: str = "127.0.0.1", port: int = 0) -> tuple:
+    """Start the fixture on the running loop; returns (runner, base_url)"""
+    runner = web.AppRunner(make_app(config))
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--pool", type=int, default=60)
+    parser.add_argument("--per-query", type=int, default=25)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    config = FixtureConfig(pool=args.pool, per_query=args.per_query, latency_ms=args.latency_ms,
+                           error_rate=args.error_rate)
+    print(f"News fixture on http://{args.host}:{args.port} ({args.latency_ms:g} ms latency)")
+    web.run_app(make_app(config), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Saved news page fixtures
+Writes a deterministic set of article pages shaped like current BBC and CNN
+article markup, plus pages of an unknown site, into a directory together with
+an index.json of {file, url, site, title, body} entries. Every page carries
+the boilerplate real pages have: a large inline JSON state script, header
+navigation, image captions, related links, "most read" lists and a footer.
+`body` holds the paragraphs an extractor should return.
+
+Usage (from backend/):
+    python -m benchmarks.news_pages --out benchmarks/results/news_pages --per-site 20
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Dict, List
+
+SENTENCES = [
+    "The company said it would cut scope 1 and 2 emissions by {n}% by 2030 compared with 2019 levels.",
+    "Campaigners questioned whether the plan covers scope 3 emissions from its supply chain.",
+    "Regulators are reviewing advertising that described several products as carbon neutral.",
+    "Analysts said the target relied heavily on offsets rather than reductions in its own operations.",
+    "Renewable sources now supply {n}% of the electricity used at its European sites, the report said.",
+    "A spokesperson said the firm remained committed to reaching net zero, and would publish progress annually.",
+    "Shareholders backed a resolution asking for more detail on capital spending on fossil fuel projects.",
+    "Water use at its plants fell by {n}% last year, although waste sent to landfill increased.",
+    "The board's remuneration committee linked part of executive pay to climate targets for the first time.",
+    "Critics said the disclosures were difficult to compare with those of other companies in the sector.",
+]
+NAV = ["Home", "News", "Sport", "Business", "Innovation", "Culture", "Arts", "Travel", "Earth", "Audio", "Video", "Live"]
+MOST_READ = [
+    "Man charged after crash on motorway", "Storm warnings issued for the weekend", "Celebrity couple announce split",
+    "Ten things we learned this week", "Train strikes: what you need to know",
+]
+
+
+def _paragraphs(rng: random.Random, count: int) -> List[str]:
+    out = []
+    for _ in range(count):
+        picked = rng.sample(SENTENCES, rng.randint(2, 4))
+        out.append(" ".join(s.format(n=rng.randint(5, 90)) for s in picked))
+    return out
+
+
+def _state_script(rng: random.Random, title: str) -> str:
+    blob = {"page": {"title": title, "tracking": [rng.random() for _ in range(400)],
+                     "related": [{"headline": h, "id": rng.randint(1, 10 ** 9)} for h in MOST_READ * 20]}}
+    return f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(blob)}</script>'
+
+
+def bbc_page(rng: random.Random, title: str, body: List[str]) -> str:
+    nav = "".join(f'<li><a href="/{n.lower()}">{n}</a></li>' for n in NAV)
+    blocks = []
+    for i, p in enumerate(body):
+        blocks.append(f'<div data-component="text-block"><p>{p}</p></div>')
+        if i == 1:
+            blocks.append('<div data-component="image-block"><figure><img src="x.jpg" alt="A wind farm">'
+                          '<figcaption>Getty Images: The company operates wind farms in the North Sea</figcaption>'
+                          '</figure></div>')
+    related = "".join(f'<li><a href="/news/{i}">{h}</a></li>' for i, h in enumerate(MOST_READ))
+    return (
+        f'<!DOCTYPE html><html lang="en-GB"><head><title>{title} - BBC News</title>'
+        f'<style>body{{font-family:sans-serif}}.x{{color:red}}</style>{_state_script(rng, title)}</head><body>'
+        f'<header data-component="header"><nav><ul>{nav}</ul></nav></header>'
+        f'<main id="main-content"><article>'
+        f'<div data-component="headline-block"><h1 id="main-heading">{title}</h1></div>'
+        f'<div data-component="byline-block"><time datetime="2025-01-01">1 January 2025</time>'
+        f'<span>By Jane Reporter, Business reporter</span></div>'
+        + "".join(blocks)
+        + f'<div data-component="links-block"><h2>Related topics</h2><ul>{related}</ul></div>'
+        f'</article><section data-component="most-read"><h2>Most read</h2><ol>{related}</ol></section></main>'
+        f'<footer><ul>{nav}</ul><p>Copyright 2025 BBC. The BBC is not responsible for the content of external sites.'
+        f' Read about our approach to external linking.</p></footer></body></html>'
+    )
+
+
+def cnn_page(rng: random.Random, title: str, body: List[str]) -> str:
+    nav = "".join(f'<a class="header__nav-item" href="/{n.lower()}">{n}</a>' for n in NAV)
+    paragraphs = "".join(f'<p class="paragraph inline-placeholder">{p}</p>' for p in body)
+    related = "".join(f'<div class="card"><a href="/2025/{i}">{h}</a></div>' for i, h in enumerate(MOST_READ))
+    return (
+        f'<html><head><title>{title} | CNN Business</title>{_state_script(rng, title)}</head><body>'
+        f'<div class="header"><nav class="header__nav">{nav}</nav></div>'
+        f'<div class="headline"><h1 class="headline__text">{title}</h1></div>'
+        f'<div class="byline">By CNN staff, updated 9:00 AM EST</div>'
+        f'<main class="article__main"><div class="article__content">{paragraphs}</div></main>'
+        f'<div class="related-content"><h2>More from CNN</h2>{related}</div>'
+        f'<div class="ad-feedback">Ad Feedback</div>'
+        f'<footer class="footer"><nav>{nav}</nav><p>2025 Cable News Network. All Rights Reserved.</p></footer>'
+        f'</body></html>'
+    )
+
+
+def generic_page(rng: random.Random, title: str, body: List[str]) -> str:
+    nav = "".join(f'<li><a href="/{n.lower()}">{n}</a></li>' for n in NAV)
+    paragraphs = "".join(f"<p>{p}</p>" for p in body)
+    sidebar = "".join(f'<li><a href="/s/{i}">{h}</a></li>' for i, h in enumerate(MOST_READ))
+    return (
+        f'<html><head><title>{title}</title>{_state_script(rng, title)}</head><body>'
+        f'<div id="top-menu"><ul>{nav}</ul></div>'
+        f'<div class="layout"><div class="col-left"><div class="post"><h1>{title}</h1>'
+        f'<div class="entry">{paragraphs}</div></div></div>'
+        f'<div class="col-right"><div class="widget"><h3>Popular</h3><ul>{sidebar}</ul></div>'
+        f'<div class="cookie-notice"><p>We use cookies to improve your experience on our site, as described in our policy.</p></div>'
+        f'</div></div><div id="site-footer"><p>All content copyright Example Media Ltd, unless stated otherwise.</p></div>'
+        f'</body></html>'
+    )
+
+
+SITES = {
+    "bbc": (bbc_page, "https://www.bbc.co.uk/news/articles/c{n}"),
+    "cnn": (cnn_page, "https://www.cnn.com/2025/01/01/business/article-{n}/index.html"),
+    "generic": (generic_page, "https://news.example.org/story/{n}"),
+}
+
+
+def write_pages(out: Path, per_site: int = 20, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    out.mkdir(parents=True, exist_ok=True)
+    index = []
+    for site, (render, url_tpl) in SITES.items():
+        for n in range(per_site):
+            title = f"Example Holdings {rng.choice(['sets', 'misses', 'revises', 'defends'])} climate target {n}"
+            body = _paragraphs(rng, rng.randint(6, 14))
+            name = f"{site}_{n:03d}.html"
+            (out / name).write_text(render(rng, title, body), encoding="utf-8")
+            index.append({"file": name, "url": url_tpl.format(n=n), "site": site, "title": title, "body": body})
+    (out / "index.json").write_text(json.dumps(index, indent=1), encoding="utf-8")
+    return index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=Path, required=True)
+    parser.add_argument("--per-site", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    index = write_pages(args.out, args.per_site, args.seed)
+    print(f"Wrote {len(index)} pages to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+News sources benchmark
+Searches every alias of a company on the BBC and CNN plugins in parallel
+against the local fixture server (benchmarks.news_fixture), merges the results
+and downloads the articles, recording every response (NEWS_FIXTURES=record).
+The same run is then replayed from the recordings and must return the same
+articles without a single request reaching the server.
+
+Usage (from backend/):
+    python -m benchmarks.news_sources
+    python -m benchmarks.news_sources --latency-ms 100 --cnn-rate 2
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.common import environment, write_json
+from benchmarks.news_fetch import serve_in_background
+from benchmarks.news_fixture import FixtureConfig
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--company", default="Royal Dutch Shell plc")
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--bbc-rate", type=float, default=0.0, help="requests/s, 0 = unlimited")
+    parser.add_argument("--cnn-rate", type=float, default=0.0, help="requests/s, 0 = unlimited")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    config = FixtureConfig(latency_ms=args.latency_ms)
+    base_url = serve_in_background(config)
+    port = base_url.rsplit(":", 1)[1]
+
+    from gw_api.core.utils import generate_company_aliases
+    from gw_api.webscraper.bbc_search import BBCSource
+    from gw_api.webscraper.cnn_search import CNNSource
+    from gw_api.webscraper.news_fetcher import NewsFetcher
+    from gw_api.webscraper.news_sources import FixtureStore
+
+    aliases = generate_company_aliases(args.company)
+    report: Dict[str, Any] = {
+        "benchmark": "news_sources",
+        "environment": environment(),
+        "aliases": aliases,
+        "latency_ms": args.latency_ms,
+        "rate_limits": {"bbc": args.bbc_rate, "cnn": args.cnn_rate},
+    }
+
+    def run(fixtures: FixtureStore) -> Dict[str, Any]:
+        sources = [
+            BBCSource(f"http://127.0.0.1:{port}", rate_per_s=args.bbc_rate),
+            CNNSource(f"http://localhost:{port}", rate_per_s=args.cnn_rate),
+        ]
+        fetcher = NewsFetcher(sources=sources, fixtures=fixtures)
+
+        async def go():
+            try:
+                results = await fetcher.collect_results(aliases)
+                bodies = await fetcher.fetch_many([r.link for r in results])
+                return results, bodies
+            finally:
+                await fetcher.close()
+
+        config.requests.clear()
+        start_t = time.perf_counter()
+        results, bodies = asyncio.run(go())
+        per_source: Dict[str, int] = {}
+        for r in results:
+            per_source[r.source] = per_source.get(r.source, 0) + 1
+        return {
+            "seconds": round(time.perf_counter() - start_t, 3),
+            "articles": len(results),
+            "per_source": per_source,
+            "downloaded": sum(body is not None for body in bodies.values()),
+            "requests": dict(config.requests),
+            "keys": sorted((r.source, r.title, r.link) for r in results),
+        }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report["record"] = run(FixtureStore(Path(tmp), "record"))
+        report["replay"] = run(FixtureStore(Path(tmp), "replay"))
+        report["fixture_files"] = sum(1 for _ in Path(tmp).rglob("*.json"))
+
+    report["replay_matches"] = report["record"]["keys"] == report["replay"]["keys"]
+    for case in ("record", "replay"):
+        r = report[case]
+        del r["keys"]
+        print(f"{case:>7}: {r['seconds']:.2f}s, {r['articles']} articles {r['per_source']}, "
+              f"{r['downloaded']} downloaded, server requests {r['requests']}")
+    print(f"{report['fixture_files']} recorded responses, replay matches: {report['replay_matches']}")
+    print(f"Results written to {write_json(report, args.out, 'news_sources')}")
+    return 0 if report["replay_matches"] and not report["replay"]["requests"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,258 @@
+"""
+OCR text cleaning micro-benchmark
+Times smart-mode cleaning (gw_api.core.ocr_service.OCRTextCleaner) on
+generated OCR output and compares it with the previous implementation, kept
+here as LegacyCleaner: per-token wordninja splits and SpellChecker.correction()
+calls with nothing memoized, and regexes looked up on every line and token.
+
+The fixtures are deterministic documents built from packaging and ESG report
+phrases with typical OCR damage: words run together, letters swapped or
+dropped, "RECYCLEO" for "RECYCLED", stray junk tokens, plus e-mails, domains
+and German/Italian words that must pass through untouched. Every document is
+cleaned by both implementations and the outputs must be byte-identical.
+
+Reported per implementation: ms per 1k tokens on a fresh cleaner (cold) and
+on a second pass over the same documents (warm, memoized).
+
+Usage (from backend/):
+    python -m benchmarks.ocr_clean
+    python -m benchmarks.ocr_clean --docs 40 --tokens 800
+"""
+
+import argparse
+import random
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.common import environment, write_json
+
+PHRASES = [
+    "RECYCLED PACKAGING", "OUR CANS CAN BE RECYCLED FOREVER", "REDUCING THE AMOUNT OF PLASTIC IN OUR OCEANS",
+    "Pure coconut water with natural electrolytes", "Sustainably sourced from family farms in Thailand",
+    "Scope 1 and 2 emissions fell compared with the previous year", "Renewable electricity across all sites",
+    "Water withdrawal intensity reduced per tonne of product", "Net zero across our value chain",
+    "Supplier code of conduct signed by most suppliers", "Packaging will be fully recyclable",
+    "Biodegradable materials replace conventional plastic", "Our commitment to biodiversity and communities",
+    "Greenhouse gas inventory verified by an independent auditor", "Waste sent to landfill increased slightly",
+]
+FOREIGN = ["Nachhaltigkeit", "Verpackung", "umweltfreundlich", "Qualität", "sostenibilità", "riciclabile", "Größe"]
+SAFE = ["H2COCO", "H2COCONUT.COM", "info@h2coco.com", "@h2coco", "SKU-4471", "B2B"]
+CONFUSIONS = [("rn", "m"), ("m", "rn"), ("e", "c"), ("o", "e"), ("i", "l"), ("u", "v"), ("a", "o")]
+
+
+def _damage(rng: random.Random, word: str) -> str:
+    """One OCR-style error in a word"""
+    roll = rng.random()
+    if len(word) < 4:
+        return word
+    if roll < 0.3:
+        for src, dst in rng.sample(CONFUSIONS, len(CONFUSIONS)):
+            if src in word:
+                return word.replace(src, dst, 1)
+    if roll < 0.55:
+        i = rng.randrange(1, len(word) - 1)
+        return word[:i] + word[i + 1:]
+    if roll < 0.75:
+        i = rng.randrange(len(word) - 1)
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if roll < 0.9 and word.upper().endswith("ED"):
+        return word[:-2] + ("O" if word.isupper() else "o")
+    return word
+
+
+def make_document(rng: random.Random, tokens: int) -> List[str]:
+    lines: List[str] = []
+    count = 0
+    while count < tokens:
+        words = rng.choice(PHRASES).split()
+        if rng.random() < 0.3:
+            words = [_damage(rng, w) for w in words]
+        elif rng.random() < 0.3:
+            words = [_damage(rng, rng.choice(words))] + words[1:]
+        if rng.random() < 0.15:  # words run together
+            i = rng.randrange(max(1, len(words) - 1))
+            words[i:i + 2] = ["".join(words[i:i + 2])]
+        if rng.random() < 0.1:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(FOREIGN))
+        if rng.random() < 0.1:
+            words.append(rng.choice(SAFE))
+        if rng.random() < 0.03:  # junk from logos and textures
+            words.append("".join(rng.choice("bcdfghjklmnpqrstvwxz") for _ in range(rng.randint(5, 8))))
+        if rng.random() < 0.05:
+            words.append("YOU ' RE")
+        lines.append(" ".join(words))
+        count += len(words)
+    return lines
+
+
+def fixtures(docs: int, tokens: int, seed: int = 0) -> List[List[str]]:
+    rng = random.Random(seed)
+    return [make_document(rng, rng.randint(tokens // 2, tokens * 3 // 2)) for _ in range(docs)]
+
+
+def legacy_cleaner_class():
+    import wordninja
+
+    from gw_api.core.ocr_service import OCRTextCleaner
+
+    class LegacyCleaner(OCRTextCleaner):
+        """Cleaning as it was before memoization, precompiled patterns and the bounded correction search"""
+
+        def __init__(self):
+            super().__init__()
+            del self._split_allcaps_token, self._split_token_general  # drop the per-instance lru_cache wrappers
+
+        @staticmethod
+        def _basic_normalize(text: str) -> str:
+            t = text.strip()
+            t = re.sub(r"\s+", " ", t)
+            t = t.replace("’", "'").replace("—", "-")
+            t = re.sub(r"\s+([,.:;!?])", r"\1", t)
+            t = re.sub(r"\s*&\s*", " & ", t)
+            t = re.sub(r"(\.[A-Za-z]{2,})(?=[A-Za-z])", r"\1 ", t)
+            return t
+
+        def _split_allcaps_token(self, tok: str) -> str:
+            if self._is_safe_token(tok):
+                return tok
+            core = tok.replace("'", "").replace("-", "")
+            if tok.isupper() and core.isalpha() and len(core) >= 6 and core.isascii():
+                parts = wordninja.split(core.lower())
+                if parts and len("".join(parts)) == len(core):
+                    return " ".join(p.upper() for p in parts)
+            return tok
+
+        def _split_token_general(self, tok: str) -> str:
+            if self._is_safe_token(tok):
+                return tok
+            camel = re.sub(r"(?<=[a-z])(?=[A-Z])", " ", tok)
+            segs, out = camel.split(), []
+            for seg in segs:
+                core = seg.replace("'", "").replace("-", "")
+                if core.isascii() and core.isalpha() and len(core) >= 8:
+                    w = wordninja.split(core.lower())
+                    if w and len("".join(w)) == len(core):
+                        if seg.isupper():
+                            out.append(" ".join(p.upper() for p in w))
+                        else:
+                            out.append(" ".join(p.capitalize() for p in w))
+                        continue
+                out.append(seg)
+            return " ".join(out)
+
+        def _smart_space_restore(self, line: str) -> str:
+            out = []
+            for t in line.split():
+                m = re.match(r"^([A-Za-zÀ-ÖØ-öø-ÿ&'\-0-9.]+)([.,!?]*)$", t)
+                core, punct = (m.group(1), m.group(2)) if m else (t, "")
+                core = self._split_allcaps_token(core)
+                core = self._split_token_general(core)
+                out.append(core + punct)
+            s = self._basic_normalize(" ".join(out))
+            return re.sub(r"(\w)-\s+(\w)", r"\1- \2", s)
+
+        def _spell_fix_tokens_en(self, tokens: List[str]) -> List[str]:
+            fixed: List[str] = []
+            for tok in tokens:
+                if not tok.isascii() or not tok.isalpha() or len(tok) < 3 or self._is_safe_token(tok):
+                    fixed.append(tok); continue
+                if tok[-1] in {"e", "E", "o", "O"}:
+                    cand = tok[:-1] + "ed"
+                    if self.spell_en.known([cand.lower()]):
+                        fixed.append(self._preserve_case(tok, cand)); continue
+                if tok.lower() in self.spell_en:
+                    fixed.append(tok); continue
+                corr = self.spell_en.correction(tok.lower())
+                fixed.append(self._preserve_case(tok, corr) if corr else tok)
+            return fixed
+
+        def _join_contractions(self, text: str) -> str:
+            return re.sub(r"\b([A-Za-z]+)\s+'\s*(s|re|ve|ll|d|t)\b", r"\1'\2", text, flags=re.IGNORECASE)
+
+        def clean(self, lines: List[str], mode: str = "basic") -> List[str]:
+            if mode == "basic":
+                return [self._basic_normalize(x) for x in lines if x and x.strip()]
+            lines = [self._smart_space_restore(self._basic_normalize(x)) for x in lines if x and x.strip()]
+            para = self._join_contractions(self._basic_normalize(" ".join(lines)))
+            tokens = self._spell_fix_tokens_en(re.findall(r"[^\W\d_]+|\d+|[^\w\s]", para, flags=re.UNICODE))
+            out: List[str] = []
+            for i, t in enumerate(tokens):
+                if i > 0 and not re.match(r"[,.!?;:)]$", t) and not re.match(r"^[(']", t):
+                    out.append(" ")
+                out.append(t)
+            para = self._basic_normalize("".join(out))
+            for pat, rep in [
+                (r"\bCAN\s*S\s+CAN\b", "CANS CAN"),
+                (r"\bRECYCLE\s*D?\b", "RECYCLED"),
+                (r"\bPACKAGING\s+WILL\b", "PACKAGING WILL"),
+                (r"\bAMOUNT\s+OF\s+PLASTIC\b", "AMOUNT OF PLASTIC"),
+                (r"\bOUR\s+OCEANS\b", "OUR OCEANS"),
+            ]:
+                para = re.sub(pat, rep, para, flags=re.IGNORECASE)
+
+            def verb_ed_fix(m):
+                base, prep = m.group(1), m.group(2)
+                cand = base + "ed"
+                return f"{cand} {prep}" if self.spell_en.known([cand]) else f"{base} {prep}"
+            para = re.sub(r"\b([A-Za-z]{3,})\s+[eoEO]\b\s+(from|in|on|by|at|to)\b", verb_ed_fix, para)
+            return [para] if para.strip() else []
+
+    return LegacyCleaner
+
+
+def timed_pass(cleaner, documents: List[List[str]], tokens: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    outputs = [cleaner.clean(lines, mode="smart") for lines in documents]
+    elapsed = time.perf_counter() - start
+    return {"seconds": round(elapsed, 3), "ms_per_1k_tokens": round(elapsed * 1000 * 1000 / tokens, 2)}, outputs
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--tokens", type=int, default=400, help="mean tokens per document")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    from gw_api.core.ocr_service import OCRTextCleaner
+
+    documents = fixtures(args.docs, args.tokens, args.seed)
+    words = re.compile(r"[^\W\d_]+|\d+|[^\w\s]")
+    tokens = sum(len(words.findall(" ".join(lines))) for lines in documents)
+    report: Dict[str, Any] = {
+        "benchmark": "ocr_clean",
+        "environment": environment(),
+        "documents": len(documents),
+        "tokens": tokens,
+        "runs": {},
+    }
+
+    outputs: Dict[str, List[List[str]]] = {}
+    for name, factory in (("legacy", legacy_cleaner_class()), ("fast", OCRTextCleaner)):
+        cleaner = factory()
+        cold, outputs[name] = timed_pass(cleaner, documents, tokens)
+        warm, _ = timed_pass(cleaner, documents, tokens)
+        report["runs"][name] = {"cold": cold, "warm": warm}
+
+    mismatches = [i for i, (a, b) in enumerate(zip(outputs["legacy"], outputs["fast"])) if a != b]
+    report["identical"] = not mismatches
+    report["mismatched_documents"] = mismatches
+    for name, r in report["runs"].items():
+        print(f"{name:>6}: cold {r['cold']['ms_per_1k_tokens']:8.2f} ms/1k tokens, "
+              f"warm {r['warm']['ms_per_1k_tokens']:8.2f} ms/1k tokens")
+    legacy, fast = report["runs"]["legacy"], report["runs"]["fast"]
+    report["speedup_cold"] = round(legacy["cold"]["seconds"] / max(fast["cold"]["seconds"], 1e-9), 1)
+    report["speedup_warm"] = round(legacy["warm"]["seconds"] / max(fast["warm"]["seconds"], 1e-9), 1)
+    print(f"{tokens} tokens in {len(documents)} documents, speedup cold {report['speedup_cold']}x, "
+          f"warm {report['speedup_warm']}x, outputs identical: {report['identical']}")
+    for i in mismatches[:3]:
+        print(f"  document {i}:\n    legacy {outputs['legacy'][i]}\n    fast   {outputs['fast'][i]}")
+    print(f"Results written to {write_json(report, args.out, 'ocr_clean')}")
+    return 0 if report["identical"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,170 @@
+"""
+OCR worker pool benchmark
+OCRs `pdf/test01.png` plus synthetic text images through the OCR worker pool
+(gw_api.core.ocr_pool) with different worker counts and reports images/s, per
+image latency and how long the event loop stalls while the OCR runs. `inline`
+is the previous behaviour: OCRService.read() called directly in the event loop.
+
+Each pool is warmed with one image first, so model loading is reported as
+`startup_s` and not counted in the throughput.
+
+Usage (from backend/):
+    python -m benchmarks.ocr_pool
+    python -m benchmarks.ocr_pool --workers 1,2,4 --synthetic 16 --mode basic
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.common import REPO_ROOT, environment, percentile, write_json
+
+SAMPLE_IMAGE = REPO_ROOT / "pdf" / "test01.png"
+LINES = [
+    "Scope 1 and 2 emissions fell by {n}% compared with 2019",
+    "{n}% of our packaging is recyclable or reusable",
+    "Renewable electricity across all European sites",
+    "Water withdrawal intensity reduced by {n}% per tonne",
+    "Net zero across our value chain by 2040",
+    "Certified B Corporation since 20{n}",
+    "Supplier code of conduct signed by {n}% of suppliers",
+]
+
+
+def synthetic_images(directory: Path, count: int, seed: int = 0) -> List[Path]:
+    """Poster-like RGB images with 6-12 lines of text in random sizes"""
+    from PIL import Image, ImageDraw, ImageFont
+
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        width, height = rng.choice([(1200, 900), (1600, 1200), (1056, 2289)])
+        image = Image.new("RGB", (width, height), (rng.randint(220, 255),) * 3)
+        draw = ImageDraw.Draw(image)
+        y = 40
+        for _ in range(rng.randint(6, 12)):
+            size = rng.randint(28, 64)
+            try:
+                font = ImageFont.load_default(size=size)
+            except TypeError:  # Pillow < 10.1
+                font = ImageFont.load_default()
+            draw.text((40, y), rng.choice(LINES).format(n=rng.randint(10, 90)).upper(), fill=(20, 20, 20), font=font)
+            y += int(size * 1.8)
+            if y > height - 80:
+                break
+        path = directory / f"synthetic_{i:03d}.png"
+        image.save(path)
+        paths.append(path)
+    return paths
+
+
+async def _measure_loop_lag(stop: asyncio.Event, interval_s: float = 0.01) -> List[float]:
+    lags = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval_s)
+        lags.append(max(0.0, time.perf_counter() - start - interval_s))
+    return lags
+
+
+async def _drive(read, images: List[Path], mode: str) -> Dict[str, Any]:
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_measure_loop_lag(stop))
+    latencies: List[float] = []
+
+    async def one(path: Path) -> None:
+        start = time.perf_counter()
+        await read(path, mode)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(p) for p in images))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    lags = await ticker
+    return {
+        "seconds": round(elapsed, 3),
+        "images_per_s": round(len(images) / elapsed, 3),
+        "latency_p50_s": round(percentile(latencies, 50), 3),
+        "latency_p95_s": round(percentile(latencies, 95), 3),
+        "max_loop_stall_ms": round(max(lags, default=0.0) * 1000, 1),
+    }
+
+
+def run_inline(images: List[Path], mode: str) -> Dict[str, Any]:
+    from gw_api.core.ocr_service import OCRService
+
+    start = time.perf_counter()
+    service = OCRService(det_lang="MULTI", rec_lang="LATIN")
+    service.read(str(images[0]), mode=mode)
+    startup_s = time.perf_counter() - start
+
+    async def read(path: Path, mode: str):
+        return service.read(str(path), mode=mode)  # blocks the loop, as upload_document used to
+
+    result = asyncio.run(_drive(read, images, mode))
+    result["startup_s"] = round(startup_s, 3)
+    return result
+
+
+def run_pool(workers: int, images: List[Path], mode: str) -> Dict[str, Any]:
+    from gw_api.core.ocr_pool import OCRPool
+
+    pool = OCRPool(workers=workers, queue_depth=len(images) + workers)
+    try:
+        start = time.perf_counter()
+        pool.start()
+        # one job per worker, so every worker has loaded its models before timing starts
+        for future in [pool.submit(str(images[0]), mode) for _ in range(workers)]:
+            future.result()
+        startup_s = time.perf_counter() - start
+
+        result = asyncio.run(_drive(lambda path, m: pool.read(str(path), m), images, mode))
+        result["startup_s"] = round(startup_s, 3)
+        result["snapshot"] = pool.snapshot()
+        return result
+    finally:
+        pool.close()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--synthetic", type=int, default=8, help="synthetic images added to test01.png")
+    parser.add_argument("--copies", type=int, default=2, help="times test01.png is included")
+    parser.add_argument("--mode", default="smart", choices=["smart", "basic"])
+    parser.add_argument("--skip-inline", action="store_true")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        images = [SAMPLE_IMAGE] * args.copies if SAMPLE_IMAGE.exists() else []
+        images += synthetic_images(Path(tmp), args.synthetic)
+        report: Dict[str, Any] = {
+            "benchmark": "ocr_pool",
+            "environment": environment(),
+            "images": len(images),
+            "sample_copies": args.copies if SAMPLE_IMAGE.exists() else 0,
+            "synthetic": args.synthetic,
+            "mode": args.mode,
+            "runs": {},
+        }
+        if not args.skip_inline:
+            report["runs"]["inline"] = run_inline(images, args.mode)
+        for workers in [int(w) for w in args.workers.split(",") if w.strip()]:
+            report["runs"][f"workers={workers}"] = run_pool(workers, images, args.mode)
+
+    for name, r in report["runs"].items():
+        print(f"{name:>10}: {r['images_per_s']:6.2f} images/s, p50 {r['latency_p50_s']:.2f}s, "
+              f"p95 {r['latency_p95_s']:.2f}s, max loop stall {r['max_loop_stall_ms']:.0f} ms, "
+              f"startup {r['startup_s']:.1f}s")
+    print(f"Results written to {write_json(report, args.out, 'ocr_pool')}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
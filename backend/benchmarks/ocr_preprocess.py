@@ -0,0 +1,211 @@
+"""
+OCR pre-processing benchmark
+OCRs a fixture set once with the original file handed to RapidOCR (`off`, the
+previous behaviour) and once through gw_api.core.ocr_preprocess (`on`), and
+reports per image: latency, peak memory added while the image was read, lines
+found, tiles used / skipped and, for the generated fixtures, the share of the
+drawn lines read back exactly (`line_recall`).
+
+Fixtures: `pdf/test01.png` plus generated images covering the cases the
+pre-processing handles: a 6000x8000 poster photo (JPEG) with small print, a
+small 480x360 product label, a transparent PNG, a greyscale 16-bit scan and a
+large scan that is blank apart from a few lines.
+
+Each mode runs in a fresh process that loads the OCR models before measuring.
+`peak_mem_mb` is the RSS high-water mark while the image was read (reset via
+/proc/self/clear_refs, so Linux only) minus the RSS before it; `rss_mb` is the
+process RSS high-water mark after the image. Fixtures run smallest first, so
+memory the runtime keeps from an earlier image is not counted twice.
+
+Usage (from backend/):
+    python -m benchmarks.ocr_preprocess
+    python -m benchmarks.ocr_preprocess --repeat 3 --mode basic
+"""
+
+import argparse
+import multiprocessing
+import re
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.common import (
+    REPO_ROOT, current_rss_mb, environment, peak_rss_mb, reset_peak_rss, window_peak_rss_mb, write_json,
+)
+
+SAMPLE_IMAGE = REPO_ROOT / "pdf" / "test01.png"
+PHRASES = [
+    "RECYCLABLE PACKAGING", "NET ZERO BY 2040", "RENEWABLE ELECTRICITY", "FAIR TRADE COCOA",
+    "WATER INTENSITY DOWN", "CERTIFIED B CORPORATION", "SCOPE THREE EMISSIONS", "PLASTIC FREE BOTTLE",
+]
+
+
+def _font(size: int):
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1
+        return ImageFont.load_default()
+
+
+def _normalize(line: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", line.lower()))
+
+
+def fixtures(directory: Path) -> List[Tuple[str, Path, Optional[List[str]]]]:
+    """(name, path, expected lines or None) per fixture image"""
+    import numpy as np
+    from PIL import Image, ImageDraw
+
+    items: List[Tuple[str, Path, Optional[List[str]]]] = []
+    if SAMPLE_IMAGE.exists():
+        items.append(("test01.png", SAMPLE_IMAGE, None))
+
+    # poster photo: a few headlines, then rows of print that shrink to 7-15 px at 2000 px
+    poster = Image.new("RGB", (6000, 8000), (238, 236, 228))
+    draw = ImageDraw.Draw(poster)
+    expected: List[str] = []
+    y = 200
+    for phrase in PHRASES[:3]:
+        draw.text((300, y), phrase, fill=(30, 30, 30), font=_font(260))
+        expected.append(phrase)
+        y += 480
+    for row in range(12):
+        for col in range(3):
+            phrase = PHRASES[(row + col) % len(PHRASES)]
+            draw.text((300 + col * 1900, y), phrase, fill=(40, 40, 40), font=_font(60 if row < 6 else 30))
+            expected.append(phrase)
+        y += 400
+    path = directory / "poster.jpg"
+    poster.save(path, quality=90)
+    items.append(("poster_6000x8000.jpg", path, expected))
+
+    label = Image.new("RGB", (480, 360), (250, 250, 250))
+    draw = ImageDraw.Draw(label)
+    expected = []
+    for i, phrase in enumerate(PHRASES[:5]):
+        draw.text((12, 20 + i * 64), phrase, fill=(20, 20, 20), font=_font(20))
+        expected.append(phrase)
+    path = directory / "label.png"
+    label.save(path)
+    items.append(("label_480x360.png", path, expected))
+
+    # dark text on a transparent background: the colour below the alpha channel is black
+    rgba = Image.new("RGBA", (1600, 1200), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(rgba)
+    expected = []
+    for i, phrase in enumerate(PHRASES[2:7]):
+        draw.text((60, 80 + i * 200), phrase, fill=(25, 25, 25, 255), font=_font(72))
+        expected.append(phrase)
+    path = directory / "transparent.png"
+    rgba.save(path)
+    items.append(("transparent_1600x1200.png", path, expected))
+
+    grey = Image.new("L", (2480, 3508), 235)
+    draw = ImageDraw.Draw(grey)
+    expected = []
+    for i, phrase in enumerate(PHRASES):
+        draw.text((200, 300 + i * 300), phrase, fill=30, font=_font(64))
+        expected.append(phrase)
+    path = directory / "scan16.png"
+    Image.fromarray(np.asarray(grey, dtype=np.uint16) * 257).save(path)
+    items.append(("scan_16bit_2480x3508.png", path, expected))
+
+    blank = Image.new("RGB", (5000, 7000), (255, 255, 255))
+    draw = ImageDraw.Draw(blank)
+    expected = []
+    for i, phrase in enumerate(PHRASES[:2]):
+        draw.text((300, 300 + i * 220), phrase, fill=(20, 20, 20), font=_font(110))
+        expected.append(phrase)
+    path = directory / "blank.png"
+    blank.save(path)
+    items.append(("mostly_blank_5000x7000.png", path, expected))
+    return items
+
+
+def _pixels(path: Path) -> int:
+    from PIL import Image
+
+    with Image.open(path) as image:
+        return image.width * image.height
+
+
+def _recall(expected: List[str], lines: List[str]) -> float:
+    found = Counter(_normalize(line) for line in lines)
+    hits = sum((Counter(_normalize(line) for line in expected) & found).values())
+    return round(hits / len(expected), 3) if expected else 0.0
+
+
+def run(items, preprocess: bool, mode: str, repeat: int) -> Dict[str, Any]:
+    """Runs in a child process: load the models, then read every fixture"""
+    from gw_api.core.ocr_service import OCRService
+
+    service = OCRService(det_lang="MULTI", rec_lang="LATIN", preprocess=preprocess)
+    results: Dict[str, Any] = {"model_rss_mb": round(current_rss_mb(), 1), "images": {}}
+    for name, path, expected in items:
+        latencies, peaks = [], []
+        out: Dict[str, Any] = {}
+        for _ in range(repeat):
+            base = current_rss_mb()
+            reset_peak_rss()
+            start = time.perf_counter()
+            out = service.read(str(path), mode=mode)
+            latencies.append(time.perf_counter() - start)
+            peaks.append(max(0.0, window_peak_rss_mb() - base))
+        row = {
+            "latency_s": round(min(latencies), 3),
+            "peak_mem_mb": round(max(peaks), 1),
+            "rss_mb": round(peak_rss_mb(), 1),
+            "lines": len(out["lines"]),
+        }
+        if "preprocess" in out:
+            row["tiles"] = out["preprocess"]["tiles"]
+            row["skipped_tiles"] = out["preprocess"]["skipped_tiles"]
+            row["scale"] = out["preprocess"]["scale"]
+        if expected is not None:
+            row["line_recall"] = _recall(expected, out["lines"])
+        row["text"] = out["full_text"]
+        results["images"][name] = row
+    return results
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=1, help="reads per image; the fastest is reported")
+    parser.add_argument("--mode", default="smart", choices=["smart", "basic"])
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    report: Dict[str, Any] = {
+        "benchmark": "ocr_preprocess",
+        "environment": environment(),
+        "mode": args.mode,
+        "repeat": args.repeat,
+        "peak_mem_measured": reset_peak_rss(),
+        "runs": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        items = fixtures(Path(tmp))
+        items.sort(key=lambda item: _pixels(item[1]))
+        ctx = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+        for label, enabled in (("off", False), ("on", True)):
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as child:
+                report["runs"][label] = child.submit(run, items, enabled, args.mode, args.repeat).result()
+
+    print(f"{'image':<28} {'latency off/on (s)':>20} {'peak MB off/on':>16} {'recall off/on':>14}  tiles")
+    for name, _, _ in items:
+        off, on = report["runs"]["off"]["images"][name], report["runs"]["on"]["images"][name]
+        recall = f"{off['line_recall']:.2f}/{on['line_recall']:.2f}" if "line_recall" in on else "-"
+        print(f"{name:<28} {off['latency_s']:>9.2f}/{on['latency_s']:<10.2f} "
+              f"{off['peak_mem_mb']:>7.0f}/{on['peak_mem_mb']:<8.0f} {recall:>14}  "
+              f"{on.get('tiles', 1)} (+{on.get('skipped_tiles', 0)} blank)")
+    print(f"Results written to {write_json(report, args.out, 'ocr_preprocess')}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
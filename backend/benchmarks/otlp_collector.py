@@ -0,0 +1,64 @@
+"""
+Local OTLP/HTTP collector stand-in
+Accepts OTLP JSON trace exports (POST /v1/traces) and appends each span as one
+JSON line to a file, so TRACE_EXPORTER=otlp can be exercised without a real
+collector.
+
+Usage (from backend/):
+    python -m benchmarks.otlp_collector --port 4318 --out data/otlp_spans.jsonl
+"""
+
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+def make_handler(out: Path, lock: threading.Lock):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path.rstrip("/") != "/v1/traces":
+                self.send_error(404)
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self.send_error(400, "expected OTLP JSON")
+                return
+            count = 0
+            with lock, out.open("a", encoding="utf-8") as f:
+                for rs in payload.get("resourceSpans", []):
+                    for ss in rs.get("scopeSpans", []):
+                        for sp in ss.get("spans", []):
+                            f.write(json.dumps(sp) + "\n")
+                            count += 1
+            print(f"[collector] received {count} spans")
+            body = b"{}"
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--out", type=Path, default=Path("data/otlp_spans.jsonl"))
+    args = parser.parse_args()
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.out, threading.Lock()))
+    print(f"OTLP collector stand-in on http://{args.host}:{args.port}/v1/traces -> {args.out}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
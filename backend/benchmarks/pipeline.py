@@ -0,0 +1,224 @@
+"""
+End-to-end pipeline benchmark
+Drives the real /upload handler (extraction -> ESG filter -> chunking -> embedding
+-> LangGraph analysis -> translation -> DB write) over the bundled PDF corpus and
+records wall time and CPU time per stage plus peak RSS.
+
+External providers are replaced by the offline stand-ins (PROVIDER_MODE=fake)
+unless --live is given. The database is a throwaway SQLite file.
+
+Usage (from backend/):
+    python -m benchmarks.pipeline
+    python -m benchmarks.pipeline --limit 3 --latency-ms 50
+    python -m benchmarks.pipeline --save-baseline benchmarks/baselines/pipeline.json
+    python -m benchmarks.pipeline --baseline benchmarks/baselines/pipeline.json
+    python -m benchmarks.pipeline --compare old.json new.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.common import (
+    BACKEND_DIR,
+    BASELINES_DIR,
+    REPO_ROOT,
+    Measure,
+    compare_metrics,
+    environment,
+    load_json,
+    print_comparison,
+    summarize,
+    write_json,
+)
+
+DEFAULT_CORPUS = [REPO_ROOT / "pdf", REPO_ROOT / "pdf" / "要跑的"]
+
+
+def find_pdfs(dirs: List[Path], limit: int = 0) -> List[Path]:
+    pdfs: List[Path] = []
+    for d in dirs:
+        if d.is_dir():
+            pdfs.extend(sorted(p for p in d.iterdir() if p.suffix.lower() == ".pdf"))
+    return pdfs[:limit] if limit else pdfs
+
+
+def _run_document(pdf: Path, db, verbose: bool) -> Dict[str, Any]:
+    # Imported lazily so PROVIDER_MODE is set before the app modules load
+    from starlette.datastructures import Headers, UploadFile
+    from gw_api.api.upload import upload_document
+    from gw_api.config import REPORT_DIR, VECTOR_STORE_DIR
+    from gw_api.core.profiling import recording
+
+    session_id = f"bench_{uuid.uuid4().hex[:12]}"
+    upload = UploadFile(
+        file=io.BytesIO(pdf.read_bytes()),
+        filename=pdf.name,
+        headers=Headers({"content-type": "application/pdf"}),
+    )
+    entry: Dict[str, Any] = {"file": str(pdf.relative_to(REPO_ROOT)), "size_bytes": pdf.stat().st_size}
+    sink = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    result: Dict[str, Any] = {}
+    with recording() as recorder, Measure() as m, sink:
+        try:
+            result = asyncio.run(
+                upload_document(file=upload, session_id=session_id, overrided_language=None, force_new=True, db=db)
+            )
+            entry["status"] = "ok"
+        except Exception as e:
+            entry["status"] = "error"
+            entry["error"] = str(getattr(e, "detail", e))[:500]
+    entry.update(m.as_dict())
+    entry["stages"] = {
+        name: {k: round(v, 6) if isinstance(v, float) else v for k, v in stat.items()}
+        for name, stat in recorder.as_dict().items()
+    }
+
+    # Leave no artefacts behind
+    from gw_api.core.esg_analysis import agent_executors, document_stores
+
+    agent_executors.pop(session_id, None)
+    document_stores.pop(session_id, None)
+    shutil.rmtree(VECTOR_STORE_DIR / session_id, ignore_errors=True)
+    if result.get("filename"):
+        (REPORT_DIR / result["filename"]).unlink(missing_ok=True)
+    return entry
+
+
+def aggregate(documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ok = [d for d in documents if d["status"] == "ok"]
+    names: List[str] = []
+    for d in ok:
+        names.extend(n for n in d["stages"] if n not in names)
+    stages = {}
+    for name in names:
+        walls = [d["stages"][name]["wall_s"] for d in ok if name in d["stages"]]
+        cpus = [d["stages"][name]["cpu_s"] for d in ok if name in d["stages"]]
+        stages[name] = {"wall_s": summarize(walls), "cpu_s": summarize(cpus)}
+    return {
+        "documents_ok": len(ok),
+        "documents_failed": len(documents) - len(ok),
+        "wall_s": summarize(d["wall_s"] for d in ok),
+        "cpu_s": summarize(d["cpu_s"] for d in ok),
+        "peak_rss_mb": max((d["peak_rss_mb"] for d in documents), default=0.0),
+        "stages": stages,
+    }
+
+
+def flat_metrics(report: Dict[str, Any]) -> Dict[str, float]:
+    """Per-document means, so baselines stay comparable when the corpus changes size"""
+    summary = report["summary"]
+    flat = {
+        "total.wall_s.mean": summary["wall_s"].get("mean", 0.0),
+        "total.cpu_s.mean": summary["cpu_s"].get("mean", 0.0),
+        "total.peak_rss_mb": summary["peak_rss_mb"],
+    }
+    for name, stat in summary["stages"].items():
+        flat[f"{name}.wall_s.mean"] = stat["wall_s"].get("mean", 0.0)
+        flat[f"{name}.cpu_s.mean"] = stat["cpu_s"].get("mean", 0.0)
+    return flat
+
+
+def compare_reports(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float, min_delta: float) -> bool:
+    rows = compare_metrics(flat_metrics(current), flat_metrics(baseline), threshold, min_delta)
+    print_comparison(rows)
+    regressions = [r for r in rows if r["status"] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {threshold:.0%}")
+    return not regressions
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from gw_api.config import Base
+    importlib.import_module("gw_api.models.report")  # registers the tables
+    from gw_api.db import SessionLocal
+
+    os.chdir(BACKEND_DIR)  # the app resolves data_files/ relative to the backend
+    pdfs = find_pdfs([Path(p).resolve() for p in args.corpus], args.limit)
+    if not pdfs:
+        raise SystemExit(f"No PDFs found in {', '.join(args.corpus)}")
+
+    tmp = tempfile.mkdtemp(prefix="gw_bench_")
+    engine = create_engine(f"sqlite:///{tmp}/bench.db", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    # Sessions the app opens itself (agent session records) go to the throwaway file too
+    SessionLocal.configure(bind=engine)
+
+    documents = []
+    try:
+        with Measure() as warm:
+            importlib.import_module("gw_api.api.upload")  # module import cost: models, graph deps
+        for i, pdf in enumerate(pdfs, 1):
+            entry = _run_document(pdf, db, args.verbose)
+            documents.append(entry)
+            print(f"[{i}/{len(pdfs)}] {pdf.name}: {entry['status']} {entry['wall_s']:.2f}s "
+                  f"cpu={entry['cpu_s']:.2f}s rss={entry['peak_rss_mb']:.0f}MB")
+    finally:
+        db.close()
+        engine.dispose()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    return {
+        "benchmark": "pipeline",
+        "environment": environment(),
+        "config": {
+            "corpus": [str(p) for p in args.corpus],
+            "limit": args.limit,
+            "fake_latency_ms": os.getenv("FAKE_PROVIDER_LATENCY_MS", "0"),
+        },
+        "import_s": round(warm.wall_s, 6),
+        "documents": documents,
+        "summary": aggregate(documents),
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", nargs="+", default=[str(p) for p in DEFAULT_CORPUS])
+    parser.add_argument("--limit", type=int, default=0, help="only the first N PDFs")
+    parser.add_argument("--live", action="store_true", help="call real Gemini/BBC instead of the offline stand-ins")
+    parser.add_argument("--latency-ms", type=float, default=None, help="simulated provider latency (fake mode)")
+    parser.add_argument("--out", type=Path, default=None, help="result JSON path (default benchmarks/results/)")
+    parser.add_argument("--baseline", type=Path, default=None, help="compare against this result JSON")
+    parser.add_argument("--save-baseline", type=Path, nargs="?", const=BASELINES_DIR / "pipeline.json")
+    parser.add_argument("--compare", type=Path, nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="only compare two existing result files")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative slowdown flagged as regression")
+    parser.add_argument("--min-delta", type=float, default=0.05, help="ignore absolute changes below this")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own output")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        ok = compare_reports(load_json(args.compare[1]), load_json(args.compare[0]), args.threshold, args.min_delta)
+        return 0 if ok else 1
+
+    if not args.live:
+        os.environ["PROVIDER_MODE"] = "fake"
+    if args.latency_ms is not None:
+        os.environ["FAKE_PROVIDER_LATENCY_MS"] = str(args.latency_ms)
+
+    report = run(args)
+    path = write_json(report, args.out, "pipeline")
+    print(f"\nResults written to {path}")
+    if args.save_baseline:
+        write_json(report, args.save_baseline, "pipeline")
+        print(f"Baseline saved to {args.save_baseline}")
+    if args.baseline:
+        return 0 if compare_reports(report, load_json(args.baseline), args.threshold, args.min_delta) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
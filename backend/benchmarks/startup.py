@@ -0,0 +1,196 @@
+"""
+API startup benchmark
+Measures how long a fresh API process takes before it can serve traffic:
+
+- import: `python -X importtime -c "import main"`, reporting the total import
+  time, the packages that took longest (self time summed per top-level
+  package) and which heavy libraries (torch,
+  transformers, pandas, RapidOCR, ...) were loaded just by importing the app
+- first /health: `uvicorn main:app` is started and polled until `GET /health`
+  answers; the time from process start is reported, with the RSS of the
+  server at that point
+- with --warmup, `GET /warmup` is called afterwards and the per-component load
+  times (gw_api.core.lazy) are reported
+
+Each measurement is repeated --runs times in a new process; the median is
+reported. PROVIDER_MODE defaults to fake so no API keys are needed.
+
+Usage (from backend/):
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 5 --warmup
+"""
+
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.common import BACKEND_DIR, environment, write_json
+
+HEAVY_MODULES = [
+    "torch", "transformers", "pandas", "rapidocr", "onnxruntime", "cv2",
+    "spellchecker", "wordninja", "chromadb", "yaml", "google.genai",
+]
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+\d+\s+\|\s*(\S+)")
+
+
+def _env(provider_mode: str, db_path: Path) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PROVIDER_MODE"] = provider_mode
+    env["DB_PATH"] = str(db_path)  # importing main runs init_db; keep it off data/reports.db
+    env.setdefault("PYTHONDONTWRITEBYTECODE", "1")
+    return env
+
+
+def measure_imports(env: Dict[str, str]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    wall_s = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"import main failed:\n{proc.stderr[-2000:]}")
+    total_us, loaded = 0, set()
+    per_package: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        m = IMPORT_LINE.match(line)
+        if not m:
+            continue
+        self_us, name = int(m.group(1)), m.group(2)
+        total_us += self_us
+        loaded.add(name)
+        package = name.split(".")[0]
+        per_package[package] = per_package.get(package, 0) + self_us
+    slowest = sorted(per_package.items(), key=lambda item: -item[1])[:15]
+    return {
+        "wall_s": round(wall_s, 3),
+        "import_s": round(total_us / 1e6, 3),
+        "slowest": [{"package": name, "self_s": round(us / 1e6, 3)} for name, us in slowest],
+        "heavy_loaded": [m for m in HEAVY_MODULES if m in loaded],
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get(url: str, timeout: float) -> Tuple[int, bytes]:
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.status, response.read()
+
+
+def _rss_mb(pid: int) -> float:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def measure_first_health(env: Dict[str, str], timeout_s: float, warmup: bool) -> Dict[str, Any]:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    try:
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"server exited with {server.returncode}:\n{server.stderr.read()[-2000:]}")
+            if time.perf_counter() - start > timeout_s:
+                raise RuntimeError(f"no /health answer within {timeout_s:g}s")
+            try:
+                status, _ = _get(f"{base}/health", timeout=1)
+                if status == 200:
+                    break
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                time.sleep(0.05)
+        result: Dict[str, Any] = {
+            "first_health_s": round(time.perf_counter() - start, 3),
+            "rss_mb": round(_rss_mb(server.pid), 1),
+        }
+        if warmup:
+            warm_start = time.perf_counter()
+            _, body = _get(f"{base}/warmup", timeout=timeout_s)
+            result["warmup_s"] = round(time.perf_counter() - warm_start, 3)
+            result["warmup"] = json.loads(body)
+            result["rss_after_warmup_mb"] = round(_rss_mb(server.pid), 1)
+        return result
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def _median(runs: List[Dict[str, Any]], key: str) -> Optional[float]:
+    values = [r[key] for r in runs if key in r]
+    return round(statistics.median(values), 3) if values else None
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--provider-mode", default="fake", choices=["fake", "live"])
+    parser.add_argument("--timeout", type=float, default=180.0, help="seconds to wait for /health (and /warmup)")
+    parser.add_argument("--warmup", action="store_true", help="call /warmup after the first /health")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _env(args.provider_mode, Path(tmp) / "reports.db")
+        imports = [measure_imports(env) for _ in range(args.runs)]
+        servers = [measure_first_health(env, args.timeout, args.warmup) for _ in range(args.runs)]
+    report: Dict[str, Any] = {
+        "benchmark": "startup",
+        "environment": environment(),
+        "runs": args.runs,
+        "import": {
+            "import_s": _median(imports, "import_s"),
+            "wall_s": _median(imports, "wall_s"),
+            "heavy_loaded": imports[-1]["heavy_loaded"],
+            "slowest": imports[-1]["slowest"],
+        },
+        "server": {
+            "first_health_s": _median(servers, "first_health_s"),
+            "rss_mb": _median(servers, "rss_mb"),
+        },
+        "import_runs": imports,
+        "server_runs": servers,
+    }
+    if args.warmup:
+        report["server"]["warmup_s"] = _median(servers, "warmup_s")
+        report["server"]["rss_after_warmup_mb"] = _median(servers, "rss_after_warmup_mb")
+
+    imp, srv = report["import"], report["server"]
+    print(f"import main: {imp['import_s']:.2f}s (process {imp['wall_s']:.2f}s), "
+          f"heavy modules loaded: {', '.join(imp['heavy_loaded']) or 'none'}")
+    for row in imp["slowest"][:8]:
+        print(f"  {row['self_s']:7.3f}s  {row['package']}")
+    print(f"first /health: {srv['first_health_s']:.2f}s, RSS {srv['rss_mb']:.0f} MB")
+    if args.warmup:
+        print(f"/warmup: {srv['warmup_s']:.2f}s, RSS {srv['rss_after_warmup_mb']:.0f} MB")
+    print(f"Results written to {write_json(report, args.out, 'startup')}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
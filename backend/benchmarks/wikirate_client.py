@@ -0,0 +1,94 @@
+"""
+Wikirate client benchmark
+Runs `company_metrics` against the local stand-in (benchmarks.wikirate_stub)
+with a fixed per-request latency, once with a single connection (the old one
+metric at a time behaviour) and once with the pooled concurrent client, then
+once more with injected 503s to exercise the retries. The cache is not used.
+
+Usage (from backend/):
+    python -m benchmarks.wikirate_client
+    python -m benchmarks.wikirate_client --metrics 50 --latency-ms 100 --error-rate 0.2
+"""
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from benchmarks.common import environment, summarize, write_json
+from benchmarks.wikirate_stub import StubConfig, start
+from gw_api.wikirate.client import AsyncWikirateClient
+
+
+async def run_case(base_url: str, config: StubConfig, concurrency: int, rounds: int,
+                   max_answers: int, backoff_s: float) -> Dict[str, Any]:
+    client = AsyncWikirateClient(base_url=base_url, max_concurrency=concurrency, backoff_s=backoff_s)
+    config.requests.clear()
+    latencies: List[float] = []
+    result = {}
+    try:
+        for i in range(rounds):
+            start_t = time.perf_counter()
+            result = await client.company_metrics(f"Company {i % config.companies}", max_answers=max_answers)
+            latencies.append(time.perf_counter() - start_t)
+    finally:
+        await client.close()
+    return {
+        "concurrency": concurrency,
+        "seconds": summarize(latencies),
+        "round_trips": round(summarize(latencies)["p50"] / (config.latency_ms / 1000), 1),
+        "requests": dict(config.requests),
+        "answers": result.get("total_answers"),
+        "esg_metrics": result.get("esg_metrics_count"),
+        "error": result.get("error"),
+    }
+
+
+async def run(args) -> Dict[str, Any]:
+    config = StubConfig(companies=5, metrics=args.metrics, latency_ms=args.latency_ms)
+    runner, base_url = await start(config)
+    max_answers = args.metrics * len(config.years)
+    report: Dict[str, Any] = {
+        "benchmark": "wikirate_client",
+        "environment": environment(),
+        "metrics": args.metrics,
+        "latency_ms": args.latency_ms,
+    }
+    try:
+        report["sequential"] = await run_case(base_url, config, 1, args.rounds, max_answers, 0.05)
+        report["pooled"] = await run_case(base_url, config, args.concurrency, args.rounds, max_answers, 0.05)
+        if args.error_rate:
+            config.error_rate = args.error_rate
+            report["pooled_with_errors"] = await run_case(
+                base_url, config, args.concurrency, args.rounds, max_answers, 0.05
+            )
+            report["pooled_with_errors"]["error_rate"] = args.error_rate
+    finally:
+        await runner.cleanup()
+    return report
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--metrics", type=int, default=50, help="distinct metrics per company")
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--error-rate", type=float, default=0.1, help="503 share for the retry run (0 skips it)")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    for case in ("sequential", "pooled", "pooled_with_errors"):
+        if case in report:
+            r = report[case]
+            print(f"{case:>18}: p50 {r['seconds']['p50']:.2f}s (~{r['round_trips']} round-trips), "
+                  f"requests {r['requests']}, answers {r['answers']}, ESG metrics {r['esg_metrics']}"
+                  + (f", error {r['error']}" if r["error"] else ""))
+    print(f"Results written to {write_json(report, args.out, 'wikirate_client')}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,125 @@
+"""
+Local Wikirate API stand-in
+Serves the endpoints used by gw_api.wikirate.client from generated data, with
+configurable latency and injected transient failures:
+
+    GET /{Company}.json            company card  (404 for unknown names)
+    GET /{Designer+Metric}.json    metric card   (topics, unit)
+    GET /{Company}+Answer.json     answers, paged with limit/offset, filter[year]
+
+Companies are "Company 0" ... "Company N-1"; each has `--metrics` metrics.
+
+Usage (from backend/):
+    python -m benchmarks.wikirate_stub --port 8765 --latency-ms 100
+    WIKIRATE_BASE_URL=http://127.0.0.1:8765 python -m ...
+"""
+
+import argparse
+import asyncio
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+TOPICS = ["Environment", "Social", "Governance", "Other"]
+
+
+@dataclass
+class StubConfig:
+    companies: int = 10
+    metrics: int = 50
+    years: tuple = (2021, 2022, 2023)
+    latency_ms: float = 50.0
+    error_rate: float = 0.0
+    seed: int = 0
+    requests: Dict[str, int] = field(default_factory=dict)
+
+
+def metric_name(i: int) -> str:
+    return f"Stub Designer+Metric {i}"
+
+
+def company_names(config: StubConfig) -> List[str]:
+    return [f"Company {i}" for i in range(config.companies)]
+
+
+def _card(path: str) -> str:
+    return path.removesuffix(".json").replace("_", " ")
+
+
+def make_app(config: StubConfig) -> web.Application:
+    rng = random.Random(config.seed)
+    companies = {name: i + 1 for i, name in enumerate(company_names(config))}
+
+    def answers_for(company: str, year: Optional[int]) -> List[dict]:
+        seed = companies[company]
+        return [
+            {"metric": metric_name(m), "company": company, "year": y, "value": str((seed * 31 + m * 7 + y) % 1000)}
+            for m in range(config.metrics)
+            for y in config.years
+            if year is None or y == year
+        ]
+
+    async def handle(request: web.Request) -> web.StreamResponse:
+        kind = "answers" if request.path.endswith("+Answer.json") else "card"
+        config.requests[kind] = config.requests.get(kind, 0) + 1
+        await asyncio.sleep(config.latency_ms / 1000)
+        if config.error_rate and rng.random() < config.error_rate:
+            return web.json_response({"error": "unavailable"}, status=503)
+
+        card = _card(request.match_info["card"])
+        if kind == "answers":
+            company = card.removesuffix("+Answer")
+            if company not in companies:
+                return web.json_response({"error": "not found"}, status=404)
+            year = request.query.get("filter[year]")
+            items = answers_for(company, int(year) if year else None)
+            offset = int(request.query.get("offset", 0))
+            limit = int(request.query.get("limit", 20))
+            return web.json_response({"items": items[offset : offset + limit]})
+        if card in companies:
+            return web.json_response({"id": companies[card], "name": card, "type": {"name": "Company"}})
+        if card.startswith("Stub Designer+Metric "):
+            i = int(card.rsplit(" ", 1)[1])
+            return web.json_response({
+                "name": card,
+                "topics": [TOPICS[i % len(TOPICS)]],
+                "unit": ["tonnes", "%", "MWh", None][i % 4],
+            })
+        return web.json_response({"error": "not found"}, status=404)
+
+    app = web.Application()
+    app.router.add_get("/{card:.+}", handle)
+    return app
+
+
+async def start(config: StubConfig, host: str = "127.0.0.1", port: int = 0) -> tuple:
+    """Start the stub on the running loop; returns (runner, base_url)"""
+    runner = web.AppRunner(make_app(config))
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--companies", type=int, default=10)
+    parser.add_argument("--metrics", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    config = StubConfig(
+        companies=args.companies, metrics=args.metrics, latency_ms=args.latency_ms, error_rate=args.error_rate
+    )
+    print(f"Wikirate stand-in on http://{args.host}:{args.port} "
+          f"({args.companies} companies x {args.metrics} metrics, {args.latency_ms:g} ms latency)")
+    web.run_app(make_app(config), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
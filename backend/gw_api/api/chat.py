@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Depends
 from starlette.responses import StreamingResponse, JSONResponse
 from datetime import datetime
@@ -11,6 +12,8 @@ from gw_api.core.store import (
     load_vector_store,
 )
 from gw_api.db import get_db
+from gw_api.core.metrics import inflight_requests
+from gw_api.core.profiling import stage
 
 router = APIRouter()
 
@@ -148,6 +151,7 @@ async def chat_with_agent(
     print(f"[AGENT] Found active agent for session")
 
     async def generate_response():
+        inflight_requests.inc(kind="chat")
         try:
             print(
                 f"[RESPONSE] Generating response with {len(conversation)} context messages"
@@ -165,7 +169,9 @@ async def chat_with_agent(
                 f"{full_prompt}\n\n"
                 f"Document Context: Use the vector store with session ID {session_id} for document retrieval and analysis."
             )
-            response = agent.run(enhanced_prompt)
+            with stage("chat.agent_run"):
+                # sync agent: keep the event loop free while it (and the LLM governor) waits
+                response = await asyncio.to_thread(agent.run, enhanced_prompt)
 
             if not response or len(response) < 10:
                 response = (
@@ -187,5 +193,7 @@ async def chat_with_agent(
                 yield chunk + " "
         except Exception as e:
             yield f"Error: {str(e)}"
+        finally:
+            inflight_requests.dec(kind="chat")
 
     return StreamingResponse(generate_response(), media_type="text/plain")
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
 from gw_api.db import get_db
+from gw_api.core.dashboard_stats import get_stats
 from gw_api.models.report import Report
 import json
 
@@ -13,40 +14,14 @@ router = APIRouter(tags=["dashboard"])
 
 @router.get("/dashboard/stats")
 async def get_dashboard_stats(db: Session = Depends(get_db)) -> Dict[str, Any]:
-    """Get dashboard statistics"""
+    """Get dashboard statistics (materialized counters, see gw_api.core.dashboard_stats)"""
     try:
-        # Get all reports and fix data
-        reports = db.query(Report).all()
-
-        high_risk_count = 0
-        total_reports = len(reports)
-
-        for report in reports:
-            # Auto-fix data: extract correct overall_score from metrics
-            if report.metrics:
-                try:
-                    metrics = json.loads(report.metrics)
-                    if "overall_greenwashing_score" in metrics:
-                        overall_score = metrics["overall_greenwashing_score"].get(
-                            "score", 0
-                        )
-
-                        # Update database record (ensure data consistency)
-                        if report.overall_score != overall_score:
-                            report.overall_score = overall_score
-
-                        # Count high-risk companies (score >=7)
-                        if overall_score >= 7:
-                            high_risk_count += 1
-                except json.JSONDecodeError:
-                    pass
-
-        # Batch commit changes
-        db.commit()
+        stats = get_stats(db)
+        high_risk_count = stats.high_risk_reports
 
         return {
             "high_risk_companies": high_risk_count,
-            "pending_reports": total_reports,
+            "pending_reports": stats.total_reports,
             "high_priority_reports": min(9, high_risk_count // 3)
             if high_risk_count > 0
             else 0,
@@ -12,6 +12,7 @@ import logging
 
 # Use your analyzer that performs discovery + analysis
 from gw_api.core.deep_research_city_analyzer import CityCompanyAnalyzer
+from gw_api.core.llm_governor import llm_priority
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -75,9 +76,11 @@ async def discover_companies_in_city(request: CityAnalysisRequest):
 
     try:
         # IMPORTANT: match your analyzer's signature (city, top_n)
-        companies_data, discovery_html = await analyzer.find_companies_in_city_fast(
-            request.city, request.top_n
-        )
+        # City rankings are batch traffic: they must not starve upload analyses
+        with llm_priority("batch"):
+            companies_data, discovery_html = await analyzer.find_companies_in_city_fast(
+                request.city, request.top_n
+            )
     except HTTPException as e:
         # Let FastAPI handle explicit HTTP errors
         raise e
@@ -119,9 +122,10 @@ async def analyze_city_companies(request: CityAnalysisRequest):
 
     # Step 1: discovery
     try:
-        companies_data, discovery_html = await analyzer.find_companies_in_city_fast(
-            request.city, request.top_n
-        )
+        with llm_priority("batch"):
+            companies_data, discovery_html = await analyzer.find_companies_in_city_fast(
+                request.city, request.top_n
+            )
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -143,9 +147,10 @@ async def analyze_city_companies(request: CityAnalysisRequest):
     try:
         # IMPORTANT: match your analyzer's signature:
         # analyze_discovered_companies(companies_data, city, progress_callback=None)
-        results = await analyzer.analyze_discovered_companies(
-            companies_data, request.city
-        )
+        with llm_priority("batch"):
+            results = await analyzer.analyze_discovered_companies(
+                companies_data, request.city
+            )
     except HTTPException as e:
         raise e
     except Exception as e:
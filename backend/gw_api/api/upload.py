@@ -6,11 +6,12 @@ from collections import defaultdict
 from gw_api.core.store import session_store, save_session
 from gw_api.core.esg_analysis import agent_executors
 from gw_api.core.utils import hash_file, translate_text
-from gw_api.core.document import process_pdf_document, process_ocr_text
-from gw_api.core.vector_store import embedding_model
-from gw_api.config import UPLOAD_DIR, REPORT_DIR, VALID_UPLOAD_TYPES, VALID_COMPANIES
-from gw_api.core.llm import llm
+from gw_api.core.document import process_pdf_document, process_ocr_pages
+from gw_api.core.vector_store import get_embedding_model
+from gw_api.config import UPLOAD_DIR, REPORT_DIR, VALID_UPLOAD_TYPES
+from gw_api.core.llm import get_llm
 from gw_api.core.company import extract_company_info
+from gw_api.core.dashboard_stats import record_report
 from gw_api.models import ChatBaseMessage
 from gw_api.core.esg_analysis import comprehensive_esg_analysis, document_stores
 from gw_api.models.report import Report, ReportFile
@@ -22,7 +23,10 @@ from PyPDF2 import PdfReader
 from langdetect import detect, DetectorFactory
 from PIL import Image
 import io
-from gw_api.core.ocr_service import ocr_service
+from gw_api.core.ocr_pool import OCRError, OCRQueueFull, OCRTimeout
+from gw_api.core.page_ocr import ocr_image_pages
+from gw_api.core.profiling import stage
+from gw_api.core.metrics import observe, track_inflight, vector_query_seconds
 from langchain_community.vectorstores import Chroma
 
 IMAGE_UPLOAD_TYPES = {
@@ -63,6 +67,7 @@ router = APIRouter()
 
 
 @router.post("/upload")
+@track_inflight("upload")
 async def upload_document(
     file: Annotated[UploadFile, File(...)],
     session_id: Optional[str] = Form(None),
@@ -130,11 +135,17 @@ async def upload_document(
         f.write(file_b)
 
     if is_image:
-        # 2) OCR MUST run on the image path (NOT a PDF)
-        ocr_out = ocr_service.read(str(file_path), mode="smart")
-        ocr_text = (
-            ocr_out.get("cleaned_text") or ocr_out.get("full_text") or ""
-        ).strip()
+        # 2) OCR MUST run on the image path (NOT a PDF); multi-page TIFFs are OCRed frame by frame
+        with stage("ocr"):
+            try:
+                ocr_pages = await ocr_image_pages(str(file_path))
+            except OCRQueueFull:
+                raise HTTPException(status_code=503, detail="OCR is busy, please retry the upload shortly.")
+            except OCRTimeout:
+                raise HTTPException(status_code=504, detail="OCR of the uploaded image timed out.")
+            except OCRError as e:
+                raise HTTPException(status_code=500, detail=f"OCR failed: {e}")
+        ocr_text = "\n\n".join(text for text in ocr_pages if text).strip()
         if not ocr_text:
             raise HTTPException(
                 status_code=400,
@@ -185,21 +196,22 @@ async def upload_document(
 
     # 🔍 Detect PDF language
     try:
-        sample_text = ""
-        if is_pdf:
-            reader = PdfReader(str(file_path))
-            for page in reader.pages:
-                text = page.extract_text()
-                if text:
-                    sample_text += text
-                if len(sample_text) > 1000:
-                    break
-        else:
-            sample_text = ocr_text
-            print("sample_text", sample_text)
-        detected_language = (
-            detect(sample_text[:2000]) if sample_text.strip() else "unknown"
-        )
+        with stage("language_detection"):
+            sample_text = ""
+            if is_pdf:
+                reader = PdfReader(str(file_path))
+                for page in reader.pages:
+                    text = page.extract_text()
+                    if text:
+                        sample_text += text
+                    if len(sample_text) > 1000:
+                        break
+            else:
+                sample_text = ocr_text
+                print("sample_text", sample_text)
+            detected_language = (
+                detect(sample_text[:2000]) if sample_text.strip() else "unknown"
+            )
     except Exception as e:
         print(f"[Warning] Language detection failed: {e}")
         detected_language = "unknown"
@@ -213,7 +225,7 @@ async def upload_document(
         if is_pdf:
             chunks = await process_pdf_document(str(file_path))
         else:
-            chunks = await process_ocr_text(ocr_text)
+            chunks = await process_ocr_pages(ocr_pages)
         print(f"[INFO] Document processed, created {len(chunks)} chunks")
 
         # Create and persist vector index
@@ -221,9 +233,10 @@ async def upload_document(
         from gw_api.config import VECTOR_STORE_DIR
 
         persist_path = VECTOR_STORE_DIR / session_id
-        vector_store = Chroma.from_documents(
-            chunks, embedding_model, persist_directory=str(persist_path)
-        )
+        with stage("embedding"):
+            vector_store = Chroma.from_documents(
+                chunks, get_embedding_model(), persist_directory=str(persist_path)
+            )
         from gw_api.core.store import save_vector_store
 
         save_vector_store(session_id, vector_store)
@@ -231,16 +244,18 @@ async def upload_document(
 
         # Extract company name
         company_query = "What is the name of the company that published this report?"
-        company_docs = vector_store.similarity_search(company_query, k=3)
-        company_context = "\n".join([doc.page_content for doc in company_docs])
-        company_prompt = f"""
+        with stage("company_extraction"):
+            with observe(vector_query_seconds, call_site="company_extraction"):
+                company_docs = vector_store.similarity_search(company_query, k=3)
+            company_context = "\n".join([doc.page_content for doc in company_docs])
+            company_prompt = f"""
         Extract the company name from this context:
         {company_context}
         
         Return only the company name, nothing else.
         """
-        company_response = llm.invoke([HumanMessage(content=company_prompt)])
-        company_name = company_response.content.strip()
+            company_response = await get_llm().ainvoke([HumanMessage(content=company_prompt)])
+            company_name = company_response.content.strip()
 
         # Perform ESG analysis
         print(f"[INFO] Starting ESG analysis for company: {company_name}")
@@ -254,8 +269,9 @@ async def upload_document(
         final_synthesis_en = analysis_result.get("final_synthesis", "")
         metrics_ref = analysis_result.get("metrics", {}) or {}
 
-        final_synthesis_de = await translate_text(final_synthesis_en, "German")
-        final_synthesis_it = await translate_text(final_synthesis_en, "Italian")
+        with stage("translation"):
+            final_synthesis_de = await translate_text(final_synthesis_en, "German")
+            final_synthesis_it = await translate_text(final_synthesis_en, "Italian")
 
         finals_by_lang = {
             "en": final_synthesis_en,
@@ -290,9 +306,11 @@ async def upload_document(
             analysis_summary_i18n=json.dumps(finals_by_lang),
             file_id=report_file.id,
         )
-        db.add(report)
-        db.commit()
-        db.refresh(report)
+        with stage("db_write"):
+            db.add(report)
+            record_report(db, report)  # dashboard counters, committed with the report
+            db.commit()
+            db.refresh(report)
 
         result = {
             "filename": file_path.name,
@@ -320,14 +338,16 @@ async def upload_document(
             "created_at": datetime.now().timestamp(),
         }
         print(f"[DEBUG] Saving session data with keys: {list(session_data.keys())}")
-        save_session(session_id, session_data, db)
+        with stage("db_write"):
+            save_session(session_id, session_data, db)
         print(f"[INFO] Session {session_id} saved to persistent storage")
 
         # Register agent executor
         print(f"[AGENT DEBUG] Creating agent for session: {session_id}")
         from gw_api.core.esg_analysis import create_esg_agent
 
-        agent = create_esg_agent(session_id, vector_store, company_name)
+        with stage("agent_setup"):
+            agent = create_esg_agent(session_id, vector_store, company_name)
         agent_executors[session_id] = agent
         print(f"[AGENT DEBUG] Agent created and registered for session: {session_id}")
         print(f"[AGENT DEBUG] Current active agents: {list(agent_executors.keys())}")
@@ -1,6 +1,5 @@
 import os
 from pathlib import Path
-import pandas as pd
 from dotenv import load_dotenv
 from gw_api.models.base import Base
 from gw_api.models import (
@@ -19,35 +18,44 @@ LLAMA_CLOUD_API_KEY = os.getenv("LLAMA_CLOUD_API_KEY")
 WIKIRATE_API_KEY = os.getenv("WIKIRATE_API_KEY")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
+# "live" calls Gemini/BBC; "fake" swaps in deterministic offline providers
+PROVIDER_MODE = os.getenv("PROVIDER_MODE", "live").lower()
+USE_FAKE_PROVIDERS = PROVIDER_MODE == "fake"
+DEEP_SEARCH_MODEL = os.getenv("DEEP_SEARCH_MODEL", "gemini-2.5-flash")  # Grounded search model (also its governor bucket)
+
 
 # Paths
 BASE_PATH = Path(__file__).parent.parent  # Points to project root
 UPLOAD_DIR = BASE_PATH / "uploads"  # Directory for uploaded files
 REPORT_DIR = BASE_PATH / "reports"  # Directory for report files
-DB_PATH = BASE_PATH / "data/reports.db"  # SQLite database path
-COMPANIES_PATH = (
-    BASE_PATH / "data_files/companies.csv"
-)  # Company whitelist CSV file path
+DB_PATH = Path(os.getenv("DB_PATH", BASE_PATH / "data/reports.db"))  # SQLite database path
+COMPANY_WHITELIST_PATH = BASE_PATH / "data_files/companies.csv"  # Company whitelist CSV file path
 VECTOR_STORE_DIR = (
     BASE_PATH / "data/vector_stores"
 )  # Directory for vector store persistence
-DB_PATH = BASE_PATH / "data/reports.db"  # SQLite database path
-COMPANIES_PATH = BASE_PATH / "data/raw/companies.csv"    # Company whitelist CSV file path
 WIKIRATE_COMPANIES_PATH = BASE_PATH / "data/raw/wikirate_companies_all.csv"    # Company whitelist CSV file path
+# Wikirate company lists for name resolution, in priority order (missing files are skipped)
+WIKIRATE_COMPANY_SOURCES = [
+    BASE_PATH / "data_files/wikirate_companies_all.csv",
+    BASE_PATH / "data_files/wikirate_companies_2000.csv",
+    BASE_PATH / "data_files/wikirate_companies.csv",
+]
+CITY_COMPANIES_PATH = BASE_PATH / "data_files/city_companies.json"  # Seed companies per city (discovery fallback)
+COMPANY_REGISTRY_DIR = BASE_PATH / "data/company_registry"  # Prebuilt company registry (gw_api.core.company_registry)
+# "live" queries the Wikirate API (through the cache); "snapshot" reads only the local snapshot
+WIKIRATE_MODE = os.getenv("WIKIRATE_MODE", "live").lower()
+WIKIRATE_SNAPSHOT_PATH = Path(os.getenv("WIKIRATE_SNAPSHOT_PATH", BASE_PATH / "data/wikirate_snapshot.db"))
+WIKIRATE_MAX_ANSWERS = int(os.getenv("WIKIRATE_MAX_ANSWERS", "20"))  # answers per company passed to validation
+WIKIRATE_CACHE_PATH = Path(os.getenv("WIKIRATE_CACHE_PATH", BASE_PATH / "data/wikirate_cache.db"))  # Shared Wikirate response cache
 DOWNLOADS_PATH = BASE_PATH / "data/downloads"
+NEWS_STORE_DIR = BASE_PATH / "data/news_store"  # Content-addressed news articles + extracted text
+NEWS_FIXTURE_DIR = Path(os.getenv("NEWS_FIXTURE_DIR", BASE_PATH / "data/news_fixtures"))  # Recorded news responses (NEWS_FIXTURES)
 
 # Ensure directories exist
 REPORT_DIR.mkdir(parents=True, exist_ok=True)
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 VECTOR_STORE_DIR.mkdir(parents=True, exist_ok=True)
 
-# Load valid companies
-if COMPANIES_PATH.exists():
-    df = pd.read_csv(COMPANIES_PATH)
-    VALID_COMPANIES = [name.lower() for name in df["company_names"].to_list()]
-else:
-    VALID_COMPANIES = []
-
 # Restrict upload file types (PDF only)
 VALID_UPLOAD_TYPES = ["application/pdf"]
 
@@ -1,6 +1,27 @@
-from .tools import ESGDocumentAnalysisTool, NewsValidationTool, ESGMetricsCalculatorTool
-from .document import process_pdf_document
-from .utils import hash_file, is_esg_related
-from .company import extract_company_info
-from .vector_store import embedding_model, text_splitter
-from .llm import llm, climatebert_tokenizer, climatebert_model 
+# Re-exports are resolved on first access (PEP 562), so importing any gw_api.core
+# module does not load the analysis tools, LangChain and the Gemini clients
+import importlib
+
+_EXPORTS = {
+    "ESGDocumentAnalysisTool": ".tools",
+    "NewsValidationTool": ".tools",
+    "ESGMetricsCalculatorTool": ".tools",
+    "process_pdf_document": ".document",
+    "hash_file": ".utils",
+    "is_esg_related": ".utils",
+    "extract_company_info": ".company",
+    "get_embedding_model": ".vector_store",
+    "text_splitter": ".vector_store",
+    "get_llm": ".llm",
+    "get_climatebert": ".llm",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
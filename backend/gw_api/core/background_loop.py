@@ -0,0 +1,28 @@
+"""
+Shared background event loop
+Process-wide aiohttp sessions (Wikirate client, news fetcher) are bound to the
+loop they were created on. This loop runs in a daemon thread so synchronous
+callers such as LangGraph nodes and tools can submit coroutines to it and
+reuse the same connection pools.
+"""
+
+import asyncio
+import threading
+from typing import Any, Coroutine, Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_lock = threading.Lock()
+
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="gw-background-loop", daemon=True).start()
+        return _loop
+
+
+def run_sync(coro: Coroutine, timeout: Optional[float] = None) -> Any:
+    """Run `coro` on the background loop and block until it finishes"""
+    return asyncio.run_coroutine_threadsafe(coro, background_loop()).result(timeout)
@@ -1,12 +1,14 @@
 from langchain_community.vectorstores import Chroma
 from langchain.schema import HumanMessage
-from gw_api.core.llm import llm
+from gw_api.core.llm import get_llm
+from gw_api.core.metrics import observe, vector_query_seconds
 
 
 def extract_company_info(query: str, vector_store: Chroma) -> str:
     """Extract company information from vector store"""
     try:
-        docs = vector_store.similarity_search(query, k=5)
+        with observe(vector_query_seconds, call_site="company_info"):
+            docs = vector_store.similarity_search(query, k=5)
         context = "\n\n".join([doc.page_content for doc in docs])
         prompt = f"""
         Extract company information from the following context:
@@ -17,7 +19,7 @@ def extract_company_info(query: str, vector_store: Chroma) -> str:
         
         Provide specific information about the company based on the query.
         """
-        response = llm.invoke([HumanMessage(content=prompt)])
+        response = get_llm().invoke([HumanMessage(content=prompt)])
         return response.content
     except Exception as e:
         return f"Error extracting company info: {str(e)}"
@@ -0,0 +1,399 @@
+"""
+Company registry
+Every company name the app knows, from one index instead of a list per feature:
+
+- the whitelist (COMPANY_WHITELIST_PATH, `company_names` column)
+- the Wikirate company lists (WIKIRATE_COMPANY_SOURCES), with ids and ISIN counts
+- the per-city seed companies shown when city discovery finds nothing
+  (CITY_COMPANIES_PATH, with city name aliases such as "münchen" -> "munich")
+
+Names are keyed by normalize_company() (lower-case, no accents or punctuation,
+trailing legal forms dropped), so "BP plc", "BP PLC." and "bp" are one entry.
+Each entry also gets aliases: the key without a leading "the" or trailing
+"group" / "holdings", and either side of a parenthesised part ("GSK
+(GlaxoSmithKline)" is also "gsk" and "glaxosmithkline"). Membership and exact
+lookups are hash-set / dict hits; anything else goes to the TF-IDF name index of
+gw_api.wikirate.company_index for near-matches.
+
+The registry is stored in COMPANY_REGISTRY_DIR as newline-separated names,
+keys and aliases, a few small numpy arrays and the memory-mapped fuzzy index.
+Loading it takes a few milliseconds; it is rebuilt on first use when a source
+file has changed since it was built.
+
+Rebuild / query from backend/:
+    python -m gw_api.core.company_registry build
+    python -m gw_api.core.company_registry query "Deutsche Bank"
+"""
+
+import argparse
+import csv
+import json
+import re
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from gw_api.config import (
+    CITY_COMPANIES_PATH, COMPANY_REGISTRY_DIR, COMPANY_WHITELIST_PATH, WIKIRATE_COMPANY_SOURCES,
+)
+from gw_api.core.lazy import lazy_singleton
+from gw_api.wikirate.company_index import (
+    LEGAL_SUFFIXES, MIN_SCORE, CompanyIndex, build_index, load_companies, normalize_company,
+)
+
+REGISTRY_VERSION = 1
+
+# Source flags per entry
+WHITELIST, WIKIRATE, CITY_SEED = 1, 2, 4
+SOURCE_NAMES = {WHITELIST: "whitelist", WIKIRATE: "wikirate", CITY_SEED: "city_seed"}
+
+# Words that describe the corporate structure rather than name the company
+DESCRIPTOR_WORDS = {"group", "holding", "holdings"}
+# Dropped when deriving aliases, here and for news searches (utils.generate_company_aliases)
+COMPANY_STOPWORDS = frozenset(LEGAL_SUFFIXES | DESCRIPTOR_WORDS)
+
+_PARENS = re.compile(r"\(([^)]*)\)")
+
+
+def _strip_stopwords(key: str) -> str:
+    words = key.split(" ")
+    if len(words) > 1 and words[0] == "the":
+        words.pop(0)
+    while len(words) > 1 and words[-1] in COMPANY_STOPWORDS:
+        words.pop()
+    return " ".join(words)
+
+
+def name_variants(name: str, exclude: Iterable[str] = ()) -> List[str]:
+    """Normalized keys a company name is also known by, the full key first
+
+    Parenthesised parts that mention one of `exclude` (city names) are
+    locations, not names: "Bayer Pharma (Berlin hub)" is not "berlin hub".
+    """
+    exclude = set(exclude)
+    candidates = [name, _PARENS.sub(" ", name)]
+    for inner in _PARENS.findall(name):
+        inner_key = normalize_company(inner)
+        if inner_key and not exclude.intersection(inner_key.split(" ")):
+            candidates.append(inner)
+    variants: List[str] = []
+    for candidate in candidates:
+        key = normalize_company(candidate)
+        for variant in (key, _strip_stopwords(key)):
+            if len(variant) > 1 and variant not in variants:
+                variants.append(variant)
+    return variants
+
+
+@dataclass
+class CompanyEntry:
+    name: str
+    key: str
+    sources: Tuple[str, ...]
+    wikirate_id: Optional[int] = None
+    isin_count: int = 0
+    score: float = 1.0  # 1.0 for key / alias hits, cosine similarity for fuzzy matches
+
+    @property
+    def whitelisted(self) -> bool:
+        return "whitelist" in self.sources
+
+
+def load_whitelist(path: Path) -> List[str]:
+    if not Path(path).exists():
+        return []
+    with open(path, newline="", encoding="utf-8") as f:
+        return [" ".join(row["company_names"].split()) for row in csv.DictReader(f) if (row.get("company_names") or "").strip()]
+
+
+def load_city_seeds(path: Path) -> Dict[str, Any]:
+    if not Path(path).exists():
+        return {"aliases": {}, "cities": {}}
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def _source_stamps(paths: Sequence[Path]) -> List[Dict[str, Any]]:
+    stamps = []
+    for path in paths:
+        path = Path(path)
+        stat = path.stat() if path.exists() else None
+        stamps.append({
+            "path": str(path),
+            "size": stat.st_size if stat else None,
+            "mtime_ns": stat.st_mtime_ns if stat else None,
+        })
+    return stamps
+
+
+def default_sources() -> Dict[str, Any]:
+    return {
+        "whitelist": Path(COMPANY_WHITELIST_PATH),
+        "wikirate": [Path(p) for p in WIKIRATE_COMPANY_SOURCES],
+        "cities": Path(CITY_COMPANIES_PATH),
+    }
+
+
+def build_registry(out_dir: Path, sources: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Merge all sources into one entry per normalized name and write the registry files"""
+    sources = sources or default_sources()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    names: List[str] = []
+    keys: List[str] = []
+    flags: List[int] = []
+    wikirate_ids: List[int] = []
+    isin: List[int] = []
+    rows: Dict[str, int] = {}
+    spellings: Dict[str, int] = {}  # every name seen -> its row, for aliases
+
+    def add(name: str, flag: int, wikirate_id: int = -1, isin_count: int = 0) -> Optional[int]:
+        name = " ".join(name.split())  # one name per line on disk
+        key = normalize_company(name)
+        if not key:
+            return None
+        row = rows.get(key)
+        if row is None:
+            row = rows[key] = len(names)
+            names.append(name)
+            keys.append(key)
+            flags.append(0)
+            wikirate_ids.append(-1)
+            isin.append(0)
+        if flag == WIKIRATE and (wikirate_ids[row] < 0 or isin_count > isin[row]):
+            # Wikirate names come first so they are the display names; on a clash keep the company with more ISINs
+            names[row], wikirate_ids[row], isin[row] = name, wikirate_id, isin_count
+        flags[row] |= flag
+        spellings.setdefault(name, row)
+        return row
+
+    for cid, name, isin_count in load_companies(sources["wikirate"]):
+        add(name, WIKIRATE, cid, isin_count)
+    whitelist_names: Dict[int, str] = {}  # row -> name as written in the whitelist, in file order
+    for name in load_whitelist(sources["whitelist"]):
+        row = add(name, WHITELIST)
+        if row is not None and row not in whitelist_names:
+            whitelist_names[row] = name
+    cities = load_city_seeds(sources["cities"])
+    for companies in cities.get("cities", {}).values():
+        for company in companies:
+            add(company["name"], CITY_SEED)
+
+    # Aliases: never shadow a key; on a clash the company with more ISINs keeps the alias
+    city_words = {w for city in cities.get("cities", {}) for w in city.split()}
+    aliases: Dict[str, int] = {}
+    whitelist_aliases: Set[str] = set()  # aliases of whitelisted names, even where another company holds the alias
+    for name, row in spellings.items():
+        for variant in name_variants(name, exclude=city_words)[1:]:
+            if variant in rows:
+                continue
+            if flags[row] & WHITELIST:
+                whitelist_aliases.add(variant)
+            if variant not in aliases or isin[row] > isin[aliases[variant]]:
+                aliases[variant] = row
+
+    (out_dir / "names.txt").write_text("\n".join(names), encoding="utf-8")
+    (out_dir / "keys.txt").write_text("\n".join(keys), encoding="utf-8")
+    (out_dir / "aliases.txt").write_text("\n".join(aliases), encoding="utf-8")
+    (out_dir / "whitelist.txt").write_text("\n".join(whitelist_names.values()), encoding="utf-8")
+    arrays = {
+        "flags": np.array(flags, dtype=np.uint8),
+        "wikirate_ids": np.array(wikirate_ids, dtype=np.int64),
+        "isin": np.array(isin, dtype=np.int32),
+        "alias_rows": np.array(list(aliases.values()), dtype=np.int32),
+        "alias_whitelisted": np.array([alias in whitelist_aliases for alias in aliases], dtype=bool),
+        "whitelist_rows": np.array(list(whitelist_names), dtype=np.int32),
+    }
+    for key, arr in arrays.items():
+        np.save(out_dir / f"{key}.npy", arr)
+    (out_dir / "cities.json").write_text(json.dumps(cities, ensure_ascii=False), encoding="utf-8")
+    build_index([(row, names[row], isin[row]) for row in range(len(names))], out_dir / "fuzzy")
+
+    flag_array = arrays["flags"]
+    meta = {
+        "version": REGISTRY_VERSION,
+        "companies": len(names),
+        "whitelist": int(np.count_nonzero(flag_array & WHITELIST)),
+        "wikirate": int(np.count_nonzero(flag_array & WIKIRATE)),
+        "city_seed": int(np.count_nonzero(flag_array & CITY_SEED)),
+        "aliases": len(aliases),
+        "sources": _source_stamps([sources["whitelist"], *sources["wikirate"], sources["cities"]]),
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    (out_dir / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return meta
+
+
+def registry_is_current(registry_dir: Path, sources: Optional[Dict[str, Any]] = None) -> bool:
+    sources = sources or default_sources()
+    meta_path = Path(registry_dir) / "meta.json"
+    if not meta_path.exists():
+        return False
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    stamps = _source_stamps([sources["whitelist"], *sources["wikirate"], sources["cities"]])
+    return meta.get("version") == REGISTRY_VERSION and meta.get("sources") == stamps
+
+
+class CompanyRegistry:
+    def __init__(self, registry_dir: Path):
+        registry_dir = Path(registry_dir)
+        self.meta = json.loads((registry_dir / "meta.json").read_text(encoding="utf-8"))
+        if self.meta.get("version") != REGISTRY_VERSION:
+            raise ValueError(f"Company registry version {self.meta.get('version')} != {REGISTRY_VERSION}")
+        read_lines = lambda name: (registry_dir / name).read_text(encoding="utf-8").split("\n")  # noqa: E731
+        load = lambda key: np.load(registry_dir / f"{key}.npy")  # noqa: E731
+        self.names = read_lines("names.txt") if self.meta["companies"] else []
+        self.keys = read_lines("keys.txt") if self.meta["companies"] else []
+        self.flags, self.wikirate_ids, self.isin = load("flags"), load("wikirate_ids"), load("isin")
+        self._rows: Dict[str, int] = {key: row for row, key in enumerate(self.keys)}
+        alias_keys = read_lines("aliases.txt") if self.meta["aliases"] else []
+        self._aliases: Dict[str, int] = dict(zip(alias_keys, load("alias_rows").tolist()))
+        self._whitelist_names = read_lines("whitelist.txt") if self.meta["whitelist"] else []
+        # whitelisted keys and their aliases
+        self.whitelist: FrozenSet[str] = frozenset(
+            [self.keys[row] for row in load("whitelist_rows").tolist()]
+            + [alias for alias, listed in zip(alias_keys, load("alias_whitelisted").tolist()) if listed]
+        )
+        self._wikirate_mask = (self.flags & WIKIRATE) > 0
+
+        cities = json.loads((registry_dir / "cities.json").read_text(encoding="utf-8"))
+        self._cities: Dict[str, List[Dict[str, str]]] = cities.get("cities", {})
+        self._city_aliases: Dict[str, str] = cities.get("aliases", {})
+        self._fuzzy_dir = registry_dir / "fuzzy"
+        self._fuzzy: Optional[CompanyIndex] = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return self._row(name) is not None
+
+    @property
+    def fuzzy(self) -> CompanyIndex:
+        if self._fuzzy is None:
+            self._fuzzy = CompanyIndex(self._fuzzy_dir)
+        return self._fuzzy
+
+    def entry(self, row: int, score: float = 1.0) -> CompanyEntry:
+        flag = int(self.flags[row])
+        wikirate_id = int(self.wikirate_ids[row])
+        return CompanyEntry(
+            name=self.names[row],
+            key=self.keys[row],
+            sources=tuple(label for bit, label in SOURCE_NAMES.items() if flag & bit),
+            wikirate_id=wikirate_id if wikirate_id >= 0 else None,
+            isin_count=int(self.isin[row]),
+            score=score,
+        )
+
+    def _row(self, name: str) -> Optional[int]:
+        """Row of an exact key or alias hit, trying the name's own variants too"""
+        for variant in name_variants(name or ""):
+            row = self._rows.get(variant)
+            if row is None:
+                row = self._aliases.get(variant)
+            if row is not None:
+                return row
+        return None
+
+    def lookup(self, name: str) -> Optional[CompanyEntry]:
+        """Exact match on the normalized name or an alias; no fuzzy matching"""
+        row = self._row(name)
+        return self.entry(row) if row is not None else None
+
+    def is_whitelisted(self, name: str) -> bool:
+        return any(variant in self.whitelist for variant in name_variants(name or ""))
+
+    def search(self, name: str, k: int = 5, source: Optional[int] = None) -> List[CompanyEntry]:
+        """Top-k fuzzy matches, optionally only among entries from one source flag"""
+        mask = (self.flags & source) > 0 if source is not None else None
+        return [self.entry(m.id, score=m.score) for m in self.fuzzy.search(name, k=k, mask=mask)]
+
+    def match(self, name: str, min_score: float = MIN_SCORE, source: Optional[int] = None) -> Optional[CompanyEntry]:
+        """Exact / alias hit, else the best fuzzy match scoring at least `min_score`"""
+        row = self._row(name)
+        if row is not None and (source is None or self.flags[row] & source):
+            return self.entry(row)
+        mask = (self.flags & source) > 0 if source is not None else None
+        best = self.fuzzy.best_match(name, min_score=min_score, mask=mask)
+        return self.entry(best.id, score=best.score) if best else None
+
+    def wikirate_match(self, name: str, min_score: float = MIN_SCORE) -> Optional[CompanyEntry]:
+        """The Wikirate company a name refers to (its Wikirate name and id)"""
+        return self.match(name, min_score=min_score, source=WIKIRATE)
+
+    def whitelist_names(self, limit: Optional[int] = None) -> List[str]:
+        """Whitelisted companies as written in the whitelist, in file order (one per entry)"""
+        return list(self._whitelist_names if limit is None else self._whitelist_names[:limit])
+
+    def city_key(self, city: str) -> str:
+        key = (city or "").strip().lower()
+        return self._city_aliases.get(key, key)
+
+    def city_companies(self, city: str, top_n: Optional[int] = None) -> List[Dict[str, str]]:
+        """Seed companies for a city (copies), e.g. when discovery found nothing"""
+        companies = self._cities.get(self.city_key(city), [])
+        return [dict(c) for c in (companies if top_n is None else companies[:top_n])]
+
+
+def load_registry(registry_dir: Path = COMPANY_REGISTRY_DIR, rebuild: bool = True) -> CompanyRegistry:
+    """Registry from `registry_dir`, rebuilt first if missing or older than its sources"""
+    registry_dir = Path(registry_dir)
+    if rebuild and not registry_is_current(registry_dir):
+        try:
+            build_registry(registry_dir)
+        except OSError as e:
+            # Read-only deployments: build into a temporary directory instead
+            print(f"[CompanyRegistry] Cannot write {registry_dir} ({e}); building in a temporary directory")
+            registry_dir = Path(tempfile.mkdtemp(prefix="company_registry_"))
+            build_registry(registry_dir)
+    return CompanyRegistry(registry_dir)
+
+
+@lazy_singleton("companies")
+def get_company_registry() -> CompanyRegistry:
+    """Process-wide registry from COMPANY_REGISTRY_DIR, built on first use if missing or stale"""
+    return load_registry()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Company registry")
+    sub = parser.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("build", help="rebuild the registry from the company lists")
+    b.add_argument("--out", type=Path, default=COMPANY_REGISTRY_DIR)
+    q = sub.add_parser("query", help="show how a name resolves")
+    q.add_argument("name")
+    q.add_argument("-k", type=int, default=5)
+    q.add_argument("--registry", type=Path, default=COMPANY_REGISTRY_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        meta = build_registry(args.out)
+        print(f"Registered {meta['companies']} companies ({meta['whitelist']} whitelisted, "
+              f"{meta['wikirate']} Wikirate, {meta['city_seed']} city seeds, {meta['aliases']} aliases) "
+              f"into {args.out} in {time.perf_counter() - start:.2f}s")
+        return 0
+
+    start = time.perf_counter()
+    registry = load_registry(args.registry)
+    load_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    entry = registry.lookup(args.name)
+    matches = registry.search(args.name, k=args.k)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if entry:
+        print(f"exact: {entry.name}  ({', '.join(entry.sources)}, wikirate id={entry.wikirate_id}, isin={entry.isin_count})")
+    for m in matches:
+        print(f"{m.score:.4f}  {m.name}  ({', '.join(m.sources)}, wikirate id={m.wikirate_id})")
+    print(f"loaded in {load_ms:.1f} ms, query {elapsed_ms:.3f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,150 @@
+"""
+Materialized dashboard statistics
+`GET /v2/dashboard/stats` reads one row of the `dashboard_stats` table instead
+of loading and parsing every report. The row holds the report count and the
+number of high-risk reports (overall greenwashing score >= HIGH_RISK_SCORE in
+the report metrics) and is updated by `record_report()` in the same
+transaction as the report insert, with an atomic `UPDATE ... SET n = n + 1` so
+concurrent workers do not lose counts.
+
+The row is created from a full scan by `init_db` at startup (existing
+databases) with an INSERT OR IGNORE, so concurrent workers cannot create it
+twice; `backfill` rebuilds it and `check` compares it with a full scan:
+    python -m gw_api.core.dashboard_stats backfill
+    python -m gw_api.core.dashboard_stats check      # exit status 1 on a mismatch
+"""
+
+import argparse
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from gw_api.models.report import DashboardStats, Report
+
+HIGH_RISK_SCORE = 7
+STATS_ID = 1
+
+
+def greenwashing_score(metrics: Optional[str]) -> Optional[float]:
+    """Overall greenwashing score (0-10) from a report's metrics JSON, None if absent"""
+    if not metrics:
+        return None
+    try:
+        overall = json.loads(metrics).get("overall_greenwashing_score")
+        return float(overall.get("score", 0)) if isinstance(overall, dict) else None
+    except (json.JSONDecodeError, AttributeError, TypeError, ValueError):
+        return None
+
+
+def is_high_risk(metrics: Optional[str]) -> bool:
+    score = greenwashing_score(metrics)
+    return score is not None and score >= HIGH_RISK_SCORE
+
+
+def compute_stats(db: Session) -> Dict[str, int]:
+    """Counters from a full scan of the reports table"""
+    total = high_risk = 0
+    for (metrics,) in db.query(Report.metrics).yield_per(500):
+        total += 1
+        high_risk += is_high_risk(metrics)
+    return {"total_reports": total, "high_risk_reports": high_risk}
+
+
+def _increment(db: Session, report: Report) -> int:
+    return (
+        db.query(DashboardStats)
+        .filter(DashboardStats.id == STATS_ID)
+        .update(
+            {
+                DashboardStats.total_reports: DashboardStats.total_reports + 1,
+                DashboardStats.high_risk_reports: DashboardStats.high_risk_reports + int(is_high_risk(report.metrics)),
+                DashboardStats.updated_at: datetime.utcnow(),
+            },
+            synchronize_session=False,
+        )
+    )
+
+
+def _insert_if_missing(db: Session, counters: Dict[str, int]) -> bool:
+    """INSERT OR IGNORE the counters row; True if this call created it"""
+    statement = (
+        insert(DashboardStats)
+        .values(id=STATS_ID, updated_at=datetime.utcnow(), **counters)
+        .on_conflict_do_nothing(index_elements=[DashboardStats.id])
+    )
+    return db.execute(statement).rowcount == 1
+
+
+def record_report(db: Session, report: Report) -> None:
+    """Count a new report; call before committing the session that adds it"""
+    if _increment(db, report):
+        return
+    # No row yet (database created without init_db): count everything, this report included
+    db.flush()
+    if not _insert_if_missing(db, compute_stats(db)):
+        # Another worker created it first, from a scan that could not see this report
+        _increment(db, report)
+
+
+def ensure_stats(db: Session) -> DashboardStats:
+    """The counters row, created from a full scan if it does not exist yet"""
+    stats = db.get(DashboardStats, STATS_ID)
+    if stats is None:
+        _insert_if_missing(db, compute_stats(db))
+        db.commit()
+        stats = db.get(DashboardStats, STATS_ID)
+    return stats
+
+
+def backfill(db: Session) -> DashboardStats:
+    """Replace the stored counters with a full scan and commit"""
+    stats = db.get(DashboardStats, STATS_ID) or DashboardStats(id=STATS_ID)
+    for key, value in compute_stats(db).items():
+        setattr(stats, key, value)
+    stats.updated_at = datetime.utcnow()
+    db.add(stats)
+    db.commit()
+    return stats
+
+
+def get_stats(db: Session) -> DashboardStats:
+    """The stored counters (single-row read)"""
+    return ensure_stats(db)
+
+
+def check(db: Session) -> Dict[str, Any]:
+    """Stored counters against a full scan"""
+    stats = db.get(DashboardStats, STATS_ID)
+    stored = {"total_reports": stats.total_reports, "high_risk_reports": stats.high_risk_reports} if stats else None
+    computed = compute_stats(db)
+    return {"consistent": stored == computed, "stored": stored, "computed": computed}
+
+
+def main(argv=None) -> int:
+    from gw_api.db import SessionLocal, init_db
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("backfill", help="rebuild the counters from all reports")
+    sub.add_parser("check", help="compare the counters with a full scan")
+    args = parser.parse_args(argv)
+
+    init_db()
+    db = SessionLocal()
+    try:
+        if args.command == "backfill":
+            stats = backfill(db)
+            print(f"Backfilled dashboard stats: {stats.total_reports} reports, {stats.high_risk_reports} high risk")
+            return 0
+        result = check(db)
+        print(json.dumps(result, indent=2))
+        return 0 if result["consistent"] else 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -10,13 +10,13 @@ import re
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import logging
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.schema import HumanMessage, SystemMessage
 from dotenv import load_dotenv
 
 from gw_api.models.city_rankings import SustainabilityData
 from .deep_research_engine import DeepSearchEngine, SearchResult
-from .deep_research_prompt_manager import prompt_manager
+from .deep_research_prompt_manager import get_prompt_manager
+from .llm import create_chat_model
 
 # Load environment variables
 load_dotenv()
@@ -33,9 +33,9 @@ class UnifiedESGAnalyzer:
         if not self.api_key:
             raise ValueError("Google API key required. Set GOOGLE_API_KEY environment variable.")
         
-        self.llm = ChatGoogleGenerativeAI(
+        self.llm = create_chat_model(
             model="gemini-2.5-flash",
-            google_api_key=self.api_key,
+            api_key=self.api_key,
             temperature=0.1
         )
         
@@ -92,7 +92,7 @@ class UnifiedESGAnalyzer:
             for i, src in enumerate(sources[:5])
         ])
         
-        system_prompt = prompt_manager.get_esg_analysis_prompt(language)
+        system_prompt = get_prompt_manager().get_esg_analysis_prompt(language)
         
         # Language mapping for human prompt
         language_instructions = {
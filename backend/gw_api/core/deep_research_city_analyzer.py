@@ -1,26 +1,25 @@
 """
 City-Based Company Analyzer for Deep Research
-Short timeouts + global RPM throttle + robust fallbacks
+Short timeouts + shared LLM governor + robust fallbacks
 (Handles both 429 rate limits and 400 API key errors gracefully)
 """
 
 import os
 import re
 import json
-import time
 import asyncio
 import logging
-from collections import deque
 from typing import List, Dict, Any, Optional, Tuple
 
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.schema import SystemMessage, HumanMessage
 
 from gw_api.models.city_rankings import SustainabilityData
 from .deep_research_engine import DeepSearchEngine, SearchResult
 from .deep_research_analyzer import UnifiedESGAnalyzer
-from .deep_research_prompt_manager import prompt_manager
+from .company_registry import get_company_registry
+from .deep_research_prompt_manager import get_prompt_manager
+from .llm import create_chat_model
 
 # -----------------------------------------------------------------------------
 # Setup
@@ -35,69 +34,6 @@ DISCOVERY_LLM_TIMEOUT_S = 25     # discovery model
 ANALYSIS_LLM_TIMEOUT_S = 45      # per-company analysis model
 BATCH_SIZE = int(os.getenv("CITY_ANALYSIS_BATCH_SIZE", "2"))
 COMPANY_SEARCH_QUERIES = 1       # keep calls minimal
-MAX_RPM = int(os.getenv("GEMINI_RPM", "8"))  # global RPM throttle
-
-# -----------------------------------------------------------------------------
-# Catalog fallback (ensures discovery never shows empty)
-# -----------------------------------------------------------------------------
-
-KNOWN_COMPANIES_BY_CITY: Dict[str, List[Dict[str, str]]] = {
-    "munich": [
-        {"name": "BMW AG (BMW Group)", "size": "Large", "industry": "Automotive", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "Allianz SE", "size": "Large", "industry": "Insurance, Asset Management", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "Siemens AG", "size": "Large", "industry": "Conglomerate (Electronics, Engineering, Automation)", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "Munich Re", "size": "Large", "industry": "Reinsurance", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "Infineon Technologies AG", "size": "Large", "industry": "Semiconductor Manufacturing", "importance": "Regional leader", "has_esg": "Likely"},
-    ],
-    "london": [
-        {"name": "HSBC Holdings", "size": "Large", "industry": "Banking & Financial Services", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "BP plc", "size": "Large", "industry": "Energy", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "Unilever plc", "size": "Large", "industry": "Consumer Goods", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "Barclays", "size": "Large", "industry": "Banking", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "Diageo plc", "size": "Large", "industry": "Beverages", "importance": "Regional leader", "has_esg": "Likely"},
-    ],
-    "san francisco": [
-        {"name": "Salesforce", "size": "Large", "industry": "Software (SaaS)", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "Uber", "size": "Large", "industry": "Mobility / Tech", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "DoorDash", "size": "Large", "industry": "Logistics / Delivery", "importance": "Regional leader", "has_esg": "Likely"},
-        {"name": "Visa Inc.", "size": "Large", "industry": "Payments", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "Airbnb", "size": "Large", "industry": "Travel / Tech", "importance": "Regional leader", "has_esg": "Likely"},
-    ],
-    "tokyo": [
-        {"name": "Sony Group Corporation", "size": "Large", "industry": "Electronics, Entertainment, Finance", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "Honda Motor Co., Ltd.", "size": "Large", "industry": "Automotive", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "Mitsubishi Corporation", "size": "Large", "industry": "Trading, Diversified", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "SoftBank Group Corp.", "size": "Large", "industry": "Telecommunications, Investment", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "Hitachi, Ltd.", "size": "Large", "industry": "IT, Power, Infrastructure", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "Canon Inc.", "size": "Large", "industry": "Imaging, Optical products", "importance": "Regional leader", "has_esg": "Likely"},
-        {"name": "Fast Retailing Co., Ltd. (Uniqlo)", "size": "Large", "industry": "Apparel Retail", "importance": "Regional leader", "has_esg": "Likely"},
-        {"name": "Rakuten Group, Inc.", "size": "Large", "industry": "E-commerce, Fintech, Telecom", "importance": "Regional leader", "has_esg": "Likely"},
-        {"name": "Nippon Telegraph and Telephone Corporation (NTT)", "size": "Large", "industry": "Telecommunications", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "Seven & i Holdings Co., Ltd.", "size": "Large", "industry": "Retail / Convenience Stores", "importance": "Regional leader", "has_esg": "Likely"},
-    ],
-    "copenhagen": [
-        {"name": "A.P. Møller – Mærsk A/S (Maersk)", "size": "Large", "industry": "Shipping & Logistics", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "Novo Nordisk", "size": "Large", "industry": "Pharmaceuticals", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "Danske Bank", "size": "Large", "industry": "Financial Services (Banking)", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "Carlsberg Group", "size": "Large", "industry": "Beverages (Brewing)", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "Ørsted", "size": "Large", "industry": "Renewable Energy", "importance": "Regional leader", "has_esg": "Likely"},
-        {"name": "DSV", "size": "Large", "industry": "Logistics & Transport", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "ISS A/S", "size": "Large", "industry": "Facility Services", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "Pandora", "size": "Large", "industry": "Jewelry Manufacturing & Retail", "importance": "Regional leader", "has_esg": "Likely"},
-        {"name": "Genmab", "size": "Large", "industry": "Biotechnology/Pharmaceuticals", "importance": "Regional leader", "has_esg": "Likely"},
-        {"name": "Novozymes", "size": "Large", "industry": "Industrial Biotechnology/Enzymes", "importance": "Regional leader", "has_esg": "Likely"},
-    ],
-}
-
-CITY_ALIASES: Dict[str, str] = {
-    "muenchen": "munich", "münchen": "munich", "munchen": "munich",
-    "tokio": "tokyo",
-    "københavn": "copenhagen", "kobenhavn": "copenhagen", "kopenhagen": "copenhagen",
-}
-
-def _normalize_city_key(city: str) -> str:
-    key = city.strip().lower()
-    return CITY_ALIASES.get(key, key)
 
 # -----------------------------------------------------------------------------
 # Helpers
@@ -146,28 +82,6 @@ def _placeholder(company_name: str, city: str, reason: str) -> SustainabilityDat
         last_updated=""
     )
 
-class _Throttle:
-    """Simple global RPM limiter for Gemini calls."""
-    def __init__(self, rpm: int):
-        self.rpm = rpm
-        self._times = deque()
-        self._lock = asyncio.Lock()
-
-    async def sleep_if_needed(self):
-        if self.rpm <= 0:
-            return
-        async with self._lock:
-            now = time.monotonic()
-            while self._times and now - self._times[0] > 60.0:
-                self._times.popleft()
-            if len(self._times) >= self.rpm:
-                to_sleep = 60.0 - (now - self._times[0]) + 0.05
-                await asyncio.sleep(max(0.05, to_sleep))
-                now = time.monotonic()
-                while self._times and now - self._times[0] > 60.0:
-                    self._times.popleft()
-            self._times.append(time.monotonic())
-
 # -----------------------------------------------------------------------------
 # Analyzer
 # -----------------------------------------------------------------------------
@@ -180,9 +94,9 @@ class CityCompanyAnalyzer:
         self.auth_ok = bool(self.api_key)
 
         # Gemini client with retries disabled (avoid long backoffs)
-        self.llm = ChatGoogleGenerativeAI(
+        self.llm = create_chat_model(
             model="gemini-2.5-flash",
-            google_api_key=self.api_key,
+            api_key=self.api_key,
             temperature=0.3,
             max_retries=0,
         )
@@ -196,7 +110,6 @@ class CityCompanyAnalyzer:
             pass
 
         self.discovered_companies: List[Dict[str, Any]] = []
-        self._throttle = _Throttle(MAX_RPM)
 
         if not self.auth_ok:
             logger.warning("GOOGLE_API_KEY is missing; LLM features will be disabled and fallbacks used.")
@@ -246,7 +159,6 @@ class CityCompanyAnalyzer:
     ) -> Tuple[List[Dict[str, Any]], str]:
 
         city_norm = city.strip()
-        city_key = _normalize_city_key(city_norm)
         queries = [
             f'largest companies headquartered in "{city_norm}"',
             f'Fortune 500 companies in "{city_norm}"',
@@ -258,7 +170,6 @@ class CityCompanyAnalyzer:
         if self.auth_ok:
             try:
                 async def _one(q: str):
-                    await self._throttle.sleep_if_needed()
                     return await asyncio.wait_for(self.deep_search.search_with_sources(q), timeout=SEARCH_TIMEOUT_S)
 
                 results = await asyncio.gather(*[_one(q) for q in queries], return_exceptions=True)
@@ -280,6 +191,7 @@ class CityCompanyAnalyzer:
                 else:
                     logger.warning("Deep search batch failed: %s", e)
 
+        prompt_manager = get_prompt_manager()
         system_prompt = (
             prompt_manager.get_city_discovery_prompt(language).format(city=city_norm, top_n=top_n)
             if hasattr(prompt_manager, "get_city_discovery_prompt")
@@ -306,7 +218,6 @@ class CityCompanyAnalyzer:
             )
             try:
                 async def _invoke():
-                    await self._throttle.sleep_if_needed()
                     return await self.llm.ainvoke([SystemMessage(content=system_prompt), HumanMessage(content=human_content)])
 
                 resp = await asyncio.wait_for(_invoke(), timeout=DISCOVERY_LLM_TIMEOUT_S)
@@ -324,10 +235,11 @@ class CityCompanyAnalyzer:
                 else:
                     logger.warning("Discovery LLM failed: %s", e)
 
-        # Catalog fallback (also used if auth disabled)
-        if not companies_data and city_key in KNOWN_COMPANIES_BY_CITY:
-            logger.info("Using catalog fallback for city=%s", city_norm)
-            companies_data = KNOWN_COMPANIES_BY_CITY[city_key][:top_n]
+        # Catalog fallback (also used if auth disabled): seed companies from the company registry
+        if not companies_data:
+            companies_data = get_company_registry().city_companies(city_norm, top_n)
+            if companies_data:
+                logger.info("Using catalog fallback for city=%s", city_norm)
 
         # Build discovery HTML
         ui = self._get_ui_texts(language)
@@ -423,7 +335,6 @@ class CityCompanyAnalyzer:
 
             async def _safe(company_name: str):
                 try:
-                    await self._throttle.sleep_if_needed()
                     return await asyncio.wait_for(
                         self.analyze_single_company_fast(company_name, city, language),
                         timeout=ANALYSIS_LLM_TIMEOUT_S,
@@ -460,7 +371,6 @@ class CityCompanyAnalyzer:
             queries = base_queries[:COMPANY_SEARCH_QUERIES]
 
             async def _one(q: str):
-                await self._throttle.sleep_if_needed()
                 return await asyncio.wait_for(self.deep_search.search_with_sources(q), timeout=SEARCH_TIMEOUT_S)
 
             results = await asyncio.gather(*[_one(q) for q in queries], return_exceptions=True)
@@ -480,7 +390,6 @@ class CityCompanyAnalyzer:
                 content = [f"General knowledge analysis for {company_name} in {city}. Provide transparent, evidence-seeking reasoning even if sources are limited."]
 
             async def _analyze():
-                await self._throttle.sleep_if_needed()
                 return await self.esg_analyzer.analyze_with_explainable_ai(
                     company_name, content[:2], sources[:2], location=city, language=language
                 )
@@ -496,7 +405,6 @@ class CityCompanyAnalyzer:
                 # one lightweight retry
                 await asyncio.sleep(1.0)
                 try:
-                    await self._throttle.sleep_if_needed()
                     return await asyncio.wait_for(_analyze(), timeout=ANALYSIS_LLM_TIMEOUT_S)
                 except Exception as e2:
                     if _looks_like_auth(e2):
@@ -3,21 +3,21 @@ Deep Research Engine for City-Based ESG Analysis
 Enhanced deep search with parallel processing support
 """
 
-import os
-import asyncio
 import re
-from typing import List, Dict, Any, Optional
+from typing import List
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import logging
 from dotenv import load_dotenv
 
-try:
-    from google import genai
-    from google.genai import types
-    GENAI_AVAILABLE = True
-except ImportError:
-    GENAI_AVAILABLE = False
+from gw_api.config import DEEP_SEARCH_MODEL
+from .llm import create_genai_client, genai_installed
+from .llm_governor import governor, estimate_tokens
+from .tracing import span
+
+# google.genai itself is imported when the first search is built
+GENAI_AVAILABLE = genai_installed()
+if not GENAI_AVAILABLE:
     print("Warning: google.genai not available. Deep search features will be limited.")
 
 # Configure logging
@@ -40,39 +40,46 @@ class SearchResult:
 class DeepSearchEngine:
     """Enhanced deep search with parallel processing support"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, model: str = DEEP_SEARCH_MODEL):
         self.api_key = api_key
-        self.client = genai.Client(api_key=self.api_key) if GENAI_AVAILABLE else None
+        self.model = model
+        self.client = create_genai_client(self.api_key)
         self.cache = {}
         self.cache_duration = timedelta(hours=24)
         self.last_request_time = 0
         self.min_request_interval = 1  # Reduced from 2 seconds
-        self.semaphore = asyncio.Semaphore(3)  # Allow 3 concurrent requests
     
     async def search_with_sources(self, query: str) -> SearchResult:
-        """Search with concurrency control"""
-        async with self.semaphore:  # Limit concurrent requests
-            # Check cache first
-            if query in self.cache:
-                cached_result, timestamp = self.cache[query]
-                if datetime.now() - timestamp < self.cache_duration:
-                    return cached_result
-            
-            # Perform search
-            result = await self._perform_search_with_sources(query)
-            
-            # Update cache
-            self.cache[query] = (result, datetime.now())
-            
-            return result
+        """Search with concurrency control (shared LLM governor)"""
+        # Check cache first
+        if query in self.cache:
+            cached_result, timestamp = self.cache[query]
+            if datetime.now() - timestamp < self.cache_duration:
+                return cached_result
+
+        # Perform search
+        with span("search", engine="gemini_grounded", query_chars=len(query)) as sp:
+            async with governor.aslot(self.model, estimate_tokens(query)):
+                result = await self._perform_search_with_sources(query)
+            sp.set(content_chars=len(result.content), urls=len(result.urls))
+
+        # Update cache
+        self.cache[query] = (result, datetime.now())
+
+        return result
     
     async def _perform_search_with_sources(self, query: str) -> SearchResult:
         """Perform search and extract source information"""
-        if not GENAI_AVAILABLE or not self.client:
+        if not self.client:
             return SearchResult(query=query, content="", timestamp=datetime.now())
         
         try:
-            google_search_tool = types.Tool(google_search=types.GoogleSearch())
+            if GENAI_AVAILABLE:
+                from google.genai import types
+
+                tools = [types.Tool(google_search=types.GoogleSearch())]
+            else:
+                tools = []
             
             # Enhanced prompt to extract sources
             enhanced_query = f"""
@@ -90,11 +97,11 @@ class DeepSearchEngine:
                 "top_k": 40,
                 "max_output_tokens": 8192,
                 "response_mime_type": "text/plain",
-                "tools": [google_search_tool]
+                "tools": tools
             }
             
             response = await self.client.aio.models.generate_content(
-                model="gemini-2.5-flash",
+                model=self.model,
                 contents=enhanced_query,
                 config=generation_config
             )
@@ -8,6 +8,8 @@ import os
 from typing import Dict, Any
 from pathlib import Path
 
+from gw_api.core.lazy import lazy_singleton
+
 class DeepResearchPromptManager:
     """Manages multilingual prompts for deep research functionality"""
     
@@ -61,5 +63,7 @@ class DeepResearchPromptManager:
         """Check if language is supported"""
         return language in self.supported_languages
 
-# Global instance
-prompt_manager = DeepResearchPromptManager()
+@lazy_singleton("prompts")
+def get_prompt_manager() -> DeepResearchPromptManager:
+    """Shared prompt manager; the YAML file is parsed on first use"""
+    return DeepResearchPromptManager()
@@ -3,23 +3,34 @@ from langchain.schema import Document
 from langchain_community.document_loaders import PyPDFLoader
 from gw_api.core.utils import is_esg_related
 from gw_api.core.vector_store import text_splitter
+from gw_api.core.profiling import stage
+from gw_api.core.page_ocr import ocr_textless_pdf_pages
 
 
 # Parse PDF and split into chunks
 async def process_pdf_document(file_path: str) -> List[Document]:
     """Process PDF document and return chunks"""
-    loader = PyPDFLoader(file_path)
-    documents = loader.load()
+    with stage("extraction"):
+        loader = PyPDFLoader(file_path)
+        documents = loader.load()
+    # Scanned / image-only pages have no text layer: OCR them into the page list
+    with stage("page_ocr"):
+        ocr_texts = await ocr_textless_pdf_pages(file_path, [doc.page_content for doc in documents])
+        for index, text in ocr_texts.items():
+            documents[index].page_content = text
+            documents[index].metadata["ocr"] = True
     # Filter ESG-related content   add to list
-    esg_documents = []
-    for doc in documents:
-        if is_esg_related(doc.page_content):
-            esg_documents.append(doc)
+    with stage("esg_filter"):
+        esg_documents = []
+        for doc in documents:
+            if is_esg_related(doc.page_content):
+                esg_documents.append(doc)
     # Check if empty
     if not esg_documents:
         esg_documents = documents  # Fallback to all documents
     # Split documents
-    chunks = text_splitter.split_documents(esg_documents)
+    with stage("chunking"):
+        chunks = text_splitter.split_documents(esg_documents)
     return chunks
 
 
@@ -33,14 +44,39 @@ async def process_ocr_text(ocr_text: str, metadata: dict = None) -> List[Documen
     document = Document(page_content=ocr_text, metadata=metadata)
 
     # Filter ESG-related content
-    esg_documents = []
-    if is_esg_related(document.page_content):
-        esg_documents.append(document)
+    with stage("esg_filter"):
+        esg_documents = []
+        if is_esg_related(document.page_content):
+            esg_documents.append(document)
 
     # Check if empty - fallback to all content if no ESG content found
     if not esg_documents:
         esg_documents = [document]
 
     # Split documents
-    chunks = text_splitter.split_documents(esg_documents)
+    with stage("chunking"):
+        chunks = text_splitter.split_documents(esg_documents)
+    return chunks
+
+
+# Process OCR text of a multi-page scan (one entry per page) and split into chunks
+async def process_ocr_pages(page_texts: List[str], metadata: dict = None) -> List[Document]:
+    """Process per-page OCR text and return chunks"""
+    documents = [
+        Document(page_content=text, metadata={**(metadata or {}), "page": i, "ocr": True})
+        for i, text in enumerate(page_texts)
+        if text.strip()
+    ]
+
+    # Filter ESG-related content
+    with stage("esg_filter"):
+        esg_documents = [doc for doc in documents if is_esg_related(doc.page_content)]
+
+    # Check if empty - fallback to all pages if no ESG content found
+    if not esg_documents:
+        esg_documents = documents
+
+    # Split documents
+    with stage("chunking"):
+        chunks = text_splitter.split_documents(esg_documents)
     return chunks
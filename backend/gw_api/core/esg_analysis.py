@@ -5,8 +5,8 @@ from gw_api.core.tools import (
     ESGMetricsCalculatorTool,
     WikirateValidationTool,
 )
-from gw_api.core.llm import llm
-from gw_api.config import VALID_COMPANIES
+from gw_api.core.llm import get_llm
+from gw_api.core.company_registry import get_company_registry
 from gw_api.models import ESGAnalysisState
 from langgraph.graph import StateGraph, END
 from langchain.schema import HumanMessage
@@ -14,10 +14,16 @@ from langchain_community.vectorstores import Chroma
 from langchain.agents import AgentExecutor
 from langchain.memory import ConversationBufferWindowMemory
 from langchain.tools import Tool
+import asyncio
 import re
 import json
+import logging
 from gw_api.core.utils import is_esg_related
 from gw_api.core.company import extract_company_info
+from gw_api.core.quotation_dedup import dedupe_quotations
+from gw_api.core.profiling import timed
+
+logger = logging.getLogger(__name__)
 
 # Global object cache
 document_stores: Dict[str, Chroma] = {}
@@ -50,7 +56,7 @@ def generate_initial_thoughts(state: ESGAnalysisState) -> ESGAnalysisState:
     """
 
     try:
-        response = llm.invoke([HumanMessage(content=prompt)])
+        response = get_llm().invoke([HumanMessage(content=prompt)])
         thoughts_text = response.content
 
         try:
@@ -95,7 +101,7 @@ def evaluate_and_select_thoughts(state: ESGAnalysisState) -> ESGAnalysisState:
     """
 
     try:
-        response = llm.invoke([HumanMessage(content=evaluation_prompt)])
+        response = get_llm().invoke([HumanMessage(content=evaluation_prompt)])
         evaluation_text = response.content
 
         # Try to extract selected thoughts
@@ -168,6 +174,7 @@ def extract_quotations_and_tools(state: ESGAnalysisState) -> ESGAnalysisState:
     - data_needed
     - verification_required (true/false)
     - verification_method
+    - page (source page number, null if unknown)
 
     Respond as a JSON list. Do not use markdown. Respond in {output_language}.
 
@@ -175,7 +182,7 @@ def extract_quotations_and_tools(state: ESGAnalysisState) -> ESGAnalysisState:
     """
 
     try:
-        response = llm.invoke([HumanMessage(content=quotation_extraction_prompt)])
+        response = get_llm().invoke([HumanMessage(content=quotation_extraction_prompt)])
         text = response.content.strip()
 
         text = (
@@ -204,6 +211,24 @@ def extract_quotations_and_tools(state: ESGAnalysisState) -> ESGAnalysisState:
         return state
 
 
+def collapse_duplicate_quotations(state: ESGAnalysisState) -> ESGAnalysisState:
+    """Merge near-duplicate quotations so each claim is planned and validated once"""
+    if state.get("error"):
+        return state
+
+    quotations = state.get("quotations", [])
+    if not isinstance(quotations, list) or not quotations:
+        state["quotation_clusters"] = []
+        return state
+
+    deduped, clusters = dedupe_quotations(quotations)
+    print(f"[DEDUP] Collapsed {len(quotations)} quotations into {len(deduped)}")
+
+    state["quotations"] = deduped
+    state["quotation_clusters"] = clusters
+    return state
+
+
 def determine_tools_for_each_quotation(state: ESGAnalysisState) -> ESGAnalysisState:
     if state.get("error"):
         return state
@@ -251,7 +276,7 @@ def determine_tools_for_each_quotation(state: ESGAnalysisState) -> ESGAnalysisSt
             """
 
             try:
-                response = llm.invoke([HumanMessage(content=prompt)])
+                response = get_llm().invoke([HumanMessage(content=prompt)])
                 tools = [
                     t.strip() for t in response.content.lower().split(",") if t.strip()
                 ]
@@ -265,7 +290,10 @@ def determine_tools_for_each_quotation(state: ESGAnalysisState) -> ESGAnalysisSt
 
     state["tool_plan"] = tool_decisions
 
-    print(f"[ FINAL TOOL PLAN SUMMARY]\n{json.dumps(tool_decisions, indent=2)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[ FINAL TOOL PLAN SUMMARY]\n%s", json.dumps(tool_decisions, indent=2))
+    else:
+        print(f"[ FINAL TOOL PLAN] {len(tool_decisions)} quotations planned")
     return state
 
 
@@ -274,7 +302,7 @@ def validate_each_quotation_independently(state: ESGAnalysisState) -> ESGAnalysi
         return state
 
     company_name = state.get("company_name", "")
-    lower_name = company_name.lower()
+    whitelisted = get_company_registry().is_whitelisted(company_name)
     tool_plan = state.get("tool_plan", [])
     validated = []
 
@@ -303,7 +331,7 @@ def validate_each_quotation_independently(state: ESGAnalysisState) -> ESGAnalysi
 
             full_result = news_tool._run(prompt)
 
-            if lower_name not in VALID_COMPANIES:
+            if not whitelisted:
                 full_result = f"[Warning] '{company_name}' not in whitelist. Forced news validation.\n\n{full_result}"
 
             news_results = full_result.strip().split("\n\n")
@@ -320,12 +348,16 @@ def validate_each_quotation_independently(state: ESGAnalysisState) -> ESGAnalysi
                     f"{i}. Claim: {q['quotation']}\nExplanation: {q['explanation']}\n\n"
                 )
 
-            full_result = wikirate_tool._run(prompt)
-
-            if lower_name not in VALID_COMPANIES:
-                full_result = f"[Warning] '{company_name}' not in whitelist. Forced Wikirate validation.\n\n{full_result}"
+            # One block per claim, in claim order; a single block (company not
+            # found, no metrics, error) applies to every claim
+            wiki_results = wikirate_tool._run(prompt).strip().split("\n\n")
+            if len(wiki_results) == 1:
+                wiki_results *= len(wiki_quotations)
 
-            wiki_results = full_result.strip().split("\n\n")
+            if not whitelisted:
+                wiki_results = [
+                    f"[Warning] '{company_name}' not in whitelist. Forced Wikirate validation.\n{r}" for r in wiki_results
+                ]
         except Exception as e:
             wiki_results = [f"[Error] {str(e)}"] * len(wiki_quotations)
 
@@ -379,6 +411,24 @@ def clean_markdown_stars(text: str) -> str:
     return re.sub(r"\*\*(.*?)\*\*", r"\1", text)
 
 
+def format_quotation_sources(clusters: List[Dict[str, Any]], quotations: List[Dict[str, Any]]) -> str:
+    """Every original quotation and page behind each collapsed quotation, for citing in the report"""
+    lines = []
+    for cluster in clusters or []:
+        sources = cluster.get("source_quotations", [])
+        pages = cluster.get("source_pages", [])
+        if len(sources) < 2 and not pages:
+            continue
+        kept = cluster.get("kept_index", 0)
+        quotation = quotations[kept].get("quotation", "") if kept < len(quotations) else ""
+        lines.append(f'- "{quotation}"')
+        if pages:
+            lines.append(f"  Pages: {', '.join(str(p) for p in pages)}")
+        for source in sources:
+            lines.append(f'  Source: "{source}"')
+    return "\n".join(lines)
+
+
 def synthesize_final_report(state: ESGAnalysisState) -> ESGAnalysisState:
     if state.get("error"):
         return state
@@ -387,6 +437,16 @@ def synthesize_final_report(state: ESGAnalysisState) -> ESGAnalysisState:
     validations = state.get("validations", [])
     metrics = state.get("metrics", "")
     lang = state.get("output_language", "en")
+    sources = format_quotation_sources(state.get("quotation_clusters", []), state.get("quotations", []))
+    sources_section = (
+        f"""
+    Quotation Sources (near-duplicate quotations were merged before validation; when presenting a quotation,
+    cite every source quotation and page listed for it):
+    {sources}
+    """
+        if sources
+        else ""
+    )
 
     prompt = f"""
     Create a comprehensive final ESG greenwashing assessment report that synthesizes all findings:
@@ -394,7 +454,7 @@ def synthesize_final_report(state: ESGAnalysisState) -> ESGAnalysisState:
     Document Analysis: {analysis}
     Validation Results: {json.dumps(validations, indent=2)}
     Metrics: {metrics}
-    
+    {sources_section}
     Structure:
     1. Executive Summary
     2. Key ESG Claims and Validation
@@ -425,7 +485,7 @@ def synthesize_final_report(state: ESGAnalysisState) -> ESGAnalysisState:
     """
 
     try:
-        response = llm.invoke([HumanMessage(content=prompt)])
+        response = get_llm().invoke([HumanMessage(content=prompt)])
         state["final_synthesis"] = response.content
         state["final_synthesis"] = clean_markdown_stars(state["final_synthesis"])
         return state
@@ -460,21 +520,27 @@ def debug_state_log(state: ESGAnalysisState) -> ESGAnalysisState:
 def create_esg_analysis_graph():
     workflow = StateGraph(ESGAnalysisState)
 
-    workflow.add_node("generate_thoughts", generate_initial_thoughts)
-    workflow.add_node("evaluate_thoughts", evaluate_and_select_thoughts)  # ✅ New
-    workflow.add_node("document_analysis", perform_document_analysis)
-    workflow.add_node("extract_quotations", extract_quotations_and_tools)
-    workflow.add_node("select_tools", determine_tools_for_each_quotation)
-    workflow.add_node("validate_quotations", validate_each_quotation_independently)
-    workflow.add_node("calculate_metrics", calculate_metrics)
-    workflow.add_node("final_synthesis", synthesize_final_report)
+    def add_node(name, fn):
+        # Every node reports its wall/CPU time as stage "node.<name>"
+        workflow.add_node(name, timed(f"node.{name}")(fn))
+
+    add_node("generate_thoughts", generate_initial_thoughts)
+    add_node("evaluate_thoughts", evaluate_and_select_thoughts)  # ✅ New
+    add_node("document_analysis", perform_document_analysis)
+    add_node("extract_quotations", extract_quotations_and_tools)
+    add_node("dedupe_quotations", collapse_duplicate_quotations)
+    add_node("select_tools", determine_tools_for_each_quotation)
+    add_node("validate_quotations", validate_each_quotation_independently)
+    add_node("calculate_metrics", calculate_metrics)
+    add_node("final_synthesis", synthesize_final_report)
 
     workflow.set_entry_point("generate_thoughts")
     workflow.add_edge("generate_thoughts", "evaluate_thoughts")  # ✅ Critical fix
     workflow.add_edge("evaluate_thoughts", "document_analysis")
     workflow.add_edge("document_analysis", "extract_quotations")
-    workflow.add_node("debug_log", debug_state_log)
-    workflow.add_edge("extract_quotations", "debug_log")
+    add_node("debug_log", debug_state_log)
+    workflow.add_edge("extract_quotations", "dedupe_quotations")
+    workflow.add_edge("dedupe_quotations", "debug_log")
     workflow.add_edge("debug_log", "select_tools")
     workflow.add_edge("select_tools", "validate_quotations")
     workflow.add_edge("validate_quotations", "calculate_metrics")
@@ -521,7 +587,7 @@ def create_esg_agent(
     from langchain.memory import ConversationSummaryMemory
 
     memory = ConversationSummaryMemory(
-        llm=llm, memory_key="chat_history", return_messages=True
+        llm=get_llm(), memory_key="chat_history", return_messages=True
     )
     memories[session_id] = memory
 
@@ -532,7 +598,7 @@ def create_esg_agent(
     print(f"[DEBUG] Initializing agent for session {session_id}")
     agent = initialize_agent(
         tools=tools,
-        llm=llm,
+        llm=get_llm(),
         agent=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
         memory=memory,
         verbose=True,
@@ -558,7 +624,8 @@ def create_esg_agent(
             "vector_store_path": f"data/vector_stores/{session_id}",
             "company_name": company_name,
         }
-        print(f"[DEBUG] Session data to save: {json.dumps(session_data, indent=2)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[DEBUG] Session data to save: %s", json.dumps(session_data, indent=2))
         save_result = save_session(session_id, session_data, db)
         print(f"[DEBUG] Session save result: {save_result}")
     except Exception as e:
@@ -616,7 +683,8 @@ async def comprehensive_esg_analysis(
     try:
         # Execute the workflow
         print("Executing LangGraph ESG analysis workflow...")
-        result = analysis_graph.invoke(initial_state)
+        # The graph nodes make blocking LLM calls: run them off the event loop
+        result = await asyncio.to_thread(analysis_graph.invoke, initial_state)
 
         # Extract results
         return {
@@ -635,6 +703,7 @@ async def comprehensive_esg_analysis(
             "metrics": result.get("metrics", ""),
             "final_synthesis": result.get("final_synthesis", ""),
             "tool_plan": result.get("tool_plan", []),
+            "quotation_clusters": result.get("quotation_clusters", []),
             "comprehensive_analysis": f"""
             Initial Thoughts: {result.get("initial_thoughts", [])}
             
@@ -666,22 +735,26 @@ async def fallback_agent_analysis(
     agent = create_esg_agent(session_id, vector_store, company_name)
     agent_executors[session_id] = agent
     wikirate_validation = ""
+    whitelisted = get_company_registry().is_whitelisted(company_name)
 
-    document_analysis = agent.run(
+    document_analysis = await asyncio.to_thread(
+        agent.run,
         f"Perform a detailed analysis of the ESG document. "
         f"Identify specific greenwashing indicators, vague language, "
         f"unsubstantiated claims, and missing evidence.\n\n"
         f"Please respond in {output_language}."
     )
 
-    if company_name.lower() in VALID_COMPANIES:
-        news_validation = agent.run(
+    if whitelisted:
+        news_validation = await asyncio.to_thread(
+            agent.run,
             f"Validate the ESG claims found in the document analysis against "
             f"recent news articles for {company_name}.\n\n"
             f"Please respond in {output_language}."
         )
     else:
-        news_validation = agent.run(
+        news_validation = await asyncio.to_thread(
+            agent.run,
             f"Validate the ESG claims found in the document analysis against "
             f"recent news articles for {company_name}.\n\n"
             f"Please respond in {output_language}."
@@ -691,25 +764,28 @@ async def fallback_agent_analysis(
             f"Proceeding with forced news validation.\n\n{news_validation}"
         )
 
-        wikirate_validation = agent.run(
+        wikirate_validation = await asyncio.to_thread(
+            agent.run,
             f"Use the Wikirate database to verify ESG metrics and claims for {company_name}. "
             f"Compare document data with verified Wikirate database entries.\n\n"
             f"Please respond in {output_language}."
         )
-    if company_name.lower() not in VALID_COMPANIES:
+    if not whitelisted:
         wikirate_validation = (
             f"[Warning] Company '{company_name}' is not in the whitelist. "
             f"Proceeding with forced Wikirate validation.\n\n{wikirate_validation}"
         )
 
-    metrics_calculation = agent.run(
+    metrics_calculation = await asyncio.to_thread(
+        agent.run,
         f"Calculate detailed greenwashing metrics based on the analysis: "
         f"Document Analysis: {document_analysis}\n"
         f"News Validation: {news_validation}\n\n"
         f"Please respond in {output_language}."
     )
 
-    final_synthesis = agent.run(
+    final_synthesis = await asyncio.to_thread(
+        agent.run,
         f"Create a comprehensive ESG greenwashing assessment report "
         f"synthesizing all findings from the analysis.\n\n"
         f"Please respond in {output_language}."
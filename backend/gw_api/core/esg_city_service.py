@@ -2,56 +2,28 @@
 import os, re, json, asyncio, logging
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
-import pandas as pd
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.schema import HumanMessage, SystemMessage
 
-# Optional deep search (google-genai). Safe degrade if missing.
-try:
-    from google import genai
-    from google.genai import types
-    GENAI_AVAILABLE = True
-except Exception:
-    GENAI_AVAILABLE = False
-    genai = None
-    types = None
+from gw_api.config import DEEP_SEARCH_MODEL
+from gw_api.core.company_registry import get_company_registry
+from gw_api.core.llm import create_chat_model, create_genai_client, genai_installed
+from gw_api.core.llm_governor import governor, estimate_tokens, llm_priority
+from gw_api.core.tracing import span, start_trace
+
+if TYPE_CHECKING:
+    import pandas as pd  # imported lazily at runtime (fast startup)
+
+# Optional deep search (google-genai). Safe degrade if missing; imported on first search.
+GENAI_AVAILABLE = genai_installed()
 
 load_dotenv()
 logger = logging.getLogger("esg-city")
 if not logger.handlers:
     logging.basicConfig(level=logging.INFO)
 
-# ---------- Seed fallback so the page always shows something ----------
-SEED_COMPANIES_BY_CITY: Dict[str, List[Dict[str, str]]] = {
-    "london": [
-        {"name": "AstraZeneca", "size": "Large", "industry": "Pharmaceuticals", "importance": "Major employer", "has_esg": "Likely"},
-        {"name": "GSK (GlaxoSmithKline)", "size": "Large", "industry": "Pharmaceuticals", "importance": "Sector leader", "has_esg": "Likely"},
-        {"name": "HSBC", "size": "Large", "industry": "Banking / Financial Services", "importance": "Global bank", "has_esg": "Likely"},
-        {"name": "Lloyds Banking Group", "size": "Large", "industry": "Banking", "importance": "Major bank", "has_esg": "Likely"},
-        {"name": "Barclays", "size": "Large", "industry": "Banking / Financial Services", "importance": "Major bank", "has_esg": "Likely"},
-        {"name": "Unilever", "size": "Large", "industry": "Consumer Goods", "importance": "Global FMCG", "has_esg": "Likely"},
-        {"name": "Vodafone Group", "size": "Large", "industry": "Telecommunications", "importance": "Global telecom", "has_esg": "Likely"},
-        {"name": "BP", "size": "Large", "industry": "Oil and Gas", "importance": "Energy major", "has_esg": "Likely"},
-        {"name": "Shell plc", "size": "Large", "industry": "Oil & Gas Producers", "importance": "Energy major", "has_esg": "Likely"},
-        {"name": "Rio Tinto", "size": "Large", "industry": "Metals and Mining", "importance": "Global miner", "has_esg": "Likely"},
-    ],
-    "berlin": [
-        {"name": "Deutsche Bahn", "size": "Large", "industry": "Transport", "importance": "National rail", "has_esg": "Likely"},
-        {"name": "Zalando", "size": "Large", "industry": "E-commerce", "importance": "European leader", "has_esg": "Likely"},
-        {"name": "Delivery Hero", "size": "Large", "industry": "Food Delivery", "importance": "Global platform", "has_esg": "Likely"},
-        {"name": "HelloFresh", "size": "Large", "industry": "Meal Kits", "importance": "Global platform", "has_esg": "Likely"},
-        {"name": "Siemens Energy", "size": "Large", "industry": "Energy Technology", "importance": "Industrial", "has_esg": "Likely"},
-        {"name": "Rocket Internet", "size": "Medium", "industry": "Tech/VC", "importance": "Venture builder", "has_esg": "Unknown"},
-        {"name": "Bayer Pharma (Berlin hub)", "size": "Large", "industry": "Pharma", "importance": "Major hub", "has_esg": "Likely"},
-        {"name": "BASF Services (Berlin)", "size": "Large", "industry": "Chemicals / Services", "importance": "Major hub", "has_esg": "Likely"},
-        {"name": "N26", "size": "Medium", "industry": "Fintech", "importance": "Challenger bank", "has_esg": "Unknown"},
-        {"name": "Scout24", "size": "Medium", "industry": "Online marketplaces", "importance": "Listed company", "has_esg": "Likely"},
-    ],
-}
-
 # ---------------------- Data classes ----------------------
 @dataclass
 class SearchResult:
@@ -116,29 +88,31 @@ def extract_json(text: str) -> Dict[str, Any]:
 # --- Deep Search (safe + SDK-correct) ---------------------------------
 
 class DeepSearchEngine:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, model: str = DEEP_SEARCH_MODEL):
         self.api_key = api_key
+        self.model = model
         # allow disabling with env if key/account doesn't have Search tool
         self.disabled = os.getenv("DISABLE_DEEP_SEARCH", "0") == "1"
-        self.client = genai.Client(api_key=self.api_key) if (GENAI_AVAILABLE and not self.disabled) else None
+        self.client = create_genai_client(self.api_key) if not self.disabled else None
         self.cache: Dict[str, Tuple[SearchResult, datetime]] = {}
         self.cache_duration = timedelta(hours=24)
-        self.semaphore = asyncio.Semaphore(3)
 
     async def search_with_sources(self, query: str) -> SearchResult:
-        # Cache + concurrency guard
-        async with self.semaphore:
-            try:
-                if query in self.cache:
-                    cached, ts = self.cache[query]
-                    if datetime.now() - ts < self.cache_duration:
-                        return cached
-                res = await self._perform_search_with_sources(query)
-                self.cache[query] = (res, datetime.now())
-                return res
-            except Exception:
-                # absolutely never propagate errors to the API layer
-                return SearchResult(query=query, content="", timestamp=datetime.now())
+        # Cache + shared governor (concurrency/RPM across the whole process)
+        try:
+            if query in self.cache:
+                cached, ts = self.cache[query]
+                if datetime.now() - ts < self.cache_duration:
+                    return cached
+            with span("search", engine="gemini_grounded", query_chars=len(query)) as sp:
+                async with governor.aslot(self.model, estimate_tokens(query)):
+                    res = await self._perform_search_with_sources(query)
+                sp.set(content_chars=len(res.content), urls=len(res.urls))
+            self.cache[query] = (res, datetime.now())
+            return res
+        except Exception:
+            # absolutely never propagate errors to the API layer
+            return SearchResult(query=query, content="", timestamp=datetime.now())
 
     async def _perform_search_with_sources(self, query: str) -> SearchResult:
         """
@@ -146,7 +120,7 @@ class DeepSearchEngine:
         - contents must be a list of Content or strings
         - generation_config goes in 'generation_config'
         """
-        if not GENAI_AVAILABLE or not self.client:
+        if not self.client:
             return SearchResult(query=query, content="", timestamp=datetime.now())
 
         try:
@@ -158,28 +132,36 @@ class DeepSearchEngine:
                 "3) 3–5 key quotes/snippets\n"
             )
 
-            # Some accounts don’t have the Google Search tool; keep it optional.
-            tools = []
-            try:
-                tools = [types.Tool(google_search=types.GoogleSearch())]
-            except Exception:
-                tools = []
+            if not GENAI_AVAILABLE:
+                # Offline stand-in client (PROVIDER_MODE=fake) takes the plain prompt
+                response = await self.client.aio.models.generate_content(
+                    model=self.model, contents=prompt
+                )
+            else:
+                from google.genai import types
 
-            # Build a proper Content list payload
-            contents = [types.Content(role="user", parts=[types.Part.from_text(prompt)])]
-
-            response = await self.client.aio.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=contents,  # <-- list of Content, never empty
-                generation_config=types.GenerateContentConfig(
-                    temperature=0.7,
-                    top_p=0.95,
-                    top_k=40,
-                    max_output_tokens=8192,
-                    response_mime_type="text/plain",
-                    tools=tools or None,  # only pass if available
-                ),
-            )
+                # Some accounts don’t have the Google Search tool; keep it optional.
+                tools = []
+                try:
+                    tools = [types.Tool(google_search=types.GoogleSearch())]
+                except Exception:
+                    tools = []
+
+                # Build a proper Content list payload
+                contents = [types.Content(role="user", parts=[types.Part.from_text(prompt)])]
+
+                response = await self.client.aio.models.generate_content(
+                    model=self.model,
+                    contents=contents,  # <-- list of Content, never empty
+                    generation_config=types.GenerateContentConfig(
+                        temperature=0.7,
+                        top_p=0.95,
+                        top_k=40,
+                        max_output_tokens=8192,
+                        response_mime_type="text/plain",
+                        tools=tools or None,  # only pass if available
+                    ),
+                )
 
             text = getattr(response, "text", "") or ""
             # extract URLs/snippets defensively
@@ -206,8 +188,8 @@ class UnifiedESGAnalyzer:
         if not self.api_key:
             # Don’t crash the API; log and continue with zeros so UI still works.
             logger.error("GOOGLE_API_KEY not found – analysis will use fallbacks only.")
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash", google_api_key=self.api_key, temperature=0.1
+        self.llm = create_chat_model(
+            model="gemini-2.5-flash", api_key=self.api_key, temperature=0.1
         )
         self.deep_search = DeepSearchEngine(self.api_key or "")
 
@@ -308,8 +290,8 @@ class UnifiedESGAnalyzer:
 class CityCompanyAnalyzer:
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY") or ""
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash", google_api_key=self.api_key, temperature=0.3
+        self.llm = create_chat_model(
+            model="gemini-2.5-flash", api_key=self.api_key, temperature=0.3
         )
         self.deep_search = DeepSearchEngine(self.api_key)
         self.esg_analyzer = UnifiedESGAnalyzer(self.api_key)
@@ -350,7 +332,7 @@ class CityCompanyAnalyzer:
 
         # Fallback to seeds if nothing found
         if not companies:
-            seed = SEED_COMPANIES_BY_CITY.get(city_norm.lower(), [])
+            seed = get_company_registry().city_companies(city_norm, top_n)
             if seed:
                 logger.info(f"Using seed list for city '{city_norm}' (fallback).")
                 companies = seed[:top_n]
@@ -403,7 +385,9 @@ class ResultFormatter:
         return html
 
     @staticmethod
-    def create_comparison_dataframe(companies: List[SustainabilityData]) -> pd.DataFrame:
+    def create_comparison_dataframe(companies: List[SustainabilityData]) -> "pd.DataFrame":
+        import pandas as pd
+
         rows = []
         for i, c in enumerate(companies, 1):
             rows.append({
@@ -422,6 +406,11 @@ class ResultFormatter:
 
 # ---------------------- Orchestration used by API ----------------------
 async def analyze_city_to_payload(city: str, top_n: int = 10) -> Dict[str, Any]:
+    with llm_priority("batch"), start_trace("job.city_analysis", city=city, top_n=top_n):
+        return await _analyze_city_to_payload(city, top_n)
+
+
+async def _analyze_city_to_payload(city: str, top_n: int) -> Dict[str, Any]:
     analyzer = CityCompanyAnalyzer()
     comps, discovery_html = await analyzer.find_companies_in_city_fast(city, top_n)
 
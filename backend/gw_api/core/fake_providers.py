@@ -0,0 +1,466 @@
+"""
+Deterministic offline providers
+Local stand-ins for the Gemini chat models, the embedding model, the google-genai
+search client and the BBC news scraper. Enabled with PROVIDER_MODE=fake so the
+pipeline can be benchmarked and load-tested without keys or network access.
+
+Tuning (env):
+    FAKE_PROVIDER_LATENCY_MS   base latency per call (default 0)
+    FAKE_PROVIDER_JITTER_MS    extra uniform random latency (default 0)
+    FAKE_PROVIDER_ERROR_RATE   probability of an injected 429-style error (default 0)
+    FAKE_PROVIDER_SEED         seed for jitter/error injection (default 0)
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+@dataclass
+class FakeProviderSettings:
+    latency_ms: float = float(os.getenv("FAKE_PROVIDER_LATENCY_MS", "0"))
+    jitter_ms: float = float(os.getenv("FAKE_PROVIDER_JITTER_MS", "0"))
+    error_rate: float = float(os.getenv("FAKE_PROVIDER_ERROR_RATE", "0"))
+    seed: int = int(os.getenv("FAKE_PROVIDER_SEED", "0"))
+
+
+settings = FakeProviderSettings()
+_rng = random.Random(settings.seed)
+_rng_lock = threading.Lock()
+
+
+class FakeProviderError(Exception):
+    """Injected failure; message mimics a Gemini quota error so retry paths trigger"""
+
+
+def _next_delay_and_error() -> tuple:
+    with _rng_lock:
+        jitter = _rng.uniform(0, settings.jitter_ms) if settings.jitter_ms else 0.0
+        fail = settings.error_rate > 0 and _rng.random() < settings.error_rate
+    return (settings.latency_ms + jitter) / 1000.0, fail
+
+
+def _simulate_call() -> None:
+    delay, fail = _next_delay_and_error()
+    if delay:
+        time.sleep(delay)
+    if fail:
+        raise FakeProviderError("429 RESOURCE_EXHAUSTED (injected by fake provider)")
+
+
+async def _asimulate_call() -> None:
+    delay, fail = _next_delay_and_error()
+    if delay:
+        await asyncio.sleep(delay)
+    if fail:
+        raise FakeProviderError("429 RESOURCE_EXHAUSTED (injected by fake provider)")
+
+
+def _stable_int(text: str) -> int:
+    return int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+
+
+# ---------------------------------------------------------------------------
+# Chat model
+# ---------------------------------------------------------------------------
+
+GREENWASHING_TYPES = [
+    "Vague or unsubstantiated claims",
+    "Lack of specific metrics or targets",
+    "Misleading terminology",
+    "Cherry-picked data",
+    "Absence of third-party verification",
+]
+
+_SENTENCE = re.compile(r"[^.!?\n]{40,400}[.!?]")
+_ESG_WORDS = (
+    "emission", "carbon", "climate", "renewable", "sustainab", "net zero",
+    "recycl", "diversity", "governance", "energy", "water", "waste", "esg",
+)
+_COMPANY = re.compile(
+    r"\b([A-Z][\w&.-]+(?:\s+[A-Z][\w&.-]+){0,3}\s+(?:plc|PLC|AG|SE|Inc\.?|Ltd\.?|Group|Corporation|Corp\.?|S\.A\.|N\.V\.))"
+)
+
+
+def _section(prompt: str, start: str, end: Optional[str] = None) -> str:
+    idx = prompt.find(start)
+    if idx < 0:
+        return ""
+    text = prompt[idx + len(start):]
+    if end:
+        stop = text.find(end)
+        if stop >= 0:
+            text = text[:stop]
+    return text
+
+
+def _esg_sentences(text: str, limit: int) -> List[str]:
+    sentences = [s.strip() for s in _SENTENCE.findall(text)]
+    scored = [s for s in sentences if any(w in s.lower() for w in _ESG_WORDS)]
+    return (scored or sentences)[:limit]
+
+
+def _score_for(text: str, low: int = 2, high: int = 8) -> int:
+    return low + _stable_int(text) % (high - low + 1)
+
+
+def _evidence(quotation: str) -> Dict[str, Any]:
+    has_number = bool(re.search(r"\d", quotation))
+    return {
+        "quotation": quotation,
+        "explanation": (
+            "The claim quotes a figure without baseline or scope."
+            if has_number
+            else "The claim is aspirational and not backed by measurable targets."
+        ),
+        "greenwashing_likelihood_score": _score_for(quotation),
+        "verification_required": has_number,
+        "verification_method": "Compare the figure with reported ESG data and recent news." if has_number else "",
+        "data_needed": "Historical emissions and third-party assured ESG metrics." if has_number else "",
+    }
+
+
+def _claims(prompt: str) -> List[Tuple[str, str]]:
+    """(number, claim text) for each "N. Claim: ..." line"""
+    return re.findall(r"^\s*(\d+)\.\s*Claim:\s*(.+)$", prompt, flags=re.M)
+
+
+def _status_blocks(prompt: str, source: str) -> str:
+    blocks = []
+    statuses = ["Supported", "Contradicted", "Indicated", "Not mentioned"]
+    for number, claim in _claims(prompt) or [("1", "claim")]:
+        status = statuses[_stable_int(claim + source) % len(statuses)]
+        blocks.append(
+            f"Claim {number}:\n"
+            f"1. **Status**: {status}\n"
+            f"**Reasoning**: The {source} data {'addresses' if status != 'Not mentioned' else 'does not address'} this claim.\n"
+            f"**news_quotation**: N/A"
+        )
+    return "\n\n".join(blocks)
+
+
+def _metrics_json(prompt: str) -> str:
+    data = {name: {"score": _score_for(prompt + name, 1, 9)} for name in GREENWASHING_TYPES}
+    overall = round(sum(v["score"] for v in data.values()) / len(data), 1)
+    data["overall_greenwashing_score"] = {"score": overall}
+    return json.dumps(data, indent=2)
+
+
+def _report(prompt: str) -> str:
+    score = _score_for(prompt, 2, 8)
+    return (
+        "1. Executive Summary\n"
+        f"The overall greenwashing score is {score}/10 (offline provider output).\n\n"
+        "2. Key Findings and Evidence from Document Analysis\n"
+        "Claims were reviewed against document evidence and external validation.\n\n"
+        "3. Greenwashing Types, Likelihood, and Overall Score\n"
+        f"Overall score: {score}/10.\n\n"
+        "4. Specific Recommendations for Stakeholders\n"
+        "Request assured, baseline-anchored metrics.\n\n"
+        "5. Risk Assessment and Concerns\n"
+        "Unverified forward-looking targets remain the main risk."
+    )
+
+
+def _sustainability_json(prompt: str) -> str:
+    company = (re.search(r"Company:\s*(.+)", prompt) or [None, "Unknown"])[1].strip()
+    location = (re.search(r"Location:\s*(.+)", prompt) or [None, "Not specified"])[1].strip()
+    e, s, g = (_score_for(company + k, 40, 85) for k in ("e", "s", "g"))
+    overall = round((e + s + g) / 3)
+    explanation = {
+        "score_rationale": f"Offline score for {company}.",
+        "confidence_level": "Low - offline provider",
+    }
+    return json.dumps(
+        {
+            "sustainability_score": overall,
+            "environmental_score": e,
+            "social_score": s,
+            "governance_score": g,
+            "esg_rating": "A" if overall >= 75 else "B" if overall >= 60 else "C",
+            "industry": "Unknown",
+            "location": location,
+            "key_strengths": [f"{company} publishes an annual sustainability report"],
+            "key_risks": ["Limited third-party assurance"],
+            "summary": f"{company} shows average ESG disclosure (offline provider).",
+            "recommendations": ["Publish assured scope 3 data"],
+            "scoring_explanations": {
+                "overall_reasoning": "Deterministic offline score.",
+                "environmental_explanation": explanation,
+                "social_explanation": explanation,
+                "governance_explanation": explanation,
+            },
+            "data_quality": {
+                "information_completeness": "Adequate",
+                "source_reliability": "Medium",
+                "data_freshness": "Recent",
+                "confidence_score": 50,
+            },
+        }
+    )
+
+
+def _companies_json(prompt: str) -> str:
+    city = (re.search(r"(?:from|in)\s+\"?([A-Z][\w\s-]+?)\"?[.\n]", prompt) or [None, "City"])[1].strip()
+    top_n = int((re.search(r"(?:up to|max|at most)\s+(\d+)", prompt) or [None, "5"])[1])
+    industries = ["Banking", "Insurance", "Automotive", "Energy", "Retail", "Pharmaceuticals"]
+    companies = [
+        {
+            "name": f"{city} {industries[i % len(industries)]} Holdings {i + 1}",
+            "size": "Large" if i < 3 else "Medium",
+            "industry": industries[i % len(industries)],
+            "importance": "Major employer",
+            "has_esg": "Likely",
+        }
+        for i in range(min(top_n, 10))
+    ]
+    return json.dumps({"companies": companies})
+
+
+def _agent_answer(prompt: str) -> str:
+    answer = "Offline analysis: the report contains forward-looking ESG claims that need external verification."
+    return "```json\n" + json.dumps({"action": "Final Answer", "action_input": answer}) + "\n```"
+
+
+def fake_completion(prompt: str) -> str:
+    """Return a schema-valid response for each prompt family used by the pipeline"""
+    p = prompt
+    if "RESPONSE FORMAT INSTRUCTIONS" in p or '"action_input"' in p:
+        return _agent_answer(p)
+    if "Progressively summarize" in p:
+        return "The user asked about the ESG report; the assistant summarised greenwashing risks."
+    if "Generate 4 different analytical approaches" in p:
+        return json.dumps([
+            "Quantitative: check every emissions and energy figure for baselines and scope.",
+            "Qualitative: flag vague terms such as 'green', 'eco-friendly' and 'carbon neutral'.",
+            "Comparative: compare targets against sector benchmarks and open ESG data.",
+            "Temporal: compare past commitments with reported achievements.",
+        ])
+    if "Evaluate the following analytical approaches" in p:
+        return json.dumps([
+            "Quantitative: check every emissions and energy figure for baselines and scope.",
+            "Qualitative: flag vague terms such as 'green', 'eco-friendly' and 'carbon neutral'.",
+            "Temporal: compare past commitments with reported achievements.",
+        ])
+    if "potential evidence of greenwashing" in p:
+        content = _section(p, "Content:", "Thought:")
+        return json.dumps([_evidence(s) for s in _esg_sentences(content, 3)])
+    if "extract individual claims (quotations)" in p:
+        quotes = re.findall(r'"quotation":\s*"((?:[^"\\]|\\.)*)"', p)
+        unique = list(dict.fromkeys(q for q in quotes if q))
+        return json.dumps([_evidence(json.loads(f'"{q}"')) for q in unique])
+    if "You are an ESG validation planner" in p:
+        options = ["news_validation", "wikirate_validation", "news_validation, wikirate_validation"]
+        return options[_stable_int(p) % len(options)]
+    if "Wikirate Database Data" in p:
+        return _status_blocks(p, "Wikirate")
+    if "News Articles:" in p:
+        return _status_blocks(p, "news")
+    if "types of greenwashing present in this report" in p:
+        return _metrics_json(p)
+    if "final ESG greenwashing assessment report" in p:
+        return _report(p)
+    if "Extract the company name from this context" in p:
+        match = _COMPANY.search(_section(p, "context:", "Return only"))
+        return match.group(1) if match else "Example Holdings plc"
+    if "Extract company information" in p:
+        return "The company reports on climate, workforce and governance topics."
+    m = re.search(r"Translate the following ESG analysis report into (\w+)", p)
+    if m:
+        return f"[{m.group(1)}] " + _section(p, ":\n\n")
+    m = re.search(r'You are screening news articles for an ESG validation of company "([^"]+)"', p)
+    if m:
+        head = m.group(1).split()[0].lower()
+        articles = re.findall(r"\[article (\d+)\]\n(.*?)(?=\n\s*\[article \d+\]|\n\s*Return only)", p, re.DOTALL)
+        return json.dumps([
+            {"id": int(i), "about_company": head in a.lower(), "esg": any(w in a.lower() for w in _ESG_WORDS)}
+            for i, a in articles
+        ])
+    if "related to ESG (Environmental, Social, and Governance)" in p:
+        article = _section(p, "Article content:").lower()
+        return "YES" if any(w in article for w in _ESG_WORDS) else "NO"
+    m = re.search(r'directly related to company "([^"]+)"', p)
+    if m:
+        article = _section(p, "Article content:").lower()
+        return "YES" if m.group(1).split()[0].lower() in article else "NO"
+    if "CONTENT TO ANALYZE" in p:
+        return _sustainability_json(p)
+    if '"companies"' in p:
+        return _companies_json(p)
+    return "OK"
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model returning canned, prompt-aware responses"""
+
+    model: str = "fake-gemini"
+    temperature: float = 0.0
+    max_retries: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-gemini"
+
+    def _result(self, messages: List[BaseMessage]) -> ChatResult:
+        prompt = "\n".join(str(m.content) for m in messages)
+        text = fake_completion(prompt)
+        usage = {
+            "input_tokens": len(prompt) // 4 + 1,
+            "output_tokens": len(text) // 4 + 1,
+        }
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))]
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        _simulate_call()
+        return self._result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await _asimulate_call()
+        return self._result(messages)
+
+
+# ---------------------------------------------------------------------------
+# Embeddings
+# ---------------------------------------------------------------------------
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+class FakeEmbeddings(Embeddings):
+    """Feature-hashed bag of words: deterministic and similarity-preserving"""
+
+    def __init__(self, model: str = "fake-embedding", size: int = 256):
+        self.model = model
+        self.size = size
+
+    def _embed(self, text: str) -> List[float]:
+        vec = [0.0] * self.size
+        for token in _TOKEN.findall(text.lower()):
+            h = _stable_int(token)
+            vec[h % self.size] += 1.0 if (h >> 32) & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+        return [v / norm for v in vec]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        _simulate_call()
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        _simulate_call()
+        return self._embed(text)
+
+
+# ---------------------------------------------------------------------------
+# google-genai search client
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class _FakeGenerateResponse:
+    text: str
+
+
+def _contents_text(contents: Any) -> str:
+    """Plain text from a str, or a list of strings / google.genai Content objects"""
+    if isinstance(contents, str):
+        return contents
+    parts = []
+    for item in contents or []:
+        if isinstance(item, str):
+            parts.append(item)
+        else:
+            parts.extend(getattr(p, "text", "") or "" for p in getattr(item, "parts", []) or [])
+    return "\n".join(parts)
+
+
+class _FakeModels:
+    async def generate_content(self, model: str = "", contents: Any = None, **kwargs) -> _FakeGenerateResponse:
+        await _asimulate_call()
+        query = _contents_text(contents)
+        m = re.search(r"Search for:\s*(.+)", query)
+        topic = (m.group(1) if m else query).strip()[:120]
+        slug = re.sub(r"[^a-z0-9]+", "-", topic.lower()).strip("-")[:60] or "result"
+        text = (
+            f"Search results for {topic}. "
+            f"The company published a sustainability report describing emission reduction targets and renewable energy use. "
+            f"Independent coverage notes progress on governance disclosures and workforce diversity. "
+            f"Sources: https://example.org/esg/{slug} https://news.example.com/{slug}-report "
+            f"Key quote: \"We are committed to reaching net zero across our operations.\""
+        )
+        return _FakeGenerateResponse(text=text)
+
+
+class _FakeAio:
+    def __init__(self):
+        self.models = _FakeModels()
+
+
+class FakeGenAIClient:
+    """Mimics google.genai.Client for the calls made by DeepSearchEngine"""
+
+    def __init__(self, api_key: str = ""):
+        self.api_key = api_key
+        self.aio = _FakeAio()
+
+
+# ---------------------------------------------------------------------------
+# News corpus
+# ---------------------------------------------------------------------------
+
+NEWS_CORPUS = [
+    ("{company} sets new net zero target for 2040",
+     "{company} said it would cut scope 1 and 2 emissions by 50% by 2030 and reach net zero by 2040. "
+     "Campaigners questioned whether the climate plan covers scope 3 emissions from its supply chain."),
+    ("{company} faces criticism over green claims",
+     "Regulators are reviewing advertising by {company} that described products as carbon neutral. "
+     "The sustainability claims rely on offsets rather than emission reductions."),
+    ("{company} reports record quarterly profit",
+     "{company} reported higher revenue driven by strong demand. Shares rose 3% in early trading."),
+    ("{company} invests in renewable energy projects",
+     "{company} signed power purchase agreements for wind and solar capacity, saying 80% of its electricity "
+     "now comes from renewable sources."),
+    ("Local football club wins cup final",
+     "The club celebrated its first trophy in a decade after a dramatic penalty shoot-out."),
+]
+
+
+def fake_news_search(name: str, directory: str = "downloads") -> Dict[str, str]:
+    """Write canned BBC-style articles for `name` and return title -> local path"""
+    os.makedirs(directory, exist_ok=True)
+    _simulate_call()
+    result = {}
+    published = datetime(2025, 1, 1)
+    for i, (title_tpl, body_tpl) in enumerate(NEWS_CORPUS):
+        title = title_tpl.format(company=name)
+        body = body_tpl.format(company=name)
+        digest = hashlib.md5(title.encode("utf-8")).hexdigest()[:8]
+        path = os.path.join(directory, f"fake_{digest}.html")
+        if not os.path.exists(path):
+            date = (published - timedelta(days=30 * i)).strftime("%d %B %Y")
+            html = (
+                f"<html><head><title>{title} - BBC News</title></head><body>"
+                f"<nav>Home News Sport Business</nav><article><h1>{title}</h1>"
+                f"<time>{date}</time><p>{body}</p></article>"
+                f"<footer>Copyright BBC</footer></body></html>"
+            )
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(html)
+        result[title] = path
+    return result
@@ -0,0 +1,111 @@
+"""
+Lazy process-wide singletons
+Heavy objects (ClimateBERT, the Gemini chat / embedding clients, the deep
+research prompts, the company registry, the OCR engines) are built on first
+use instead of at import, so the API process starts serving `/health` before
+any model is loaded:
+
+    @lazy_singleton("climatebert")
+    def get_climatebert():
+        ...
+
+The first call builds the value under a lock; concurrent first callers wait for
+that one build and later calls return it without locking. A factory that
+raises is retried on the next call.
+
+Components are loaded ahead of traffic by `GET /warmup` (main.py) or, with
+WARMUP_ON_STARTUP=1, in a background thread once the API has started.
+
+    WARMUP_ON_STARTUP    1 warms every component in the background after startup (0)
+    WARMUP_COMPONENTS    comma-separated components warmed by default (all)
+"""
+
+import importlib
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "0") == "1"
+WARMUP_COMPONENTS = [c.strip() for c in os.getenv("WARMUP_COMPONENTS", "").split(",") if c.strip()]
+
+# component -> "module:accessor"; modules are only imported when the component is warmed
+COMPONENTS: Dict[str, str] = {
+    "companies": "gw_api.core.company_registry:get_company_registry",
+    "prompts": "gw_api.core.deep_research_prompt_manager:get_prompt_manager",
+    "llm": "gw_api.core.llm:get_llm",
+    "embeddings": "gw_api.core.vector_store:get_embedding_model",
+    "climatebert": "gw_api.core.llm:get_climatebert",
+    "ocr": "gw_api.core.ocr_pool:warm_up_ocr",
+}
+
+
+class LazySingleton(Generic[T]):
+    """Callable returning the value of `factory`, built once on the first call"""
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        self.name = name
+        self.factory = factory
+        self.__doc__ = factory.__doc__
+        self.load_seconds: Optional[float] = None
+        self._value: Optional[T] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def __call__(self) -> T:
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                start = time.perf_counter()
+                self._value = self.factory()
+                self.load_seconds = time.perf_counter() - start
+                self._loaded = True
+        return self._value
+
+    def reset(self) -> None:
+        """Forget the value; the next call builds it again"""
+        with self._lock:
+            self._value, self._loaded, self.load_seconds = None, False, None
+
+
+def lazy_singleton(name: str) -> Callable[[Callable[[], T]], LazySingleton[T]]:
+    def wrap(factory: Callable[[], T]) -> LazySingleton[T]:
+        return LazySingleton(name, factory)
+
+    return wrap
+
+
+def _accessor(component: str) -> Callable[[], Any]:
+    module, attr = COMPONENTS[component].split(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+def warm_up(components: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Load the given components (default WARMUP_COMPONENTS, else all); reports seconds or the error per component"""
+    names: List[str] = list(components or WARMUP_COMPONENTS or COMPONENTS)
+    unknown = [n for n in names if n not in COMPONENTS]
+    if unknown:
+        raise ValueError(f"unknown component(s) {', '.join(unknown)}; known: {', '.join(COMPONENTS)}")
+    report: Dict[str, Any] = {}
+    for name in names:
+        start = time.perf_counter()
+        try:
+            _accessor(name)()
+            report[name] = {"status": "ok", "seconds": round(time.perf_counter() - start, 3)}
+        except Exception as e:
+            report[name] = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+            print(f"[Warmup] {name} failed: {type(e).__name__}: {e}")
+    return report
+
+
+def warm_up_in_background(components: Optional[Sequence[str]] = None) -> threading.Thread:
+    thread = threading.Thread(target=warm_up, args=(components,), name="warmup", daemon=True)
+    thread.start()
+    return thread
@@ -1,12 +1,141 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
-from langchain.callbacks.manager import CallbackManager
-from transformers import AutoModelForSequenceClassification, AutoTokenizer
-from gw_api.config import GOOGLE_API_KEY
+import importlib.util
+from typing import Any, List, Optional, Tuple
+from langchain_core.outputs import ChatResult
+from gw_api.config import GOOGLE_API_KEY, USE_FAKE_PROVIDERS
+from gw_api.core.llm_governor import governor, estimate_tokens
+from gw_api.core.metrics import embedding_seconds, embedding_texts, llm_seconds, llm_tokens, observe
+from gw_api.core.profiling import current_stage
+from gw_api.core.fake_providers import FakeChatModel, FakeEmbeddings, FakeGenAIClient
+from gw_api.core.lazy import lazy_singleton
 from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
 
+
+def _bucket_name(model: str) -> str:
+    return (model or "gemini").removeprefix("models/")
+
+
+def _prompt_tokens(messages: List[Any]) -> int:
+    return estimate_tokens("".join(str(getattr(m, "content", m)) for m in messages))
+
+
+def _reported_tokens(result: ChatResult) -> Optional[int]:
+    try:
+        usage = result.generations[0].message.usage_metadata or {}
+        return usage.get("total_tokens") or None
+    except Exception:
+        return None
+
+
+def _annotate(sp, permit, result: ChatResult) -> None:
+    try:
+        output_chars = len(str(result.generations[0].message.content))
+    except Exception:
+        output_chars = 0
+    sp.set(
+        prompt_tokens_est=permit.tokens,
+        total_tokens=permit.actual_tokens or 0,
+        output_chars=output_chars,
+        governor_wait_ms=round(permit.waited_s * 1000, 1),
+    )
+
+
+class GovernedChatModelMixin:
+    """Routes every chat completion (sync and async) through the shared LLM governor"""
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        model, site = _bucket_name(self.model), current_stage()
+        with observe(llm_seconds, model=model, call_site=site) as sp:
+            with governor.slot(model, _prompt_tokens(messages)) as permit:
+                result = super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+                permit.actual_tokens = _reported_tokens(result)
+            _annotate(sp, permit, result)
+        llm_tokens.inc(permit.actual_tokens or permit.tokens, model=model, call_site=site)
+        return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        model, site = _bucket_name(self.model), current_stage()
+        with observe(llm_seconds, model=model, call_site=site) as sp:
+            async with governor.aslot(model, _prompt_tokens(messages)) as permit:
+                result = await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+                permit.actual_tokens = _reported_tokens(result)
+            _annotate(sp, permit, result)
+        llm_tokens.inc(permit.actual_tokens or permit.tokens, model=model, call_site=site)
+        return result
+
+
+class GovernedChatGoogleGenerativeAI(GovernedChatModelMixin, ChatGoogleGenerativeAI):
+    pass
+
+
+class GovernedFakeChatModel(GovernedChatModelMixin, FakeChatModel):
+    pass
+
+
+class GovernedEmbeddingsMixin:
+    """Embedding calls share the governor with chat traffic under their own model bucket"""
+
+    def embed_documents(self, texts: List[str], *args, **kwargs) -> List[List[float]]:
+        model = _bucket_name(self.model)
+        embedding_texts.inc(len(texts), model=model)
+        with observe(embedding_seconds, model=model, operation="documents") as sp:
+            sp.set(texts=len(texts), chars=sum(len(t) for t in texts))
+            with governor.slot(model, estimate_tokens("".join(texts))):
+                return super().embed_documents(texts, *args, **kwargs)
+
+    def embed_query(self, text: str, *args, **kwargs) -> List[float]:
+        model = _bucket_name(self.model)
+        embedding_texts.inc(1, model=model)
+        with observe(embedding_seconds, model=model, operation="query") as sp:
+            sp.set(texts=1, chars=len(text))
+            with governor.slot(model, estimate_tokens(text)):
+                return super().embed_query(text, *args, **kwargs)
+
+
+class GovernedGoogleGenerativeAIEmbeddings(GovernedEmbeddingsMixin, GoogleGenerativeAIEmbeddings):
+    pass
+
+
+class GovernedFakeEmbeddings(GovernedEmbeddingsMixin, FakeEmbeddings):
+    pass
+
+
+def create_chat_model(model: str = "gemini-2.0-flash", api_key: Optional[str] = None, **kwargs) -> ChatGoogleGenerativeAI:
+    """Build a Gemini chat model whose calls go through the process-wide governor"""
+    if USE_FAKE_PROVIDERS:
+        return GovernedFakeChatModel(model=model, temperature=kwargs.get("temperature") or 0.0)
+    return GovernedChatGoogleGenerativeAI(
+        model=model, google_api_key=api_key or GOOGLE_API_KEY, **kwargs
+    )
+
+
+def create_embedding_model(model: str = "models/gemini-embedding-exp-03-07", api_key: Optional[str] = None):
+    if USE_FAKE_PROVIDERS:
+        return GovernedFakeEmbeddings(model=model)
+    return GovernedGoogleGenerativeAIEmbeddings(model=model, google_api_key=api_key or GOOGLE_API_KEY)
+
+
+def genai_installed() -> bool:
+    """google-genai SDK present, checked without importing it (the import alone takes about a second)"""
+    try:
+        return importlib.util.find_spec("google.genai") is not None
+    except ImportError:
+        return False
+
+
+def create_genai_client(api_key: Optional[str] = None):
+    """google.genai client for grounded search; None when the SDK is unavailable"""
+    if USE_FAKE_PROVIDERS:
+        return FakeGenAIClient(api_key=api_key or "")
+    try:
+        from google import genai
+    except ImportError:
+        return None
+    return genai.Client(api_key=api_key or GOOGLE_API_KEY)
+
+
 # Initialize LangChain components with updated parameters
 # llm = AzureChatOpenAI(
 #     azure_endpoint=AZURE_OPENAI_ENDPOINT,
@@ -18,28 +147,33 @@ from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmb
 #     callback_manager=CallbackManager([StreamingStdOutCallbackHandler()])
 # )
 
-llm = ChatGoogleGenerativeAI(
-  model="gemini-2.0-flash",  # flash is faster
-  temperature=0,  # Controls text generation "randomness" - 0 means completely deterministic, 0.7 slightly creative, 1.0 more random
-  max_tokens=None,  # Maximum tokens to generate - None means use model default (can be omitted)
-  timeout=None,  # Maximum wait time per request - None means default wait, can set to 60s etc
-  max_retries=2,  # Max retries on error - recommended 2-3
-  google_api_key=GOOGLE_API_KEY
-  # other params...
-)
-
-
-# Initialize ClimateBERT
-climatebert_model_name = "climatebert/distilroberta-base-climate-f"
-try:
-    climatebert_tokenizer = AutoTokenizer.from_pretrained(
-        climatebert_model_name, local_files_only=True
-    )
-    climatebert_model = AutoModelForSequenceClassification.from_pretrained(
-        climatebert_model_name, local_files_only=True
+@lazy_singleton("llm")
+def get_llm() -> ChatGoogleGenerativeAI:
+    """Shared Gemini chat model used by the analysis pipeline"""
+    return create_chat_model(
+        model="gemini-2.0-flash",  # flash is faster
+        temperature=0,  # Controls text generation "randomness" - 0 means completely deterministic, 0.7 slightly creative, 1.0 more random
+        max_tokens=None,  # Maximum tokens to generate - None means use model default (can be omitted)
+        timeout=None,  # Maximum wait time per request - None means default wait, can set to 60s etc
+        max_retries=2,  # Max retries on error - recommended 2-3
+        # other params...
     )
-except Exception as e:
-    print(f"Warning: Could not load ClimateBERT model: {e}")
-    print("ESG classification will be disabled.")
-    climatebert_tokenizer = None
-    climatebert_model = None
+
+
+CLIMATEBERT_MODEL_NAME = "climatebert/distilroberta-base-climate-f"
+
+
+@lazy_singleton("climatebert")
+def get_climatebert() -> Tuple[Any, Any]:
+    """(tokenizer, model) of ClimateBERT, or (None, None) when it is not available locally"""
+    try:
+        # transformers pulls in torch: several seconds, so only on first use
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(CLIMATEBERT_MODEL_NAME, local_files_only=True)
+        model = AutoModelForSequenceClassification.from_pretrained(CLIMATEBERT_MODEL_NAME, local_files_only=True)
+        return tokenizer, model
+    except Exception as e:
+        print(f"Warning: Could not load ClimateBERT model: {e}")
+        print("ESG classification will be disabled.")
+        return None, None
@@ -0,0 +1,336 @@
+"""
+Process-wide Gemini rate governor
+One shared limiter for every LLM, embedding and search call: requests per minute,
+tokens per minute and max in-flight requests per model bucket, with priority
+classes so batch work (city rankings) cannot starve interactive uploads/chat.
+
+Each model gets GEMINI_RPM requests per minute (16, so city rankings keep the
+8 RPM their old private throttle allowed via GEMINI_BATCH_SHARE); TPM and
+in-flight limits are off unless set. A limit of 0 is not enforced, and fake
+providers run unthrottled. Sync callers give up after
+GEMINI_SYNC_ACQUIRE_TIMEOUT_S instead of blocking their thread for a whole RPM
+window; run sync LLM code off the event loop (asyncio.to_thread) so a wait never
+stalls the server. Queue depth, in-flight calls and wait times are exported as
+gw_llm_governor_* metrics.
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from gw_api.config import USE_FAKE_PROVIDERS
+from gw_api.core.metrics import llm_governor_in_flight, llm_governor_queued, llm_governor_wait_seconds
+
+# Lower value = served first. Non-interactive classes only get a share of the RPM
+# budget so there is always headroom left for uploads and chat.
+PRIORITIES: Dict[str, int] = {"interactive": 0, "batch": 1, "background": 2}
+PRIORITY_SHARE: Dict[str, float] = {
+    "interactive": 1.0,
+    "batch": float(os.getenv("GEMINI_BATCH_SHARE", "0.5")),
+    "background": float(os.getenv("GEMINI_BACKGROUND_SHARE", "0.25")),
+}
+
+# 0 = unlimited
+DEFAULT_RPM = int(os.getenv("GEMINI_RPM", "0" if USE_FAKE_PROVIDERS else "16"))
+DEFAULT_TPM = int(os.getenv("GEMINI_TPM", "0"))
+DEFAULT_MAX_IN_FLIGHT = int(os.getenv("GEMINI_MAX_IN_FLIGHT", "0"))
+SYNC_ACQUIRE_TIMEOUT_S = float(os.getenv("GEMINI_SYNC_ACQUIRE_TIMEOUT_S", "30"))
+
+WINDOW_S = 60.0
+
+_current_priority: ContextVar[str] = ContextVar("llm_priority", default="interactive")
+
+
+@contextmanager
+def llm_priority(priority: str):
+    """Run the enclosed calls (and tasks spawned from them) under a priority class"""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown LLM priority: {priority}")
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> str:
+    return _current_priority.get()
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap prompt-size estimate (~4 characters per token)"""
+    return len(text or "") // 4 + 1
+
+
+@dataclass
+class BucketLimits:
+    rpm: int = DEFAULT_RPM
+    tpm: int = DEFAULT_TPM
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT
+
+
+def _load_model_limits() -> Dict[str, BucketLimits]:
+    """Per-model overrides, e.g. GEMINI_MODEL_LIMITS='{"gemini-2.5-flash": {"rpm": 10}}'"""
+    raw = os.getenv("GEMINI_MODEL_LIMITS", "")
+    if not raw:
+        return {}
+    try:
+        return {model: BucketLimits(**cfg) for model, cfg in json.loads(raw).items()}
+    except Exception as e:
+        print(f"[GOVERNOR] Ignoring invalid GEMINI_MODEL_LIMITS: {e}")
+        return {}
+
+
+@dataclass
+class Permit:
+    model: str
+    priority: str
+    tokens: int
+    waited_s: float
+    actual_tokens: Optional[int] = None
+
+
+@dataclass
+class _Bucket:
+    limits: BucketLimits
+    requests: Deque[Tuple[float, str]] = field(default_factory=deque)
+    token_log: Deque[Tuple[float, int]] = field(default_factory=deque)
+    tokens_in_window: int = 0
+    in_flight: int = 0
+    waiters: List[Tuple[int, int]] = field(default_factory=list)  # heap of (priority, seq)
+    cancelled: set = field(default_factory=set)
+    # Async waiters are woken through their own loop; threads wait on the condition
+    async_waiters: Dict[Tuple[int, int], Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = field(default_factory=dict)
+
+    def prune(self, now: float) -> None:
+        while self.requests and now - self.requests[0][0] >= WINDOW_S:
+            self.requests.popleft()
+        while self.token_log and now - self.token_log[0][0] >= WINDOW_S:
+            self.tokens_in_window -= self.token_log.popleft()[1]
+
+    def head(self) -> Optional[Tuple[int, int]]:
+        while self.waiters and self.waiters[0] in self.cancelled:
+            self.cancelled.discard(heapq.heappop(self.waiters))
+        return self.waiters[0] if self.waiters else None
+
+    def wait_time(self, now: float, tokens: int, priority: str) -> Optional[float]:
+        """Seconds until a request of this size/priority fits; 0 if it fits now, None until a release"""
+        if 0 < self.limits.max_in_flight <= self.in_flight:
+            return None  # freed on release, not by time
+        waits = [0.0]
+        if self.limits.rpm > 0:
+            rpm_cap = max(1, int(self.limits.rpm * PRIORITY_SHARE.get(priority, 1.0)))
+            if len(self.requests) >= rpm_cap:
+                waits.append(WINDOW_S - (now - self.requests[-rpm_cap][0]))
+        if self.limits.tpm > 0 and self.token_log and self.tokens_in_window + tokens > self.limits.tpm:
+            # Wait until enough old entries have left the window
+            excess = self.tokens_in_window + tokens - self.limits.tpm
+            for ts, n in self.token_log:
+                excess -= n
+                if excess <= 0:
+                    waits.append(WINDOW_S - (now - ts))
+                    break
+        return max(waits)
+
+
+class LLMGovernor:
+    """Thread-safe limiter usable from sync code, threads and asyncio tasks"""
+
+    def __init__(self, model_limits: Optional[Dict[str, BucketLimits]] = None):
+        self._cond = threading.Condition()
+        self._model_limits = model_limits if model_limits is not None else _load_model_limits()
+        self._buckets: Dict[str, _Bucket] = {}
+        self._seq = itertools.count()
+        self._stats: Dict[Tuple[str, str], Dict[str, float]] = {}
+
+    # ---- internals (caller holds the lock) ----
+    def _bucket(self, model: str) -> _Bucket:
+        bucket = self._buckets.get(model)
+        if bucket is None:
+            bucket = _Bucket(self._model_limits.get(model, BucketLimits()))
+            self._buckets[model] = bucket
+        return bucket
+
+    def _stat(self, model: str, priority: str) -> Dict[str, float]:
+        key = (model, priority)
+        if key not in self._stats:
+            self._stats[key] = {
+                "admitted": 0,
+                "timeouts": 0,
+                "wait_seconds_total": 0.0,
+                "wait_seconds_max": 0.0,
+                "tokens_total": 0,
+            }
+        return self._stats[key]
+
+    def _enqueue(self, model: str, bucket: _Bucket, priority: str) -> Tuple[int, int]:
+        ticket = (PRIORITIES[priority], next(self._seq))
+        heapq.heappush(bucket.waiters, ticket)
+        llm_governor_queued.inc(model=model, priority=priority)
+        return ticket
+
+    def _notify(self, bucket: _Bucket) -> None:
+        self._cond.notify_all()
+        for loop, event in bucket.async_waiters.values():
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:  # loop already closed
+                pass
+
+    def _try_admit(
+        self, model: str, bucket: _Bucket, ticket: Tuple[int, int], tokens: int, priority: str
+    ) -> Optional[float]:
+        """0 once admitted, else seconds to wait (None: until another call is admitted or released)"""
+        now = time.monotonic()
+        bucket.prune(now)
+        if bucket.head() != ticket:
+            return None
+        wait = bucket.wait_time(now, tokens, priority)
+        if wait is None or wait > 0:
+            return wait
+        heapq.heappop(bucket.waiters)
+        bucket.requests.append((now, priority))
+        bucket.token_log.append((now, tokens))
+        bucket.tokens_in_window += tokens
+        bucket.in_flight += 1
+        return 0.0
+
+    def _admitted(self, model: str, bucket: _Bucket, priority: str, tokens: int, waited: float) -> Permit:
+        stat = self._stat(model, priority)
+        stat["admitted"] += 1
+        stat["tokens_total"] += tokens
+        stat["wait_seconds_total"] += waited
+        stat["wait_seconds_max"] = max(stat["wait_seconds_max"], waited)
+        llm_governor_queued.dec(model=model, priority=priority)
+        llm_governor_in_flight.inc(model=model, priority=priority)
+        llm_governor_wait_seconds.observe(waited, model=model, priority=priority)
+        self._notify(bucket)
+        return Permit(model=model, priority=priority, tokens=tokens, waited_s=waited)
+
+    def _abandon(self, model: str, bucket: _Bucket, ticket: Tuple[int, int], priority: str) -> None:
+        bucket.cancelled.add(ticket)
+        self._stat(model, priority)["timeouts"] += 1
+        llm_governor_queued.dec(model=model, priority=priority)
+        self._notify(bucket)
+
+    # ---- public API ----
+    def acquire(
+        self, model: str, tokens: int = 1, priority: Optional[str] = None, timeout: Optional[float] = SYNC_ACQUIRE_TIMEOUT_S
+    ) -> Permit:
+        """Blocking acquire; raises TimeoutError after `timeout` seconds (None waits indefinitely)"""
+        priority = priority or current_priority()
+        start = time.monotonic()
+        with self._cond:
+            bucket = self._bucket(model)
+            ticket = self._enqueue(model, bucket, priority)
+            while True:
+                wait = self._try_admit(model, bucket, ticket, tokens, priority)
+                if wait == 0:
+                    return self._admitted(model, bucket, priority, tokens, time.monotonic() - start)
+                if timeout is not None:
+                    remaining = timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        self._abandon(model, bucket, ticket, priority)
+                        raise TimeoutError(f"LLM governor: no capacity for {model} within {timeout}s")
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._cond.wait(wait)
+
+    async def acquire_async(
+        self, model: str, tokens: int = 1, priority: Optional[str] = None, timeout: Optional[float] = None
+    ) -> Permit:
+        priority = priority or current_priority()
+        start = time.monotonic()
+        wakeup = asyncio.Event()
+        with self._cond:
+            bucket = self._bucket(model)
+            ticket = self._enqueue(model, bucket, priority)
+            bucket.async_waiters[ticket] = (asyncio.get_running_loop(), wakeup)
+        try:
+            while True:
+                with self._cond:
+                    # Cleared under the lock: any admit/release after this check sets it again
+                    wakeup.clear()
+                    wait = self._try_admit(model, bucket, ticket, tokens, priority)
+                    if wait == 0:
+                        del bucket.async_waiters[ticket]
+                        return self._admitted(model, bucket, priority, tokens, time.monotonic() - start)
+                if timeout is not None:
+                    remaining = timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        raise TimeoutError(f"LLM governor: no capacity for {model} within {timeout}s")
+                    wait = remaining if wait is None else min(wait, remaining)
+                try:
+                    await asyncio.wait_for(wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            with self._cond:
+                bucket.async_waiters.pop(ticket, None)
+                self._abandon(model, bucket, ticket, priority)
+            raise
+
+    def release(self, permit: Permit) -> None:
+        with self._cond:
+            bucket = self._bucket(permit.model)
+            bucket.in_flight = max(0, bucket.in_flight - 1)
+            llm_governor_in_flight.dec(model=permit.model, priority=permit.priority)
+            if permit.actual_tokens is not None and permit.actual_tokens != permit.tokens:
+                # Reconcile the estimate with reported usage
+                delta = permit.actual_tokens - permit.tokens
+                bucket.token_log.append((time.monotonic(), delta))
+                bucket.tokens_in_window += delta
+                self._stat(permit.model, permit.priority)["tokens_total"] += delta
+            self._notify(bucket)
+
+    @contextmanager
+    def slot(self, model: str, tokens: int = 1, priority: Optional[str] = None, timeout: Optional[float] = SYNC_ACQUIRE_TIMEOUT_S):
+        permit = self.acquire(model, tokens, priority, timeout)
+        try:
+            yield permit
+        finally:
+            self.release(permit)
+
+    @asynccontextmanager
+    async def aslot(self, model: str, tokens: int = 1, priority: Optional[str] = None, timeout: Optional[float] = None):
+        permit = await self.acquire_async(model, tokens, priority, timeout)
+        try:
+            yield permit
+        finally:
+            self.release(permit)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Queue depth, in-flight, window usage and wait statistics per model/priority"""
+        with self._cond:
+            now = time.monotonic()
+            models = {}
+            for model, bucket in self._buckets.items():
+                bucket.prune(now)
+                depth: Dict[str, int] = {p: 0 for p in PRIORITIES}
+                names = {v: k for k, v in PRIORITIES.items()}
+                for ticket in bucket.waiters:
+                    if ticket not in bucket.cancelled:
+                        depth[names[ticket[0]]] += 1
+                models[model] = {
+                    "limits": vars(bucket.limits).copy(),
+                    "in_flight": bucket.in_flight,
+                    "requests_last_minute": len(bucket.requests),
+                    "tokens_last_minute": bucket.tokens_in_window,
+                    "queue_depth": depth,
+                }
+            stats = {}
+            for (model, priority), stat in self._stats.items():
+                stats.setdefault(model, {})[priority] = dict(stat)
+            return {"models": models, "stats": stats}
+
+
+# Shared by every module in the process
+governor = LLMGovernor()
@@ -0,0 +1,322 @@
+"""
+In-process Prometheus metrics
+Counters, gauges and histograms rendered in the Prometheus text exposition
+format by GET /metrics. No client library or push gateway: everything lives in
+this process and is scraped locally.
+
+Label values come from code constants (stage, tool, model, service names); each
+metric additionally caps its number of series so an unexpected value can never
+blow up cardinality - overflow is folded into the "other" label value.
+"""
+
+import bisect
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from gw_api.core.tracing import end_span, span, start_span
+
+# Seconds; covers sub-millisecond SQL up to multi-minute LangGraph runs
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+MAX_SERIES = 100
+OVERFLOW_LABEL = "other"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), max_series: int = MAX_SERIES):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        if key not in self._series and len(self._series) >= self.max_series:
+            key = tuple(OVERFLOW_LABEL for _ in self.labelnames)
+        return key
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        with self._lock:
+            key = self._key(labels)
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._series.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        with self._lock:
+            key = self._key(labels)
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._series[self._key(labels)] = value
+
+    @contextmanager
+    def track(self, **labels: str):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._series.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS, max_series: int = MAX_SERIES):
+        super().__init__(name, documentation, labelnames, max_series)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: str) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            key = self._key(labels)
+            series = self._series.get(key)
+            if series is None:
+                # [per-bucket counts..., +Inf count, sum]
+                series = [0] * (len(self.buckets) + 1) + [0.0]
+                self._series[key] = series
+            series[idx] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = self._header()
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ---- Pipeline ----
+stage_seconds = registry.register(Histogram(
+    "gw_stage_duration_seconds",
+    "Wall time of pipeline stages: LangGraph nodes (node.*), tools (tool.*) and upload steps",
+    ["stage", "outcome"],
+))
+inflight_requests = registry.register(Gauge(
+    "gw_inflight_requests", "Requests currently being processed", ["kind"],
+))
+
+# ---- LLM / embeddings / vector store ----
+llm_seconds = registry.register(Histogram(
+    "gw_llm_call_duration_seconds", "Chat model call latency (including governor wait)",
+    ["model", "call_site", "outcome"],
+))
+llm_tokens = registry.register(Counter(
+    "gw_llm_tokens_total", "Tokens reported (or estimated) for chat model calls", ["model", "call_site"],
+))
+embedding_seconds = registry.register(Histogram(
+    "gw_embedding_call_duration_seconds", "Embedding call latency", ["model", "operation", "outcome"],
+))
+embedding_texts = registry.register(Counter(
+    "gw_embedding_texts_total", "Texts sent to the embedding model", ["model"],
+))
+llm_governor_queued = registry.register(Gauge(
+    "gw_llm_governor_queued", "Calls waiting for LLM governor capacity", ["model", "priority"],
+))
+llm_governor_in_flight = registry.register(Gauge(
+    "gw_llm_governor_in_flight", "Calls admitted by the LLM governor and not yet released", ["model", "priority"],
+))
+llm_governor_wait_seconds = registry.register(Histogram(
+    "gw_llm_governor_wait_seconds", "Time calls spent queued in the LLM governor before admission",
+    ["model", "priority"],
+))
+vector_query_seconds = registry.register(Histogram(
+    "gw_vector_query_duration_seconds", "Chroma query latency", ["call_site", "outcome"],
+))
+
+# ---- External services / OCR / DB ----
+external_seconds = registry.register(Histogram(
+    "gw_external_request_duration_seconds", "Outbound HTTP calls to third-party services",
+    ["service", "operation", "outcome"],
+))
+ocr_seconds = registry.register(Histogram(
+    "gw_ocr_duration_seconds", "OCR run latency", ["mode", "outcome"],
+))
+ocr_jobs = registry.register(Gauge(
+    "gw_ocr_jobs", "OCR jobs waiting for or running in the OCR worker pool", ["state"],
+))
+ocr_rejected = registry.register(Counter(
+    "gw_ocr_rejected_total", "OCR jobs refused because the OCR queue was full",
+))
+news_filter_articles = registry.register(Counter(
+    "gw_news_filter_articles_total", "News articles screened for relevance, by the step that decided them",
+    ["decided_by"],
+))
+news_llm_calls_saved = registry.register(Counter(
+    "gw_news_llm_calls_saved_total", "LLM calls avoided by the news relevance cascade versus two per article",
+))
+db_query_seconds = registry.register(Histogram(
+    "gw_db_query_duration_seconds", "SQL statement latency",
+    ["operation"], buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+))
+
+
+@contextmanager
+def observe(histogram: Histogram, **labels: str):
+    """
+    Time the block into `histogram`, adding outcome="ok"/"error" if the metric has it.
+    The block is also a trace span (yielded, so callers can attach sizes).
+    """
+    name = histogram.name.removeprefix("gw_").removesuffix("_duration_seconds")
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        with span(name, **labels) as sp:
+            yield sp
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        if "outcome" in histogram.labelnames:
+            labels["outcome"] = outcome
+        histogram.observe(time.perf_counter() - start, **labels)
+
+
+def track_inflight(kind: str) -> Callable:
+    """Decorator counting concurrent executions of a (sync or async) handler"""
+
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with inflight_requests.track(kind=kind):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with inflight_requests.track(kind=kind):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def sql_operation(statement: str) -> str:
+    head = (statement or "").lstrip().split(None, 1)
+    op = head[0].upper() if head else ""
+    return op if op in {"SELECT", "INSERT", "UPDATE", "DELETE", "PRAGMA", "CREATE", "ALTER"} else OVERFLOW_LABEL
+
+
+def instrument_engine(engine) -> None:
+    """Record every SQL statement executed through a SQLAlchemy engine (metric + span)"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        sp = start_span("db_query", operation=sql_operation(statement), statement=statement[:200])
+        conn.info.setdefault("_gw_query_start", []).append((time.perf_counter(), sp))
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("_gw_query_start")
+        if starts:
+            start, sp = starts.pop()
+            db_query_seconds.observe(time.perf_counter() - start, operation=sql_operation(statement))
+            sp.set(rowcount=getattr(cursor, "rowcount", -1))
+            end_span(sp)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("_gw_query_start") if context.connection else None
+        if starts:
+            end_span(starts.pop()[1], error=True)
+
+
+def render_latest() -> str:
+    return registry.render()
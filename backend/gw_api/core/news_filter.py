@@ -0,0 +1,370 @@
+"""
+News relevance cascade
+Decides which fetched articles are about the company and ESG-related without
+two LLM calls per article:
+
+1. company: alias mentions counted locally. No mention drops the article; a
+   mention in the title, a multi-word alias (or the full name) in the text, or
+   NEWS_ALIAS_MIN_MENTIONS mentions keep it; a few passing mentions of a
+   one-word alias are left undecided.
+2. ESG: ClimateBERT scores the remaining articles in batches (keyword score
+   without the model). >= NEWS_ESG_HIGH keeps, <= NEWS_ESG_LOW drops.
+3. LLM: articles still undecided on either question go to the chat model
+   NEWS_LLM_BATCH at a time, one JSON verdict per article. An unparseable
+   batch falls back to the per-article prompts.
+
+`filter_company_news` streams this: search results are ranked by alias match
+in the title and recency, at most NEWS_STREAM_CONCURRENCY articles are
+downloaded/parsed at a time, each is screened as soon as it is loaded, and no
+new article is started once `max_articles` are kept.
+
+    NEWS_LLM_BATCH                articles per LLM prompt (8)
+    NEWS_ESG_HIGH / _LOW          ClimateBERT probability bounds (0.75 / 0.25)
+    NEWS_ALIAS_MIN_MENTIONS       alias mentions that settle company relevance (3)
+    NEWS_STREAM_CONCURRENCY       articles loaded at once (6)
+    NEWS_RECENCY_HALF_LIFE_DAYS   age at which recency counts half in the ranking (90)
+"""
+
+import asyncio
+import functools
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain.schema import HumanMessage
+
+from gw_api.core.llm import get_llm
+from gw_api.core.metrics import news_filter_articles, news_llm_calls_saved
+from gw_api.core.profiling import stage
+from gw_api.core.background_loop import run_sync
+from gw_api.core.utils import esg_scores, is_article_about_company, is_esg_related_llm
+from gw_api.webscraper.article_store import (
+    StoredArticle,
+    StoredVerdict,
+    get_article_store,
+    load_article,
+    search_results,
+)
+from gw_api.webscraper.news_fetcher import canonical_url
+from gw_api.webscraper.news_sources import SearchResult
+
+LLM_BATCH = int(os.getenv("NEWS_LLM_BATCH", "8"))
+ESG_HIGH = float(os.getenv("NEWS_ESG_HIGH", "0.75"))
+ESG_LOW = float(os.getenv("NEWS_ESG_LOW", "0.25"))
+ALIAS_MIN_MENTIONS = int(os.getenv("NEWS_ALIAS_MIN_MENTIONS", "3"))
+STREAM_CONCURRENCY = int(os.getenv("NEWS_STREAM_CONCURRENCY", "6"))
+RECENCY_HALF_LIFE_DAYS = float(os.getenv("NEWS_RECENCY_HALF_LIFE_DAYS", "90"))
+MAX_CANDIDATES = 100  # articles the per-article filter used to evaluate at most
+ARTICLE_CHARS = 1200  # same excerpt the per-article prompts use
+LEGACY_CALLS_PER_ARTICLE = 2  # is_article_about_company + is_esg_related_llm
+SCREENED = {"local", "llm_batch", "llm_single"}  # verdicts worth storing
+
+JSON_ARRAY = re.compile(r"\[.*\]", re.DOTALL)
+
+
+@dataclass
+class ArticleVerdict:
+    title: str
+    text: str
+    about_company: Optional[bool] = None
+    esg: Optional[bool] = None
+    esg_score: Optional[float] = None
+    decided_by: str = "local"
+    url: str = ""
+
+    @property
+    def keep(self) -> bool:
+        return bool(self.about_company and self.esg)
+
+
+@dataclass
+class CascadeStats:
+    articles: int = 0
+    decided: Dict[str, int] = field(default_factory=dict)
+    llm_calls: int = 0
+
+    @property
+    def legacy_calls(self) -> int:
+        return self.articles * LEGACY_CALLS_PER_ARTICLE
+
+    @property
+    def saved_calls(self) -> int:
+        return self.legacy_calls - self.llm_calls
+
+    def summary(self) -> str:
+        decided = ", ".join(f"{k}={v}" for k, v in sorted(self.decided.items()))
+        return (f"{self.articles} articles ({decided}), {self.llm_calls} LLM calls "
+                f"instead of {self.legacy_calls}: {self.saved_calls} saved")
+
+
+@functools.lru_cache(maxsize=256)
+def _alias_pattern(alias: str) -> re.Pattern:
+    return re.compile(r"(?<!\w)" + r"\s+".join(map(re.escape, alias.split())) + r"(?!\w)", re.I)
+
+
+def _is_strong(alias: str, company_name: str) -> bool:
+    return len(alias.split()) > 1 or alias == company_name
+
+
+def company_relevance(title: str, text: str, company_name: str, aliases: Sequence[str]) -> Optional[bool]:
+    """True/False when alias matching settles it, None when the LLM has to decide"""
+    names = list(dict.fromkeys([company_name, *aliases]))
+    mentions = 0
+    for alias in names:
+        pattern = _alias_pattern(alias)
+        if pattern.search(title):
+            return True
+        hits = len(pattern.findall(text))
+        if hits and _is_strong(alias, company_name):
+            return True
+        mentions += hits
+    if mentions == 0:
+        return False
+    return True if mentions >= ALIAS_MIN_MENTIONS else None
+
+
+def esg_relevance(score: float) -> Optional[bool]:
+    if score >= ESG_HIGH:
+        return True
+    if score <= ESG_LOW:
+        return False
+    return None
+
+
+def alias_strength(title: str, company_name: str, aliases: Sequence[str]) -> int:
+    """2: full name or multi-word alias in the title, 1: a one-word alias, 0: none"""
+    best = 0
+    for alias in dict.fromkeys([company_name, *aliases]):
+        if _alias_pattern(alias).search(title):
+            if _is_strong(alias, company_name):
+                return 2
+            best = 1
+    return best
+
+
+def prioritise(results: Sequence[SearchResult], company_name: str, aliases: Sequence[str],
+               now: Optional[datetime] = None) -> List[SearchResult]:
+    """Best candidates first: alias match in the title, then recency (ties keep search order)"""
+    now = now or datetime.now()
+
+    def score(result: SearchResult) -> float:
+        recency = 0.0
+        if result.published is not None:
+            age_days = max(0.0, (now - result.published).total_seconds() / 86400)
+            recency = 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+        return alias_strength(result.title, company_name, aliases) + recency
+
+    return sorted(results, key=score, reverse=True)
+
+
+def batch_prompt(company_name: str, aliases: Sequence[str], batch: Sequence[Tuple[int, ArticleVerdict]]) -> str:
+    articles = "\n\n".join(
+        f"[article {i}]\nTitle: {v.title}\n{v.text[:ARTICLE_CHARS]}" for i, v in batch
+    )
+    return f"""
+    You are screening news articles for an ESG validation of company "{company_name}" (also known as {list(aliases)}).
+    For every article below decide:
+    - about_company: is the article directly about this company?
+    - esg: is it related to ESG, sustainability, climate change, carbon emissions, energy transition, green finance or relevant policy?
+
+    {articles}
+
+    Return only a JSON array with one object per article, e.g.
+    [{{"id": 0, "about_company": true, "esg": false}}]
+    """
+
+
+def parse_batch(response: str, ids: Sequence[int]) -> Dict[int, Tuple[bool, bool]]:
+    """id -> (about_company, esg); ValueError unless every id has a verdict"""
+    match = JSON_ARRAY.search(response or "")
+    if match is None:
+        raise ValueError("no JSON array in response")
+    verdicts = {}
+    for item in json.loads(match.group()):
+        verdicts[int(item["id"])] = (bool(item["about_company"]), bool(item["esg"]))
+    missing = set(ids) - set(verdicts)
+    if missing:
+        raise ValueError(f"no verdict for articles {sorted(missing)}")
+    return verdicts
+
+
+def _resolve_batch(company_name: str, aliases: Sequence[str], batch: List[Tuple[int, ArticleVerdict]],
+                   stats: CascadeStats) -> None:
+    try:
+        with stage("news.relevance_batch"):
+            stats.llm_calls += 1
+            response = get_llm().invoke([HumanMessage(content=batch_prompt(company_name, aliases, batch))])
+        verdicts = parse_batch(response.content, [i for i, _ in batch])
+    except Exception as e:
+        print(f"[News] batched relevance failed ({e}); asking per article")
+        for _, v in batch:
+            if v.about_company is None:
+                stats.llm_calls += 1
+                v.about_company = is_article_about_company(v.text, company_name, list(aliases))
+            if v.esg is None and v.about_company:
+                stats.llm_calls += 1
+                v.esg = is_esg_related_llm(v.text)
+            v.decided_by = "llm_single"
+        return
+    for i, v in batch:
+        about_company, esg = verdicts[i]
+        if v.about_company is None:
+            v.about_company = about_company
+        if v.esg is None:
+            v.esg = esg
+        v.decided_by = "llm_batch"
+
+
+def screen_locally(verdicts: Sequence[ArticleVerdict], company_name: str, aliases: Sequence[str]) -> None:
+    """Alias matching, then one ClimateBERT batch for the articles it did not rule out"""
+    with stage("news.alias_match"):
+        for v in verdicts:
+            v.about_company = company_relevance(v.title, v.text, company_name, aliases)
+
+    candidates = [v for v in verdicts if v.about_company is not False]
+    with stage("news.esg_classify"):
+        scores = esg_scores([f"{v.title}\n{v.text}" for v in candidates])
+    for v, score in zip(candidates, scores):
+        v.esg_score = score
+        v.esg = esg_relevance(score)
+
+
+def needs_llm(v: ArticleVerdict) -> bool:
+    return v.about_company is not False and v.esg is not False and (v.about_company is None or v.esg is None)
+
+
+def _record(verdicts: Sequence[ArticleVerdict], stats: CascadeStats) -> None:
+    for v in verdicts:
+        stats.decided[v.decided_by] = stats.decided.get(v.decided_by, 0) + 1
+        news_filter_articles.inc(decided_by=v.decided_by)
+    news_llm_calls_saved.inc(stats.saved_calls)
+
+
+async def stream_verdicts(
+    candidates: Sequence[Tuple[str, str]],
+    company_name: str,
+    aliases: Sequence[str],
+    max_articles: int,
+    concurrency: int = STREAM_CONCURRENCY,
+    batch_size: int = LLM_BATCH,
+    known: Optional[Dict[str, StoredVerdict]] = None,
+) -> Tuple[Dict[int, Tuple[Optional[StoredArticle], ArticleVerdict]], CascadeStats]:
+    """
+    Load and screen (title, url) candidates best-first with at most `concurrency`
+    loads in flight; ambiguous articles are sent to the LLM once a batch is full
+    or nothing else is loading. Once `max_articles` are kept no new load is
+    started; loads already in flight (better ranked than anything not started)
+    are still screened locally, so the caller can take the kept articles in
+    rank order. `known` verdicts (by canonical URL) are reused: rejected
+    articles are not loaded at all, kept ones only read from the store.
+    Returns candidate index -> (article, verdict).
+    """
+    known = known or {}
+    stats = CascadeStats()
+    evaluated: Dict[int, Tuple[Optional[StoredArticle], ArticleVerdict]] = {}
+    inflight: Dict[asyncio.Task, int] = {}
+    pending: List[Tuple[int, ArticleVerdict]] = []
+    upcoming = iter(enumerate(candidates))
+    kept = 0
+    batch_size = max(1, batch_size)
+
+    def cached_verdict(title: str, text: str, url: str) -> ArticleVerdict:
+        prior = known[url]
+        return ArticleVerdict(title, text, prior.about_company, prior.esg, prior.esg_score, "cached", url)
+
+    def launch() -> None:
+        while len(inflight) < concurrency and kept < max_articles:
+            item = next(upcoming, None)
+            if item is None:
+                return
+            i, (title, url) = item
+            url = canonical_url(url)
+            if url in known and not (known[url].about_company and known[url].esg):
+                evaluated[i] = (None, cached_verdict(title, "", url))
+                continue
+            inflight[asyncio.ensure_future(load_article(url, title))] = i
+
+    launch()
+    while inflight or (pending and kept < max_articles):
+        if inflight:
+            done, _ = await asyncio.wait(inflight, return_when=asyncio.FIRST_COMPLETED)
+            ready = []
+            for task in done:
+                i = inflight.pop(task)
+                article = task.result()
+                if article is None or not article.text:
+                    continue
+                if article.url in known:
+                    evaluated[i] = (article, cached_verdict(article.title, article.text, article.url))
+                    kept += 1
+                else:
+                    ready.append((i, article, ArticleVerdict(article.title, article.text, url=article.url)))
+            if ready:
+                await asyncio.to_thread(screen_locally, [v for _, _, v in ready], company_name, aliases)
+                for i, article, v in ready:
+                    evaluated[i] = (article, v)
+                    if v.keep:
+                        kept += 1
+                    elif needs_llm(v):
+                        pending.append((i, v))
+            launch()
+        if pending and kept < max_articles and (len(pending) >= batch_size or not inflight):
+            batch, pending = pending[:batch_size], pending[batch_size:]
+            await asyncio.to_thread(_resolve_batch, company_name, aliases, batch, stats)
+            kept += sum(v.keep for _, v in batch)
+            launch()
+
+    verdicts = [v for _, v in evaluated.values()]
+    for _, v in pending:
+        v.decided_by = "skipped"  # enough articles kept before the LLM saw these
+    # Savings are counted against the articles actually screened; skipped and
+    # never-loaded candidates are reported separately in `decided`
+    stats.articles = sum(v.decided_by != "skipped" for v in verdicts)
+    _record(verdicts, stats)
+    not_evaluated = len(candidates) - len(evaluated)
+    if not_evaluated:
+        stats.decided["not_evaluated"] = not_evaluated
+    return evaluated, stats
+
+
+def filter_company_news(
+    company_name: str, aliases: Sequence[str], max_articles: int, refresh: bool = False
+) -> Tuple[List[ArticleVerdict], CascadeStats]:
+    """
+    Screened articles for a company in priority order (the kept ones are those
+    with `keep`). Candidates come from the article store while the company's
+    search is fresh (unless `refresh`), otherwise from a new search ranked by
+    `prioritise`. Verdicts are stored per company, so articles screened before
+    (e.g. by the prefetch scheduler) cost no LLM call.
+    """
+    store = get_article_store()
+    cached = None if refresh else store.company_results(company_name)
+    if cached is not None:
+        candidates = cached
+    else:
+        try:
+            with stage("news.search"):
+                results = search_results(aliases)
+        except Exception as e:
+            print(f"[News search error for aliases {aliases}]: {e}")
+            results = []
+        candidates = [(r.title, r.link) for r in prioritise(results, company_name, aliases)]
+        # A failed (or empty) search is not remembered, so the next validation searches again
+        if candidates:
+            store.index_company(company_name, candidates)
+    candidates = candidates[:MAX_CANDIDATES]
+    print(f"[News] {len(candidates)} candidate articles for '{company_name}'"
+          f"{' (cached search)' if cached is not None else ''}")
+
+    known = store.company_verdicts(company_name)
+    with stage("news.stream"):
+        evaluated, stats = run_sync(stream_verdicts(candidates, company_name, aliases, max_articles, known=known))
+    verdicts = [evaluated[i][1] for i in sorted(evaluated)]
+    store.save_verdicts(company_name, [
+        StoredVerdict(v.url, v.about_company, v.esg, v.esg_score, v.decided_by)
+        for v in verdicts if v.decided_by in SCREENED
+    ])
+    return verdicts, stats
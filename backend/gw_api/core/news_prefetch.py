@@ -0,0 +1,272 @@
+"""
+Background news prefetch
+Keeps the article store warm for the companies we expect to validate, so the
+news validation tool reads stored search results, texts and verdicts instead
+of scraping and classifying inside the analysis request. A daemon thread
+periodically builds a priority queue of companies whose stored search is older
+than NEWS_PREFETCH_REFRESH_HOURS (well inside NEWS_COMPANY_TTL_HOURS) and
+refreshes them best-first within an hourly budget:
+
+1. companies analysed in the last NEWS_PREFETCH_RECENT_DAYS, most recent first
+2. the watchlist, in the order given
+3. the first NEWS_PREFETCH_WHITELIST_TOP companies of the whitelist (companies.csv)
+
+Each refresh searches all news sources, downloads and screens articles
+(news_filter.filter_company_news) and stores results and verdicts.
+
+    NEWS_PREFETCH                 1 starts the scheduler with the API (0)
+    NEWS_PREFETCH_WATCHLIST       comma-separated company names, or @path to a file with one per line
+    NEWS_PREFETCH_RECENT_DAYS     (14)
+    NEWS_PREFETCH_WHITELIST_TOP   (0)
+    NEWS_PREFETCH_PER_HOUR        companies refreshed per hour at most (30)
+    NEWS_PREFETCH_REFRESH_HOURS   (12)
+    NEWS_PREFETCH_INTERVAL_S      how often the queue is rebuilt (600)
+
+Run one round by hand (from backend/):
+    python -m gw_api.core.news_prefetch --limit 5
+"""
+
+import argparse
+import heapq
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from gw_api.core.company_registry import get_company_registry
+from gw_api.core.profiling import stage
+from gw_api.webscraper.article_store import company_key, get_article_store
+
+PREFETCH_ENABLED = os.getenv("NEWS_PREFETCH", "0") == "1"
+WATCHLIST = os.getenv("NEWS_PREFETCH_WATCHLIST", "")
+RECENT_DAYS = float(os.getenv("NEWS_PREFETCH_RECENT_DAYS", "14"))
+WHITELIST_TOP = int(os.getenv("NEWS_PREFETCH_WHITELIST_TOP", "0"))
+PER_HOUR = float(os.getenv("NEWS_PREFETCH_PER_HOUR", "30"))
+REFRESH_S = float(os.getenv("NEWS_PREFETCH_REFRESH_HOURS", "12")) * 3600
+INTERVAL_S = float(os.getenv("NEWS_PREFETCH_INTERVAL_S", "600"))
+MAX_ARTICLES = 10  # what NewsValidationTool asks for
+
+TIER_RECENT, TIER_WATCHLIST, TIER_WHITELIST = 0, 1, 2
+
+
+@dataclass(order=True)
+class PrefetchItem:
+    priority: Tuple[int, float]
+    company: str = field(compare=False)
+    reason: str = field(compare=False)
+
+
+def load_watchlist(spec: Optional[str] = None) -> List[str]:
+    spec = WATCHLIST if spec is None else spec
+    if spec.startswith("@"):
+        path = Path(spec[1:])
+        if not path.exists():
+            print(f"[Prefetch] watchlist file {path} not found")
+            return []
+        names = path.read_text(encoding="utf-8").splitlines()
+    else:
+        names = spec.split(",")
+    return [n.strip() for n in names if n.strip() and not n.strip().startswith("#")]
+
+
+def recently_analysed(days: float = RECENT_DAYS) -> List[Tuple[str, datetime]]:
+    """(company, last analysis time) of reports newer than `days`, most recent first"""
+    from sqlalchemy import func
+
+    from gw_api.db import SessionLocal
+    from gw_api.models.report import Report
+
+    last = func.max(Report.analysis_time)
+    with SessionLocal() as db:
+        return (
+            db.query(Report.company_name, last)
+            .filter(Report.company_name.isnot(None), Report.analysis_time >= datetime.utcnow() - timedelta(days=days))
+            .group_by(Report.company_name)
+            .order_by(last.desc())
+            .all()
+        )
+
+
+class HourlyBudget:
+    """Token bucket holding at most one hour of budget"""
+
+    def __init__(self, per_hour: float):
+        self.per_hour = per_hour
+        self.tokens = min(1.0, per_hour)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.per_hour, self.tokens + (now - self._updated) * self.per_hour / 3600)
+        self._updated = now
+
+    def try_take(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_s(self) -> float:
+        self._refill()
+        return max(0.0, (1 - self.tokens) * 3600 / self.per_hour) if self.per_hour > 0 else float("inf")
+
+
+class NewsPrefetcher:
+    def __init__(
+        self,
+        per_hour: float = PER_HOUR,
+        refresh_s: float = REFRESH_S,
+        interval_s: float = INTERVAL_S,
+        max_articles: int = MAX_ARTICLES,
+    ):
+        self.budget = HourlyBudget(per_hour)
+        self.refresh_s = refresh_s
+        self.interval_s = interval_s
+        self.max_articles = max_articles
+        self.queue: List[PrefetchItem] = []
+        self.recent_runs: deque = deque(maxlen=20)
+        self.prefetched = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def due(self, company: str) -> bool:
+        searched_at = get_article_store().searched_at(company)
+        return searched_at is None or time.time() - searched_at >= self.refresh_s
+
+    def candidates(self) -> List[PrefetchItem]:
+        """Due companies from all tiers; a company listed twice keeps its best priority"""
+        items: List[PrefetchItem] = []
+        try:
+            now = datetime.utcnow()
+            for name, analysed_at in recently_analysed():
+                age_h = (now - analysed_at).total_seconds() / 3600 if analysed_at else 0.0
+                items.append(PrefetchItem((TIER_RECENT, age_h), name, "recent"))
+        except Exception as e:
+            print(f"[Prefetch] could not read recent analyses: {e}")
+        items += [PrefetchItem((TIER_WATCHLIST, i), name, "watchlist") for i, name in enumerate(load_watchlist())]
+        if WHITELIST_TOP > 0:
+            items += [PrefetchItem((TIER_WHITELIST, i), name, "whitelist")
+                      for i, name in enumerate(get_company_registry().whitelist_names(WHITELIST_TOP))]
+
+        best: Dict[str, PrefetchItem] = {}
+        for item in items:
+            key = company_key(item.company)
+            if key not in best or item < best[key]:
+                best[key] = item
+        return [item for item in best.values() if self.due(item.company)]
+
+    def refill(self) -> int:
+        queue = self.candidates()
+        heapq.heapify(queue)
+        with self._lock:
+            self.queue = queue
+        return len(queue)
+
+    def prefetch(self, item: PrefetchItem) -> Dict[str, Any]:
+        """Search, download and screen news for one company into the article store"""
+        from gw_api.core.news_filter import filter_company_news
+        from gw_api.core.utils import generate_company_aliases
+
+        start = time.perf_counter()
+        run: Dict[str, Any] = {"company": item.company, "reason": item.reason, "at": datetime.utcnow().isoformat()}
+        try:
+            with stage("news.prefetch"):
+                aliases = generate_company_aliases(item.company)
+                verdicts, stats = filter_company_news(item.company, aliases, self.max_articles, refresh=True)
+            run.update(kept=sum(v.keep for v in verdicts), screened=len(verdicts), llm_calls=stats.llm_calls)
+            self.prefetched += 1
+        except Exception as e:
+            run["error"] = str(e)
+            self.failures += 1
+            print(f"[Prefetch] {item.company} failed: {e}")
+        run["seconds"] = round(time.perf_counter() - start, 2)
+        self.recent_runs.append(run)
+        return run
+
+    def _next(self) -> Optional[PrefetchItem]:
+        with self._lock:
+            return heapq.heappop(self.queue) if self.queue else None
+
+    def run_once(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Refill the queue and prefetch up to `limit` companies now, ignoring the budget"""
+        self.refill()
+        runs = []
+        while limit is None or len(runs) < limit:
+            item = self._next()
+            if item is None:
+                break
+            runs.append(self.prefetch(item))
+        return runs
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            deadline = time.monotonic() + self.interval_s
+            try:
+                self.refill()
+            except Exception as e:
+                print(f"[Prefetch] queue refill failed: {e}")
+            while not self._stop.is_set() and time.monotonic() < deadline:
+                if not self.queue:
+                    break
+                if not self.budget.try_take():
+                    self._stop.wait(min(self.budget.wait_s(), max(0.0, deadline - time.monotonic())))
+                    continue
+                item = self._next()
+                if item is not None and self.due(item.company):
+                    self.prefetch(item)
+            self._stop.wait(max(0.0, deadline - time.monotonic()))
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="news-prefetch", daemon=True)
+        self._thread.start()
+        print(f"[Prefetch] news prefetch scheduler started ({self.budget.per_hour:g} companies/hour)")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            queued = [{"company": i.company, "reason": i.reason} for i in sorted(self.queue)[:20]]
+            depth = len(self.queue)
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "queue_depth": depth,
+            "queue_head": queued,
+            "budget_tokens": round(self.budget.tokens, 2),
+            "per_hour": self.budget.per_hour,
+            "prefetched": self.prefetched,
+            "failures": self.failures,
+            "recent_runs": list(self.recent_runs),
+        }
+
+
+_prefetcher: Optional[NewsPrefetcher] = None
+
+
+def get_news_prefetcher() -> NewsPrefetcher:
+    global _prefetcher
+    if _prefetcher is None:
+        _prefetcher = NewsPrefetcher()
+    return _prefetcher
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=None, help="companies to prefetch (default: all due)")
+    args = parser.parse_args()
+    for run in get_news_prefetcher().run_once(args.limit):
+        print(run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+OCR worker pool
+Runs RapidOCR and the text cleaning in separate processes, so a large image
+never blocks the event loop or holds the GIL of the API worker. Each process
+builds its own OCRService (ONNX sessions are not shared across processes) and
+is fed by one dispatcher thread from a bounded queue:
+
+- `await ocr_pool.read(path, mode)` resolves with the OCRService.read() result
+- a full queue fails fast with OCRQueueFull instead of piling up uploads
+- a job running longer than its timeout kills and restarts that worker and
+  fails with OCRTimeout; a crashed worker is restarted the same way
+
+    OCR_WORKERS        worker processes; 0 runs OCR in a thread of this process (2)
+    OCR_QUEUE_DEPTH    jobs waiting for a free worker before new ones are refused (8)
+    OCR_TIMEOUT_S      per-job limit, not counting worker start-up (120)
+    OCR_START_METHOD   multiprocessing start method (forkserver where available, else spawn)
+
+Workers are never forked from the API process itself: by the time OCR starts it
+runs the event loop, the background loop and the dispatcher threads, and a fork
+would copy their locks in whatever state they are in.
+
+Workers are started on first use (or by the warm-up, gw_api.core.lazy) and load
+their models once.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from gw_api.core.metrics import ocr_jobs, ocr_rejected, ocr_seconds
+
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "2"))
+OCR_QUEUE_DEPTH = int(os.getenv("OCR_QUEUE_DEPTH", "8"))
+OCR_TIMEOUT_S = float(os.getenv("OCR_TIMEOUT_S", "120"))
+OCR_START_METHOD = os.getenv(
+    "OCR_START_METHOD", "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+STARTUP_TIMEOUT_S = 300.0
+
+
+class OCRError(RuntimeError):
+    pass
+
+
+class OCRQueueFull(OCRError):
+    pass
+
+
+class OCRTimeout(OCRError):
+    pass
+
+
+def _worker_main(conn, det_lang: str, rec_lang: str) -> None:
+    """Worker process: build one OCR engine, then answer (path, mode) jobs until the pipe closes"""
+    try:
+        from gw_api.core.ocr_service import OCRService
+
+        service = OCRService(det_lang=det_lang, rec_lang=rec_lang)
+    except Exception as e:
+        conn.send(("error", f"OCR worker start-up failed: {type(e).__name__}: {e}"))
+        return
+    conn.send(("ready", os.getpid()))
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if job is None:
+            return
+        image_path, mode = job
+        try:
+            conn.send(("ok", service.read(image_path, mode=mode)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+@dataclass
+class OCRJob:
+    image_path: str
+    mode: str
+    timeout_s: float
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class _Worker:
+    """One OCR process and the dispatcher thread that feeds it"""
+
+    def __init__(self, pool: "OCRPool", index: int):
+        self.pool = pool
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.pid: Optional[int] = None
+        self.busy = False
+        self.restarts = 0
+        self.thread = threading.Thread(target=self._run, name=f"ocr-dispatch-{index}", daemon=True)
+
+    def _start_process(self) -> None:
+        ctx = multiprocessing.get_context(self.pool.start_method)
+        parent_conn, child_conn = ctx.Pipe()
+        process = ctx.Process(
+            target=_worker_main, args=(child_conn, self.pool.det_lang, self.pool.rec_lang),
+            name=f"ocr-worker-{self.index}", daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self.process, self.conn = process, parent_conn
+        if not parent_conn.poll(STARTUP_TIMEOUT_S):
+            self._kill()
+            raise OCRError(f"OCR worker {self.index} did not start within {STARTUP_TIMEOUT_S:.0f}s")
+        try:
+            status, payload = parent_conn.recv()
+        except EOFError:
+            status, payload = "error", f"OCR worker {self.index} exited during start-up"
+        if status != "ready":
+            self._kill()
+            raise OCRError(payload)
+        self.pid = payload
+
+    def _kill(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+        if self.process is not None:
+            self.process.kill()
+            self.process.join(timeout=5)
+        self.process = self.conn = self.pid = None
+
+    def _restart(self) -> None:
+        """Replace the process now, so the next job does not wait for model loading"""
+        self._kill()
+        self.restarts += 1
+        try:
+            self._start_process()
+        except OCRError as e:
+            print(f"[OCR] {e}")  # retried by the next job
+
+    def _ensure_process(self) -> None:
+        if self.process is not None and not self.process.is_alive():
+            self._kill()
+            self.restarts += 1
+        if self.process is None:
+            self._start_process()
+
+    def _execute(self, job: OCRJob) -> Dict[str, Any]:
+        self._ensure_process()
+        self.conn.send((job.image_path, job.mode))
+        if not self.conn.poll(job.timeout_s):
+            self._restart()
+            raise OCRTimeout(f"OCR of {os.path.basename(job.image_path)} exceeded {job.timeout_s:g}s")
+        try:
+            status, payload = self.conn.recv()
+        except EOFError:
+            self._restart()
+            raise OCRError(f"OCR worker {self.index} exited while reading {os.path.basename(job.image_path)}")
+        if status != "ok":
+            raise OCRError(payload)
+        return payload
+
+    def _run(self) -> None:
+        try:
+            self._ensure_process()
+        except OCRError as e:
+            print(f"[OCR] {e}")  # retried when the first job arrives
+        while True:
+            job = self.pool._jobs.get()
+            if job is None:
+                break
+            ocr_jobs.dec(state="queued")
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            self.busy = True
+            start = time.perf_counter()
+            outcome = "ok"
+            with ocr_jobs.track(state="running"):
+                try:
+                    job.future.set_result(self._execute(job))
+                except OCRTimeout as e:
+                    outcome = "timeout"
+                    job.future.set_exception(e)
+                except Exception as e:
+                    outcome = "error"
+                    job.future.set_exception(e if isinstance(e, OCRError) else OCRError(str(e)))
+            self.busy = False
+            self.pool._finished(outcome, time.monotonic() - job.enqueued_at)
+            ocr_seconds.observe(time.perf_counter() - start, mode=job.mode, outcome=outcome)
+        if self.conn is not None:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self._kill()
+
+
+class OCRPool:
+    def __init__(
+        self,
+        workers: int = OCR_WORKERS,
+        queue_depth: int = OCR_QUEUE_DEPTH,
+        timeout_s: float = OCR_TIMEOUT_S,
+        det_lang: str = "MULTI",
+        rec_lang: str = "LATIN",
+        start_method: str = OCR_START_METHOD,
+    ):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.timeout_s = timeout_s
+        self.det_lang = det_lang
+        self.rec_lang = rec_lang
+        self.start_method = start_method
+        self._jobs: "queue.Queue[Optional[OCRJob]]" = queue.Queue(maxsize=max(1, queue_depth))
+        self._workers: List[_Worker] = []
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self._total_latency_s = 0.0
+
+    def start(self) -> None:
+        with self._lock:
+            if self._workers or self.workers <= 0:
+                return
+            self._workers = [_Worker(self, i) for i in range(self.workers)]
+            for worker in self._workers:
+                worker.thread.start()
+        print(f"[OCR] started {self.workers} OCR worker(s), queue depth {self.queue_depth}")
+
+    def close(self) -> None:
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for _ in workers:
+            self._jobs.put(None)
+        for worker in workers:
+            worker.thread.join(timeout=10)
+
+    def submit(self, image_path: str, mode: str = "smart", timeout_s: Optional[float] = None) -> Future:
+        """Queue one image; raises OCRQueueFull when queue_depth jobs are already waiting"""
+        self.start()
+        job = OCRJob(str(image_path), mode, timeout_s or self.timeout_s)
+        try:
+            self._jobs.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            ocr_rejected.inc()
+            raise OCRQueueFull(f"OCR queue is full ({self.queue_depth} images waiting)") from None
+        ocr_jobs.inc(state="queued")
+        return job.future
+
+    def _finished(self, outcome: str, latency_s: float) -> None:
+        with self._lock:
+            if outcome == "ok":
+                self.completed += 1
+                self._total_latency_s += latency_s
+            elif outcome == "timeout":
+                self.timeouts += 1
+            else:
+                self.failed += 1
+
+    async def read(self, image_path: str, mode: str = "smart", timeout_s: Optional[float] = None) -> Dict[str, Any]:
+        """OCRService.read() in a worker process, awaited without blocking the event loop"""
+        if self.workers <= 0:
+            from gw_api.core.ocr_service import get_ocr_service
+
+            start = time.perf_counter()
+            outcome = "ok"
+            try:
+                return await asyncio.to_thread(get_ocr_service().read, str(image_path), mode)
+            except Exception:
+                outcome = "error"
+                raise
+            finally:
+                ocr_seconds.observe(time.perf_counter() - start, mode=mode, outcome=outcome)
+        return await asyncio.wrap_future(self.submit(image_path, mode, timeout_s))
+
+    def read_sync(self, image_path: str, mode: str = "smart", timeout_s: Optional[float] = None) -> Dict[str, Any]:
+        if self.workers <= 0:
+            from gw_api.core.ocr_service import get_ocr_service
+
+            return get_ocr_service().read(str(image_path), mode)
+        return self.submit(image_path, mode, timeout_s).result()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            workers = list(self._workers)
+            done = self.completed
+            mean_latency = self._total_latency_s / done if done else 0.0
+            return {
+                "workers": self.workers,
+                "alive": sum(1 for w in workers if w.process is not None and w.process.is_alive()),
+                "busy": sum(1 for w in workers if w.busy),
+                "queued": self._jobs.qsize(),
+                "queue_depth": self.queue_depth,
+                "timeout_s": self.timeout_s,
+                "completed": done,
+                "failed": self.failed,
+                "timeouts": self.timeouts,
+                "rejected": self.rejected,
+                "restarts": sum(w.restarts for w in workers),
+                "mean_latency_s": round(mean_latency, 3),
+            }
+
+
+_pool: Optional[OCRPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_ocr_pool() -> OCRPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = OCRPool()
+    return _pool
+
+
+def warm_up_ocr() -> None:
+    """Start the OCR workers, which load their models in the background; with OCR_WORKERS=0 load the engine here"""
+    pool = get_ocr_pool()
+    if pool.workers <= 0:
+        from gw_api.core.ocr_service import get_ocr_service
+
+        get_ocr_service()
+    else:
+        pool.start()
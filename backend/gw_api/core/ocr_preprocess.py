@@ -0,0 +1,201 @@
+"""
+Image pre-processing for OCR
+Prepares an upload for RapidOCR instead of handing it the original file:
+
+- colour: EXIF rotation applied, transparency flattened onto white, palette /
+  CMYK / greyscale / 16-bit images converted to RGB (BGR arrays for RapidOCR)
+- size: images with a long side above OCR_MAX_LONG_SIDE are downscaled to it
+  (JPEGs are decoded at reduced size, so a 6000x8000 photo is never fully
+  decoded); images below OCR_MIN_LONG_SIDE are upscaled (at most 3x) for recall
+- tiling: RapidOCR shrinks anything longer than 2000 px before detection, which
+  loses small print on posters, so images still longer than 2 x OCR_TILE_SIDE
+  are cut into OCR_TILE_SIDE tiles overlapping by OCR_TILE_OVERLAP px; tiles
+  whose grey level barely varies (std < OCR_BLANK_STD) are skipped. A page
+  scan (A4 at 300 dpi is 2480x3508) stays one image: its text survives the
+  shrink and tiling it would cost 4 detector passes
+
+Lines found in several tiles are merged back (duplicates in the overlap
+dropped, lines cut at a tile edge stitched together) and ordered top to
+bottom, left to right, as RapidOCR orders a single image.
+
+    OCR_PREPROCESS      0 sends the original file to RapidOCR (1)
+    OCR_MAX_LONG_SIDE   (5000)
+    OCR_MIN_LONG_SIDE   (800)
+    OCR_TILE_SIDE       0 disables tiling (2000)
+    OCR_TILE_OVERLAP    (160)
+    OCR_BLANK_STD       (6)
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps
+
+PREPROCESS = os.getenv("OCR_PREPROCESS", "1") == "1"
+MAX_LONG_SIDE = int(os.getenv("OCR_MAX_LONG_SIDE", "5000"))
+MIN_LONG_SIDE = int(os.getenv("OCR_MIN_LONG_SIDE", "800"))
+TILE_SIDE = int(os.getenv("OCR_TILE_SIDE", "2000"))
+TILE_OVERLAP = int(os.getenv("OCR_TILE_OVERLAP", "160"))
+BLANK_STD = float(os.getenv("OCR_BLANK_STD", "6"))
+MAX_UPSCALE = 3.0
+
+
+@dataclass
+class Tile:
+    image: np.ndarray  # BGR, as RapidOCR expects
+    x: int
+    y: int
+
+
+@dataclass
+class PreparedImage:
+    tiles: List[Tile]
+    original_size: Tuple[int, int]
+    size: Tuple[int, int]
+    scale: float
+    skipped_tiles: int = 0
+
+    def summary(self) -> dict:
+        return {
+            "original_size": list(self.original_size),
+            "size": list(self.size),
+            "scale": round(self.scale, 3),
+            "tiles": len(self.tiles),
+            "skipped_tiles": self.skipped_tiles,
+        }
+
+
+@dataclass
+class OCRLine:
+    box: np.ndarray  # 4x2 corner points in prepared-image coordinates
+    text: str
+    score: float
+    tile: int = 0
+    x0: float = field(init=False)
+    y0: float = field(init=False)
+    x1: float = field(init=False)
+    y1: float = field(init=False)
+
+    def __post_init__(self):
+        self.x0, self.y0 = (float(v) for v in self.box.min(axis=0))
+        self.x1, self.y1 = (float(v) for v in self.box.max(axis=0))
+
+    @property
+    def height(self) -> float:
+        return max(1.0, self.y1 - self.y0)
+
+    @property
+    def area(self) -> float:
+        return max(1.0, (self.x1 - self.x0) * (self.y1 - self.y0))
+
+
+def _to_rgb(image: Image.Image) -> Image.Image:
+    if image.mode in ("I;16", "I;16B", "I;16L", "I"):
+        image = image.point(lambda v: v / 256).convert("L")
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        rgba = image.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    return image.convert("RGB") if image.mode != "RGB" else image
+
+
+def _tile_origins(length: int, side: int, overlap: int) -> List[int]:
+    if length <= side:
+        return [0]
+    step = side - overlap
+    origins = list(range(0, length - side, step))
+    origins.append(length - side)
+    return origins
+
+
+def prepare_image(
+    image_path: str,
+    max_long_side: int = MAX_LONG_SIDE,
+    min_long_side: int = MIN_LONG_SIDE,
+    tile_side: int = TILE_SIDE,
+    overlap: int = TILE_OVERLAP,
+    blank_std: float = BLANK_STD,
+) -> PreparedImage:
+    with Image.open(image_path) as source:
+        original_size = source.size
+        long_side = max(source.size)
+        scale = 1.0
+        if long_side > max_long_side:
+            scale = max_long_side / long_side
+            source.draft("RGB", (round(source.width * scale), round(source.height * scale)))  # JPEG: decode at 1/2, 1/4 or 1/8
+        elif long_side < min_long_side:
+            scale = min(MAX_UPSCALE, min_long_side / long_side)
+        image = _to_rgb(ImageOps.exif_transpose(source))
+    target_long = max(1, round(long_side * scale))
+    if max(image.size) != target_long:
+        factor = target_long / max(image.size)
+        size = (max(1, round(image.width * factor)), max(1, round(image.height * factor)))
+        image = image.resize(size, Image.LANCZOS if factor < 1 else Image.BICUBIC)
+
+    pixels = np.asarray(image)
+    height, width = pixels.shape[:2]
+    if tile_side <= 0 or max(width, height) <= tile_side * 2:
+        return PreparedImage([Tile(np.ascontiguousarray(pixels[:, :, ::-1]), 0, 0)], original_size, (width, height), scale)
+
+    grey = np.asarray(image.convert("L"))
+    tiles, skipped = [], 0
+    for y in _tile_origins(height, tile_side, overlap):
+        for x in _tile_origins(width, tile_side, overlap):
+            if float(grey[y:y + tile_side, x:x + tile_side].std()) < blank_std:
+                skipped += 1
+                continue
+            tile = pixels[y:y + tile_side, x:x + tile_side, ::-1]
+            tiles.append(Tile(np.ascontiguousarray(tile), x, y))
+    return PreparedImage(tiles, original_size, (width, height), scale, skipped)
+
+
+def _same_row(a: OCRLine, b: OCRLine) -> bool:
+    overlap = min(a.y1, b.y1) - max(a.y0, b.y0)
+    return overlap > 0.5 * min(a.height, b.height)
+
+
+def _stitch(left: str, right: str) -> str:
+    """Join two pieces of one line cut at a tile edge, dropping the text both pieces read in the overlap"""
+    for n in range(min(len(left), len(right)), 1, -1):
+        if left.endswith(right[:n]):
+            return left + right[n:]  # "RECYCLABLE PACKAGIN" + "GING" -> "RECYCLABLE PACKAGING"
+    return f"{left} {right}"
+
+
+def merge_lines(lines: Sequence[OCRLine]) -> List[OCRLine]:
+    """Drop duplicates from tile overlaps, stitch lines cut at tile edges, order top-down then left-right"""
+    merged: List[OCRLine] = []
+    for line in sorted(lines, key=lambda l: (-len(l.text), -l.score)):
+        keep = True
+        for i, other in enumerate(merged):
+            if other.tile == line.tile or not _same_row(line, other):
+                continue
+            if min(line.x1, other.x1) - max(line.x0, other.x0) <= 0:
+                continue
+            inter = (min(line.x1, other.x1) - max(line.x0, other.x0)) * (
+                min(line.y1, other.y1) - max(line.y0, other.y0))
+            if line.text in other.text or inter >= 0.9 * line.area:
+                keep = False  # the same text seen again in the overlap
+                break
+            # two pieces of one line cut at a tile edge
+            left, right = (other, line) if other.x0 <= line.x0 else (line, other)
+            box = np.array([[min(left.x0, right.x0), min(left.y0, right.y0)], [max(left.x1, right.x1), min(left.y0, right.y0)],
+                            [max(left.x1, right.x1), max(left.y1, right.y1)], [min(left.x0, right.x0), max(left.y1, right.y1)]])
+            merged[i] = OCRLine(box, _stitch(left.text, right.text), min(left.score, right.score), tile=-1)
+            keep = False
+            break
+        if keep:
+            merged.append(line)
+
+    merged.sort(key=lambda l: (l.y0, l.x0))
+    ordered: List[OCRLine] = []
+    row: List[OCRLine] = []
+    for line in merged:
+        if row and not _same_row(row[0], line):
+            ordered += sorted(row, key=lambda l: l.x0)
+            row = []
+        row.append(line)
+    return ordered + sorted(row, key=lambda l: l.x0)
@@ -1,17 +1,65 @@
 # app/core/ocr_service.py
+import os
 import re
-from typing import Any, Dict, List
-from rapidocr import RapidOCR, EngineType, LangDet, LangRec, ModelType, OCRVersion
+import threading
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 import wordninja
 from spellchecker import SpellChecker
+from gw_api.core.lazy import lazy_singleton
+from gw_api.core.ocr_preprocess import PREPROCESS, OCRLine, merge_lines, prepare_image
 
-class OCRService:
+# Cleaning limits (see OCRTextCleaner)
+CLEAN_CACHE_SIZE = int(os.getenv("OCR_CLEAN_CACHE_SIZE", "50000"))          # memoized splits/corrections per kind
+SPELL_MIN_FREQUENCY = int(os.getenv("OCR_SPELL_MIN_FREQUENCY", "0"))         # distance-2 candidates must be this common
+SPELL_MAX_CORRECTIONS = int(os.getenv("OCR_SPELL_MAX_CORRECTIONS", "500"))   # dictionary searches per document
+
+
+def _letter_mask(word: str) -> int:
+    # Letters sharing a bit only make masks more alike, so the prefilter never rejects a real candidate
+    mask = 0
+    for ch in word:
+        mask |= 1 << (ord(ch) & 63)
+    return mask
+
+
+def _strip_diacritics(word: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", word) if not unicodedata.combining(c))
+
+
+def _within_two_edits(a: str, b: str) -> bool:
+    """Optimal string alignment distance (insert/delete/replace/adjacent swap) of at most 2"""
+    if abs(len(a) - len(b)) > 2:
+        return False
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            d = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d = min(d, prev2[j - 2] + 1)
+            cur[j] = d
+        if min(cur) > 2:
+            return False
+        prev2, prev = prev, cur
+    return prev[-1] <= 2
+
+
+class OCRTextCleaner:
     """
-    RapidOCR v3 (ONNXRuntime) + General Cleaning:
-    - Recognition language: LATIN (including EN/DE/IT etc.)
-    - Cleaning modes:
+    Cleaning of OCR lines, independent of the OCR engine:
         mode="smart"  Use wordninja tokenization + mild English spell correction (ASCII English words only) Can be more aggressive, but may "over-correct".
         mode="basic"  Normalize whitespace/punctuation only (safest across languages)  Now set to default. Safer for short slogans / packaging text.
+
+    Smart mode is kept cheap on large documents: wordninja splits and spelling corrections are memoized per token,
+    and a document gets at most SPELL_MAX_CORRECTIONS dictionary searches (unknown tokens beyond that are left as
+    they are). Distance-2 corrections no longer generate every two-edit string: dictionary words of similar length
+    are tried most frequent first (letter-set prefilter) and a length stops at its first match, since nothing after
+    it can win. OCR_SPELL_MIN_FREQUENCY drops rarer words from that search (0 keeps SpellChecker's results).
     """
     SAFE_TOKENS = {"H2COCO", "H2COCONUT.COM"}
     SAFE_PATTERNS = [
@@ -21,41 +69,50 @@ class OCRService:
         re.compile(r"^(?=.*[0-9-])[A-Z0-9-]{2,}$"),                       # Model/code (must contain numbers/hyphen)
     ]
 
-    def __init__(self, det_lang: str = "MULTI", rec_lang: str = "LATIN") -> None:
-        self.engine = RapidOCR(params={
-            "Det.engine_type": EngineType.ONNXRUNTIME,
-            "Det.lang_type":   getattr(LangDet, det_lang),
-            "Det.model_type":  ModelType.MOBILE,
-            "Det.ocr_version": OCRVersion.PPOCRV4,
-            "Rec.engine_type": EngineType.ONNXRUNTIME,
-            "Rec.lang_type":   getattr(LangRec, rec_lang),
-            "Rec.model_type":  ModelType.MOBILE,
-            "Rec.ocr_version": OCRVersion.PPOCRV5,
-        })
-        # Only used for English spell correction; DE/IT and other non-ASCII words are left unchanged
+    # Precompiled patterns (these used to be compiled or looked up in re's cache on every line/token)
+    WS = re.compile(r"\s+")
+    SPACE_BEFORE_PUNCT = re.compile(r"\s+([,.:;!?])")
+    AMPERSAND = re.compile(r"\s*&\s*")
+    DOMAIN_GLUE = re.compile(r"(\.[A-Za-z]{2,})(?=[A-Za-z])")
+    CAMEL = re.compile(r"(?<=[a-z])(?=[A-Z])")
+    TOKEN_PUNCT = re.compile(r"^([A-Za-zÀ-ÖØ-öø-ÿ&'\-0-9.]+)([.,!?]*)$")
+    HYPHEN_BREAK = re.compile(r"(\w)-\s+(\w)")
+    CONTRACTION = re.compile(r"\b([A-Za-z]+)\s+'\s*(s|re|ve|ll|d|t)\b", re.IGNORECASE)
+    WORDS = re.compile(r"[^\W\d_]+|\d+|[^\w\s]", re.UNICODE)
+    NO_SPACE_BEFORE = re.compile(r"[,.!?;:)]$")
+    NO_SPACE_AFTER = re.compile(r"^[(']")
+    FIXES = [
+        (re.compile(r"\bCAN\s*S\s+CAN\b", re.IGNORECASE), "CANS CAN"),
+        (re.compile(r"\bRECYCLE\s*D?\b", re.IGNORECASE), "RECYCLED"),
+        (re.compile(r"\bPACKAGING\s+WILL\b", re.IGNORECASE), "PACKAGING WILL"),
+        (re.compile(r"\bAMOUNT\s+OF\s+PLASTIC\b", re.IGNORECASE), "AMOUNT OF PLASTIC"),
+        (re.compile(r"\bOUR\s+OCEANS\b", re.IGNORECASE), "OUR OCEANS"),
+    ]
+    VERB_ED = re.compile(r"\b([A-Za-z]{3,})\s+[eoEO]\b\s+(from|in|on|by|at|to)\b")
 
+    def __init__(
+        self,
+        cache_size: int = CLEAN_CACHE_SIZE,
+        min_frequency: int = SPELL_MIN_FREQUENCY,
+        max_corrections: int = SPELL_MAX_CORRECTIONS,
+    ) -> None:
+        # Only used for English spell correction; DE/IT and other non-ASCII words are left unchanged
         self.spell_en = SpellChecker(language="en")
-
-    #  External Call 
-    def read(self, image_path: str, mode: str = "smart") -> Dict[str, Any]:
-        r = self.engine(image_path)
-        lines: List[str] = list(r.txts or [])
-        scores: List[float] = [float(s) for s in (r.scores or [])]
-        out: Dict[str, Any] = {
-            "elapsed_sec": float(getattr(r, "elapse", 0.0) or 0.0),
-            "lines": lines,
-            "scores": scores,
-            "full_text": "\n".join(lines),
-        }
-        cleaned = self._clean_lines(lines, mode=mode)
-        out["cleaned_lines"] = cleaned
-        out["cleaned_text"] = "\n".join(cleaned)
-        out["clean_mode"] = mode
-        return out
+        self.min_frequency = min_frequency
+        self.max_corrections = max_corrections
+        self._frequent: Optional[Dict[int, List[Tuple[str, int, int]]]] = None
+        self._frequent_lock = threading.Lock()
+        # Per-token memoization; the cleaner lives as long as its OCRService
+        self._split_allcaps_token = lru_cache(maxsize=cache_size)(self._split_allcaps_token)
+        self._split_token_general = lru_cache(maxsize=cache_size)(self._split_token_general)
+        # Spelling corrections get their own LRU so the per-document cap can tell memoized words from new searches
+        self.cache_size = cache_size
+        self._corrections: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self._corrections_lock = threading.Lock()
 
     # Cleaning Implementation
-    @staticmethod
-    def _basic_normalize(text: str) -> str:
+    @classmethod
+    def _basic_normalize(cls, text: str) -> str:
         # Use Unicode letter classes to avoid breaking ä/ö/ü/ß/à/è etc.
         """
         Basic whitespace/punctuation normalization.
@@ -64,15 +121,15 @@ class OCRService:
         breaking chemical formulas or brand names like H2.
         """
         t = text.strip()
-        t = re.sub(r"\s+", " ", t)
+        t = cls.WS.sub(" ", t)
         t = t.replace("’", "'").replace("—", "-")
        # Removed: splitting letter+digit → caused "H2" → "H 2"
        # t = re.sub(r"([^\W\d_])(\d)", r"\1 \2", t)  # A1 -> A 1
        # t = re.sub(r"(\d)([^\W\d_])", r"\1 \2", t)  # 1A -> 1 A
-        t = re.sub(r"\s+([,.:;!?])", r"\1", t)
-        t = re.sub(r"\s*&\s*", " & ", t)
+        t = cls.SPACE_BEFORE_PUNCT.sub(r"\1", t)
+        t = cls.AMPERSAND.sub(" & ", t)
         # Break after domain if followed by letters: .comAB -> .com AB
-        t = re.sub(r"(\.[A-Za-z]{2,})(?=[A-Za-z])", r"\1 ", t)
+        t = cls.DOMAIN_GLUE.sub(r"\1 ", t)
         return t
 
     def _is_safe_token(self, tok: str) -> bool:
@@ -95,7 +152,7 @@ class OCRService:
         # Split CamelCase + use wordninja for "ASCII long lowercase runs" (avoid splitting DE/IT umlaut words)
         if self._is_safe_token(tok):
             return tok
-        camel = re.sub(r"(?<=[a-z])(?=[A-Z])", " ", tok)
+        camel = self.CAMEL.sub(" ", tok)
         segs, out = camel.split(), []
         for seg in segs:
             core = seg.replace("'", "").replace("-", "")
@@ -114,14 +171,14 @@ class OCRService:
         toks = line.split()
         out = []
         for t in toks:
-            m = re.match(r"^([A-Za-zÀ-ÖØ-öø-ÿ&'\-0-9.]+)([.,!?]*)$", t)
+            m = self.TOKEN_PUNCT.match(t)
             core, punct = (m.group(1), m.group(2)) if m else (t, "")
             core = self._split_allcaps_token(core)
             core = self._split_token_general(core)
             out.append(core + punct)
         s = " ".join(out)
         s = self._basic_normalize(s)
-        s = re.sub(r"(\w)-\s+(\w)", r"\1- \2", s)  # plants-\ncom → plants- com
+        s = self.HYPHEN_BREAK.sub(r"\1- \2", s)  # plants-\ncom → plants- com
         return s
 
     def _preserve_case(self, src: str, dst: str) -> str:
@@ -129,9 +186,63 @@ class OCRService:
         if src.istitle(): return dst.capitalize()
         return dst
 
+    def _frequent_words(self) -> Dict[int, List[Tuple[str, int, int]]]:
+        """Dictionary words seen at least min_frequency times, by length, most frequent first"""
+        if self._frequent is None:
+            with self._frequent_lock:
+                if self._frequent is None:
+                    by_len: Dict[int, List[Tuple[str, int, int]]] = {}
+                    for word, freq in self.spell_en.word_frequency.dictionary.items():
+                        if freq >= self.min_frequency and word.isalpha():
+                            by_len.setdefault(len(word), []).append((word, freq, _letter_mask(word)))
+                    for words in by_len.values():
+                        words.sort(key=lambda x: (-x[1], x[0]))
+                    self._frequent = by_len
+        return self._frequent
+
+    def _distance2_candidate(self, word: str) -> Optional[str]:
+        # Every edit changes at most two letters of the letter set, so two edits change at most four
+        mask = _letter_mask(word)
+        frequent = self._frequent_words()
+        best, best_freq = None, 0
+        for length in range(len(word) - 2, len(word) + 3):
+            for cand, freq, cand_mask in frequent.get(length, ()):
+                if freq < best_freq:
+                    break
+                if (mask ^ cand_mask).bit_count() <= 4 and _within_two_edits(word, cand):
+                    if best is None or freq > best_freq or cand < best:
+                        best, best_freq = cand, freq
+                    break
+        return best
+
+    def _correction(self, word: str) -> Optional[str]:
+        """SpellChecker.correction() for a lowercase ASCII word, with the distance-2 step bounded by frequency"""
+        if len(word) > self.spell_en.word_frequency.longest_word_length + 3:
+            return word
+        known = self.spell_en.known(self.spell_en.edit_distance_1(word))
+        if known:
+            # like SpellChecker, prefer the same word with diacritics (tenne -> tenné) over other edits
+            accented = [c for c in known if _strip_diacritics(c) == word]
+            return max(accented or known, key=self.spell_en.__getitem__)
+        return self._distance2_candidate(word)
+
+    def _memoized_correction(self, word: str) -> Tuple[bool, Optional[str]]:
+        with self._corrections_lock:
+            if word in self._corrections:
+                self._corrections.move_to_end(word)
+                return True, self._corrections[word]
+        return False, None
+
+    def _remember_correction(self, word: str, corr: Optional[str]) -> None:
+        with self._corrections_lock:
+            self._corrections[word] = corr
+            if len(self._corrections) > self.cache_size:
+                self._corrections.popitem(last=False)
+
     def _spell_fix_tokens_en(self, tokens: List[str]) -> List[str]:
         # Apply English spell correction only to "ASCII letters"; leave DE/IT words unchanged
         fixed: List[str] = []
+        searches = 0
         for tok in tokens:
             if not tok.isascii() or not tok.isalpha() or len(tok) < 3 or self._is_safe_token(tok):
                 fixed.append(tok); continue
@@ -142,15 +253,23 @@ class OCRService:
                     fixed.append(self._preserve_case(tok, cand)); continue
             if tok.lower() in self.spell_en:
                 fixed.append(tok); continue
-            corr = self.spell_en.correction(tok.lower())
+            word = tok.lower()
+            found, corr = self._memoized_correction(word)
+            if not found:
+                # Past max_corrections dictionary searches, only memoized corrections are applied
+                if searches >= self.max_corrections:
+                    fixed.append(tok); continue
+                searches += 1
+                corr = self._correction(word)
+                self._remember_correction(word, corr)
             fixed.append(self._preserve_case(tok, corr) if corr else tok)
         return fixed
 
     def _join_contractions(self, text: str) -> str:
         # Normalize YOU ' RE → YOU'RE; also general s/re/ve/ll/d/t cases
-        return re.sub(r"\b([A-Za-z]+)\s+'\s*(s|re|ve|ll|d|t)\b", r"\1'\2", text, flags=re.IGNORECASE)
+        return self.CONTRACTION.sub(r"\1'\2", text)
 
-    def _clean_lines(self, lines: List[str], mode: str = "basic") -> List[str]:
+    def clean(self, lines: List[str], mode: str = "basic") -> List[str]:
         # 1) Line-level cleaning
         if mode == "basic":
             cleaned = [self._basic_normalize(x) for x in lines if x and x.strip()]
@@ -162,34 +281,27 @@ class OCRService:
         para = self._join_contractions(para)
 
         # 2) Word-level correction (ASCII English only), no effect on DE/IT umlaut words
-        tokens = re.findall(r"[^\W\d_]+|\d+|[^\w\s]", para, flags=re.UNICODE)
+        tokens = self.WORDS.findall(para)
         tokens = self._spell_fix_tokens_en(tokens)
 
         # 3) Rebuild sentence: no space before punctuation
         out: List[str] = []
         for i, t in enumerate(tokens):
-            if i > 0 and not re.match(r"[,.!?;:)]$", t) and not re.match(r"^[(']", t):
+            if i > 0 and not self.NO_SPACE_BEFORE.match(t) and not self.NO_SPACE_AFTER.match(t):
                 out.append(" ")
             out.append(t)
         para = self._basic_normalize("".join(out))
 
         # 4) Mild general fixes
-        fixes = [
-            (r"\bCAN\s*S\s+CAN\b", "CANS CAN"),
-            (r"\bRECYCLE\s*D?\b", "RECYCLED"),
-            (r"\bPACKAGING\s+WILL\b", "PACKAGING WILL"),
-            (r"\bAMOUNT\s+OF\s+PLASTIC\b", "AMOUNT OF PLASTIC"),
-            (r"\bOUR\s+OCEANS\b", "OUR OCEANS"),
-        ]
-        for pat, rep in fixes:
-            para = re.sub(pat, rep, para, flags=re.IGNORECASE)
+        for pat, rep in self.FIXES:
+            para = pat.sub(rep, para)
 
         # 5) Morphology: <verb> e/o + preposition → <verb>ed + preposition (only if accepted by English dict)
         def verb_ed_fix(m):
             base, prep = m.group(1), m.group(2)
             cand = base + "ed"
             return f"{cand} {prep}" if self.spell_en.known([cand]) else f"{base} {prep}"
-        para = re.sub(r"\b([A-Za-z]{3,})\s+[eoEO]\b\s+(from|in|on|by|at|to)\b", verb_ed_fix, para)
+        para = self.VERB_ED.sub(verb_ed_fix, para)
 
         # 6) Sentence segmentation output
         #parts = re.split(r"(?<=[.!?])\s+", para)
@@ -197,5 +309,70 @@ class OCRService:
         #return parts
         return [para] if para.strip() else []
 
-# In-process singleton (default = smart cleaning; switch to mode=basic in routes to disable enhanced cleaning)
-ocr_service = OCRService(det_lang="MULTI", rec_lang="LATIN")
+
+class OCRService:
+    """
+    RapidOCR v3 (ONNXRuntime) + General Cleaning (OCRTextCleaner):
+    - Recognition language: LATIN (including EN/DE/IT etc.)
+    - Cleaning modes: "smart" (default here) or "basic", see OCRTextCleaner
+    - Input scaled / tiled first unless preprocess=False, see ocr_preprocess
+    """
+
+    def __init__(self, det_lang: str = "MULTI", rec_lang: str = "LATIN", preprocess: bool = PREPROCESS) -> None:
+        from rapidocr import RapidOCR, EngineType, LangDet, LangRec, ModelType, OCRVersion
+
+        self.engine = RapidOCR(params={
+            "Det.engine_type": EngineType.ONNXRUNTIME,
+            "Det.lang_type":   getattr(LangDet, det_lang),
+            "Det.model_type":  ModelType.MOBILE,
+            "Det.ocr_version": OCRVersion.PPOCRV4,
+            "Rec.engine_type": EngineType.ONNXRUNTIME,
+            "Rec.lang_type":   getattr(LangRec, rec_lang),
+            "Rec.model_type":  ModelType.MOBILE,
+            "Rec.ocr_version": OCRVersion.PPOCRV5,
+        })
+        self.cleaner = OCRTextCleaner()
+        self.preprocess = preprocess
+
+    def _recognize(self, image_path: str) -> Tuple[List[str], List[float], float, Optional[Dict[str, Any]]]:
+        if not self.preprocess:
+            r = self.engine(image_path)
+            return list(r.txts or []), [float(s) for s in (r.scores or [])], float(getattr(r, "elapse", 0.0) or 0.0), None
+
+        prepared = prepare_image(image_path)
+        found: List[OCRLine] = []
+        elapsed = 0.0
+        for index, tile in enumerate(prepared.tiles):
+            r = self.engine(tile.image)
+            elapsed += float(getattr(r, "elapse", 0.0) or 0.0)
+            if r.boxes is None:
+                continue
+            for box, text, score in zip(r.boxes, r.txts or [], r.scores or []):
+                found.append(OCRLine(box + (tile.x, tile.y), text, float(score), tile=index))
+        # a single tile keeps RapidOCR's own line order
+        lines = merge_lines(found) if len(prepared.tiles) > 1 else found
+        return [l.text for l in lines], [l.score for l in lines], elapsed, prepared.summary()
+
+    #  External Call
+    def read(self, image_path: str, mode: str = "smart") -> Dict[str, Any]:
+        lines, scores, elapsed, prepared = self._recognize(image_path)
+        out: Dict[str, Any] = {
+            "elapsed_sec": elapsed,
+            "lines": lines,
+            "scores": scores,
+            "full_text": "\n".join(lines),
+        }
+        if prepared is not None:
+            out["preprocess"] = prepared
+        cleaned = self.cleaner.clean(lines, mode=mode)
+        out["cleaned_lines"] = cleaned
+        out["cleaned_text"] = "\n".join(cleaned)
+        out["clean_mode"] = mode
+        return out
+
+
+# In-process instance, built on first use (default = smart cleaning; switch to mode=basic in routes to disable
+# enhanced cleaning). Uploads go through gw_api.core.ocr_pool, whose worker processes hold their own instances.
+@lazy_singleton("ocr")
+def get_ocr_service() -> OCRService:
+    return OCRService(det_lang="MULTI", rec_lang="LATIN")
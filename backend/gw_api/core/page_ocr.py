@@ -0,0 +1,157 @@
+"""
+OCR for scanned documents
+Gives scanned PDFs and multi-page TIFFs the same page list a born-digital PDF
+has. PDF pages whose text layer is (nearly) empty are rasterized and OCRed;
+every frame of a TIFF is OCRed, not just the first. Pages go through the OCR
+worker pool (gw_api.core.ocr_pool) in parallel, and each OCRed page is marked
+with metadata ocr=True.
+
+Pages are rasterized with pypdfium2 (a project dependency). Without it the
+largest image embedded in the page is used, which is what a scanner produces.
+
+    OCR_MAX_PAGES       pages OCRed per document; later textless pages stay empty (30)
+    OCR_PAGE_TIMEOUT_S  OCR limit per page (60)
+    OCR_RENDER_DPI      resolution textless PDF pages are rendered at (200)
+    OCR_MIN_PAGE_CHARS  extracted characters below which a PDF page counts as textless (20)
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from PIL import Image, ImageSequence
+
+from gw_api.core.ocr_pool import OCRError, OCRQueueFull, get_ocr_pool
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+MAX_PAGES = int(os.getenv("OCR_MAX_PAGES", "30"))
+PAGE_TIMEOUT_S = float(os.getenv("OCR_PAGE_TIMEOUT_S", "60"))
+RENDER_DPI = int(os.getenv("OCR_RENDER_DPI", "200"))
+MIN_PAGE_CHARS = int(os.getenv("OCR_MIN_PAGE_CHARS", "20"))
+QUEUE_RETRY_S = 0.5
+
+
+def textless_pages(page_texts: Sequence[str], min_chars: int = MIN_PAGE_CHARS) -> List[int]:
+    return [i for i, text in enumerate(page_texts) if len((text or "").strip()) < min_chars]
+
+
+def _largest_embedded_image(page) -> Optional[Image.Image]:
+    best = None
+    for image_file in page.images:
+        image = image_file.image
+        if image is not None and (best is None or image.width * image.height > best.width * best.height):
+            best = image
+    return best
+
+
+def render_pdf_pages(file_path: str, pages: Sequence[int], out_dir: Path, dpi: int = RENDER_DPI) -> Dict[int, Path]:
+    """PNG per page index; pages that cannot be rendered are left out"""
+    rendered: Dict[int, Path] = {}
+    if pdfium is not None:
+        pdf = pdfium.PdfDocument(file_path)
+        close = pdf.close
+
+        def page_image(index: int) -> Optional[Image.Image]:
+            return pdf[index].render(scale=dpi / 72).to_pil()
+    else:
+        from pypdf import PdfReader
+
+        reader = PdfReader(file_path)  # parsed once for all pages
+        close = None
+
+        def page_image(index: int) -> Optional[Image.Image]:
+            return _largest_embedded_image(reader.pages[index])
+    try:
+        for index in pages:
+            try:
+                image = page_image(index)
+                if image is None:
+                    continue
+                path = out_dir / f"page_{index:04d}.png"
+                image.convert("RGB").save(path)
+                rendered[index] = path
+            except Exception as e:
+                print(f"[OCR] could not rasterize page {index + 1} of {Path(file_path).name}: {e}")
+    finally:
+        if close is not None:
+            close()
+    return rendered
+
+
+def split_frames(file_path: str, out_dir: Path, max_frames: int = MAX_PAGES) -> List[Path]:
+    """One PNG per frame of a multi-frame image (TIFF); [] for single-frame images"""
+    with Image.open(file_path) as image:
+        if getattr(image, "n_frames", 1) <= 1:
+            return []
+        paths = []
+        for index, frame in enumerate(ImageSequence.Iterator(image)):
+            if index >= max_frames:
+                break
+            path = out_dir / f"frame_{index:04d}.png"
+            frame.convert("RGB").save(path)
+            paths.append(path)
+        return paths
+
+
+async def _ocr_page(path: Path, timeout_s: float, deadline: float) -> str:
+    pool = get_ocr_pool()
+    while True:
+        try:
+            out = await pool.read(str(path), mode="smart", timeout_s=timeout_s)
+            return (out.get("cleaned_text") or out.get("full_text") or "").strip()
+        except OCRQueueFull:
+            # other uploads hold the queue; wait for room rather than failing the page
+            if time.monotonic() >= deadline:
+                raise
+            await asyncio.sleep(QUEUE_RETRY_S)
+
+
+async def ocr_pages(paths: Sequence[Path], timeout_s: float = PAGE_TIMEOUT_S) -> List[Optional[str]]:
+    """OCR text per image, None for pages that failed; as many pages in flight as there are OCR workers"""
+    slots = asyncio.Semaphore(max(1, get_ocr_pool().workers))
+    deadline = time.monotonic() + timeout_s * max(1, len(paths))
+
+    async def one(path: Path) -> Optional[str]:
+        async with slots:
+            try:
+                return await _ocr_page(path, timeout_s, deadline)
+            except OCRError as e:
+                print(f"[OCR] {path.name} failed: {e}")
+                return None
+
+    return await asyncio.gather(*(one(p) for p in paths))
+
+
+async def ocr_image_pages(file_path: str) -> List[str]:
+    """OCR text of every frame of an uploaded image; errors of a single-frame image are raised"""
+    with tempfile.TemporaryDirectory(prefix="gw_ocr_") as tmp:
+        frames = await asyncio.to_thread(split_frames, file_path, Path(tmp))
+        if not frames:
+            out = await get_ocr_pool().read(file_path, mode="smart", timeout_s=PAGE_TIMEOUT_S)
+            return [(out.get("cleaned_text") or out.get("full_text") or "").strip()]
+        texts = await ocr_pages(frames)
+    if all(text is None for text in texts):
+        raise OCRError(f"OCR failed for all {len(texts)} pages of {Path(file_path).name}")
+    return [text or "" for text in texts]
+
+
+async def ocr_textless_pdf_pages(file_path: str, page_texts: Sequence[str]) -> Dict[int, str]:
+    """OCR text of the PDF pages without a usable text layer, by page index (first MAX_PAGES of them)"""
+    pages = textless_pages(page_texts)
+    if not pages:
+        return {}
+    if len(pages) > MAX_PAGES:
+        print(f"[OCR] {Path(file_path).name}: {len(pages)} pages without text, OCR limited to the first {MAX_PAGES}")
+        pages = pages[:MAX_PAGES]
+    with tempfile.TemporaryDirectory(prefix="gw_ocr_") as tmp:
+        rendered = await asyncio.to_thread(render_pdf_pages, file_path, pages, Path(tmp))
+        indexes = list(rendered)
+        texts = await ocr_pages([rendered[i] for i in indexes])
+    return {i: text for i, text in zip(indexes, texts) if text}
@@ -0,0 +1,107 @@
+"""
+Pipeline stage timing
+`stage(name)` marks a section of the upload/analysis path. Every stage opens a
+trace span, feeds the gw_stage_duration_seconds histogram and names the call
+site for LLM metrics; when a recorder is active (see `recording()`), which the benchmark suite uses,
+wall and CPU time per stage are collected as well.
+"""
+
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from gw_api.core.metrics import stage_seconds
+from gw_api.core.tracing import span
+
+
+class StageRecorder:
+    """Accumulates timings per stage name; safe to share across threads/tasks"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.order: List[str] = []
+
+    def add(self, name: str, wall_s: float, cpu_s: float) -> None:
+        with self._lock:
+            stat = self.stages.get(name)
+            if stat is None:
+                stat = {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "wall_s_max": 0.0}
+                self.stages[name] = stat
+                self.order.append(name)
+            stat["calls"] += 1
+            stat["wall_s"] += wall_s
+            stat["cpu_s"] += cpu_s
+            stat["wall_s_max"] = max(stat["wall_s_max"], wall_s)
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: dict(self.stages[name]) for name in self.order}
+
+
+_recorder: ContextVar[Optional[StageRecorder]] = ContextVar("stage_recorder", default=None)
+_current_stage: ContextVar[str] = ContextVar("current_stage", default="other")
+
+
+def current_stage() -> str:
+    """Innermost active stage name, used as the call-site label of LLM metrics"""
+    return _current_stage.get()
+
+
+@contextmanager
+def recording(recorder: Optional[StageRecorder] = None):
+    """Collect stage timings for everything run inside the block"""
+    recorder = recorder or StageRecorder()
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    recorder = _recorder.get()
+    token = _current_stage.set(name)
+    outcome = "ok"
+    wall0 = time.perf_counter()
+    cpu0 = time.process_time() if recorder is not None else 0.0
+    try:
+        with span(name):
+            yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        _current_stage.reset(token)
+        wall = time.perf_counter() - wall0
+        stage_seconds.observe(wall, stage=name, outcome=outcome)
+        if recorder is not None:
+            recorder.add(name, wall, time.process_time() - cpu0)
+
+
+def timed(name: str) -> Callable:
+    """Decorator form of `stage` for sync and async callables"""
+
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with stage(name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with stage(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
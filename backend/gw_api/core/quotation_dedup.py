@@ -0,0 +1,227 @@
+"""
+Near-duplicate quotation collapsing
+Clusters quotations that quote the same report sentence with slightly different
+boundaries (MinHash/LSH over character shingles), keeps one representative per
+cluster and records the mapping so every source can still be cited.
+
+LSH only surfaces pairs of similar length, so a short quotation that is a
+sub-span of a longer one is found separately: an inverted word index looked up
+with the short quotation's rarest words (prefix filtering) yields every longer
+quotation that can contain CONTAINMENT_THRESHOLD of its words.
+"""
+
+import math
+import re
+import unicodedata
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+SHINGLE_SIZE = 5  # character shingles over normalized text
+NUM_PERM = 64  # MinHash signature length
+LSH_BANDS = 16  # 16 bands x 4 rows -> candidates from ~0.5 Jaccard upwards
+JACCARD_THRESHOLD = 0.6  # same sentence, different wording at the edges
+CONTAINMENT_THRESHOLD = 0.85  # one quotation is (almost) a sub-span of another
+MIN_CONTAINMENT_WORDS = 5  # shorter fragments ("net zero") would chain unrelated quotations
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed coefficients keep signatures identical across processes
+_PERMUTATIONS: List[Tuple[int, int]] = [
+    (
+        (zlib.crc32(f"a{i}".encode()) * 2654435761 + 1) % _MERSENNE_PRIME,
+        (zlib.crc32(f"b{i}".encode()) * 40503) % _MERSENNE_PRIME,
+    )
+    for i in range(NUM_PERM)
+]
+
+_NON_WORD = re.compile(r"[^\w\s%]", re.UNICODE)
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_quotation(text: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    text = unicodedata.normalize("NFKC", str(text or "")).lower()
+    text = text.replace("’", "'")
+    text = _NON_WORD.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def shingle(text: str, k: int = SHINGLE_SIZE) -> Set[int]:
+    """Hashed character k-shingles of normalized text"""
+    if not text:
+        return set()
+    if len(text) <= k:
+        return {zlib.crc32(text.encode("utf-8"))}
+    return {
+        zlib.crc32(text[i : i + k].encode("utf-8")) for i in range(len(text) - k + 1)
+    }
+
+
+def minhash_signature(shingles: Set[int]) -> Tuple[int, ...]:
+    if not shingles:
+        return tuple([_MAX_HASH] * NUM_PERM)
+    return tuple(
+        min(((a * s + b) % _MERSENNE_PRIME) & _MAX_HASH for s in shingles)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def _similar(a: Set[int], b: Set[int]) -> bool:
+    if not a or not b:
+        return False
+    overlap = len(a & b)
+    if overlap / len(a | b) >= JACCARD_THRESHOLD:
+        return True
+    return overlap / min(len(a), len(b)) >= CONTAINMENT_THRESHOLD
+
+
+def _containment_candidates(tokens: List[List[str]]) -> Iterator[Tuple[int, int]]:
+    """(short, long) index pairs where `long` contains most of the words of `short`"""
+    words = [set(t) for t in tokens]
+    doc_freq = Counter(w for ws in words for w in ws)
+    postings: Dict[str, List[int]] = {}
+    for idx, ws in enumerate(words):
+        for w in ws:
+            postings.setdefault(w, []).append(idx)
+
+    for i, toks in enumerate(tokens):
+        if len(toks) < MIN_CONTAINMENT_WORDS:
+            continue
+        # The first and last word may be cut mid-word by a different span boundary
+        inner = set(toks[1:-1])
+        # A container shares >= `need` of them, so it has one of the len - need + 1 rarest
+        need = math.ceil(CONTAINMENT_THRESHOLD * len(inner))
+        prefix = sorted(inner, key=lambda w: (doc_freq[w], w))[: len(inner) - need + 1]
+        seen: Set[int] = set()
+        for w in prefix:
+            for j in postings[w]:
+                if j == i or j in seen or len(words[j]) < len(words[i]):
+                    continue
+                seen.add(j)
+                if len(inner & words[j]) >= need:
+                    yield i, j
+
+
+def _score(q: Dict[str, Any]) -> float:
+    try:
+        return float(q.get("greenwashing_likelihood_score", 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _is_true(value: Any) -> bool:
+    return str(value).strip().lower() == "true"
+
+
+def _unique(values: List[Any]) -> List[str]:
+    seen, out = set(), []
+    for v in values:
+        text = str(v or "").strip()
+        if text and text.lower() not in seen:
+            seen.add(text.lower())
+            out.append(text)
+    return out
+
+
+def _pages(members: List[Dict[str, Any]]) -> List[int]:
+    pages = set()
+    for q in members:
+        try:
+            pages.add(int(q.get("page")))
+        except (TypeError, ValueError):
+            continue
+    return sorted(pages)
+
+
+def _merge_cluster(members: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # Representative: highest score, then the longest (most complete) quotation
+    rep = max(members, key=lambda q: (_score(q), len(str(q.get("quotation", "")))))
+    merged = dict(rep)
+    if len(members) == 1:
+        return merged
+
+    merged["explanation"] = "\n".join(_unique([q.get("explanation") for q in members]))
+    merged["verification_required"] = any(
+        _is_true(q.get("verification_required")) for q in members
+    )
+    merged["data_needed"] = "; ".join(_unique([q.get("data_needed") for q in members]))
+    merged["verification_method"] = "; ".join(
+        _unique([q.get("verification_method") for q in members])
+    )
+    merged["merged_quotations"] = _unique([q.get("quotation") for q in members])
+    merged["pages"] = _pages(members)
+    return merged
+
+
+def dedupe_quotations(
+    quotations: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Collapse near-duplicate quotations.
+
+    Returns the deduplicated quotations (input order of first occurrence) and the
+    cluster mapping: one entry per kept quotation with the indices and texts of
+    every original quotation it represents.
+    """
+    items = [q for q in quotations if isinstance(q, dict)]
+    n = len(items)
+    if n == 0:
+        return [], []
+
+    normalized = [normalize_quotation(q.get("quotation", "")) for q in items]
+    shingles = [shingle(text) for text in normalized]
+
+    # LSH banding: only quotations sharing a band bucket are compared exactly
+    rows = NUM_PERM // LSH_BANDS
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+    for idx, sh in enumerate(shingles):
+        sig = minhash_signature(sh)
+        for band in range(LSH_BANDS):
+            key = (band, sig[band * rows : (band + 1) * rows])
+            buckets.setdefault(key, []).append(idx)
+
+    parent = list(range(n))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def candidate_pairs() -> Iterator[Tuple[int, int]]:
+        for members in buckets.values():
+            for i_pos, i in enumerate(members):
+                for j in members[i_pos + 1 :]:
+                    yield i, j
+        yield from _containment_candidates([text.split() for text in normalized])
+
+    checked: Set[Tuple[int, int]] = set()
+    for i, j in candidate_pairs():
+        pair = (i, j) if i < j else (j, i)
+        if pair in checked:
+            continue
+        checked.add(pair)
+        if _similar(shingles[i], shingles[j]):
+            parent[find(pair[1])] = find(pair[0])
+
+    clusters: Dict[int, List[int]] = {}
+    for idx in range(n):
+        clusters.setdefault(find(idx), []).append(idx)
+
+    deduped: List[Dict[str, Any]] = []
+    mapping: List[Dict[str, Any]] = []
+    for member_idx in sorted(clusters.values(), key=lambda m: m[0]):
+        merged = _merge_cluster([items[i] for i in member_idx])
+        mapping.append(
+            {
+                "kept_index": len(deduped),
+                "source_indices": member_idx,
+                "source_quotations": [items[i].get("quotation", "") for i in member_idx],
+                "source_pages": _pages([items[i] for i in member_idx]),
+            }
+        )
+        deduped.append(merged)
+
+    return deduped, mapping
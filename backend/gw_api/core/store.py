@@ -1,12 +1,15 @@
 from typing import Dict, Any, List, Optional
 import time
 import json
+import logging
 from sqlalchemy.orm import Session
 from gw_api.db import get_db
 from gw_api.models.report import Report
 from gw_api.config import Base
 from fastapi import Depends
 
+logger = logging.getLogger(__name__)
+
 
 # Database dependencies
 def get_db_session():
@@ -28,7 +31,7 @@ dashboard_stats = {
 # Vector store persistence
 import os
 from gw_api.config import VECTOR_STORE_DIR
-from gw_api.core.vector_store import embedding_model
+from gw_api.core.vector_store import get_embedding_model
 
 VECTOR_STORE_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -46,7 +49,7 @@ def load_vector_store(session_id: str):
     from langchain_community.vectorstores import Chroma
 
     return Chroma(
-        persist_directory=str(persist_path), embedding_function=embedding_model
+        persist_directory=str(persist_path), embedding_function=get_embedding_model()
     )
 
 
@@ -197,18 +200,25 @@ def store_analysis_result(session_id: str, company_name: str, data: Dict[str, An
 
 def save_session(session_id: str, session_data: Dict, db: Session):
     """Save session with vector store and analysis results to database"""
-    print(
-        f"[SESSION DEBUG] Saving session {session_id} with data: {json.dumps(session_data, indent=2)}"
-    )
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "[SESSION DEBUG] Saving session %s with data: %s",
+            session_id,
+            json.dumps(session_data, indent=2),
+        )
+    else:
+        print(f"[SESSION] Saving session {session_id} (keys: {list(session_data.keys())})")
 
     # Validate required fields
     required_fields = ["vector_store_path", "company_name", "agent_config"]
     for field in required_fields:
         if field not in session_data:
             print(f"[SESSION WARNING] Missing required field: {field} in session data")
-            print(
-                f"[SESSION DEBUG] Full session data: {json.dumps(session_data, indent=2)}"
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "[SESSION DEBUG] Full session data: %s",
+                    json.dumps(session_data, indent=2),
+                )
             return False
 
     try:
@@ -323,9 +333,11 @@ def get_session(
         # Rebuild agent if config exists
         if "agent_config" in session_data:
             print(f"[AGENT DEBUG] Found agent config in session data")
-            print(
-                f"[AGENT DEBUG] Agent config: {json.dumps(session_data['agent_config'], indent=2)}"
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "[AGENT DEBUG] Agent config: %s",
+                    json.dumps(session_data["agent_config"], indent=2),
+                )
 
             from gw_api.core.esg_analysis import create_esg_agent, agent_executors
             from gw_api.core.vector_store import load_vector_store
@@ -2,24 +2,37 @@ from langchain.tools import BaseTool
 from langchain_community.vectorstores import Chroma
 from langchain_community.document_loaders import UnstructuredHTMLLoader
 from langchain.schema import HumanMessage
-from typing import Any, Optional, Dict, List
+from typing import Any, Optional, Dict, List, Tuple
 import json
 import requests
 import cloudscraper
-from gw_api.config import WIKIRATE_API_KEY
+from gw_api.config import WIKIRATE_API_KEY, WIKIRATE_MODE
 from gw_api.core.utils import search_and_filter_news  # Location depends on your setup
 
 # get_company_name
-from wikirate4py import API
 from pprint import pprint
-import pandas as pd
-from name_matching.name_matcher import NameMatcher
 import time
 import csv
 import re
 import multiprocessing
-
-from .llm import llm
+import logging
+
+from .llm import get_llm
+from .metrics import external_seconds, observe, vector_query_seconds
+from .profiling import stage, timed
+from gw_api.wikirate import client as wikirate_client
+from gw_api.wikirate.claims import (
+    check_claims,
+    claim_number,
+    compact_block,
+    format_verdict,
+    split_answers,
+    split_claims,
+)
+from gw_api.wikirate.snapshot import get_wikirate_snapshot
+from gw_api.core.company_registry import get_company_registry
+
+logger = logging.getLogger(__name__)
 
 
 # Name fuzzy matching
@@ -42,21 +55,32 @@ def get_isin_count(company):
         return 0
 
 
+_scraper_session = None
+
+
 class WikirateClient:
     """Wikirate API client for fetching and validating ESG data"""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, snapshot_only: bool = False):
         self.base_url = "https://wikirate.org"
         self.api_key = api_key
-        self.session = cloudscraper.create_scraper(  # Alternative to requests
-            browser={"browser": "chrome", "platform": "windows", "mobile": False}
-        )
+        self.snapshot_only = snapshot_only
+
+    @property
+    def session(self):
+        """One cloudscraper session per process, created on first use"""
+        global _scraper_session
+        if _scraper_session is None:
+            _scraper_session = cloudscraper.create_scraper(  # Alternative to requests
+                browser={"browser": "chrome", "platform": "windows", "mobile": False}
+            )
 
-        # Cloudscraper defaults to including real browser UA
-        self.session.headers.update({"Accept": "application/json"})
+            # Cloudscraper defaults to including real browser UA
+            _scraper_session.headers.update({"Accept": "application/json"})
 
-        if api_key:
-            self.session.headers.update({"Authorization": f"Bearer {api_key}"})
+            if self.api_key:
+                _scraper_session.headers.update({"Authorization": f"Bearer {self.api_key}"})
+        return _scraper_session
 
     def search_company(self, company_name: str) -> Dict[str, Any]:
         """Search company info, supports exact name and fuzzy search"""
@@ -67,10 +91,11 @@ class WikirateClient:
             direct_url = f"{self.base_url}/{clean_name}.json"
 
             # print(f"[Wikirate] Trying exact search: {direct_url}")
-            response = self.session.get(direct_url, timeout=10)
+            with observe(external_seconds, service="wikirate", operation="company"):
+                response = self.session.get(direct_url, timeout=10)
 
-            print(f"[DEBUG] Status Code: {response.status_code}")
-            print(f"[DEBUG] Response preview:\n{response.text[:300]}")
+            logger.debug("[DEBUG] Status Code: %s", response.status_code)
+            logger.debug("[DEBUG] Response preview:\n%s", response.text[:300])
 
             if response.status_code == 200:
                 data = response.json()
@@ -100,7 +125,8 @@ class WikirateClient:
             search_url = f"{self.base_url}/search.json"
             params = {"q": original_name, "type": "Company"}
 
-            response = self.session.get(search_url, params=params, timeout=10)
+            with observe(external_seconds, service="wikirate", operation="search"):
+                response = self.session.get(search_url, params=params, timeout=10)
             if response.status_code == 200:
                 results = response.json().get("items", [])
                 for item in results:
@@ -117,199 +143,20 @@ class WikirateClient:
 
     # Main function: Fuzzy match input name and select best match based on ISIN count
     def find_best_matching_company(self, input_name: str) -> str:
-        # self.parallel_fetch(num_workers=6)
-
-        # Load company data
-        csv_path = "data_files\wikirate_companies_all.csv"
-        wikirate_companies = []
-
-        try:
-            with open(csv_path, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    wikirate_companies.append(
-                        {
-                            "id": row["id"],
-                            "name": row["name"],
-                            "isin_count": int(row["isin_count"]),
-                        }
-                    )
-        except FileNotFoundError:
-            print(f"Company data file not found: {csv_path}")
+        """Resolve a company name against the Wikirate companies of the company registry"""
+        match = get_company_registry().wikirate_match(input_name)
+        if match is None:
+            print(f"No Wikirate company matches '{input_name}'")
             return None
-
-        keyword = input_name.lower()
-        filtered_companies = [
-            c for c in wikirate_companies if keyword in c["name"].lower()
-        ]
-        if not filtered_companies:
-            print("No companies found containing keywords")
-            return None
-
-        # Print all matching company names
-        print("🔍 Found companies containing keywords:")
-        for c in filtered_companies:
-            print(f" - {c['name']}")
-
-        company_names = [c["name"] for c in filtered_companies]
-
-        # Create conversion mapping table
-        normalized_map = {}
-        for c in wikirate_companies:
-            original_name = c["name"] if isinstance(c, dict) else c
-            normalized = normalize_name(original_name)
-            normalized_map[normalized] = {
-                "original_name": original_name,
-                "isin_count": c.get("isin_count", 0) if isinstance(c, dict) else 0,
-            }
-
-        df_master = pd.DataFrame({"Company name": company_names})
-        df_input = pd.DataFrame({"name": [input_name]})
-
-        matcher = NameMatcher(
-            number_of_matches=5,
-            legal_suffixes=True,
-            common_words=False,
-            top_n=50,
-            verbose=False,
-        )
-        matcher.set_distance_metrics(["bag", "typo", "refined_soundex"])
-        matcher.load_and_process_master_data(
-            column="Company name", df_matching_data=df_master, transform=True
-        )
-        matches = matcher.match_names(to_be_matched=df_input, column_matching="name")
-
-        if matches.empty:
-            return None
-
-        # Print all matched names and scores
-        print("All matching results:")
-        results = []
-        for i in range(5):
-            match_name_col = f"match_name_{i}"
-            score_col = f"score_{i}"
-            if match_name_col in matches.columns and score_col in matches.columns:
-                match_name = matches.at[0, match_name_col]
-                score = matches.at[0, score_col]
-                if pd.notna(match_name):
-                    normalized = normalize_name(match_name)
-                    isin_count = normalized_map.get(normalized, {}).get("isin_count", 0)
-                    print(
-                        f"{i + 1}. {match_name}  Score: {score:.2f}  ISIN count: {isin_count}"
-                    )
-                    results.append((normalized, score))
-
-        if not results:
-            return None
-
-        # Find highest score
-        max_score = max(score for _, score in results)
-        top_matches = [name for name, score in results if score == max_score]
-
-        # If only one highest score → return original name
-        if len(top_matches) == 1:
-            return normalized_map.get(top_matches[0], {}).get(
-                "original_name", top_matches[0]
-            )
-
-        # If multiple highest scores → select by isin_count
-        best_match = max(
-            top_matches,
-            key=lambda name: normalized_map.get(name, {}).get("isin_count", 0),
-        )
-        return normalized_map.get(best_match, {}).get("original_name", best_match)
+        print(f"🔍 Matched '{input_name}' -> {match.name}  Score: {match.score:.2f}  ISIN count: {match.isin_count}")
+        return match.name
 
     def get_company_metrics(self, company_name: str) -> Dict[str, Any]:
-        """Get company ESG metrics data using wikirate4py API"""
+        """Get company ESG metrics data (pooled async client + persistent cache, or the offline snapshot)"""
         try:
-            from wikirate4py import API
-
-            # Initialize wikirate4py API
-            api = API(self.api_key)
-
-            # Get company info
-            company = api.get_company(company_name)
-            if not company:
-                return {"error": f"Company '{company_name}' not found"}
-
-            # Paginate to get all answers
-            all_answers = []
-            limit = 10
-            offset = 0
-            max_total = 20  # Max 200 records to fetch
-
-            while len(all_answers) < max_total:
-                batch = api.get_answers(
-                    company=company.name,
-                    limit=min(limit, max_total - len(all_answers)),
-                    offset=offset,
-                )
-                if not batch:
-                    break
-                all_answers.extend(batch)
-                if len(batch) < limit or len(all_answers) >= max_total:
-                    break
-                offset += limit
-
-            # Filter ESG-related metrics
-            esg_topics = ["environment", "social", "governance"]
-            esg_metrics = set()
-            metric_cache = {}
-
-            # Get ESG topics and unit info for all metrics
-            for answer in all_answers:
-                metric_name = answer.metric
-                if metric_name in metric_cache:
-                    topics = metric_cache[metric_name]["topics"]
-                    unit = metric_cache[metric_name]["unit"]
-                else:
-                    try:
-                        metric_obj = api.get_metric(metric_name)
-                        topics_raw = getattr(metric_obj, "topics", [])
-                        topics = []
-                        for t in topics_raw or []:
-                            if isinstance(t, str):
-                                topics.append(t.lower())
-                            elif isinstance(t, dict) and "name" in t:
-                                topics.append(t["name"].lower())
-
-                        # Get unit info
-                        unit = getattr(metric_obj, "unit", None)
-
-                        metric_cache[metric_name] = {"topics": topics, "unit": unit}
-                    except Exception as e:
-                        print(f"Failed to get metric {metric_name} info: {e}")
-                        topics = []
-                        unit = None
-                        metric_cache[metric_name] = {"topics": topics, "unit": unit}
-
-                if any(topic in topics for topic in esg_topics):
-                    esg_metrics.add(metric_name)
-
-            # Build return result
-            results = {
-                "company_name": company_name,
-                "total_answers": len(all_answers),
-                "esg_metrics_count": len(esg_metrics),
-                "esg_data": [],
-            }
-
-            # Extract ESG-related metric data
-            for answer in all_answers:
-                if answer.metric in esg_metrics:
-                    record = {
-                        "metric_name": answer.metric,
-                        "year": getattr(answer, "year", None),
-                        "value": getattr(answer, "value", None),
-                        "unit": metric_cache.get(answer.metric, {}).get("unit"),
-                        # "comments": getattr(answer, 'comments', None),
-                        # "source": getattr(answer, 'source', None),
-                        # "topics": metric_cache.get(answer.metric, {}).get('topics', [])
-                    }
-                    results["esg_data"].append(record)
-
-            return results
-
+            if self.snapshot_only:
+                return get_wikirate_snapshot().company_metrics(company_name)
+            return wikirate_client.get_company_metrics(company_name)
         except Exception as e:
             print(f"Error getting company metrics: {e}")
             return {"error": str(e)}
@@ -318,7 +165,8 @@ class WikirateClient:
         """Get metric details and definitions"""
         try:
             url = f"{self.base_url}/{metric_name}.json"
-            response = self.session.get(url, timeout=10)
+            with observe(external_seconds, service="wikirate", operation="metric"):
+                response = self.session.get(url, timeout=10)
 
             if response.status_code == 200:
                 return response.json()
@@ -337,11 +185,15 @@ class WikirateValidationTool(BaseTool):
     company_name: str = ""
     wikirate_client: WikirateClient = None
 
-    def __init__(self, company_name: str):
+    def __init__(self, company_name: str, snapshot_only: Optional[bool] = None):
         super().__init__()
         self.company_name = company_name
-        self.wikirate_client = WikirateClient(WIKIRATE_API_KEY)
+        # Snapshot mode answers from the local Wikirate snapshot without any network calls
+        if snapshot_only is None:
+            snapshot_only = WIKIRATE_MODE == "snapshot"
+        self.wikirate_client = WikirateClient(WIKIRATE_API_KEY, snapshot_only=snapshot_only)
 
+    @timed("tool.wikirate_validation")
     def _run(self, extracted_metrics: str) -> str:
         """Validate extracted ESG metrics against Wikirate database"""
         try:
@@ -368,33 +220,19 @@ class WikirateValidationTool(BaseTool):
                 if "error" not in metrics_data:
                     # validation_results["metrics_verified"] = metrics_data
 
-                    analysis_prompt = f"""
-                    You are an expert ESG validation analyst. 
-
-                    Your task is to assess how well each ESG claim is reflected in the following Wikirate Database Data.
-            
-                    You need to analyze each claim as follows.
-                    
-                    Claims:{extracted_metrics}
-
-                    Wikirate Database Data: {json.dumps(metrics_data, indent=2)}
-
-                    Instruction:
-                    - If the ESG data provided directly proves that the statement is true, thereby refuting or partially refuting the greenwashing allegation, mark it as “Refuted”.
-                    - If the ESG data provided directly refutes the statement, thereby confirming or partially confirming the greenwashing allegation, mark it as “Supported”.
-                    - If the provided ESG data relates to relevant indicators or topics but is insufficient to directly verify or refute the greenwashing allegations in the quote, please mark it as “Mentioned.”
-                    - If the provided ESG data is unrelated to the quote and cannot be evaluated in any way, please mark it as “Not Mentioned.”
-
-                    For each claim, respond with:
-                    1. **Status**: Supported / Contradicted / Indicated / Not mentioned  
-                    2. **Reasoning**: Explain why you chose this status  
-                    3. **news_quotation**: Include any relevant metrics from Wikirate Database Data if applicable  
-                    
-                    """
-
-                    response = llm.invoke([HumanMessage(content=analysis_prompt)])
-
-                    return response.content
+                    # Deterministic numeric comparison first; the LLM only sees what it cannot decide
+                    with stage("wikirate.claim_check"):
+                        items = split_claims(extracted_metrics)
+                        verdicts = check_claims([claim for _, claim in items], metrics_data)
+                    pending = [i for i, v in enumerate(verdicts) if not v.decided]
+                    print(f"[Wikirate] Numeric check decided {len(items) - len(pending)}/{len(items)} claims")
+                    results = [format_verdict(v) if v.decided else None for v in verdicts]
+                    if pending:
+                        answers = self._validate_claims([items[i] for i in pending], metrics_data)
+                        for i, answer in zip(pending, answers):
+                            results[i] = f"Claim: {items[i][1]}\n{answer}"
+                    # One block per claim, in claim order
+                    return "\n\n".join(results)
 
                     # # Extract validation score
                     # verification_text = response.content
@@ -427,6 +265,59 @@ class WikirateValidationTool(BaseTool):
         except Exception as e:
             return f"Error in Wikirate validation: {str(e)}"
 
+    def _validate_claims(self, items: List[Tuple[str, str]], metrics_data: dict) -> List[str]:
+        """
+        LLM answers for the (block, claim) pairs the numeric check left undecided,
+        one per item and in the same order. The reply is split on its "Claim N:"
+        headings; a claim it skips is asked again on its own.
+        """
+        numbers = [claim_number(block) for block, _ in items]
+        reply = self._ask([block for block, _ in items], metrics_data)
+        if len(items) == 1:
+            return [split_answers(reply).get(numbers[0]) or compact_block(reply)]
+        answers = split_answers(reply) if None not in numbers else {}
+        results = []
+        for (block, _), number in zip(items, numbers):
+            answer = answers.get(number)
+            if answer is None:
+                single = self._ask([block], metrics_data)
+                answer = split_answers(single).get(number) or compact_block(single)
+            results.append(answer)
+        return results
+
+    def _ask(self, blocks: List[str], metrics_data: dict) -> str:
+        claims_text = "\n\n".join(blocks)
+        analysis_prompt = f"""
+        You are an expert ESG validation analyst. 
+
+        Your task is to assess how well each ESG claim is reflected in the following Wikirate Database Data.
+
+        You need to analyze each claim as follows.
+        
+        Claims:{claims_text}
+
+        Wikirate Database Data: {json.dumps(metrics_data, separators=(",", ":"))}
+
+        Instruction:
+        - If the ESG data provided directly proves that the statement is true, thereby refuting or partially refuting the greenwashing allegation, mark it as “Contradicted”.
+        - If the ESG data provided directly refutes the statement, thereby confirming or partially confirming the greenwashing allegation, mark it as “Supported”.
+        - If the provided ESG data relates to relevant indicators or topics but is insufficient to directly verify or refute the greenwashing allegations in the quote, please mark it as “Indicated.”
+        - If the provided ESG data is unrelated to the quote and cannot be evaluated in any way, please mark it as “Not mentioned.”
+
+        Answer every claim, in order. Start each answer with a line "Claim <number>:" using the claim's number above, then:
+        1. **Status**: Supported / Contradicted / Indicated / Not mentioned  
+        2. **Reasoning**: Explain why you chose this status  
+        3. **news_quotation**: Include any relevant metrics from Wikirate Database Data if applicable  
+        
+        """
+        return get_llm().invoke([HumanMessage(content=analysis_prompt)]).content.strip()
+
+
+def _with_page_label(doc) -> str:
+    """Chunk text prefixed with its 1-based page number, so quotations can cite it"""
+    page = (doc.metadata or {}).get("page")
+    return f"[Page {page + 1}] {doc.page_content}" if isinstance(page, int) else doc.page_content
+
 
 class ESGDocumentAnalysisTool(BaseTool):
     name: str = "esg_document_analysis"
@@ -437,10 +328,12 @@ class ESGDocumentAnalysisTool(BaseTool):
         super().__init__()
         self.vector_store = vector_store
 
+    @timed("tool.esg_document_analysis")
     def _run(self, query: str) -> list:
         try:
-            docs = self.vector_store.similarity_search(query, k=10)
-            context = "\n\n".join([doc.page_content for doc in docs])
+            with observe(vector_query_seconds, call_site="esg_document_analysis"):
+                docs = self.vector_store.similarity_search(query, k=10)
+            context = "\n\n".join(_with_page_label(doc) for doc in docs)
             analysis_prompt = f"""
             Analyze the following ESG document content to obtain potential evidence of greenwashing using the following thought. There may be multiple pieces of potential evidence in content. Please identify all potential evidence as much as possible.:
 
@@ -461,9 +354,10 @@ class ESGDocumentAnalysisTool(BaseTool):
             * "verification_required" (boolean): Indicates whether further verification using external data is required (true/false).
             * "verification_method" (string): If verification is required, describe the specific verification method and steps.
             * "data_needed" (string): If verification is required, specify what external data is needed.
+            * "page" (integer): The page number shown in the [Page N] label before the quoted content, or null if there is none.
             """
 
-            response = llm.invoke([HumanMessage(content=analysis_prompt)])
+            response = get_llm().invoke([HumanMessage(content=analysis_prompt)])
             # return response.content
             raw_llm_content = response.content
 
@@ -531,6 +425,7 @@ class NewsValidationTool(BaseTool):
         super().__init__()
         self.company_name = company_name
 
+    @timed("tool.news_validation")
     def _run(self, claims: str) -> str:
         try:
             # 👇 Modified: Make search function return content + title
@@ -577,7 +472,7 @@ class NewsValidationTool(BaseTool):
             3. **news_quotation**: Include any relevant quotation from news_text if applicable  
             """
 
-            response = llm.invoke([HumanMessage(content=validation_prompt)])
+            response = get_llm().invoke([HumanMessage(content=validation_prompt)])
             return response.content
 
         except Exception as e:
@@ -588,6 +483,7 @@ class ESGMetricsCalculatorTool(BaseTool):
     name: str = "esg_metrics_calculator"
     description: str = "Identify types of greenwashing and calculate a comprehensive greenwashing score"
 
+    @timed("tool.esg_metrics_calculator")
     def _run(self, analysis_evidence: str) -> dict:
         """Calculate ESG metrics from analysis and return a parsed dict"""
         try:
@@ -614,7 +510,7 @@ class ESGMetricsCalculatorTool(BaseTool):
                 "overall_greenwashing_score": {{"score": 0}}
             }}
             """
-            response = llm.invoke([HumanMessage(content=metrics_prompt)])
+            response = get_llm().invoke([HumanMessage(content=metrics_prompt)])
             raw = (response.content or "").strip()
             clean = raw.replace("```json", "").replace("```", "").strip()
 
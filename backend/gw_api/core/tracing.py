@@ -0,0 +1,335 @@
+"""
+Request-scoped tracing
+Every HTTP request (and every background job started with `start_trace`) gets a
+trace id; stages, tools, LLM/embedding calls, searches, scrapes, vector queries
+and SQL statements inside it become nested spans with durations and sizes.
+
+Only sampled traces are recorded. When the root span ends the whole trace is
+handed to the configured exporter:
+
+    TRACE_SAMPLE_RATE   fraction of traces recorded (default 0.05); a request
+                        with header "X-Trace-Sampled: 1" is always recorded
+    TRACE_EXPORTER      "none" (default), "file" or "otlp"
+    TRACE_FILE          JSON-lines output for the file exporter (data/traces.jsonl)
+    TRACE_FILE_MAX_MB   size at which TRACE_FILE is rotated to TRACE_FILE.1 (50);
+                        at most two files are kept
+    TRACE_OTLP_ENDPOINT OTLP/HTTP JSON endpoint (http://localhost:4318/v1/traces);
+                        `python -m benchmarks.otlp_collector` is a local stand-in
+"""
+
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.05"))
+EXPORTER = os.getenv("TRACE_EXPORTER", "none").lower()
+TRACE_FILE = Path(os.getenv("TRACE_FILE", Path(__file__).parent.parent.parent / "data" / "traces.jsonl"))
+TRACE_FILE_MAX_BYTES = int(float(os.getenv("TRACE_FILE_MAX_MB", "50")) * 1024 * 1024)
+OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+SERVICE_NAME = "gw-api"
+MAX_SPANS_PER_TRACE = 5000
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Stand-in yielded when the current trace is not sampled"""
+
+    trace_id = None
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    def __init__(self, sampled: bool):
+        self.trace_id = _new_id(16)
+        self.sampled = sampled
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            if len(self.spans) < MAX_SPANS_PER_TRACE:
+                self.spans.append(span)
+            else:
+                self.dropped += 1
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("span", default=None)
+
+
+def current_trace_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.trace_id if trace is not None and trace.sampled else None
+
+
+def start_span(name: str, **attributes: Any):
+    """Open a leaf span without making it current (for callback-style hooks)"""
+    trace = _current_trace.get()
+    if trace is None or not trace.sampled:
+        return NOOP_SPAN
+    parent = _current_span.get()
+    return Span(name, trace.trace_id, _new_id(8), parent.span_id if parent else None, attributes=attributes)
+
+
+def end_span(span, error: bool = False) -> None:
+    if span is NOOP_SPAN:
+        return
+    span.end_ns = time.time_ns()
+    if error:
+        span.status = "error"
+    trace = _current_trace.get()
+    if trace is not None and trace.trace_id == span.trace_id:
+        trace.add(span)
+
+
+@contextmanager
+def span(name: str, **attributes: Any):
+    """Nested span under the current one; no-op outside a sampled trace"""
+    sp = start_span(name, **attributes)
+    if sp is NOOP_SPAN:
+        yield sp
+        return
+    token = _current_span.set(sp)
+    error = False
+    try:
+        yield sp
+    except BaseException as e:
+        error = True
+        sp.set(error=type(e).__name__)
+        raise
+    finally:
+        _current_span.reset(token)
+        end_span(sp, error)
+
+
+@contextmanager
+def start_trace(name: str, sampled: Optional[bool] = None, **attributes: Any):
+    """Root span of a request or job; inside an active trace it is just a child span"""
+    if _current_trace.get() is not None:
+        with span(name, **attributes) as sp:
+            yield sp
+        return
+    if sampled is None:
+        sampled = SAMPLE_RATE > 0 and random.random() < SAMPLE_RATE
+    trace = Trace(sampled)
+    trace_token = _current_trace.set(trace)
+    try:
+        with span(name, **attributes) as root:
+            yield root
+    finally:
+        _current_trace.reset(trace_token)
+        if trace.sampled:
+            exporter.export(trace, root)
+
+
+# ---------------------------------------------------------------------------
+# Exporters
+# ---------------------------------------------------------------------------
+
+
+class FileExporter:
+    """One JSON object per trace, appended to a local file (rotated at max_bytes)"""
+
+    def __init__(self, path: Path, max_bytes: int = TRACE_FILE_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace, root: Span) -> None:
+        record = {
+            "trace_id": trace.trace_id,
+            "name": root.name,
+            "start_ns": root.start_ns,
+            "duration_ms": round(root.duration_ms, 3),
+            "dropped_spans": trace.dropped,
+            "spans": [s.as_dict() for s in sorted(trace.spans, key=lambda s: s.start_ns)],
+        }
+        try:
+            with self._lock:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                if self.path.exists() and self.path.stat().st_size >= self.max_bytes:
+                    self.path.replace(self.path.with_name(self.path.name + ".1"))
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, default=str) + "\n")
+        except OSError as e:
+            print(f"[TRACE] Failed to write trace: {e}")
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: List[Span]) -> Dict[str, Any]:
+    """OTLP/HTTP JSON payload (ExportTraceServiceRequest)"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{
+                "scope": {"name": "gw_api.tracing"},
+                "spans": [
+                    {
+                        "traceId": s.trace_id,
+                        "spanId": s.span_id,
+                        "parentSpanId": s.parent_id or "",
+                        "name": s.name,
+                        "kind": 1,
+                        "startTimeUnixNano": str(s.start_ns),
+                        "endTimeUnixNano": str(s.end_ns or s.start_ns),
+                        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                        "status": {"code": 2 if s.status == "error" else 1},
+                    }
+                    for s in spans
+                ],
+            }],
+        }]
+    }
+
+
+class OTLPExporter:
+    """Ships finished traces to an OTLP/HTTP collector from a background thread"""
+
+    def __init__(self, endpoint: str, batch_size: int = 512, flush_interval_s: float = 2.0):
+        self.endpoint = endpoint
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=50_000)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace, root: Span) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="otlp-exporter", daemon=True)
+                self._thread.start()
+        for s in trace.spans:
+            try:
+                self._queue.put_nowait(s)
+            except queue.Full:
+                break  # never block a request on telemetry
+
+    def _worker(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval_s
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._post(batch)
+
+    def _post(self, spans: List[Span]) -> None:
+        body = json.dumps(to_otlp(spans), default=str).encode("utf-8")
+        request = urllib.request.Request(
+            self.endpoint, data=body, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        try:
+            urllib.request.urlopen(request, timeout=5).close()
+        except Exception as e:
+            print(f"[TRACE] OTLP export failed ({len(spans)} spans): {e}")
+
+
+class NoopExporter:
+    def export(self, trace: Trace, root: Span) -> None:
+        pass
+
+
+def _make_exporter():
+    if EXPORTER == "otlp":
+        return OTLPExporter(OTLP_ENDPOINT)
+    if EXPORTER == "file":
+        return FileExporter(TRACE_FILE)
+    return NoopExporter()
+
+
+exporter = _make_exporter()
+
+
+# ---------------------------------------------------------------------------
+# ASGI middleware
+# ---------------------------------------------------------------------------
+
+
+class TracingMiddleware:
+    """
+    Starts a trace per HTTP request. Implemented as plain ASGI (not
+    BaseHTTPMiddleware) so streamed responses such as /chat stay inside the trace.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        forced = headers.get(b"x-trace-sampled") == b"1"
+        name = f"{scope.get('method', 'GET')} {scope.get('path', '')}"
+        with start_trace(name, sampled=True if forced else None, http_path=scope.get("path", "")) as root:
+
+            async def send_with_trace_id(message):
+                if message["type"] == "http.response.start" and root.trace_id:
+                    root.set(http_status=message.get("status"))
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [(b"x-trace-id", root.trace_id.encode())]
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace_id)
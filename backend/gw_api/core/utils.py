@@ -1,10 +1,9 @@
 import hashlib
 from typing import Any, List, Tuple
-from gw_api.core.llm import climatebert_tokenizer, climatebert_model, llm
+from gw_api.core.company_registry import COMPANY_STOPWORDS
+from gw_api.core.llm import get_climatebert, get_llm
 import re
-from gw_api.webscraper.bbc_search import bbc_search
 # from gw_api.webscraper.cnn_search import cnn_search
-from langchain_community.document_loaders import UnstructuredHTMLLoader
 from langchain.schema import HumanMessage
 
 
@@ -15,70 +14,65 @@ def hash_file(file_b) -> str:
     return file_hash.hexdigest()
 
 
-def is_esg_related(text: str, threshold: float = 0.5) -> bool:
-    """Use ClimateBERT to determine if text is ESG-related"""
-    import torch
+ESG_KEYWORDS = [
+    "esg",
+    "environment",
+    "sustainability",
+    "carbon",
+    "emission",
+    "governance",
+    "social",
+    "net zero",
+    "decarbon",
+    "climate",
+    "renewable",
+]
+
 
+def keyword_esg_score(text: str) -> float:
+    """Keyword fallback when ClimateBERT is unavailable: 0 hits -> 0.0, 3+ distinct hits -> 1.0"""
+    lowered = text.lower()
+    hits = sum(keyword in lowered for keyword in ESG_KEYWORDS)
+    return min(hits / 3, 1.0)
+
+
+def esg_scores(texts: List[str], batch_size: int = 16) -> List[float]:
+    """ClimateBERT ESG probability per text, classified in padded batches"""
+    climatebert_tokenizer, climatebert_model = get_climatebert()
     if climatebert_tokenizer is None or climatebert_model is None:
-        esg_keywords = [
-            "esg",
-            "environment",
-            "sustainability",
-            "carbon",
-            "emission",
-            "governance",
-            "social",
-            "net zero",
-            "decarbon",
-            "climate",
-            "renewable",
-        ]
-        return any(keyword in text.lower() for keyword in esg_keywords)
+        return [keyword_esg_score(t) for t in texts]
+    import torch
+
+    scores: List[float] = []
     try:
-        inputs = climatebert_tokenizer(
-            text, return_tensors="pt", truncation=True, padding=True, max_length=512
-        )
-        with torch.no_grad():
-            outputs = climatebert_model(**inputs)
-        probabilities = torch.nn.functional.softmax(outputs.logits, dim=-1)
-        esg_prob = probabilities[0][1].item()
-        return esg_prob >= threshold
+        for i in range(0, len(texts), batch_size):
+            inputs = climatebert_tokenizer(
+                texts[i : i + batch_size], return_tensors="pt", truncation=True, padding=True, max_length=512
+            )
+            with torch.no_grad():
+                outputs = climatebert_model(**inputs)
+            probabilities = torch.nn.functional.softmax(outputs.logits, dim=-1)
+            scores.extend(probabilities[:, 1].tolist())
+        return scores
     except Exception as e:
         print(f"Error in ESG classification: {e}")
-        esg_keywords = [
-            "esg",
-            "environment",
-            "sustainability",
-            "carbon",
-            "emission",
-            "governance",
-            "social",
-            "net zero",
-            "decarbon",
-            "climate",
-            "renewable",
-        ]
-        return any(keyword in text.lower() for keyword in esg_keywords)
+        return scores + [keyword_esg_score(t) for t in texts[len(scores):]]
+
+
+def is_esg_related(text: str, threshold: float = 0.5) -> bool:
+    """Use ClimateBERT to determine if text is ESG-related"""
+    climatebert_tokenizer, climatebert_model = get_climatebert()
+    if climatebert_tokenizer is None or climatebert_model is None:
+        return any(keyword in text.lower() for keyword in ESG_KEYWORDS)
+    return esg_scores([text])[0] >= threshold
 
 
 def generate_company_aliases(company_name: str) -> list:
     aliases = set()
     aliases.add(company_name.strip())
-    blacklist = {
-        "co",
-        "inc",
-        "ltd",
-        "limited",
-        "corporation",
-        "corp",
-        "group",
-        "plc",
-        "llc",
-        "holdings",
-        "company",
-    }
+    # Legal forms and "group" / "holdings", as dropped by the company registry
     simplified = re.sub(
-        r"\b(?:" + "|".join(blacklist) + r")\b\.?", "", company_name, flags=re.I
+        r"\b(?:" + "|".join(sorted(COMPANY_STOPWORDS)) + r")\b\.?", "", company_name, flags=re.I
     )
     simplified = re.sub(r"[^a-zA-Z0-9\s]", "", simplified)
     simplified = re.sub(r"\s+", " ", simplified).strip()
@@ -88,7 +82,7 @@ def generate_company_aliases(company_name: str) -> list:
         p_clean = p.strip().lower()
         if len(p_clean) < 4:
             continue
-        if p_clean in blacklist:
+        if p_clean in COMPANY_STOPWORDS:
             continue
         aliases.add(p.strip())
     risky_terms = {"chase", "co", "bank", "group", "partners"}
@@ -109,7 +103,7 @@ def is_esg_related_llm(text: str) -> bool:
     If the article is thematically related to ESG, respond with YES. Otherwise, respond with NO.
     """
     try:
-        response = llm.invoke([HumanMessage(content=prompt)])
+        response = get_llm().invoke([HumanMessage(content=prompt)])
         return "YES" in response.content.upper()
     except Exception as e:
         print(f"[LLM ESG classification failed]: {e}")
@@ -126,7 +120,7 @@ def is_article_about_company(text: str, company_name: str, aliases: list) -> boo
     Please answer only YES or NO.
     """
     try:
-        response = llm.invoke([HumanMessage(content=prompt)])
+        response = get_llm().invoke([HumanMessage(content=prompt)])
         return "YES" in response.content.upper()
     except Exception as e:
         print(f"[LLM error when checking article relevance]: {e}")
@@ -142,7 +136,7 @@ async def translate_text(text: str, target_lang: str) -> str:
         f"Translate the following ESG analysis report into {target_lang}:\n\n{text}"
     )
     try:
-        response = llm.invoke([HumanMessage(content=prompt)])
+        response = await get_llm().ainvoke([HumanMessage(content=prompt)])
         return response.content.strip()
     except Exception as e:
         print(f"[LLM translation failed]: {e}")
@@ -158,53 +152,20 @@ def search_and_filter_news(
     aliases = generate_company_aliases(company_name)
     print(f"[DEBUG] Searching news with aliases: {aliases}")
 
-    # bbc_articles, cnn_articles = {}, {}
-    bbc_articles = {}
-    for alias in aliases:
-        try:
-            results = bbc_search(alias)
-            if results:
-                bbc_articles.update(results)
-        except Exception as e:
-            print(f"[BBC error with alias '{alias}']: {e}")
-        # try:
-        #     results = cnn_search(alias)
-        #     if results:
-        #         cnn_articles.update(results)
-        # except Exception as e:
-        #     print(f"[CNN error with alias '{alias}']: {e}")
-
-    all_articles = list((bbc_articles or {}).items())
-    # list((cnn_articles or {}).items())
-    print(f"[DEBUG] Fetched BBC articles count: {len(bbc_articles)}")
-    for title in bbc_articles:
-        print(f"  [BBC] {title}")
-
-    # print(f"[DEBUG] Fetched CNN articles count: {len(cnn_articles)}")
-    # for title in cnn_articles:
-    #     print(f"  [CNN] {title}")
-    filtered_articles = []
+    # Streams candidates best-first (stored text is reused) and stops once max_articles are kept
+    from gw_api.core.news_filter import filter_company_news
 
-    for title, file_path in all_articles[:100]:  # Evaluate at most first 100 articles
-        try:
-            loader = UnstructuredHTMLLoader(file_path)
-            docs = loader.load()
-            for doc in docs:
-                is_company = is_article_about_company(
-                    doc.page_content, company_name, aliases
-                )
-                is_esg = is_esg_related_llm(doc.page_content)
-
-                if is_company and is_esg:
-                    print(f"[✅ Keep] {title} 👉 Company match: YES, ESG related: YES")
-                    filtered_articles.append((doc.page_content, title))
-                else:
-                    print(
-                        f"[❌ Remove] {title} 👉 Company match: {'YES' if is_company else 'NO'}, ESG related: {'YES' if is_esg else 'NO'}"
-                    )
-
-        except Exception as e:
-            print(f"[⚠️ Error loading article: {title}]: {e}")
+    verdicts, stats = filter_company_news(company_name, aliases, max_articles)
+    filtered_articles = []
+    for v in verdicts:
+        if v.keep:
+            print(f"[✅ Keep] {v.title} 👉 Company match: YES, ESG related: YES ({v.decided_by})")
+            filtered_articles.append((v.text, v.title))
+        else:
+            print(
+                f"[❌ Remove] {v.title} 👉 Company match: {'YES' if v.about_company else 'NO'}, ESG related: {'YES' if v.esg else 'NO'} ({v.decided_by})"
+            )
+    print(f"[News] Relevance cascade: {stats.summary()}")
 
     # Only take first N articles for further analysis
     top_articles = filtered_articles[:max_articles]
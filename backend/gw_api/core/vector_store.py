@@ -1,13 +1,12 @@
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from gw_api.config import (
-    GOOGLE_API_KEY,
-)
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from gw_api.core.lazy import lazy_singleton
+from gw_api.core.llm import create_embedding_model
 
 
-embedding_model = GoogleGenerativeAIEmbeddings(
-    model="models/gemini-embedding-exp-03-07", google_api_key=GOOGLE_API_KEY
-)
+@lazy_singleton("embeddings")
+def get_embedding_model():
+    """Shared Gemini embedding client for the session vector stores"""
+    return create_embedding_model(model="models/gemini-embedding-exp-03-07")
 
 
 # Text splitter
@@ -30,5 +29,5 @@ def load_vector_store(session_id: str):
     from langchain_community.vectorstores import Chroma
 
     return Chroma(
-        persist_directory=str(persist_path), embedding_function=embedding_model
+        persist_directory=str(persist_path), embedding_function=get_embedding_model()
     )
@@ -18,7 +18,7 @@ from gw_api.core.tools import (
     ESGMetricsCalculatorTool,
     ESGDocumentAnalysisTool,
 )
-from gw_api.core.llm import llm
+from gw_api.core.llm import get_llm
 from langchain.schema import HumanMessage
 
 
@@ -245,7 +245,7 @@ class WorkflowValidator:
         Include the reported values, units, and time periods.
         """
 
-        response = llm.invoke([HumanMessage(content=prompt)])
+        response = await get_llm().ainvoke([HumanMessage(content=prompt)])
         return response.content
 
     async def _extract_claims_from_analysis(self, document_analysis: str) -> str:
@@ -258,7 +258,7 @@ class WorkflowValidator:
         List the main claims that should be validated against news sources.
         """
 
-        response = llm.invoke([HumanMessage(content=prompt)])
+        response = await get_llm().ainvoke([HumanMessage(content=prompt)])
         return response.content
 
     async def _generate_analysis_query(self, document_analysis: str) -> str:
@@ -271,7 +271,7 @@ class WorkflowValidator:
         Create a specific query that will help identify potential greenwashing indicators.
         """
 
-        response = llm.invoke([HumanMessage(content=prompt)])
+        response = await get_llm().ainvoke([HumanMessage(content=prompt)])
         return response.content
 
     def _process_workflow_results(
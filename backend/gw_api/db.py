@@ -1,6 +1,7 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from gw_api.config import SQLALCHEMY_DATABASE_URL, Base
+from gw_api.core.metrics import instrument_engine
 import sqlite3
 
 # Create database engine
@@ -8,6 +9,7 @@ engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},  # Required for SQLite
 )
+instrument_engine(engine)
 
 # Create SessionLocal class for database sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -38,6 +40,12 @@ def init_db():
     Base.metadata.create_all(bind=engine)  # Create tables (if not exist)
     migrate_db()  # Auto migrate missing fields
 
+    # Dashboard counters row, created once here rather than by the first upload
+    from gw_api.core.dashboard_stats import ensure_stats
+
+    with SessionLocal() as db:
+        ensure_stats(db)
+
 
 def get_db():
     """Get database session"""
@@ -24,6 +24,7 @@ class ESGAnalysisState(TypedDict):
     selected_thoughts: List[str]
     document_analysis: List[str]
     quotations: List[Dict[str, Any]]  # ✅ Add this line
+    quotation_clusters: List[Dict[str, Any]]  # kept quotation -> original quotations
     tool_plan: List[Dict[str, Any]]   # ✅ If you need to pass tool decisions
     validations: List[Dict[str, Any]] # ✅ If you have validation logic
     news_validation: str
@@ -35,3 +35,14 @@ class Report(Base):
     file_id = Column(Integer, ForeignKey("report_files.id"))
 
     report_file = relationship("ReportFile", back_populates="reports")
+
+
+class DashboardStats(Base):
+    """Dashboard counters over all reports, kept in step with report inserts (single row)"""
+
+    __tablename__ = "dashboard_stats"
+
+    id = Column(Integer, primary_key=True)
+    total_reports = Column(Integer, nullable=False, default=0)
+    high_risk_reports = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
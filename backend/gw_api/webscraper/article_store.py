@@ -0,0 +1,265 @@
+"""
+News article store
+Articles are keyed by canonical URL; their raw HTML is kept once per content
+hash (sha256) under NEWS_STORE_DIR/blobs, and the extracted main text, title and
+fetch time live in a SQLite index next to it. A per-company index remembers
+the ranked results a search for that company returned, so a repeat validation
+within NEWS_COMPANY_TTL_HOURS does not search again and reads cached plain text
+for every article already downloaded. Relevance verdicts are kept per company
+and article, so a screened article is not classified again. Article bodies and
+verdicts are refreshed only after NEWS_ARTICLE_TTL_DAYS.
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from gw_api.config import NEWS_STORE_DIR, USE_FAKE_PROVIDERS
+from gw_api.core.background_loop import run_sync
+from gw_api.webscraper.html_extract import EXTRACTOR, extract_main_text
+from gw_api.webscraper.news_fetcher import canonical_url, get_news_fetcher
+from gw_api.webscraper.news_sources import SearchResult
+
+COMPANY_TTL_S = float(os.getenv("NEWS_COMPANY_TTL_HOURS", "24")) * 3600
+ARTICLE_TTL_S = float(os.getenv("NEWS_ARTICLE_TTL_DAYS", "30")) * 24 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    text TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS company_results (
+    company TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    PRIMARY KEY (company, rank)
+);
+CREATE TABLE IF NOT EXISTS article_verdicts (
+    company TEXT NOT NULL,
+    url TEXT NOT NULL,
+    about_company INTEGER,
+    esg INTEGER,
+    esg_score REAL,
+    decided_by TEXT NOT NULL,
+    classified_at REAL NOT NULL,
+    PRIMARY KEY (company, url)
+);
+CREATE TABLE IF NOT EXISTS company_searches (
+    company TEXT PRIMARY KEY,
+    searched_at REAL NOT NULL
+);
+"""
+
+
+@dataclass
+class StoredArticle:
+    id: int
+    url: str
+    title: str
+    content_hash: str
+    text: str
+    fetched_at: float
+
+
+@dataclass
+class StoredVerdict:
+    url: str
+    about_company: Optional[bool]
+    esg: Optional[bool]
+    esg_score: Optional[float]
+    decided_by: str
+
+
+def _flag(value) -> Optional[bool]:
+    return None if value is None else bool(value)
+
+
+def extract_text(html: str, url: Optional[str] = None, html_path: Optional[Path] = None) -> str:
+    """Main text of an article page (NEWS_EXTRACTOR=unstructured restores the previous loader, which reads html_path)"""
+    if EXTRACTOR == "unstructured" and html_path is not None:
+        from langchain_community.document_loaders import UnstructuredHTMLLoader
+
+        docs = UnstructuredHTMLLoader(str(html_path)).load()
+        return "\n\n".join(doc.page_content for doc in docs if doc.page_content)
+    return extract_main_text(html, url)
+
+
+def company_key(company_name: str) -> str:
+    return " ".join(company_name.lower().split())
+
+
+class ArticleStore:
+    def __init__(self, root: Path = NEWS_STORE_DIR):
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.root / "index.db", timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def blob_path(self, content_hash: str) -> Path:
+        return self.blob_dir / content_hash[:2] / f"{content_hash}.html"
+
+    @staticmethod
+    def _row(row) -> Optional[StoredArticle]:
+        return StoredArticle(*row) if row else None
+
+    def get(self, url: str) -> Optional[StoredArticle]:
+        return self._row(self._conn().execute(
+            "SELECT id, url, title, content_hash, text, fetched_at FROM articles WHERE url=?", (canonical_url(url),)
+        ).fetchone())
+
+    def put(self, url: str, title: str, html: str) -> StoredArticle:
+        """Store raw HTML (deduplicated by content hash) and its extracted text"""
+        content_hash = hashlib.sha256(html.encode("utf-8")).hexdigest()
+        path = self.blob_path(content_hash)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(html, encoding="utf-8")
+            os.replace(tmp, path)
+
+        existing = self.get(url)
+        if existing is not None and existing.content_hash == content_hash:
+            text = existing.text  # unchanged page: no re-parse
+        else:
+            text = extract_text(html, url, path)
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                """
+                INSERT INTO articles (url, title, content_hash, text, fetched_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET title=excluded.title, content_hash=excluded.content_hash,
+                                               text=excluded.text, fetched_at=excluded.fetched_at
+                """,
+                (canonical_url(url), title, content_hash, text, time.time()),
+            )
+        return self.get(url)
+
+    def _search_fresh(self, company_name: str, max_age_s: float) -> bool:
+        searched_at = self.searched_at(company_name)
+        return searched_at is not None and time.time() - searched_at <= max_age_s
+
+    def company_results(
+        self, company_name: str, max_age_s: float = COMPANY_TTL_S
+    ) -> Optional[List[Tuple[str, str]]]:
+        """Ranked (title, url) search results of a company, or None if it was never searched or the search is stale"""
+        if not self._search_fresh(company_name, max_age_s):
+            return None
+        return self._conn().execute(
+            "SELECT title, url FROM company_results WHERE company=? ORDER BY rank", (company_key(company_name),)
+        ).fetchall()
+
+    def index_company(self, company_name: str, results: Sequence[Tuple[str, str]]) -> None:
+        """Remember a company's ranked (title, url) search results"""
+        key = company_key(company_name)
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM company_results WHERE company=?", (key,))
+            conn.executemany(
+                "INSERT INTO company_results (company, rank, title, url) VALUES (?, ?, ?, ?)",
+                [(key, rank, title, canonical_url(url)) for rank, (title, url) in enumerate(results)],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO company_searches (company, searched_at) VALUES (?, ?)", (key, time.time())
+            )
+
+    def company_verdicts(self, company_name: str, max_age_s: float = ARTICLE_TTL_S) -> Dict[str, StoredVerdict]:
+        """Relevance verdicts for a company's articles, by canonical URL"""
+        rows = self._conn().execute(
+            """
+            SELECT url, about_company, esg, esg_score, decided_by FROM article_verdicts
+            WHERE company=? AND classified_at >= ?
+            """,
+            (company_key(company_name), time.time() - max_age_s),
+        ).fetchall()
+        return {url: StoredVerdict(url, _flag(about), _flag(esg), score, by) for url, about, esg, score, by in rows}
+
+    def save_verdicts(self, company_name: str, verdicts: Sequence[StoredVerdict]) -> None:
+        key, now = company_key(company_name), time.time()
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO article_verdicts
+                    (company, url, about_company, esg, esg_score, decided_by, classified_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [(key, canonical_url(v.url), v.about_company, v.esg, v.esg_score, v.decided_by, now) for v in verdicts],
+            )
+
+    def searched_at(self, company_name: str) -> Optional[float]:
+        row = self._conn().execute(
+            "SELECT searched_at FROM company_searches WHERE company=?", (company_key(company_name),)
+        ).fetchone()
+        return row[0] if row else None
+
+
+_store: Optional[ArticleStore] = None
+_store_lock = threading.Lock()
+
+
+def get_article_store() -> ArticleStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArticleStore()
+        return _store
+
+
+def search_results(aliases: Sequence[str]) -> List[SearchResult]:
+    """De-duplicated search results for all aliases (canned articles in fake provider mode)"""
+    if USE_FAKE_PROVIDERS:
+        from gw_api.core.fake_providers import fake_news_search
+
+        found: Dict[str, str] = {}
+        for alias in aliases:
+            for title, path in fake_news_search(alias).items():
+                found.setdefault(title, Path(path).resolve().as_uri())
+        return [SearchResult(title, url) for title, url in found.items()]
+    return run_sync(get_news_fetcher().collect_results(list(aliases)))
+
+
+def _read_file_uri(url: str) -> str:
+    return Path(url.removeprefix("file://")).read_text(encoding="utf-8")
+
+
+async def load_article(url: str, title: str) -> Optional[StoredArticle]:
+    """
+    One article on the background loop: from the store while fresh, otherwise
+    downloaded and parsed (in a worker thread). None when the download fails.
+    """
+    store = get_article_store()
+    existing = await asyncio.to_thread(store.get, url)
+    if existing is not None and time.time() - existing.fetched_at < ARTICLE_TTL_S:
+        return existing
+    if USE_FAKE_PROVIDERS:
+        html = await asyncio.to_thread(_read_file_uri, url)
+    else:
+        html = await get_news_fetcher().get_text(url, "article")
+    if html is None:
+        return None
+    try:
+        return await asyncio.to_thread(store.put, url, title, html)
+    except Exception as e:
+        print(f"[⚠️ Error loading article: {title}]: {e}")
+        return None
+
@@ -2,18 +2,31 @@ import os
 import shutil
 import hashlib
 from datetime import datetime, timedelta
-from typing import Dict
+from typing import Dict, List, Tuple
 import requests
 from bs4 import BeautifulSoup
-
-
-def date_calculation(delta: int) -> datetime:
-    """
-    Calculate the date delta days from today, used for news crawler time range.
-    """
-    current_date = datetime.now()
-    from_date = current_date - timedelta(days=delta)
-    return from_date
+from gw_api.config import USE_FAKE_PROVIDERS
+from gw_api.core.metrics import external_seconds, observe
+from gw_api.webscraper.news_sources import (
+    SEARCH_DAYS,
+    SEARCH_DEPTH,
+    SEARCH_MAX_PAGES,
+    NewsSource,
+    SearchResult,
+    date_calculation,
+    register_source,
+)
+
+BBC_BASE_URL = os.getenv("BBC_BASE_URL", "https://www.bbc.co.uk").rstrip("/")
+
+
+def article_path(title: str, directory: str) -> str:
+    """Local file for an article: safe title + short hash, so reruns find earlier downloads"""
+    safe_title = "".join(char for char in title if char.isalnum())
+    if not safe_title:
+        safe_title = "article"
+    title_hash = hashlib.md5(title.encode("utf-8")).hexdigest()[:8]
+    return os.path.join(directory, f"{safe_title[:50]}_{title_hash}.html")
 
 
 def url_download(links: dict, directory: str = "downloads") -> Dict[str, str]:
@@ -26,20 +39,16 @@ def url_download(links: dict, directory: str = "downloads") -> Dict[str, str]:
 
     try:
         for title, url in links.items():
-            # Convert title to a safe filename + unique hash
-            safe_title = "".join(char for char in title if char.isalnum())
-            if not safe_title:
-                safe_title = "article"
-            title_hash = hashlib.md5(title.encode("utf-8")).hexdigest()[:8]
-            filename = f"{safe_title[:50]}_{title_hash}.html"
-            path = os.path.join(directory, filename)
+            path = article_path(title, directory)
 
             # Avoid duplicate downloads
             if os.path.exists(path):
                 downloads_dictionary[title] = path
                 continue
 
-            response = requests.get(url, timeout=10)
+            with observe(external_seconds, service="bbc", operation="article") as sp:
+                response = requests.get(url, timeout=10)
+                sp.set(status=response.status_code, bytes=len(response.content))
             with open(path, "w", encoding="utf-8") as f:
                 f.write(response.text)
 
@@ -78,65 +87,91 @@ def date_conversion(date: str) -> datetime:
             return datetime(int(components[2]), month, int(components[0]))
 
 
+def search_url(name: str, page: int) -> str:
+    return f"{BBC_BASE_URL}/search?q={name}&d=NEWS_PS&page={page}"
+
+
+def parse_search_page(html: str, last_date: datetime) -> Tuple[List[SearchResult], bool]:
+    """
+    Recent news articles (title, link, publication date) on one search result
+    page, and whether the page was empty (no more results).
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    promo_articles = soup.find_all("div", attrs={"data-testid": "default-promo"})
+    if not promo_articles:
+        return [], True
+
+    results = []
+    for article in promo_articles:
+        title_struct = article.find("p")
+        if not title_struct:
+            continue
+        title = title_struct.get_text(strip=True)
+        a_tag = article.find("a")
+        if not a_tag:
+            continue
+        link = a_tag.get("href")
+        if not link:
+            continue
+        container = article.find("ul")
+        if not container or not container.find("span"):
+            continue
+        article_date = container.find("span").text
+        if not article_date:
+            continue
+
+        try:
+            date = date_conversion(article_date)
+        except Exception:
+            continue
+
+        if url_validity(link) and date >= last_date:
+            results.append(SearchResult(title, link, date))
+    return results, False
+
+
+@register_source
+class BBCSource(NewsSource):
+    name = "bbc"
+    default_base_url = BBC_BASE_URL
+    hosts = ("www.bbc.co.uk", "www.bbc.com")
+
+    def search_request(self, query: str, page: int) -> Tuple[str, Dict[str, str]]:
+        return f"{self.base_url}/search", {"q": query, "d": "NEWS_PS", "page": str(page)}
+
+    def parse_search(self, body: str, last_date: datetime) -> Tuple[List[SearchResult], bool]:
+        return parse_search_page(body, last_date)
+
+
 def bbc_search(name: str) -> Dict[str, str]:
     """
     BBC news crawler: search for news related to 'name', download, and return local paths.
     """
-    depth = 10
-    delta = 365 * 2
-    last_date = date_calculation(delta)
+    if USE_FAKE_PROVIDERS:
+        from gw_api.core.fake_providers import fake_news_search
+
+        return fake_news_search(name)
+
+    last_date = date_calculation(SEARCH_DAYS)
     web_dictionary = {}
-    page_count = 1
-    next_page = True
-    limit = False
 
-    while next_page:
-        source = f"https://www.bbc.co.uk/search?q={name}&d=NEWS_PS&page={page_count}"
-        response = requests.get(source)
+    for page_count in range(1, SEARCH_MAX_PAGES + 1):
+        with observe(external_seconds, service="bbc", operation="search") as sp:
+            response = requests.get(search_url(name, page_count), timeout=10)
+            sp.set(status=response.status_code, bytes=len(response.content), page=page_count)
         response.encoding = "utf-8"
-        soup = BeautifulSoup(response.text, "html.parser")
-        promo_articles = soup.find_all("div", attrs={"data-testid": "default-promo"})
-
-        if not promo_articles:
+        results, exhausted = parse_search_page(response.text, last_date)
+        if exhausted:
             break
 
-        for article in promo_articles:
-            title_struct = article.find("p")
-            if not title_struct:
-                continue
-            title = title_struct.get_text(strip=True)
-            a_tag = article.find("a")
-            if not a_tag:
-                continue
-            link = a_tag.get("href")
-            if not link:
-                continue
-            container = article.find("ul")
-            if not container:
-                continue
-            article_date = container.find("span").text
-            if not article_date:
-                continue
-
-            try:
-                date = date_conversion(article_date)
-            except:
-                continue
-
-            size = len(web_dictionary) + 1 <= depth
-            if url_validity(link) and size and date >= last_date:
-                web_dictionary[title] = link
-            elif not size:
+        limit = False
+        for title, link, _ in results:
+            if len(web_dictionary) + 1 > SEARCH_DEPTH:
                 limit = True
                 break
-
+            web_dictionary[title] = link
         if limit:
-            next_page = False
-        else:
-            page_count += 1
-   
-            if page_count > 10:
-                break
+            break
 
     if len(web_dictionary) != 0:
         return url_download(web_dictionary)
@@ -1,22 +1,22 @@
-import os
-import re
-import hashlib
-from datetime import datetime, timedelta
-from typing import Dict
-from app.config import DOWNLOADS_PATH
+"""
+CNN news source
+CNN's search page is rendered in the browser from a JSON search API; the
+source queries that API directly over plain HTTP, so no browser is needed.
+Article pages are fetched like any other article.
+
+    CNN_SEARCH_URL   search API host (https://search.prod.di.api.cnn.io)
+"""
 
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import requests
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
+from gw_api.config import DOWNLOADS_PATH
+from gw_api.webscraper.news_sources import NewsSource, SearchResult, register_source
 
-def date_calculation(delta: int) -> datetime:
-    current_date = datetime.now()
-    return current_date - timedelta(days=delta)
+CNN_SEARCH_URL = os.getenv("CNN_SEARCH_URL", "https://search.prod.di.api.cnn.io").rstrip("/")
+PAGE_SIZE = 10
 
 
 def url_validity(url: str) -> bool:
@@ -24,113 +24,64 @@ def url_validity(url: str) -> bool:
 
 
 def date_conversion(date: str) -> datetime:
-    components = date.split(" ")
-    if len(components) == 3 and components[2] == "ago":
-        return datetime.now() - timedelta(hours=int(components[0]))
-    else:
-        month = datetime.strptime(components[1], "%B").month
-        if len(components) == 2:
-            return datetime(datetime.now().year, month, int(components[0]))
-        else:
-            return datetime(int(components[2]), month, int(components[0]))
-
-
-def url_download(links: dict, directory: str = "downloads") -> Dict[str, str]:
-    os.makedirs(directory, exist_ok=True)
-    downloads_dictionary = {}
-
-    for title, url in links.items():
-        safe_title = "".join(char for char in title if char.isalnum()) or "article"
-        title_hash = hashlib.md5(title.encode("utf-8")).hexdigest()[:8]
-        filename = f"{safe_title[:50]}_{title_hash}.html"
-        path = os.path.join(directory, filename)
-
-        if os.path.exists(path):
-            downloads_dictionary[title] = path
-            continue
+    """ISO timestamp from the search API (e.g. 2024-05-01T12:30:00.000Z) as naive UTC"""
+    return datetime.fromisoformat(date.replace("Z", "+00:00")).replace(tzinfo=None)
 
-        try:
-            response = requests.get(url, timeout=10)
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(response.text)
-            downloads_dictionary[title] = path
-        except Exception as e:
-            print(f"[ERROR] Failed to download {url}: {e}")
-
-    return downloads_dictionary
 
-
-def cnn_search(name: str) -> Dict[str, str]:
+def parse_search_json(body: str, last_date: datetime) -> Tuple[List[SearchResult], bool]:
     """
-    Use Selenium to crawl CNN search results, download, and return local paths.
+    Recent articles (title, url, publication date) in one search API response,
+    and whether it was empty (no more results).
     """
-    depth = 20
-    delta = 365 * 2
-    last_date = date_calculation(delta)
-    web_dictionary = {}
-    page_count = 1
-
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-
-    driver = webdriver.Chrome(options=chrome_options)
-
-    while True:
-        url = f"https://www.cnn.com/search?q={name}&size=10&page={page_count}"
-        driver.get(url)
+    items = json.loads(body).get("result") or []
+    if not items:
+        return [], True
 
+    results = []
+    for item in items:
+        if item.get("type", "article") != "article":
+            continue
+        title = (item.get("headline") or "").strip()
+        link = item.get("url") or item.get("path")
+        article_date = item.get("firstPublishDate") or item.get("lastPublishDate") or item.get("lastModifiedDate")
+        if not title or not link or not article_date:
+            continue
         try:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div.container__headline"))
-            )
-        except:
-            print(f"[DEBUG] No articles on CNN page {page_count}, ending")
-            break
-
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        cards = soup.select("div.container__headline")
-
-        if not cards:
-            print(f"[DEBUG] No articles on CNN page {page_count}, ending")
-            break
-
-        for card in cards:
-            a_tag = card.find("a")
-            title = a_tag.get_text(strip=True) if a_tag else None
-            link = a_tag["href"] if a_tag and a_tag.has_attr("href") else None
-
-            date_tag = card.find_next("div", class_="container__date")
-            article_date = date_tag.get_text(strip=True) if date_tag else None
-
-            if not title or not link or not article_date:
-                continue
-
-            try:
-                date = date_conversion(article_date)
-            except:
-                continue
-
-            if url_validity(link) and len(web_dictionary) < depth and date >= last_date:
-                if link.startswith("/"):
-                    link = "https://www.cnn.com" + link
-                web_dictionary[title] = link
-
-            if len(web_dictionary) >= depth:
-                break
-
-        if len(web_dictionary) >= depth or page_count >= 20:
-            break
-        page_count += 1
-
-    driver.quit()
-
-    if web_dictionary:
-        print(f"[DEBUG] Number of CNN articles crawled: {len(web_dictionary)}")
-        for i, title in enumerate(web_dictionary.keys(), 1):
-            print(f"  [CNN] {title}")
-        return url_download(web_dictionary, DOWNLOADS_PATH)
-    else:
-        print("[DEBUG] No qualifying CNN articles found")
-        return None
+            date = date_conversion(article_date)
+        except ValueError:
+            continue
+        if url_validity(link) and date >= last_date:
+            results.append(SearchResult(title, link, date))
+    return results, False
+
+
+@register_source
+class CNNSource(NewsSource):
+    name = "cnn"
+    default_base_url = CNN_SEARCH_URL
+    hosts = ("www.cnn.com", "edition.cnn.com", "cnn.com")
+    rate_per_s = 2.0
+    burst = 2
+
+    def search_request(self, query: str, page: int) -> Tuple[str, Dict[str, str]]:
+        params = {
+            "q": query,
+            "size": str(PAGE_SIZE),
+            "from": str((page - 1) * PAGE_SIZE),
+            "page": str(page),
+            "sort": "newest",
+            "types": "article",
+        }
+        return f"{self.base_url}/content", params
+
+    def parse_search(self, body: str, last_date: datetime) -> Tuple[List[SearchResult], bool]:
+        return parse_search_json(body, last_date)
+
+
+def cnn_search(name: str) -> Optional[Dict[str, str]]:
+    """
+    CNN news crawler: search for news related to 'name', download, and return local paths.
+    """
+    from gw_api.webscraper.news_fetcher import fetch_news
+
+    return fetch_news([name], str(DOWNLOADS_PATH), sources=["cnn"]) or None
@@ -0,0 +1,149 @@
+"""
+Main-content extraction for news articles
+Pulls the headline and body text out of an article page with BeautifulSoup
+instead of UnstructuredHTMLLoader, which is slow to import and run and keeps
+navigation, related links and footers that end up in LLM prompts.
+
+Site rules (BBC, CNN) select the article blocks directly. Other pages, or a
+site page whose layout changed, fall back to a readability-style heuristic:
+boilerplate elements are dropped, every paragraph scores its parent (and half
+for the grandparent) by text length and commas, scores are discounted by link
+density, and the paragraphs of the best container are kept.
+
+    NEWS_EXTRACTOR   fast (default) | unstructured (previous loader)
+"""
+
+import importlib.util
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup, Tag
+
+PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+EXTRACTOR = os.getenv("NEWS_EXTRACTOR", "fast").lower()
+
+DROP_TAGS = ["script", "style", "noscript", "template", "svg", "iframe", "form", "button", "nav", "footer", "header", "aside"]
+BOILERPLATE = re.compile(
+    r"nav|menu|footer|header|share|social|promo|related|recommend|cookie|consent|banner|advert|\bad\b|"
+    r"comment|subscribe|newsletter|breadcrumb|most-?read|sidebar|tags|byline|caption",
+    re.I,
+)
+TEXT_TAGS = ["p", "h2", "h3", "li", "blockquote"]
+MIN_PARAGRAPH_CHARS = 25
+WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class SiteRule:
+    headline: str
+    blocks: str  # CSS selector of body text elements, in page order
+
+
+SITE_RULES: Dict[str, SiteRule] = {
+    "bbc": SiteRule(
+        headline="h1#main-heading, [data-component='headline-block'] h1, article h1",
+        blocks="article [data-component='text-block'] p, article [data-component='subheadline-block'] h2",
+    ),
+    "cnn": SiteRule(
+        headline="h1.headline__text, h1[data-editable='headlineText'], h1",
+        blocks=".article__content p.paragraph, .article__content h2, [data-editable='text'] p",
+    ),
+}
+
+
+def _site(url: Optional[str]) -> Optional[str]:
+    host = urlsplit(url or "").netloc.lower()
+    if host.endswith("bbc.co.uk") or host.endswith("bbc.com"):
+        return "bbc"
+    if host.endswith("cnn.com"):
+        return "cnn"
+    return None
+
+
+def _clean(text: str) -> str:
+    return WHITESPACE.sub(" ", text).strip()
+
+
+def _is_boilerplate(tag: Tag) -> bool:
+    attrs = tag.attrs or {}
+    marker = " ".join([attrs.get("id") or "", " ".join(attrs.get("class") or []), attrs.get("data-component") or "",
+                       attrs.get("role") or ""])
+    return bool(marker.strip()) and bool(BOILERPLATE.search(marker))
+
+
+def _strip_boilerplate(root: Tag) -> None:
+    for tag in root.find_all(DROP_TAGS):
+        tag.decompose()
+    for tag in root.find_all(True):
+        if not tag.decomposed and tag.name not in ("html", "body", "article", "main") and _is_boilerplate(tag):
+            tag.decompose()
+
+
+def _title(soup: BeautifulSoup, selector: str = "h1") -> str:
+    heading = soup.select_one(selector)
+    if heading is not None:
+        return _clean(heading.get_text(" "))
+    return _clean(soup.title.get_text(" ")) if soup.title else ""
+
+
+def _by_rule(soup: BeautifulSoup, rule: SiteRule) -> Tuple[str, List[str]]:
+    paragraphs = [_clean(el.get_text(" ")) for el in soup.select(rule.blocks)]
+    return _title(soup, rule.headline), [p for p in paragraphs if p]
+
+
+def _by_density(soup: BeautifulSoup) -> Tuple[str, List[str]]:
+    title = _title(soup)
+    body = soup.body or soup
+    _strip_boilerplate(body)
+
+    scores: Dict[int, float] = {}
+    nodes: Dict[int, Tag] = {}
+    for p in body.find_all("p"):
+        text = _clean(p.get_text(" "))
+        if len(text) < MIN_PARAGRAPH_CHARS:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        for parent, share in ((p.parent, 1.0), (p.parent.parent if p.parent else None, 0.5)):
+            if isinstance(parent, Tag):
+                scores[id(parent)] = scores.get(id(parent), 0.0) + score * share
+                nodes[id(parent)] = parent
+
+    best: Optional[Tag] = None
+    best_score = 0.0
+    for key, score in scores.items():
+        node = nodes[key]
+        text_len = len(node.get_text()) or 1
+        link_len = sum(len(a.get_text()) for a in node.find_all("a"))
+        score *= 1 - link_len / text_len
+        if score > best_score:
+            best, best_score = node, score
+
+    if best is None:
+        text = _clean(body.get_text(" "))
+        return title, [text] if text else []
+    paragraphs = []
+    for el in best.find_all(TEXT_TAGS):
+        if el.find_parent(TEXT_TAGS) is not None:
+            continue  # nested (e.g. <p> inside <li>): the outer element already has its text
+        text = _clean(el.get_text(" "))
+        if text and (el.name != "li" or len(text) >= MIN_PARAGRAPH_CHARS):
+            paragraphs.append(text)
+    return title, paragraphs
+
+
+def extract_main_text(html: str, url: Optional[str] = None) -> str:
+    """Headline and body paragraphs of an article page, separated by blank lines"""
+    soup = BeautifulSoup(html, PARSER)
+    site = _site(url)
+    title, paragraphs = ("", [])
+    if site is not None:
+        title, paragraphs = _by_rule(soup, SITE_RULES[site])
+    if not paragraphs:
+        title, paragraphs = _by_density(soup)
+    if title and paragraphs and paragraphs[0] == title:
+        paragraphs = paragraphs[1:]
+    return "\n\n".join([title, *paragraphs] if title else paragraphs)
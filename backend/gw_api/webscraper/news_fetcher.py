@@ -0,0 +1,221 @@
+"""
+Concurrent news fetcher
+Searches every company alias on every enabled news source at once (see
+news_sources), merges the results with duplicate article URLs and titles
+dropped, and downloads the remaining articles concurrently. One pooled aiohttp
+session per process (on the shared background loop) with a per-host connection
+limit, per-source rate limits, timeouts and retries with backoff for
+connection errors, 429 and 5xx. With NEWS_FIXTURES=record|replay every
+response is recorded per source or answered from the recordings.
+
+    NEWS_MAX_PER_HOST   concurrent connections per host (8)
+    BBC_BASE_URL        BBC search host; `python -m benchmarks.news_fixture` is a local stand-in
+"""
+
+import asyncio
+import os
+import random
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlsplit, urlunsplit
+
+import aiohttp
+
+from gw_api.config import USE_FAKE_PROVIDERS
+from gw_api.core.background_loop import run_sync
+from gw_api.core.metrics import external_seconds, observe
+from gw_api.webscraper.bbc_search import article_path
+from gw_api.webscraper.news_sources import (
+    FixtureStore,
+    NewsSource,
+    SearchError,
+    SearchResult,
+    enabled_sources,
+    source_for_url,
+)
+
+MAX_PER_HOST = int(os.getenv("NEWS_MAX_PER_HOST", "8"))
+RETRIES = 2
+BACKOFF_S = 0.5
+TIMEOUT_S = 10
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def title_key(title: str) -> str:
+    return " ".join(title.casefold().split())
+
+
+def canonical_url(url: str) -> str:
+    """Article identity for de-duplication: no query string, fragment or trailing slash"""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), "", ""))
+
+
+class NewsFetcher:
+    def __init__(
+        self,
+        sources: Optional[Sequence[NewsSource]] = None,
+        max_per_host: int = MAX_PER_HOST,
+        retries: int = RETRIES,
+        backoff_s: float = BACKOFF_S,
+        timeout_s: float = TIMEOUT_S,
+        fixtures: Optional[FixtureStore] = None,
+    ):
+        self.sources = list(sources) if sources is not None else enabled_sources()
+        self.max_per_host = max_per_host
+        self.fixtures = fixtures if fixtures is not None else FixtureStore()
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.timeout_s = timeout_s
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_per_host * 4, limit_per_host=self.max_per_host),
+                timeout=aiohttp.ClientTimeout(total=self.timeout_s),
+                headers={"User-Agent": "Mozilla/5.0 (compatible; gw-api news fetcher)"},
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def get_text(
+        self, url: str, operation: str, params: Optional[Dict[str, str]] = None, service: Optional[str] = None
+    ) -> Optional[str]:
+        """Body of a GET, None on 404 or once retries are exhausted"""
+        source = source_for_url(url, self.sources)
+        service = service or (source.name if source else "news")
+        if self.fixtures.replaying:
+            return self.fixtures.load(service, url, params)
+        body = await self._fetch(url, operation, params, service, source)
+        if self.fixtures.recording:
+            self.fixtures.save(service, url, params, body)
+        return body
+
+    async def _fetch(
+        self, url: str, operation: str, params: Optional[Dict[str, str]], service: str, source: Optional[NewsSource]
+    ) -> Optional[str]:
+        session = await self._ensure_session()
+        for attempt in range(self.retries + 1):
+            if attempt:
+                delay = self.backoff_s * 2 ** (attempt - 1)
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
+            if source is not None:
+                await source.limiter.acquire()
+            try:
+                with observe(external_seconds, service=service, operation=operation) as sp:
+                    async with session.get(url, params=params) as response:
+                        body = await response.read()
+                        sp.set(status=response.status, bytes=len(body), attempt=attempt)
+                        if response.status in RETRY_STATUSES:
+                            continue
+                        if response.status >= 400:
+                            return None
+                        return body.decode(response.charset or "utf-8", errors="replace")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.retries:
+                    print(f"[News] {url} failed after {attempt + 1} attempts: {e}")
+        return None
+
+    async def download(self, articles: Dict[str, str], directory: str) -> Dict[str, str]:
+        """title -> local path; already downloaded articles are not fetched again"""
+        os.makedirs(directory, exist_ok=True)
+
+        async def one(title: str, url: str) -> Optional[str]:
+            path = article_path(title, directory)
+            if os.path.exists(path):
+                return path
+            body = await self.get_text(url, "article")
+            if body is None:
+                return None
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(body)
+            return path
+
+        titles = list(articles)
+        paths = await asyncio.gather(*(one(t, articles[t]) for t in titles))
+        return {t: p for t, p in zip(titles, paths) if p}
+
+    async def collect_results(self, aliases: Sequence[str]) -> List[SearchResult]:
+        """
+        Search all aliases on all sources concurrently; results with duplicate
+        URLs and titles dropped. Queries that fail are skipped, but if every one
+        fails SearchError is raised, so an outage is not mistaken for no news.
+        """
+        pairs = [(source, alias) for alias in aliases for source in self.sources]
+        per_query = await asyncio.gather(
+            *(source.search(self, alias) for source, alias in pairs), return_exceptions=True
+        )
+        failures = [r for r in per_query if isinstance(r, BaseException)]
+        if pairs and len(failures) == len(pairs):
+            raise SearchError(f"all {len(pairs)} news searches failed, e.g. {failures[0]!r}")
+        collected: List[SearchResult] = []
+        seen_urls, seen_titles = set(), set()
+        for (source, alias), results in zip(pairs, per_query):
+            if isinstance(results, BaseException):
+                print(f"[{source.name.upper()} error with alias '{alias}']: {results}")
+                continue
+            for result in results:
+                key, title = canonical_url(result.link), title_key(result.title)
+                if key in seen_urls or title in seen_titles:
+                    continue
+                seen_urls.add(key)
+                seen_titles.add(title)
+                collected.append(result)
+        return collected
+
+    async def collect(self, aliases: Sequence[str]) -> Dict[str, str]:
+        """Search all aliases concurrently; title -> url with duplicate URLs dropped ({} if every search failed)"""
+        try:
+            results = await self.collect_results(aliases)
+        except SearchError as e:
+            print(f"[News] {e}")
+            return {}
+        return {r.title: r.link for r in results}
+
+    async def fetch_many(self, urls: Sequence[str]) -> Dict[str, Optional[str]]:
+        """url -> HTML (None when the download failed), fetched concurrently"""
+        bodies = await asyncio.gather(*(self.get_text(url, "article") for url in urls))
+        return dict(zip(urls, bodies))
+
+    async def search_aliases(self, aliases: Sequence[str], directory: str = "downloads") -> Dict[str, str]:
+        """Search all aliases on all sources concurrently, de-duplicate articles, download once each"""
+        return await self.download(await self.collect(aliases), directory)
+
+
+_fetcher: Optional[NewsFetcher] = None
+
+
+def get_news_fetcher() -> NewsFetcher:
+    """Process-wide fetcher; use it through `run_sync` from synchronous code"""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = NewsFetcher()
+    return _fetcher
+
+
+def fetch_news(
+    aliases: Sequence[str], directory: str = "downloads", sources: Optional[Sequence[str]] = None
+) -> Dict[str, str]:
+    """Synchronous search and download: title -> local HTML path (all enabled sources by default)"""
+    if USE_FAKE_PROVIDERS:
+        from gw_api.core.fake_providers import fake_news_search
+
+        articles: Dict[str, str] = {}
+        for alias in aliases:
+            articles.update(fake_news_search(alias, directory))
+        return articles
+    fetcher = get_news_fetcher()
+    if sources is not None:
+        fetcher = NewsFetcher(sources=enabled_sources(sources))
+
+    async def run() -> Dict[str, str]:
+        try:
+            return await fetcher.search_aliases(list(aliases), directory)
+        finally:
+            if fetcher is not get_news_fetcher():
+                await fetcher.close()
+
+    return run_sync(run())
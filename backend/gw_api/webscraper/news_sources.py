@@ -0,0 +1,232 @@
+"""
+News source plugins
+A news source knows how to build a search request for a query and page and how
+to parse the response into SearchResults; the pooled HTTP layer
+(news_fetcher.NewsFetcher) does the fetching. Sources register themselves with
+`@register_source` and are enabled by name:
+
+    NEWS_SOURCES       comma-separated enabled sources (bbc,cnn)
+    NEWS_RATE_LIMITS   per-source requests per second, e.g. "bbc=5,cnn=2"
+                       (default: each source's rate_per_s; 0 disables the limit)
+    NEWS_PAGE_WINDOW   result pages requested together per query (3)
+    NEWS_FIXTURES      off | record | replay - record every response per source
+                       under NEWS_FIXTURE_DIR, or answer only from recordings
+                       (no network) for repeatable tests
+
+Rate limits also cover article downloads: an article URL is attributed to the
+source whose hosts include its host.
+"""
+
+import asyncio
+import hashlib
+import importlib
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Type
+from urllib.parse import urljoin, urlsplit
+
+from gw_api.config import NEWS_FIXTURE_DIR
+
+ENABLED_SOURCES = [s.strip() for s in os.getenv("NEWS_SOURCES", "bbc,cnn").split(",") if s.strip()]
+PAGE_WINDOW = int(os.getenv("NEWS_PAGE_WINDOW", "3"))
+FIXTURE_MODE = os.getenv("NEWS_FIXTURES", "off").lower()
+SEARCH_DEPTH = 10  # articles kept per query and source
+SEARCH_MAX_PAGES = 10
+SEARCH_DAYS = 365 * 2
+
+# Plugin modules imported on first registry access
+BUILTIN_SOURCES = ("gw_api.webscraper.bbc_search", "gw_api.webscraper.cnn_search")
+
+
+class SearchError(RuntimeError):
+    """A source could not be searched (first result page failed), as opposed to finding nothing"""
+
+
+class SearchResult(NamedTuple):
+    title: str
+    link: str
+    published: Optional[datetime] = None
+    source: str = ""
+
+
+def date_calculation(delta: int) -> datetime:
+    """
+    Calculate the date delta days from today, used for news crawler time range.
+    """
+    return datetime.now() - timedelta(days=delta)
+
+
+def _parse_rate_limits(raw: str) -> Dict[str, float]:
+    limits = {}
+    for item in raw.split(","):
+        name, _, rate = item.partition("=")
+        if name.strip() and rate.strip():
+            limits[name.strip()] = float(rate)
+    return limits
+
+
+RATE_LIMITS = _parse_rate_limits(os.getenv("NEWS_RATE_LIMITS", ""))
+
+
+class RateLimiter:
+    """Async token bucket: `rate_per_s` requests per second with bursts of `burst`"""
+
+    def __init__(self, rate_per_s: float, burst: int = 1):
+        self.rate_per_s = rate_per_s
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self) -> None:
+        if self.rate_per_s <= 0:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_s)
+            self._updated = now
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate_per_s)
+                self._tokens = 1.0
+                self._updated = time.monotonic()
+            self._tokens -= 1
+
+
+class FixtureStore:
+    """Recorded responses, one JSON file per (source, url, params) under root/source/"""
+
+    def __init__(self, root: Path = NEWS_FIXTURE_DIR, mode: str = FIXTURE_MODE):
+        self.root = Path(root)
+        self.mode = mode
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    def path(self, source: str, url: str, params: Optional[Dict[str, str]]) -> Path:
+        key = json.dumps([url, sorted((params or {}).items())])
+        return self.root / source / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]}.json"
+
+    def load(self, source: str, url: str, params: Optional[Dict[str, str]]) -> Optional[str]:
+        path = self.path(source, url, params)
+        if not path.exists():
+            print(f"[News] no recorded response for {source} {url} {params or ''}")
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))["body"]
+
+    def save(self, source: str, url: str, params: Optional[Dict[str, str]], body: Optional[str]) -> None:
+        path = self.path(source, url, params)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"url": url, "params": params, "body": body}), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+class NewsSource(ABC):
+    """A searchable news site; subclasses build requests and parse result pages"""
+
+    name: str = ""
+    default_base_url: str = ""
+    hosts: Tuple[str, ...] = ()  # article hosts, besides the base URL's
+    rate_per_s: float = 5.0
+    burst: int = 5
+    depth: int = SEARCH_DEPTH
+    max_pages: int = SEARCH_MAX_PAGES
+    days: int = SEARCH_DAYS
+
+    def __init__(self, base_url: Optional[str] = None, rate_per_s: Optional[float] = None,
+                 page_window: int = PAGE_WINDOW):
+        self.base_url = (base_url or self.default_base_url).rstrip("/")
+        rate = rate_per_s if rate_per_s is not None else RATE_LIMITS.get(self.name, self.rate_per_s)
+        self.limiter = RateLimiter(rate, self.burst)
+        self.page_window = max(1, page_window)
+
+    def owns(self, url: str) -> bool:
+        host = urlsplit(url).netloc.lower()
+        return host == urlsplit(self.base_url).netloc.lower() or host in self.hosts
+
+    @abstractmethod
+    def search_request(self, query: str, page: int) -> Tuple[str, Dict[str, str]]:
+        """(url, query params) of one result page, pages counted from 1"""
+
+    @abstractmethod
+    def parse_search(self, body: str, last_date: datetime) -> Tuple[List[SearchResult], bool]:
+        """Results on one page newer than last_date, and whether there are no more pages"""
+
+    async def search(self, http, query: str) -> List[SearchResult]:
+        """
+        Up to `depth` recent results in result order, `page_window` pages at a
+        time. Raises SearchError when the first page cannot be fetched; a later
+        page failing ends the search with what was found.
+        """
+        last_date = date_calculation(self.days)
+        found: List[SearchResult] = []
+        for first in range(1, self.max_pages + 1, self.page_window):
+            pages = range(first, min(first + self.page_window, self.max_pages + 1))
+            requests = [self.search_request(query, p) for p in pages]
+            bodies = await asyncio.gather(*(
+                http.get_text(url, "search", params, service=self.name) for url, params in requests
+            ))
+            for page, body in zip(pages, bodies):
+                if body is None:
+                    if page == 1:
+                        raise SearchError(f"{self.name}: no response for '{query}'")
+                    return found
+                results, exhausted = self.parse_search(body, last_date)
+                if exhausted:
+                    return found
+                for result in results:
+                    found.append(result._replace(link=urljoin(self.base_url + "/", result.link), source=self.name))
+                    if len(found) >= self.depth:
+                        return found
+        return found
+
+
+_registry: Dict[str, Type[NewsSource]] = {}
+_instances: Dict[str, NewsSource] = {}
+
+
+def register_source(cls: Type[NewsSource]) -> Type[NewsSource]:
+    _registry[cls.name] = cls
+    return cls
+
+
+def _load_builtin() -> None:
+    for module in BUILTIN_SOURCES:
+        importlib.import_module(module)
+
+
+def registered_sources() -> List[str]:
+    _load_builtin()
+    return sorted(_registry)
+
+
+def get_source(name: str) -> NewsSource:
+    """Process-wide instance of a registered source (one rate limiter per source)"""
+    _load_builtin()
+    if name not in _instances:
+        if name not in _registry:
+            raise KeyError(f"Unknown news source '{name}' (registered: {', '.join(sorted(_registry))})")
+        _instances[name] = _registry[name]()
+    return _instances[name]
+
+
+def enabled_sources(names: Optional[Sequence[str]] = None) -> List[NewsSource]:
+    return [get_source(name) for name in (names or ENABLED_SOURCES)]
+
+
+def source_for_url(url: str, sources: Optional[Sequence[NewsSource]] = None) -> Optional[NewsSource]:
+    for source in sources if sources is not None else enabled_sources():
+        if source.owns(url):
+            return source
+    return None
@@ -0,0 +1,239 @@
+"""
+Persistent Wikirate cache
+SQLite-backed (WAL, so several worker processes share one file) store for
+Wikirate company records, answers by company and year, and metric metadata.
+
+Each entity kind has its own TTL. After the TTL an entry is still served for a
+stale-while-revalidate window while a background thread refreshes it; only
+entries older than TTL + stale window block on a fetch. Companies that Wikirate
+does not know are cached as negative entries so they are not looked up again
+on every analysis.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from gw_api.config import WIKIRATE_CACHE_PATH
+
+DAY = 24 * 3600
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl_s: float
+    stale_s: float
+    negative_ttl_s: float = DAY
+
+
+# Company records and metric definitions barely change; answers get new years
+POLICIES: Dict[str, CachePolicy] = {
+    "company": CachePolicy(ttl_s=7 * DAY, stale_s=30 * DAY),
+    "answers": CachePolicy(ttl_s=1 * DAY, stale_s=7 * DAY),
+    "metric": CachePolicy(ttl_s=30 * DAY, stale_s=90 * DAY),
+}
+
+_MISSING = object()
+
+
+class WikirateCache:
+    def __init__(self, path: Path = WIKIRATE_CACHE_PATH, policies: Optional[Dict[str, CachePolicy]] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.policies = dict(POLICIES, **(policies or {}))
+        self._local = threading.local()
+        self._refreshing: Set[Tuple[str, str]] = set()
+        self._refresh_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="wikirate-swr")
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {"hit": 0, "stale": 0, "miss": 0, "negative_hit": 0, "refresh_error": 0}
+        with self._conn() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS wikirate_cache (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT,
+                    negative INTEGER NOT NULL DEFAULT 0,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (kind, key)
+                )
+                """
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _key(key: str) -> str:
+        return " ".join(str(key).lower().split())
+
+    # ---- raw access ----
+    def get(self, kind: str, key: str) -> Tuple[Any, Optional[float], bool]:
+        """(value, age_seconds, negative); value is _MISSING when absent"""
+        row = self._conn().execute(
+            "SELECT value, negative, fetched_at FROM wikirate_cache WHERE kind=? AND key=?",
+            (kind, self._key(key)),
+        ).fetchone()
+        if row is None:
+            return _MISSING, None, False
+        value, negative, fetched_at = row
+        return (None if negative else json.loads(value)), time.time() - fetched_at, bool(negative)
+
+    def put(self, kind: str, key: str, value: Any) -> None:
+        """Store a value; None is stored as a negative (not found) entry"""
+        self._conn().execute(
+            "INSERT OR REPLACE INTO wikirate_cache (kind, key, value, negative, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (kind, self._key(key), None if value is None else json.dumps(value, default=str),
+             1 if value is None else 0, time.time()),
+        )
+
+    def invalidate(self, kind: Optional[str] = None, key: Optional[str] = None) -> None:
+        if kind and key is not None:
+            self._conn().execute("DELETE FROM wikirate_cache WHERE kind=? AND key=?", (kind, self._key(key)))
+        elif kind:
+            self._conn().execute("DELETE FROM wikirate_cache WHERE kind=?", (kind,))
+        else:
+            self._conn().execute("DELETE FROM wikirate_cache")
+
+    # ---- read-through ----
+    def _lookup(self, kind: str, key: str) -> Tuple[Any, str]:
+        """(value, state) with state one of fresh / negative / stale / expired / missing"""
+        policy = self.policies[kind]
+        value, age, negative = self.get(kind, key)
+        if negative:
+            return None, "negative" if age < policy.negative_ttl_s else "missing"
+        if value is _MISSING:
+            return value, "missing"
+        if age < policy.ttl_s:
+            return value, "fresh"
+        return value, "stale" if age < policy.ttl_s + policy.stale_s else "expired"
+
+    def _served(self, state: str) -> None:
+        self.stats[{"fresh": "hit", "negative": "negative_hit"}.get(state, state)] += 1
+
+    def get_or_fetch(self, kind: str, key: str, fetch: Callable[[], Any]) -> Any:
+        """
+        Cached value for (kind, key), calling `fetch` on a miss. `fetch` returns
+        None for "does not exist" (negatively cached) and raises on transient
+        errors (nothing cached, stale value served if there is one).
+        """
+        value, state = self._lookup(kind, key)
+        if state in ("fresh", "negative", "stale"):
+            self._served(state)
+            if state == "stale":
+                self._refresh_in_background(kind, key, fetch)
+            return value
+
+        self.stats["miss"] += 1
+        try:
+            fresh = fetch()
+        except Exception:
+            if state == "expired":
+                return value  # expired but better than nothing
+            raise
+        self.put(kind, key, fresh)
+        return fresh
+
+    async def aget_or_fetch(self, kind: str, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """`get_or_fetch` for coroutine fetchers; stale entries refresh in a task on the running loop"""
+        value, state = self._lookup(kind, key)
+        if state in ("fresh", "negative", "stale"):
+            self._served(state)
+            if state == "stale":
+                self._refresh_task(kind, key, fetch)
+            return value
+
+        self.stats["miss"] += 1
+        try:
+            fresh = await fetch()
+        except Exception:
+            if state == "expired":
+                return value
+            raise
+        self.put(kind, key, fresh)
+        return fresh
+
+    def _claim_refresh(self, kind: str, key: str) -> Optional[Tuple[str, str]]:
+        token = (kind, self._key(key))
+        with self._refresh_lock:
+            if token in self._refreshing:
+                return None
+            self._refreshing.add(token)
+        return token
+
+    def _refresh_done(self, token: Tuple[str, str], kind: str, key: str, error: Optional[Exception]) -> None:
+        if error is not None:
+            self.stats["refresh_error"] += 1
+            print(f"[WikirateCache] Background refresh of {kind}:{key} failed: {error}")
+        with self._refresh_lock:
+            self._refreshing.discard(token)
+
+    def _refresh_in_background(self, kind: str, key: str, fetch: Callable[[], Any]) -> None:
+        token = self._claim_refresh(kind, key)
+        if token is None:
+            return
+
+        def refresh():
+            error = None
+            try:
+                self.put(kind, key, fetch())
+            except Exception as e:
+                error = e
+            self._refresh_done(token, kind, key, error)
+
+        self._pool.submit(refresh)
+
+    def _refresh_task(self, kind: str, key: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        token = self._claim_refresh(kind, key)
+        if token is None:
+            return
+
+        async def refresh():
+            error = None
+            try:
+                self.put(kind, key, await fetch())
+            except Exception as e:
+                error = e
+            self._refresh_done(token, kind, key, error)
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def summary(self) -> Dict[str, Any]:
+        rows = self._conn().execute(
+            "SELECT kind, COUNT(*), SUM(negative) FROM wikirate_cache GROUP BY kind"
+        ).fetchall()
+        return {
+            "entries": {kind: {"total": total, "negative": neg or 0} for kind, total, neg in rows},
+            "stats": dict(self.stats),
+        }
+
+
+_cache: Optional[WikirateCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_wikirate_cache() -> Optional[WikirateCache]:
+    """Process-wide cache; WIKIRATE_CACHE=0 disables it"""
+    global _cache
+    if os.getenv("WIKIRATE_CACHE", "1") == "0":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = WikirateCache()
+        return _cache
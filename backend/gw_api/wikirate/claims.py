@@ -0,0 +1,426 @@
+"""
+Numeric claim checks against Wikirate answers
+Deterministic pre-stage for WikirateValidationTool: pulls numeric claims
+(value, unit, year, Scope 1/2/3, percentages, reductions against a baseline
+year) out of quotations, normalizes units and compares them against the
+company's answer rows in one vectorized pass. Each claim comes back as
+supported, contradicted, not_found or undecided; only undecided claims (and
+claims without figures) still need the LLM.
+
+A figure is only compared with a metric it shares an ESG topic with; a claim
+without a GHG scope is never compared with scope-specific metrics, and a claim
+that matches more than one metric is left to the LLM.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Relative difference for absolute figures, percentage points for shares/reductions
+SUPPORT_REL = 0.05
+CONTRADICT_REL = 0.20
+SUPPORT_PP = 1.0
+CONTRADICT_PP = 5.0
+
+# ---- units: dimension code + factor to the canonical unit ----
+MASS, ENERGY, VOLUME, PERCENT = 1, 2, 3, 4
+DIMENSION_NAMES = {MASS: "t", ENERGY: "MWh", VOLUME: "m3", PERCENT: "%"}
+
+# Ordered: longer / more specific spellings first. Matched case-insensitively
+# except where a pattern carries its own (?-i:...) group.
+_UNIT_PATTERNS: List[Tuple[str, int, float]] = [
+    (r"(?-i:Mt)\s*co2e?|megatonnes?|million\s+(?:metric\s+)?tonnes?|million\s+tons?", MASS, 1e6),
+    (r"(?-i:kt)\s*co2e?|(?-i:kt)\b|kilotonnes?|thousand\s+(?:metric\s+)?tonnes?", MASS, 1e3),
+    (r"t\s*co2e?|tco₂e|(?:metric\s+)?tonnes?(?:\s+(?:of\s+)?co2e?(?:\s+equivalent)?)?|(?:metric\s+)?tons?|(?-i:t)\b", MASS, 1.0),
+    (r"twh", ENERGY, 1e6),
+    (r"gwh", ENERGY, 1e3),
+    (r"mwh", ENERGY, 1.0),
+    (r"kwh", ENERGY, 1e-3),
+    (r"pj|petajoules?", ENERGY, 1e9 / 3600),
+    (r"tj|terajoules?", ENERGY, 1e6 / 3600),
+    (r"gj|gigajoules?", ENERGY, 1e3 / 3600),
+    (r"megalit(?:re|er)s?|(?-i:ML)\b", VOLUME, 1e3),
+    (r"m3|m³|cubic\s+met(?:re|er)s?", VOLUME, 1.0),
+    (r"%|percent|per\s+cent", PERCENT, 1.0),
+]
+_UNIT_RE = [(re.compile(p, re.IGNORECASE), dim, factor) for p, dim, factor in _UNIT_PATTERNS]
+
+_MULTIPLIERS = {"thousand": 1e3, "k": 1e3, "million": 1e6, "mn": 1e6, "m": 1e6, "billion": 1e9, "bn": 1e9}
+
+_NUMBER = r"(?P<num>\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)"
+_MULT = r"(?:\s*(?P<mult>thousand|million|billion|mn|bn)\b)?"
+_UNIT = "(?P<unit>" + "|".join(p for p, _, _ in _UNIT_PATTERNS) + ")"
+_QUANTITY = re.compile(_NUMBER + _MULT + r"\s*" + _UNIT, re.IGNORECASE)
+
+_YEAR = re.compile(r"\b(?:FY\s?)?((?:19|20)\d{2})\b")
+_BASELINE = re.compile(
+    r"(?:compared\s+(?:to|with)|relative\s+to|versus|vs\.?|from|since|against|below)\s+(?:a\s+|the\s+|its\s+)?"
+    r"(?:FY\s?)?((?:19|20)\d{2})(?:\s+(?:baseline|levels?|base\s+year))?",
+    re.IGNORECASE,
+)
+_TARGET = re.compile(r"\b(?:by|until|before|target(?:ing)?\s+(?:for\s+)?)\s+(?:FY\s?)?((?:19|20)\d{2})\b", re.IGNORECASE)
+_REDUCTION = re.compile(r"\b(reduc\w*|cut\w*|decreas\w*|lower\w*|fell|fall\w*|drop\w*|down)\b", re.IGNORECASE)
+_INCREASE = re.compile(r"\b(increas\w*|grow\w*|grew|rise|rose|up)\b", re.IGNORECASE)
+_SCOPE = re.compile(r"scopes?\s*((?:[123]|one|two|three)(?:\s*(?:,|and|&|\+|/|-)\s*(?:[123]|one|two|three))*)", re.IGNORECASE)
+_SCOPE_WORDS = {"1": 1, "2": 2, "3": 3, "one": 1, "two": 2, "three": 3}
+
+# ---- topics (bit flags) matched in claim text and metric names ----
+TOPICS = {
+    "emissions": (1, re.compile(r"emission|ghg|greenhouse|co2|carbon|scope\s*[123]", re.IGNORECASE)),
+    "energy": (2, re.compile(r"energy|electricity|power|fuel", re.IGNORECASE)),
+    "renewable": (4, re.compile(r"renewable|solar|wind|clean\s+energy|green\s+electricity", re.IGNORECASE)),
+    "water": (8, re.compile(r"water|withdraw", re.IGNORECASE)),
+    "waste": (16, re.compile(r"waste|landfill|recycl", re.IGNORECASE)),
+    "diversity": (32, re.compile(r"women|female|gender|divers", re.IGNORECASE)),
+    "safety": (64, re.compile(r"injur|fatalit|lost[\s-]time|ltifr|trir|safety", re.IGNORECASE)),
+}
+
+_CLAIM_ITEM = re.compile(r"^\s*(\d+)\.\s*Claim:\s*", re.IGNORECASE | re.MULTILINE)
+# "Claim 3:" / "**Claim 3**" / "### Claim 3" heading in the LLM answer
+_ANSWER_ITEM = re.compile(r"^[\s#*]*Claim\s+(\d+)\b[*:.\s]*", re.IGNORECASE | re.MULTILINE)
+
+
+def parse_unit(text: str) -> Tuple[int, float]:
+    """(dimension, factor) of the first unit spelled in `text`; (0, 1.0) if none"""
+    for pattern, dim, factor in _UNIT_RE:
+        if pattern.search(text or ""):
+            return dim, factor
+    return 0, 1.0
+
+
+def parse_number(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = re.search(r"-?\d[\d,]*(?:\.\d+)?", str(value or ""))
+    return float(match.group(0).replace(",", "")) if match else float("nan")
+
+
+def scopes_in(text: str) -> int:
+    """Bitmask of GHG scopes named in `text` (bit 0 = Scope 1)"""
+    mask = 0
+    for match in _SCOPE.finditer(text or ""):
+        for token in re.findall(r"[123]|one|two|three", match.group(1), re.IGNORECASE):
+            mask |= 1 << (_SCOPE_WORDS[token.lower()] - 1)
+    return mask
+
+
+def topics_in(text: str) -> int:
+    return sum(bit for bit, pattern in TOPICS.values() if pattern.search(text or ""))
+
+
+@dataclass
+class NumericClaim:
+    text: str
+    value: float  # in the canonical unit of `dimension`
+    dimension: int
+    kind: str  # "absolute" | "share" | "reduction"
+    year: Optional[int] = None
+    baseline_year: Optional[int] = None
+    target_year: Optional[int] = None
+    scopes: int = 0
+    topics: int = 0
+    raw: str = ""
+
+
+@dataclass
+class ClaimVerdict:
+    claim: str
+    status: str  # supported | contradicted | not_found | undecided
+    reason: str
+    claimed: Optional[str] = None
+    database: Optional[str] = None
+    metric: Optional[str] = None
+    year: Optional[int] = None
+    delta: Optional[float] = None
+    numeric: List[NumericClaim] = field(default_factory=list, repr=False)
+
+    @property
+    def decided(self) -> bool:
+        return self.status != "undecided"
+
+
+def extract_claims(text: str) -> List[NumericClaim]:
+    """Numeric claims in one quotation, with the context that scopes them"""
+    text = text or ""
+    baseline = _BASELINE.search(text)
+    target = _TARGET.search(text)
+    baseline_year = int(baseline.group(1)) if baseline else None
+    target_year = int(target.group(1)) if target else None
+    years = [int(y) for y in _YEAR.findall(text) if int(y) not in (baseline_year, target_year)]
+    reduction = bool(_REDUCTION.search(text))
+    increase = bool(_INCREASE.search(text)) and not reduction
+    claims = []
+    for match in _QUANTITY.finditer(text):
+        number = parse_number(match.group("num"))
+        dim, factor = parse_unit(match.group("unit"))
+        if not dim:
+            continue
+        # "in 2022 tonnes were..." - a year followed by a unit is not a quantity
+        if dim != PERCENT and match.group("mult") is None and re.fullmatch(r"(?:19|20)\d{2}", match.group("num")):
+            continue
+        number *= _MULTIPLIERS.get((match.group("mult") or "").lower(), 1.0)
+        kind = "absolute"
+        if dim == PERCENT:
+            before = text[max(0, match.start() - 12):match.start()].lower()
+            if re.search(r"\bto\s*$", before):
+                kind = "share"  # "rose to 45%"
+            elif re.search(r"\bby\s*$", before) or ((reduction or increase) and baseline_year):
+                kind = "reduction"  # "cut by 30%", "30% lower than 2019"
+            else:
+                kind = "share"
+            if kind == "reduction" and increase:
+                number = -number
+        claims.append(NumericClaim(
+            text=text,
+            value=number * factor,
+            dimension=dim,
+            kind=kind,
+            year=years[-1] if years else None,
+            baseline_year=baseline_year,
+            target_year=target_year,
+            scopes=scopes_in(text),
+            topics=topics_in(text),
+            raw=match.group(0),
+        ))
+    return claims
+
+
+class AnswerTable:
+    """Company answer rows as parallel arrays for vectorized matching"""
+
+    def __init__(self, esg_data: Sequence[Dict[str, Any]]):
+        rows = [r for r in esg_data if r.get("metric_name")]
+        self.metrics = [r["metric_name"] for r in rows]
+        # Percent-valued metrics often carry no unit but say so in the name
+        units = [parse_unit(r.get("unit") or "") for r in rows]
+        units = [u if u[0] else parse_unit(m) if re.search(r"%|percent", m, re.I) else u
+                 for u, m in zip(units, self.metrics)]
+        self.dimension = np.array([u[0] for u in units], dtype=np.int8)
+        self.value = np.array([parse_number(r.get("value")) for r in rows], dtype=np.float64) * np.array(
+            [u[1] for u in units], dtype=np.float64
+        )
+        self.year = np.array([int(r.get("year") or 0) for r in rows], dtype=np.int32)
+        self.scopes = np.array([scopes_in(m) for m in self.metrics], dtype=np.int8)
+        self.topics = np.array([topics_in(m) for m in self.metrics], dtype=np.int16)
+        metric_ids = {m: i for i, m in enumerate(dict.fromkeys(self.metrics))}
+        self.metric_id = np.array([metric_ids[m] for m in self.metrics], dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.metrics)
+
+    def candidates(self, claim: NumericClaim, dimension: int, any_scope: bool = False) -> np.ndarray:
+        """
+        Rows in `dimension` sharing a topic with the claim. A claim naming GHG
+        scopes matches exactly those scopes; one naming none matches only
+        scope-less metrics (all scopes with `any_scope`).
+        """
+        if not len(self):
+            return np.zeros(0, dtype=bool)
+        mask = (self.dimension == dimension) & ~np.isnan(self.value) & ((self.topics & claim.topics) != 0)
+        if claim.scopes:
+            mask &= self.scopes == claim.scopes
+        elif not any_scope:
+            mask &= self.scopes == 0
+        return mask
+
+    def metric_names(self, mask: np.ndarray) -> List[str]:
+        return [self.metrics[i] for i in np.flatnonzero(mask)]
+
+
+def _undecided(claim: NumericClaim, reason: str) -> ClaimVerdict:
+    return ClaimVerdict(claim.text, "undecided", reason, claimed=claim.raw)
+
+
+def _scope_missing(claim: NumericClaim) -> ClaimVerdict:
+    return _undecided(claim, "The claim names no GHG scope and Wikirate only has scope-specific figures.")
+
+
+def _ambiguous(claim: NumericClaim, table: AnswerTable, mask: np.ndarray) -> Optional[ClaimVerdict]:
+    """Undecided verdict when the matching rows span more than one metric"""
+    names = list(dict.fromkeys(table.metric_names(mask)))
+    if len(names) <= 1:
+        return None
+    return _undecided(claim, f"Several Wikirate metrics match: {', '.join(repr(n) for n in names[:5])}.")
+
+
+def _fmt(value: float, dimension: int) -> str:
+    unit = DIMENSION_NAMES.get(dimension, "")
+    if dimension == PERCENT:
+        return f"{value:.1f}%"
+    return f"{value:,.0f} {unit}" if abs(value) >= 100 else f"{value:,.3g} {unit}"
+
+
+def _judge(diff: float, support: float, contradict: float) -> str:
+    if diff <= support:
+        return "supported"
+    if diff > contradict:
+        return "contradicted"
+    return "undecided"
+
+
+def _check_level(claim: NumericClaim, table: AnswerTable) -> ClaimVerdict:
+    """Absolute figure or share: the matching metric's value in the claimed (or latest) year"""
+    year = (table.year == claim.year) if claim.year else np.ones(len(table), dtype=bool)
+    mask = table.candidates(claim, claim.dimension) & year
+    if not mask.any():
+        if not claim.scopes and (table.candidates(claim, claim.dimension, any_scope=True) & year).any():
+            return _scope_missing(claim)
+        return ClaimVerdict(claim.text, "not_found", "No Wikirate answer with a matching metric, unit, scope and year.",
+                            claimed=claim.raw)
+    ambiguous = _ambiguous(claim, table, mask)
+    if ambiguous:
+        return ambiguous
+    idx = np.flatnonzero(mask)
+    if not claim.year:
+        idx = idx[table.year[idx] == table.year[idx].max()]
+    if claim.dimension == PERCENT:
+        diffs = np.abs(table.value[idx] - claim.value)
+        best = idx[int(np.argmin(diffs))]
+        diff = float(abs(table.value[best] - claim.value))
+        status = _judge(diff, SUPPORT_PP, CONTRADICT_PP)
+        delta, delta_text = round(claim.value - float(table.value[best]), 2), f"{claim.value - table.value[best]:+.1f} pp"
+    else:
+        rel = np.abs(table.value[idx] - claim.value) / np.maximum(np.abs(table.value[idx]), 1e-9)
+        best = idx[int(np.argmin(rel))]
+        diff = float(np.min(rel))
+        status = _judge(diff, SUPPORT_REL, CONTRADICT_REL)
+        signed = (claim.value - table.value[best]) / max(abs(table.value[best]), 1e-9)
+        delta, delta_text = round(float(signed), 4), f"{signed:+.1%}"
+    return ClaimVerdict(
+        claim.text, status,
+        f"Claimed {_fmt(claim.value, claim.dimension)} vs Wikirate {_fmt(table.value[best], claim.dimension)} "
+        f"for '{table.metrics[best]}' ({table.year[best]}), difference {delta_text}.",
+        claimed=claim.raw, database=_fmt(table.value[best], claim.dimension),
+        metric=table.metrics[best], year=int(table.year[best]), delta=delta,
+    )
+
+
+def _check_reduction(claim: NumericClaim, table: AnswerTable) -> ClaimVerdict:
+    """Percent change between the baseline year and the claimed (or latest) year, per metric"""
+    if claim.target_year and not claim.year:
+        return ClaimVerdict(claim.text, "undecided", f"Forward-looking target for {claim.target_year}.",
+                            claimed=claim.raw)
+    if not claim.baseline_year:
+        return ClaimVerdict(claim.text, "undecided", "Reduction without a baseline year.", claimed=claim.raw)
+    mask = np.zeros(len(table), dtype=bool)
+    scoped = np.zeros(len(table), dtype=bool)
+    for dim in (MASS, ENERGY, VOLUME):
+        mask |= table.candidates(claim, dim)
+        scoped |= table.candidates(claim, dim, any_scope=True)
+    base = mask & (table.year == claim.baseline_year)
+    if not base.any():
+        if not claim.scopes and (scoped & (table.year == claim.baseline_year)).any():
+            return _scope_missing(claim)
+        return ClaimVerdict(claim.text, "not_found", f"No Wikirate answer for the {claim.baseline_year} baseline.",
+                            claimed=claim.raw)
+    ambiguous = _ambiguous(claim, table, base)
+    if ambiguous:
+        return ambiguous
+    best: Optional[Tuple[float, int, int, float]] = None
+    for b in np.flatnonzero(base):
+        later = mask & (table.metric_id == table.metric_id[b]) & (table.year > claim.baseline_year)
+        if claim.year:
+            later &= table.year == claim.year
+        if not later.any() or table.value[b] == 0:
+            continue
+        c = np.flatnonzero(later)[int(np.argmax(table.year[later]))]
+        actual = float((table.value[b] - table.value[c]) / table.value[b] * 100)
+        diff = abs(actual - claim.value)
+        if best is None or diff < best[0]:
+            best = (diff, int(b), int(c), actual)
+    if best is None:
+        return ClaimVerdict(claim.text, "not_found", "No Wikirate answers after the baseline year for the same metric.",
+                            claimed=claim.raw)
+    diff, b, c, actual = best
+    return ClaimVerdict(
+        claim.text, _judge(diff, SUPPORT_PP, CONTRADICT_PP),
+        f"Claimed {claim.value:.1f}% reduction since {claim.baseline_year}; Wikirate '{table.metrics[b]}' went from "
+        f"{_fmt(table.value[b], table.dimension[b])} ({table.year[b]}) to {_fmt(table.value[c], table.dimension[c])} "
+        f"({table.year[c]}), a {actual:.1f}% reduction (difference {claim.value - actual:+.1f} pp).",
+        claimed=claim.raw, database=f"{actual:.1f}%", metric=table.metrics[b], year=int(table.year[c]),
+        delta=round(claim.value - actual, 2),
+    )
+
+
+def check_claim(text: str, table: AnswerTable) -> ClaimVerdict:
+    """Verdict for one quotation: any contradicted figure wins, then anything undecided"""
+    claims = extract_claims(text)
+    if not claims:
+        return ClaimVerdict(text, "undecided", "No numeric figure to compare.")
+    if not claims[0].topics:
+        # Without a shared ESG topic any figure in the same unit would match
+        return ClaimVerdict(text, "undecided", "No ESG topic to match against Wikirate metrics.")
+    verdicts = [
+        _check_reduction(c, table) if c.kind == "reduction" else _check_level(c, table) for c in claims
+    ]
+    for status in ("contradicted", "undecided", "supported", "not_found"):
+        for v in verdicts:
+            if v.status == status:
+                v.numeric = claims
+                return v
+    return verdicts[0]
+
+
+def check_claims(texts: Sequence[str], metrics_data: Dict[str, Any]) -> List[ClaimVerdict]:
+    table = AnswerTable(metrics_data.get("esg_data") or [])
+    return [check_claim(t, table) for t in texts]
+
+
+def split_claims(prompt: str) -> List[Tuple[str, str]]:
+    """
+    ("1. Claim: ...\\nExplanation: ..." block, claim text) pairs from the batched
+    validation prompt built in esg_analysis; the whole text is one claim otherwise.
+    """
+    starts = list(_CLAIM_ITEM.finditer(prompt or ""))
+    if not starts:
+        return [(prompt, prompt)]
+    items = []
+    for i, match in enumerate(starts):
+        end = starts[i + 1].start() if i + 1 < len(starts) else len(prompt)
+        block = prompt[match.start():end].strip()
+        claim = prompt[match.end():end].split("\nExplanation:", 1)[0].strip()
+        items.append((block, claim))
+    return items
+
+
+def claim_number(block: str) -> Optional[int]:
+    """Number of a "N. Claim: ..." block from split_claims, None for an unnumbered prompt"""
+    match = _CLAIM_ITEM.match(block or "")
+    return int(match.group(1)) if match else None
+
+
+def split_answers(reply: str) -> Dict[int, str]:
+    """
+    Claim number -> answer block from an LLM reply that heads each answer with
+    "Claim N:". Blank lines inside a block are dropped, since validation results
+    are joined and split on blank lines downstream.
+    """
+    starts = list(_ANSWER_ITEM.finditer(reply or ""))
+    answers = {}
+    for i, match in enumerate(starts):
+        end = starts[i + 1].start() if i + 1 < len(starts) else len(reply)
+        answers.setdefault(int(match.group(1)), compact_block(reply[match.end():end]))
+    return answers
+
+
+def compact_block(text: str) -> str:
+    return re.sub(r"\n\s*\n+", "\n", (text or "").strip())
+
+
+# Labels follow the validation prompt, which rates the greenwashing allegation:
+# a figure that matches the database refutes it ("Contradicted"), a figure the
+# database refutes confirms it ("Supported").
+STATUS_LABELS = {"supported": "Contradicted", "contradicted": "Supported", "not_found": "Not mentioned"}
+
+
+def format_verdict(verdict: ClaimVerdict) -> str:
+    """One result block (no blank lines, the caller splits results on them)"""
+    quote = f"{verdict.metric} ({verdict.year}): {verdict.database}" if verdict.metric else "None"
+    return (
+        f"Claim: {verdict.claim}\n"
+        f"1. **Status**: {STATUS_LABELS.get(verdict.status, verdict.status)}\n"
+        f"2. **Reasoning**: {verdict.reason} (numeric check against Wikirate data)\n"
+        f"3. **news_quotation**: {quote}"
+    )
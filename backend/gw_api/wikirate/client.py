@@ -0,0 +1,220 @@
+"""
+Pooled async Wikirate client
+One aiohttp session (keep-alive connection pool) per process, owned by a
+background event loop so synchronous callers such as the LangGraph tools can
+share it. Metric and answer-page fan-out runs concurrently under a semaphore,
+so a company with fifty metrics costs about one round-trip instead of fifty.
+Transient failures (connection errors, 429, 5xx) are retried with exponential
+backoff; 404 means "does not exist" and is returned as None.
+
+    WIKIRATE_BASE_URL         API root (https://wikirate.org); point it at
+                              `python -m benchmarks.wikirate_stub` for local runs
+    WIKIRATE_MAX_CONCURRENCY  requests in flight per process (16)
+    WIKIRATE_RETRIES          retries per request after the first attempt (3)
+    WIKIRATE_MAX_ANSWERS      answers fetched per company (20)
+"""
+
+import asyncio
+import os
+import random
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import quote
+
+import aiohttp
+
+from gw_api.core.background_loop import run_sync
+from gw_api.core.metrics import external_seconds, observe
+from gw_api.config import WIKIRATE_MAX_ANSWERS as MAX_ANSWERS
+from gw_api.wikirate.cache import WikirateCache, get_wikirate_cache
+from gw_api.wikirate.snapshot import summarize_answers
+
+BASE_URL = os.getenv("WIKIRATE_BASE_URL", "https://wikirate.org").rstrip("/")
+MAX_CONCURRENCY = int(os.getenv("WIKIRATE_MAX_CONCURRENCY", "16"))
+RETRIES = int(os.getenv("WIKIRATE_RETRIES", "3"))
+BACKOFF_S = 0.5
+TIMEOUT_S = 10
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class WikirateError(Exception):
+    """Wikirate request failed after all retries"""
+
+
+def card_path(name: str) -> str:
+    """Wikirate card URL path: spaces become underscores, '+' joins card names"""
+    return quote("_".join(str(name).strip().split()), safe="+~_-.")
+
+
+def _topics(raw: Any) -> List[str]:
+    topics = []
+    for t in raw or []:
+        if isinstance(t, str):
+            topics.append(t.lower())
+        elif isinstance(t, dict) and "name" in t:
+            topics.append(t["name"].lower())
+    return topics
+
+
+class AsyncWikirateClient:
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = BASE_URL,
+        max_concurrency: int = MAX_CONCURRENCY,
+        retries: int = RETRIES,
+        backoff_s: float = BACKOFF_S,
+        timeout_s: float = TIMEOUT_S,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.timeout_s = timeout_s
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            headers = {"Accept": "application/json"}
+            if self.api_key:
+                headers["X-API-Key"] = self.api_key
+            self._session = aiohttp.ClientSession(
+                headers=headers,
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.timeout_s),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None, operation: str = "get") -> Any:
+        """GET {base_url}/{path}; None on 404, WikirateError once retries are exhausted"""
+        session = await self._ensure_session()
+        url = f"{self.base_url}/{path}"
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                delay = self.backoff_s * 2 ** (attempt - 1)
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
+            try:
+                async with self._semaphore:
+                    with observe(external_seconds, service="wikirate", operation=operation) as sp:
+                        async with session.get(url, params=params) as response:
+                            sp.set(status=response.status, attempt=attempt)
+                            if response.status == 404:
+                                return None
+                            if response.status in RETRY_STATUSES:
+                                retry_after = response.headers.get("Retry-After", "")
+                                last_error = WikirateError(f"{url}: HTTP {response.status}")
+                                if retry_after.isdigit():
+                                    await asyncio.sleep(min(float(retry_after), 30))
+                                continue
+                            if response.status >= 400:
+                                raise WikirateError(f"{url}: HTTP {response.status}")
+                            return await response.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = e
+        raise WikirateError(f"{url}: giving up after {self.retries + 1} attempts ({last_error})")
+
+    # ---- entities ----
+    async def get_company(self, name: str) -> Optional[Dict[str, Any]]:
+        data = await self.get_json(f"{card_path(name)}.json", operation="company")
+        if not data:
+            return None
+        return {"id": data.get("id"), "name": data.get("name") or name}
+
+    async def get_answers(
+        self, company: str, year: Optional[int] = None, page_size: int = 10, max_total: int = MAX_ANSWERS,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Answers for a company (optionally one year / extra filter[...] params); all pages are requested at once"""
+        params = dict(filters or {}, limit=page_size)
+        if year is not None:
+            params["filter[year]"] = year
+        path = f"{card_path(company)}+Answer.json"
+        pages = await asyncio.gather(*(
+            self.get_json(path, dict(params, offset=offset, limit=min(page_size, max_total - offset)), "answers")
+            for offset in range(0, max_total, page_size)
+        ))
+        answers = []
+        for page in pages:
+            items = (page or {}).get("items", []) if isinstance(page, dict) else (page or [])
+            answers.extend(
+                {"metric": item.get("metric"), "year": item.get("year"), "value": item.get("value")}
+                for item in items
+                if item.get("metric")
+            )
+            if len(items) < page_size:
+                break  # later pages are past the end
+        return answers[:max_total]
+
+    async def get_metric(self, name: str) -> Optional[Dict[str, Any]]:
+        data = await self.get_json(f"{card_path(name)}.json", operation="metric")
+        if not data:
+            return None
+        return {"topics": _topics(data.get("topics")), "unit": data.get("unit")}
+
+    async def get_metrics(self, names: Iterable[str], cache: Optional[WikirateCache] = None) -> Dict[str, Dict[str, Any]]:
+        """Metric metadata for many metrics concurrently; failures degrade to no topics"""
+        names = list(dict.fromkeys(names))
+
+        async def one(name: str) -> Dict[str, Any]:
+            try:
+                if cache is not None:
+                    metric = await cache.aget_or_fetch("metric", name, lambda: self.get_metric(name))
+                else:
+                    metric = await self.get_metric(name)
+            except Exception as e:
+                print(f"Failed to get metric {name} info: {e}")
+                metric = None
+            return metric or {"topics": [], "unit": None}
+
+        return dict(zip(names, await asyncio.gather(*(one(n) for n in names))))
+
+    async def company_metrics(
+        self, company_name: str, cache: Optional[WikirateCache] = None, max_answers: int = MAX_ANSWERS
+    ) -> Dict[str, Any]:
+        """ESG answers of a company in the shape WikirateValidationTool feeds the LLM"""
+
+        async def cached(kind: str, key: str, fetch):
+            return await cache.aget_or_fetch(kind, key, fetch) if cache is not None else await fetch()
+
+        company = await cached("company", company_name, lambda: self.get_company(company_name))
+        if not company:
+            return {"error": f"Company '{company_name}' not found"}
+        answers = await cached(
+            "answers", f"{company['name']}|all|{max_answers}",
+            lambda: self.get_answers(company["name"], max_total=max_answers),
+        )
+        metrics = await self.get_metrics((a["metric"] for a in answers), cache)
+        return summarize_answers(company_name, answers, metrics)
+
+
+# ---------------------------------------------------------------------------
+# Process-wide client on a background loop, for synchronous callers
+# ---------------------------------------------------------------------------
+
+_client: Optional[AsyncWikirateClient] = None
+_lock = threading.Lock()
+
+
+def get_wikirate_client(api_key: Optional[str] = None) -> AsyncWikirateClient:
+    """Shared client; its session lives on the background loop used by `run_sync`"""
+    global _client
+    with _lock:
+        if _client is None:
+            from gw_api.config import WIKIRATE_API_KEY
+
+            _client = AsyncWikirateClient(api_key or WIKIRATE_API_KEY)
+        return _client
+
+
+def get_company_metrics(company_name: str) -> Dict[str, Any]:
+    """Synchronous entry point: shared pool + persistent cache"""
+    client = get_wikirate_client()
+    return run_sync(client.company_metrics(company_name, get_wikirate_cache()))
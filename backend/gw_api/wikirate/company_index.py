@@ -0,0 +1,218 @@
+"""
+Company-name index
+Character n-gram TF-IDF over normalized company names, stored as flat numpy
+arrays (inverted postings) that are memory-mapped on load. A lookup touches only
+the postings of the query's n-grams, so top-k takes well under a millisecond for
+the bundled company lists. Ties are broken by ISIN count, as before.
+
+This is the fuzzy layer of the company registry (gw_api.core.company_registry),
+which builds, stores and loads it; rebuild / query from backend/ with:
+    python -m gw_api.core.company_registry build
+    python -m gw_api.core.company_registry query "Deutsche Bank"
+"""
+
+import csv
+import json
+import math
+import re
+import unicodedata
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+INDEX_VERSION = 1
+NGRAM = 3
+MIN_SCORE = 0.5  # below this the best candidate is not considered the same company
+
+# Legal forms ignored for matching (NameMatcher legal_suffixes=True equivalent); also
+# dropped from news search aliases (gw_api.core.utils.generate_company_aliases)
+LEGAL_SUFFIXES = {
+    "ag", "asa", "bhd", "bv", "co", "company", "corp", "corporation", "gmbh", "inc",
+    "incorporated", "kgaa", "limited", "llc", "lp", "ltd", "nv", "oyj", "plc", "pjsc",
+    "sa", "sab", "se", "spa", "tbk",
+}
+
+_PUNCT = re.compile(r"[^\w\s]", re.UNICODE)
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_company(name: str) -> str:
+    """Lowercase, strip accents/punctuation and trailing legal forms"""
+    text = unicodedata.normalize("NFKD", str(name or ""))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    text = _PUNCT.sub(" ", text.replace("&", " and "))
+    words = _SPACES.sub(" ", text).strip().split(" ")
+    while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(w for w in words if w)
+
+
+def features(normalized: str) -> Dict[int, int]:
+    """Hashed char n-grams (with word boundaries) plus whole words -> counts"""
+    counts: Dict[int, int] = {}
+    padded = f" {normalized} "
+    grams = [padded[i : i + NGRAM] for i in range(max(1, len(padded) - NGRAM + 1))]
+    grams += [f"w:{w}" for w in normalized.split()]
+    for g in grams:
+        h = zlib.crc32(g.encode("utf-8"))
+        counts[h] = counts.get(h, 0) + 1
+    return counts
+
+
+@dataclass
+class CompanyMatch:
+    id: int
+    name: str
+    isin_count: int
+    score: float
+
+
+def load_companies(sources: Iterable[Path]) -> List[Tuple[int, str, int]]:
+    """(id, name, isin_count) from Wikirate company CSVs; first source wins per id"""
+    companies: Dict[int, Tuple[int, str, int]] = {}
+    for source in sources:
+        source = Path(source)
+        if not source.exists():
+            continue
+        with source.open("r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    cid = int(row["id"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                name = (row.get("name") or "").strip()
+                if not name:
+                    continue
+                isin = int(row.get("isin_count") or 0)
+                if cid in companies:
+                    # Keep the richer ISIN information if a later file has it
+                    if isin > companies[cid][2]:
+                        companies[cid] = (cid, companies[cid][1], isin)
+                    continue
+                companies[cid] = (cid, name, isin)
+    return list(companies.values())
+
+
+def build_index(companies: List[Tuple[int, str, int]], out_dir: Path, sources: List[str] = ()) -> Dict:
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    n = len(companies)
+
+    doc_feats = [features(normalize_company(name)) for _, name, _ in companies]
+    df: Dict[int, int] = {}
+    for feats in doc_feats:
+        for h in feats:
+            df[h] = df.get(h, 0) + 1
+    vocab = np.array(sorted(df), dtype=np.uint32)
+    col = {int(h): i for i, h in enumerate(vocab)}
+    idf = np.array([math.log((1 + n) / (1 + df[int(h)])) + 1.0 for h in vocab], dtype=np.float32)
+
+    # Postings (CSC of the L2-normalized TF-IDF matrix)
+    postings: List[List[Tuple[int, float]]] = [[] for _ in range(len(vocab))]
+    for row, feats in enumerate(doc_feats):
+        weights = {col[h]: (1.0 + math.log(c)) * float(idf[col[h]]) for h, c in feats.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        for j, w in weights.items():
+            postings[j].append((row, w / norm))
+    ptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+    ptr[1:] = np.cumsum([len(p) for p in postings])
+    rows = np.fromiter((r for p in postings for r, _ in p), dtype=np.int32, count=int(ptr[-1]))
+    weights = np.fromiter((w for p in postings for _, w in p), dtype=np.float32, count=int(ptr[-1]))
+
+    encoded = [name.encode("utf-8") for _, name, _ in companies]
+    blob = b"".join(encoded)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    arrays = {
+        "ids": np.array([c[0] for c in companies], dtype=np.int64),
+        "isin": np.array([c[2] for c in companies], dtype=np.int32),
+        "vocab": vocab,
+        "idf": idf,
+        "ptr": ptr,
+        "rows": rows,
+        "weights": weights,
+        "name_offsets": offsets,
+    }
+    for key, arr in arrays.items():
+        np.save(out_dir / f"{key}.npy", arr)
+    (out_dir / "names.bin").write_bytes(blob)
+    meta = {
+        "version": INDEX_VERSION,
+        "ngram": NGRAM,
+        "companies": n,
+        "features": int(len(vocab)),
+        "postings": int(ptr[-1]),
+        "sources": [str(s) for s in sources],
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    (out_dir / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return meta
+
+
+class CompanyIndex:
+    def __init__(self, index_dir: Path):
+        index_dir = Path(index_dir)
+        self.meta = json.loads((index_dir / "meta.json").read_text(encoding="utf-8"))
+        if self.meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"Company index version {self.meta.get('version')} != {INDEX_VERSION}")
+        load = lambda key: np.load(index_dir / f"{key}.npy", mmap_mode="r")  # noqa: E731
+        self.ids, self.isin, self.vocab, self.idf = load("ids"), load("isin"), load("vocab"), load("idf")
+        self.ptr, self.rows, self.weights = load("ptr"), load("rows"), load("weights")
+        self.name_offsets = load("name_offsets")
+        self._names = np.memmap(index_dir / "names.bin", dtype=np.uint8, mode="r") if (index_dir / "names.bin").stat().st_size else b""
+        self.size = int(self.ids.shape[0])
+
+    def name(self, row: int) -> str:
+        start, end = int(self.name_offsets[row]), int(self.name_offsets[row + 1])
+        return bytes(self._names[start:end]).decode("utf-8")
+
+    def search(self, query: str, k: int = 5, mask: Optional[np.ndarray] = None) -> List[CompanyMatch]:
+        """Top-k rows by cosine similarity; `mask` (bool per row) limits the candidates"""
+        feats = features(normalize_company(query))
+        if not feats or self.size == 0:
+            return []
+        hashes = np.fromiter(feats.keys(), dtype=np.uint32, count=len(feats))
+        cols = np.searchsorted(self.vocab, hashes)
+        cols = np.minimum(cols, len(self.vocab) - 1)
+        known = self.vocab[cols] == hashes
+        counts = np.fromiter(feats.values(), dtype=np.float32, count=len(feats))
+        qw = (1.0 + np.log(counts)) * np.where(known, self.idf[cols], 0.0)
+        qnorm = float(np.sqrt(np.dot(qw, qw))) or 1.0
+        row_parts, weight_parts = [], []
+        for c, w in zip(cols[known], qw[known] / qnorm):
+            lo, hi = int(self.ptr[c]), int(self.ptr[c + 1])
+            row_parts.append(self.rows[lo:hi])
+            weight_parts.append(self.weights[lo:hi] * w)
+        if not row_parts:
+            return []
+        scores = np.bincount(
+            np.concatenate(row_parts), weights=np.concatenate(weight_parts), minlength=self.size
+        )
+        if mask is not None:
+            scores = np.where(mask, scores, 0.0)
+        pool = min(self.size, k * 4)
+        top = np.argpartition(-scores, pool - 1)[:pool]
+        # Equal scores (to 1e-6) -> more ISINs first
+        ranked = sorted(
+            (int(i) for i in top if scores[i] > 0),
+            key=lambda i: (-round(float(scores[i]), 6), -int(self.isin[i])),
+        )[:k]
+        return [
+            CompanyMatch(
+                id=int(self.ids[i]),
+                name=self.name(i),
+                isin_count=int(self.isin[i]),
+                score=round(float(scores[i]), 4),
+            )
+            for i in ranked
+        ]
+
+    def best_match(self, query: str, min_score: float = MIN_SCORE, mask: Optional[np.ndarray] = None) -> Optional[CompanyMatch]:
+        matches = self.search(query, k=5, mask=mask)
+        if not matches or matches[0].score < min_score:
+            return None
+        return matches[0]
@@ -0,0 +1,384 @@
+"""
+Offline Wikirate snapshot
+A local SQLite copy of Wikirate companies, metric cards and answers, so batch
+validation runs without network access (WIKIRATE_MODE=snapshot). Validating a
+portfolio becomes a handful of indexed local queries per company.
+
+Build / refresh from backend/:
+    python -m gw_api.wikirate.snapshot import --answers-csv answers.csv --metrics-csv metrics.csv
+    python -m gw_api.wikirate.snapshot import --from-api --companies "BP plc." "Shell plc"
+    python -m gw_api.wikirate.snapshot refresh            # only answers updated since the last pull
+    python -m gw_api.wikirate.snapshot stats
+    python -m gw_api.wikirate.snapshot query "BP plc." "Unknown Corp"
+
+`import` always loads the company lists (WIKIRATE_COMPANY_SOURCES). Answer and
+metric CSVs are Wikirate data exports; column names are matched case-insensitively
+(Metric, Company, Year, Value / Metric, Topics, Unit).
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from gw_api.config import WIKIRATE_COMPANY_SOURCES, WIKIRATE_MAX_ANSWERS, WIKIRATE_SNAPSHOT_PATH
+from gw_api.wikirate.company_index import load_companies, normalize_company
+
+ESG_TOPICS = ("environment", "social", "governance")
+API_MAX_ANSWERS = 500  # answers pulled per company when importing from the API
+API_PAGE_SIZE = 100
+DAY = 24 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS companies (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    norm_name TEXT NOT NULL,
+    isin_count INTEGER NOT NULL DEFAULT 0,
+    answers_refreshed_at REAL
+);
+CREATE INDEX IF NOT EXISTS companies_norm ON companies (norm_name);
+CREATE TABLE IF NOT EXISTS metrics (
+    name TEXT PRIMARY KEY,
+    topics TEXT NOT NULL,
+    unit TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS answers (
+    company TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    year INTEGER,
+    value TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (company, metric, year)
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def summarize_answers(company_name: str, answers: List[Dict[str, Any]], metrics: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """ESG subset of a company's answers, in the shape WikirateValidationTool feeds the LLM"""
+    esg_metrics = {
+        name for name, meta in metrics.items() if any(topic in (meta.get("topics") or []) for topic in ESG_TOPICS)
+    }
+    return {
+        "company_name": company_name,
+        "total_answers": len(answers),
+        "esg_metrics_count": len(esg_metrics),
+        "esg_data": [
+            {
+                "metric_name": a["metric"],
+                "year": a.get("year"),
+                "value": a.get("value"),
+                "unit": metrics.get(a["metric"], {}).get("unit"),
+            }
+            for a in answers
+            if a["metric"] in esg_metrics
+        ],
+    }
+
+
+def _column(row: Dict[str, str], *names: str) -> Optional[str]:
+    lowered = {k.strip().lower(): v for k, v in row.items() if k}
+    for name in names:
+        value = lowered.get(name)
+        if value not in (None, ""):
+            return value.strip()
+    return None
+
+
+def _year(value: Any) -> Optional[int]:
+    try:
+        return int(str(value).strip()[:4])
+    except (TypeError, ValueError):
+        return None
+
+
+class WikirateSnapshot:
+    def __init__(self, path: Path = WIKIRATE_SNAPSHOT_PATH, readonly: bool = False):
+        self.path = Path(path)
+        if readonly:
+            if not self.path.exists():
+                raise FileNotFoundError(f"Wikirate snapshot {self.path} does not exist; run the importer first")
+            self.conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # ---- writes ----
+    def upsert_companies(self, companies: Iterable[tuple]) -> int:
+        """(id, name, isin_count) rows; keeps answers_refreshed_at of known companies"""
+        rows = [(cid, name, normalize_company(name), isin) for cid, name, isin in companies]
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO companies (id, name, norm_name, isin_count) VALUES (?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET name=excluded.name, norm_name=excluded.norm_name,
+                                              isin_count=excluded.isin_count
+                """,
+                rows,
+            )
+        return len(rows)
+
+    def upsert_metrics(self, metrics: Dict[str, Dict[str, Any]]) -> int:
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO metrics (name, topics, unit, updated_at) VALUES (?, ?, ?, ?)",
+                [(name, json.dumps(m.get("topics") or []), m.get("unit"), now) for name, m in metrics.items()],
+            )
+        return len(metrics)
+
+    def upsert_answers(self, answers: Iterable[Dict[str, Any]]) -> int:
+        """Rows with company, metric, year, value; a later value for the same key wins"""
+        now = time.time()
+        rows = [
+            (a["company"], a["metric"], _year(a.get("year")), None if a.get("value") is None else str(a["value"]), now)
+            for a in answers
+            if a.get("company") and a.get("metric")
+        ]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO answers (company, metric, year, value, updated_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def mark_refreshed(self, companies: Iterable[str], at: float) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE companies SET answers_refreshed_at=? WHERE name=?", [(at, name) for name in companies]
+            )
+
+    def set_meta(self, key: str, value: Any) -> None:
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        row = self.conn.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    # ---- CSV imports ----
+    def import_answers_csv(self, path: Path, batch_size: int = 50_000) -> int:
+        total = 0
+        with Path(path).open("r", encoding="utf-8-sig") as f:
+            batch = []
+            for row in csv.DictReader(f):
+                batch.append({
+                    "company": _column(row, "company", "company name"),
+                    "metric": _column(row, "metric", "metric name"),
+                    "year": _column(row, "year"),
+                    "value": _column(row, "value", "answer"),
+                })
+                if len(batch) >= batch_size:
+                    total += self.upsert_answers(batch)
+                    batch = []
+            total += self.upsert_answers(batch)
+        return total
+
+    def import_metrics_csv(self, path: Path) -> int:
+        metrics = {}
+        with Path(path).open("r", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                name = _column(row, "metric", "name", "metric name")
+                if not name:
+                    continue
+                topics_raw = _column(row, "topics", "topic") or ""
+                topics = [t.strip().lower() for t in topics_raw.replace(";", ",").split(",") if t.strip()]
+                metrics[name] = {"topics": topics, "unit": _column(row, "unit")}
+        return self.upsert_metrics(metrics)
+
+    # ---- reads ----
+    def resolve(self, name: str) -> Optional[str]:
+        """Snapshot company name for an exact or normalized-name match"""
+        row = self.conn.execute("SELECT name FROM companies WHERE name=?", (name,)).fetchone()
+        if row is None:
+            row = self.conn.execute(
+                "SELECT name FROM companies WHERE norm_name=? ORDER BY isin_count DESC LIMIT 1",
+                (normalize_company(name),),
+            ).fetchone()
+        return row[0] if row else None
+
+    def answers(self, company: str, year: Optional[int] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        sql = "SELECT metric, year, value FROM answers WHERE company=?"
+        params: list = [company]
+        if year is not None:
+            sql += " AND year=?"
+            params.append(year)
+        sql += " ORDER BY year DESC, metric"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [{"metric": m, "year": y, "value": v} for m, y, v in self.conn.execute(sql, params)]
+
+    def metrics(self, names: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        names = list(dict.fromkeys(names))
+        found: Dict[str, Dict[str, Any]] = {}
+        for i in range(0, len(names), 500):  # stay under SQLite's bound-parameter limit
+            chunk = names[i : i + 500]
+            marks = ",".join("?" * len(chunk))
+            for name, topics, unit in self.conn.execute(
+                f"SELECT name, topics, unit FROM metrics WHERE name IN ({marks})", chunk
+            ):
+                found[name] = {"topics": json.loads(topics), "unit": unit}
+        return found
+
+    def company_metrics(self, company_name: str, max_answers: int = WIKIRATE_MAX_ANSWERS) -> Dict[str, Any]:
+        """Same result as the live client, answered from the snapshot only"""
+        company = self.resolve(company_name)
+        if company is None:
+            return {"error": f"Company '{company_name}' not found"}
+        answers = self.answers(company, limit=max_answers)
+        return summarize_answers(company_name, answers, self.metrics([a["metric"] for a in answers]))
+
+    def stats(self) -> Dict[str, Any]:
+        count = lambda table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]  # noqa: E731
+        return {
+            "path": str(self.path),
+            "companies": count("companies"),
+            "companies_with_answers": self.conn.execute("SELECT COUNT(DISTINCT company) FROM answers").fetchone()[0],
+            "metrics": count("metrics"),
+            "answers": count("answers"),
+            "imported_at": self.get_meta("imported_at"),
+            "refreshed_at": self.get_meta("refreshed_at"),
+        }
+
+
+_snapshot: Optional[WikirateSnapshot] = None
+
+
+def get_wikirate_snapshot() -> WikirateSnapshot:
+    """Process-wide read-only snapshot (raises if it has not been imported)"""
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = WikirateSnapshot(WIKIRATE_SNAPSHOT_PATH, readonly=True)
+    return _snapshot
+
+
+# ---------------------------------------------------------------------------
+# API import / incremental refresh
+# ---------------------------------------------------------------------------
+
+
+def updated_window(age_s: Optional[float]) -> Optional[str]:
+    """Wikirate `filter[updated]` value covering everything changed since the last pull"""
+    if age_s is None:
+        return None
+    for window, span_s in (("today", DAY), ("week", 7 * DAY), ("month", 30 * DAY)):
+        if age_s < span_s:
+            return window
+    return None  # too old for a window: pull everything again
+
+
+async def pull_from_api(snapshot: WikirateSnapshot, companies: List[str], incremental: bool,
+                        max_answers: int = API_MAX_ANSWERS) -> Dict[str, int]:
+    """Fetch answers (changed ones only when incremental) and any unknown metric cards"""
+    from gw_api.wikirate.client import AsyncWikirateClient
+    from gw_api.config import WIKIRATE_API_KEY
+
+    client = AsyncWikirateClient(WIKIRATE_API_KEY)
+    last = dict(snapshot.conn.execute(
+        "SELECT name, answers_refreshed_at FROM companies WHERE answers_refreshed_at IS NOT NULL"
+    ).fetchall())
+    started = time.time()
+
+    # Companies named on the command line but missing from the company lists
+    known_names = {r[0] for r in snapshot.conn.execute("SELECT name FROM companies")}
+    cards = await asyncio.gather(*(client.get_company(n) for n in companies if n not in known_names))
+    snapshot.upsert_companies((c["id"], c["name"], 0) for c in cards if c and c.get("id") is not None)
+
+    async def one(name: str) -> List[Dict[str, Any]]:
+        window = updated_window(started - last[name]) if incremental and name in last else None
+        filters = {"filter[updated]": window} if window else None
+        try:
+            rows = await client.get_answers(
+                name, page_size=API_PAGE_SIZE, max_total=max_answers, filters=filters
+            )
+        except Exception as e:
+            print(f"[Snapshot] Failed to pull answers for {name}: {e}")
+            return None
+        return [dict(r, company=name) for r in rows]
+
+    try:
+        results = await asyncio.gather(*(one(n) for n in companies))
+        answers = [a for rows in results if rows for a in rows]
+        snapshot.upsert_answers(answers)
+        snapshot.mark_refreshed([n for n, rows in zip(companies, results) if rows is not None], started)
+
+        known = snapshot.metrics([a["metric"] for a in answers])
+        missing = sorted({a["metric"] for a in answers} - set(known))
+        fetched = await client.get_metrics(missing)
+        snapshot.upsert_metrics(fetched)
+    finally:
+        await client.close()
+    return {"companies": len(companies), "answers": len(answers), "new_metrics": len(missing)}
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", type=Path, default=WIKIRATE_SNAPSHOT_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="bulk-load companies, metrics and answers")
+    imp.add_argument("--company-source", type=Path, nargs="+", default=WIKIRATE_COMPANY_SOURCES)
+    imp.add_argument("--answers-csv", type=Path, nargs="*", default=[])
+    imp.add_argument("--metrics-csv", type=Path, nargs="*", default=[])
+    imp.add_argument("--from-api", action="store_true", help="pull answers for --companies from the API")
+    imp.add_argument("--companies", nargs="*", default=[])
+    ref = sub.add_parser("refresh", help="pull answers changed since each company's last refresh")
+    ref.add_argument("--companies", nargs="*", default=None, help="default: every company pulled before")
+    sub.add_parser("stats")
+    q = sub.add_parser("query", help="validation payloads for one or more companies, from the snapshot only")
+    q.add_argument("names", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command in ("stats", "query"):
+        snapshot = WikirateSnapshot(args.db, readonly=True)
+        if args.command == "stats":
+            print(json.dumps(snapshot.stats(), indent=2))
+            return 0
+        start = time.perf_counter()
+        results = [snapshot.company_metrics(name) for name in args.names]
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for name, result in zip(args.names, results):
+            summary = result.get("error") or f"{result['total_answers']} answers, {result['esg_metrics_count']} ESG metrics"
+            print(f"{name}: {summary}")
+        print(f"{len(results)} companies in {elapsed_ms:.1f} ms")
+        return 0
+
+    snapshot = WikirateSnapshot(args.db)
+    start = time.perf_counter()
+    if args.command == "import":
+        counts = {"companies": snapshot.upsert_companies(load_companies(args.company_source))}
+        counts["metrics"] = sum(snapshot.import_metrics_csv(p) for p in args.metrics_csv)
+        counts["answers"] = sum(snapshot.import_answers_csv(p) for p in args.answers_csv)
+        if args.from_api:
+            names = [snapshot.resolve(n) or n for n in args.companies]
+            counts["api"] = asyncio.run(pull_from_api(snapshot, names, incremental=False))
+        snapshot.set_meta("imported_at", datetime.now().isoformat(timespec="seconds"))
+    else:
+        names = args.companies
+        if names is None:
+            names = [r[0] for r in snapshot.conn.execute(
+                "SELECT name FROM companies WHERE answers_refreshed_at IS NOT NULL"
+            )]
+        else:
+            names = [snapshot.resolve(n) or n for n in names]
+        counts = asyncio.run(pull_from_api(snapshot, names, incremental=True))
+        snapshot.set_meta("refreshed_at", datetime.now().isoformat(timespec="seconds"))
+    print(f"{args.command}: {counts} in {time.perf_counter() - start:.1f}s -> {args.db}")
+    snapshot.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,7 +1,11 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI
+import asyncio
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from gw_api.api import (
     upload_router,
@@ -14,6 +18,7 @@ from gw_api.api import (
     city_rankings_router
 )
 from gw_api.db import init_db
+from gw_api.core.tracing import TracingMiddleware
 
 app = FastAPI(title="ESG Greenwashing Analysis API")
 
@@ -31,13 +36,93 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/llm")
+async def llm_governor_stats():
+    """Queue depth, in-flight requests and wait times of the shared LLM governor"""
+    from gw_api.core.llm_governor import governor
+
+    return governor.snapshot()
+
+
+@app.get("/health/news-prefetch")
+async def news_prefetch_stats():
+    """Queue, budget and recent runs of the background news prefetch scheduler"""
+    from gw_api.core.news_prefetch import get_news_prefetcher
+
+    return get_news_prefetcher().snapshot()
+
+
+@app.get("/health/ocr")
+async def ocr_pool_stats():
+    """Workers, queue and outcomes of the OCR worker pool"""
+    from gw_api.core.ocr_pool import get_ocr_pool
+
+    return get_ocr_pool().snapshot()
+
+
+@app.get("/warmup")
+async def warmup(components: Optional[str] = None):
+    """
+    Load models and clients ahead of traffic instead of on the first request that needs them.
+    `components`: comma-separated subset of companies, prompts, llm, embeddings, climatebert, ocr (default all)
+    """
+    from gw_api.core.lazy import warm_up
+
+    names = [c.strip() for c in components.split(",") if c.strip()] if components else None
+    try:
+        return await asyncio.to_thread(warm_up, names)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.on_event("startup")
+def start_warmup():
+    from gw_api.core.lazy import WARMUP_ON_STARTUP, warm_up_in_background
+
+    if WARMUP_ON_STARTUP:
+        warm_up_in_background()
+
+
+@app.on_event("shutdown")
+def stop_ocr_pool():
+    from gw_api.core.ocr_pool import get_ocr_pool
+
+    get_ocr_pool().close()
+
+
+@app.on_event("startup")
+def start_news_prefetch():
+    from gw_api.core.news_prefetch import PREFETCH_ENABLED, get_news_prefetcher
+
+    if PREFETCH_ENABLED:
+        get_news_prefetcher().start()
+
+
+@app.on_event("shutdown")
+def stop_news_prefetch():
+    from gw_api.core.news_prefetch import get_news_prefetcher
+
+    get_news_prefetcher().stop()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of in-process latency histograms and counters"""
+    from gw_api.core.metrics import CONTENT_TYPE, render_latest
+
+    return PlainTextResponse(render_latest(), media_type=CONTENT_TYPE)
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Trace-Id"],
 )
+# Outermost: one trace per request, covering streamed responses
+app.add_middleware(TracingMiddleware)
 
 app.include_router(upload_router, prefix="/v2")
 app.include_router(chat_router, prefix="/v2")
@@ -0,0 +1,81 @@
+"""LLMGovernor admission, wakeups and exported metrics"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from gw_api.core import metrics
+from gw_api.core.llm_governor import BucketLimits, LLMGovernor
+
+
+def _series(metric, model: str, priority: str):
+    return metric._series.get((model, priority))
+
+
+def test_async_waiter_wakes_on_release():
+    governor = LLMGovernor({"m-wake": BucketLimits(rpm=0, tpm=0, max_in_flight=1)})
+
+    async def run():
+        first = await governor.acquire_async("m-wake")
+        waiter = asyncio.ensure_future(governor.acquire_async("m-wake"))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        assert _series(metrics.llm_governor_queued, "m-wake", "interactive") == 1
+        released = time.monotonic()
+        # Released from another thread, as sync LLM code running in to_thread would
+        threading.Thread(target=governor.release, args=(first,)).start()
+        second = await asyncio.wait_for(waiter, 1)
+        governor.release(second)
+        return time.monotonic() - released
+
+    assert asyncio.run(run()) < 0.02
+    assert _series(metrics.llm_governor_queued, "m-wake", "interactive") == 0
+    assert _series(metrics.llm_governor_in_flight, "m-wake", "interactive") == 0
+    assert _series(metrics.llm_governor_wait_seconds, "m-wake", "interactive")[-1] > 0
+
+
+def test_interactive_is_served_before_batch():
+    governor = LLMGovernor({"m-prio": BucketLimits(rpm=0, tpm=0, max_in_flight=1)})
+    order = []
+
+    async def call(priority):
+        async with governor.aslot("m-prio", priority=priority):
+            order.append(priority)
+
+    async def run():
+        holder = await governor.acquire_async("m-prio")
+        tasks = [asyncio.ensure_future(call("batch")), asyncio.ensure_future(call("interactive"))]
+        await asyncio.sleep(0.01)
+        governor.release(holder)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert order == ["interactive", "batch"]
+
+
+def test_batch_share_of_rpm():
+    governor = LLMGovernor({"m-rpm": BucketLimits(rpm=4, tpm=0, max_in_flight=0)})
+    for _ in range(2):
+        governor.release(governor.acquire("m-rpm", priority="batch"))
+    with pytest.raises(TimeoutError):
+        governor.acquire("m-rpm", priority="batch", timeout=0.05)
+    governor.release(governor.acquire("m-rpm", priority="interactive", timeout=0.05))
+    assert _series(metrics.llm_governor_queued, "m-rpm", "batch") == 0
+
+
+def test_async_timeout_leaves_the_queue():
+    governor = LLMGovernor({"m-timeout": BucketLimits(rpm=0, tpm=0, max_in_flight=1)})
+
+    async def run():
+        holder = await governor.acquire_async("m-timeout")
+        with pytest.raises(TimeoutError):
+            await governor.acquire_async("m-timeout", timeout=0.05)
+        governor.release(holder)
+
+    asyncio.run(run())
+    snapshot = governor.snapshot()
+    assert snapshot["models"]["m-timeout"]["queue_depth"]["interactive"] == 0
+    assert snapshot["stats"]["m-timeout"]["interactive"]["timeouts"] == 1
+    assert _series(metrics.llm_governor_queued, "m-timeout", "interactive") == 0
@@ -0,0 +1,184 @@
+"""NewsFetcher against local aiohttp servers (no network)"""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from benchmarks import news_fixture
+from gw_api.core import news_filter
+from gw_api.core.background_loop import run_sync
+from gw_api.webscraper import article_store
+from gw_api.webscraper.article_store import ArticleStore
+from gw_api.webscraper.bbc_search import BBCSource
+from gw_api.webscraper.news_fetcher import NewsFetcher
+from gw_api.webscraper.news_sources import FixtureStore, SearchError
+
+
+class Server:
+    """/slow/{n} tracks concurrent requests, /flaky answers 503 `fail_first` times, /hang never answers in time"""
+
+    def __init__(self, fail_first: int = 0, delay_s: float = 0.05):
+        self.fail_first = fail_first
+        self.delay_s = delay_s
+        self.hits = {}
+        self.in_flight = self.max_in_flight = 0
+
+    def _hit(self, name: str) -> int:
+        self.hits[name] = self.hits.get(name, 0) + 1
+        return self.hits[name]
+
+    async def slow(self, request: web.Request) -> web.Response:
+        self._hit("slow")
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay_s)
+        finally:
+            self.in_flight -= 1
+        return web.Response(text=f"article {request.match_info['n']}")
+
+    async def flaky(self, request: web.Request) -> web.Response:
+        if self._hit("flaky") <= self.fail_first:
+            raise web.HTTPServiceUnavailable()
+        return web.Response(text="recovered")
+
+    async def missing(self, request: web.Request) -> web.Response:
+        self._hit("missing")
+        raise web.HTTPNotFound()
+
+    async def hang(self, request: web.Request) -> web.Response:
+        self._hit("hang")
+        await asyncio.sleep(5)
+        return web.Response(text="too late")
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/slow/{n}", self.slow)
+        app.router.add_get("/flaky", self.flaky)
+        app.router.add_get("/missing", self.missing)
+        app.router.add_get("/hang", self.hang)
+        return app
+
+
+def fetcher(**kwargs) -> NewsFetcher:
+    kwargs.setdefault("backoff_s", 0.0)
+    return NewsFetcher(sources=kwargs.pop("sources", []), fixtures=FixtureStore(mode="off"), **kwargs)
+
+
+async def with_server(server: Server, fn):
+    runner = web.AppRunner(server.app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    try:
+        return await fn(base)
+    finally:
+        await runner.cleanup()
+
+
+def test_downloads_respect_the_per_host_limit():
+    server = Server(delay_s=0.05)
+
+    async def run(base):
+        http = fetcher(max_per_host=2)
+        try:
+            return await http.fetch_many([f"{base}/slow/{i}" for i in range(8)])
+        finally:
+            await http.close()
+
+    bodies = asyncio.run(with_server(server, run))
+    assert sorted(bodies.values()) == sorted(f"article {i}" for i in range(8))
+    assert server.max_in_flight == 2
+
+
+def test_retries_5xx_then_gives_up():
+    server = Server(fail_first=2)
+
+    async def run(base):
+        http = fetcher(retries=2)
+        try:
+            recovered = await http.get_text(f"{base}/flaky", "article")
+            server.hits.clear()
+            server.fail_first = 10
+            exhausted = await http.get_text(f"{base}/flaky", "article")
+            return recovered, exhausted
+        finally:
+            await http.close()
+
+    recovered, exhausted = asyncio.run(with_server(server, run))
+    assert recovered == "recovered"
+    assert exhausted is None
+    assert server.hits["flaky"] == 3  # first attempt + 2 retries
+
+
+def test_404_is_not_retried():
+    server = Server()
+
+    async def run(base):
+        http = fetcher(retries=2)
+        try:
+            return await http.get_text(f"{base}/missing", "article")
+        finally:
+            await http.close()
+
+    assert asyncio.run(with_server(server, run)) is None
+    assert server.hits["missing"] == 1
+
+
+def test_timeout_returns_none_after_retries():
+    server = Server()
+
+    async def run(base):
+        http = fetcher(retries=1, timeout_s=0.2)
+        try:
+            return await http.get_text(f"{base}/hang", "article")
+        finally:
+            await http.close()
+
+    assert asyncio.run(with_server(server, run)) is None
+    assert server.hits["hang"] == 2
+
+
+def _fixture_search(config: news_fixture.FixtureConfig, aliases):
+    async def run():
+        runner, base = await news_fixture.start(config)
+        http = fetcher(sources=[BBCSource(base_url=base, rate_per_s=0)], retries=0)
+        try:
+            return await http.collect_results(aliases)
+        finally:
+            await http.close()
+            await runner.cleanup()
+
+    return asyncio.run(run())
+
+
+def test_search_merges_aliases_without_duplicates():
+    results = _fixture_search(news_fixture.FixtureConfig(latency_ms=0), ["Acme", "Acme plc"])
+    links = [r.link for r in results]
+    assert results and len(links) == len(set(links))
+    assert all(r.source == "bbc" for r in results)
+
+
+def test_search_raises_when_every_source_fails():
+    with pytest.raises(SearchError):
+        _fixture_search(news_fixture.FixtureConfig(latency_ms=0, error_rate=1.0), ["Acme"])
+
+
+def test_failed_search_is_not_cached(tmp_path, monkeypatch):
+    config = news_fixture.FixtureConfig(latency_ms=0, error_rate=1.0)
+    runner, base = run_sync(news_fixture.start(config))
+    http = fetcher(sources=[BBCSource(base_url=base, rate_per_s=0)], retries=0)
+    store = ArticleStore(tmp_path)
+    monkeypatch.setattr(article_store, "USE_FAKE_PROVIDERS", False)
+    monkeypatch.setattr(article_store, "get_news_fetcher", lambda: http)
+    monkeypatch.setattr(news_filter, "get_article_store", lambda: store)
+    try:
+        verdicts, _ = news_filter.filter_company_news("Acme", ["Acme"], max_articles=3)
+    finally:
+        run_sync(http.close())
+        run_sync(runner.cleanup())
+    assert verdicts == []
+    assert config.requests.get("search")
+    assert store.company_results("Acme") is None  # the next validation searches again
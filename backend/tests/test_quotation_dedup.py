@@ -0,0 +1,51 @@
+"""Near-duplicate quotation collapsing"""
+
+from gw_api.core import quotation_dedup
+from gw_api.core.quotation_dedup import dedupe_quotations, normalize_quotation, shingle
+
+LONG = (
+    "In 2023 we reduced our Scope 1 and 2 emissions by 42% compared to the 2019 baseline, "
+    "while doubling renewable electricity purchases across all of our European manufacturing sites "
+    "and rolling out heat pumps in every new warehouse."
+)
+SUB_SPAN = "we reduced our Scope 1 and 2 emissions by 42% compared to the 2019 baseline"
+
+
+def _quote(text: str, page: int, score: int = 50) -> dict:
+    return {"quotation": text, "page": page, "greenwashing_likelihood_score": score, "explanation": text[:20]}
+
+
+def test_sub_span_is_merged_into_the_longer_quotation():
+    a, b = shingle(normalize_quotation(LONG)), shingle(normalize_quotation(SUB_SPAN))
+    # Too dissimilar for the LSH bands; only the containment lookup pairs them
+    assert len(a & b) / len(a | b) < 0.5
+
+    deduped, mapping = dedupe_quotations([_quote(SUB_SPAN, 3), _quote(LONG, 7)])
+    assert len(deduped) == 1
+    assert deduped[0]["quotation"] == LONG
+    assert deduped[0]["pages"] == [3, 7]
+    assert mapping[0]["source_indices"] == [0, 1]
+
+
+def test_short_fragment_does_not_chain_quotations():
+    other = "Our European manufacturing sites will be net zero by 2030 thanks to renewable electricity."
+    deduped, _ = dedupe_quotations([_quote(LONG, 1), _quote("net zero", 2), _quote(other, 3)])
+    assert len(deduped) == 3
+
+
+def test_edge_variants_are_merged_and_distinct_quotations_kept():
+    quotations = [
+        _quote(SUB_SPAN, 1, score=40),
+        _quote("We reduced our Scope 1 and 2 emissions by 42% compared to the 2019 baseline.", 1, score=70),
+        _quote("All packaging will be fully recyclable or compostable by 2025.", 4),
+    ]
+    deduped, mapping = dedupe_quotations(quotations)
+    assert [q["greenwashing_likelihood_score"] for q in deduped] == [70, 50]
+    assert [m["source_indices"] for m in mapping] == [[0, 1], [2]]
+
+
+def test_containment_candidates_use_the_rarest_words():
+    tokens = [normalize_quotation(t).split() for t in (SUB_SPAN, LONG, "the 2019 baseline")]
+    pairs = set(quotation_dedup._containment_candidates(tokens))
+    assert (0, 1) in pairs
+    assert all(i != 2 for i, _ in pairs)  # below MIN_CONTAINMENT_WORDS
@@ -0,0 +1,52 @@
+from gw_api.wikirate.claims import check_claims
+
+ESG_DATA = {
+    "esg_data": [
+        {"metric_name": "Renewable energy share (%)", "unit": "%", "value": "44", "year": 2023},
+        {"metric_name": "Scope 1 Emissions", "unit": "tCO2e", "value": "1,200,000", "year": 2019},
+        {"metric_name": "Scope 1 Emissions", "unit": "tCO2e", "value": "1,150,000", "year": 2023},
+        {"metric_name": "Scope 2 Emissions", "unit": "tCO2e", "value": "400,000", "year": 2019},
+        {"metric_name": "Scope 2 Emissions", "unit": "tCO2e", "value": "300,000", "year": 2023},
+    ]
+}
+
+
+def verdict(text, data=ESG_DATA):
+    return check_claims([text], data)[0]
+
+
+def test_claim_without_esg_topic_is_left_to_the_llm():
+    v = verdict("Revenue up 3% to 2 billion")
+    assert v.status == "undecided"
+    assert v.metric is None
+
+
+def test_scopeless_figure_is_not_compared_with_scope_metrics():
+    v = verdict("We emitted 500 t of CO2 in 2023")
+    assert v.status == "undecided"
+    assert "scope" in v.reason.lower()
+
+
+def test_scopeless_reduction_is_not_compared_with_scope_series():
+    v = verdict("We reduced emissions by 30% compared to 2019")
+    assert v.status == "undecided"
+
+
+def test_several_matching_metrics_are_left_to_the_llm():
+    data = {"esg_data": ESG_DATA["esg_data"] + [
+        {"metric_name": "Scope 1 GHG emissions (market-based)", "unit": "tCO2e", "value": "900,000", "year": 2023},
+    ]}
+    v = verdict("Scope 1 emissions were 1,150,000 tCO2e in 2023", data)
+    assert v.status == "undecided"
+    assert "Several Wikirate metrics" in v.reason
+
+
+def test_matching_scope_figure_is_decided():
+    assert verdict("Scope 1 emissions were 1,150,000 tCO2e in 2023").status == "supported"
+    assert verdict("Scope 1 emissions were 500,000 tCO2e in 2023").status == "contradicted"
+    assert verdict("Scope 2 emissions fell by 25% compared to 2019").status == "supported"
+
+
+def test_scopeless_figure_matches_scopeless_metric():
+    data = {"esg_data": [{"metric_name": "Total GHG emissions", "unit": "tCO2e", "value": "1,550,000", "year": 2023}]}
+    assert verdict("Our GHG emissions were 1.55 million tonnes in 2023", data).status == "supported"